@@ -2,12 +2,15 @@
 브로커 기본 인터페이스
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
 from datetime import datetime, date
 
 class BaseBroker(ABC):
     """브로커 기본 인터페이스"""
     
+    # 여러 계좌를 한 번에 조회하는 편이 유리한 브로커 (수집 엔진이 계좌를 묶어서 요청)
+    supports_batch_snapshot = False
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.name = config.get('name', 'Unknown')
@@ -40,6 +43,40 @@ class BaseBroker(ABC):
         """보유종목 조회"""
         pass
     
+    def iter_holdings_pages(self, account_number: str) -> Iterator[List[Dict[str, Any]]]:
+        """보유종목 페이지 단위 조회 (연속조회를 지원하는 브로커는 재정의)"""
+        yield self.get_holdings(account_number)
+    
+    def get_account_snapshot(self, account_number: str) -> Dict[str, Any]:
+        """잔고 + 보유종목 조회 (단일 호출을 지원하는 브로커는 재정의)"""
+        return {
+            'balance': self.get_balance(account_number),
+            'holdings': self.get_holdings(account_number)
+        }
+    
+    def stream_account_snapshot(self, account_number: str) -> Dict[str, Any]:
+        """잔고 + 보유종목 페이지 이터레이터 조회 (연속조회를 지원하는 브로커는 재정의)
+
+        Returns:
+            {'balance', 'holdings_pages'} - holdings_pages는 보유종목 페이지를 차례로 반환하는 이터레이터
+        """
+        snapshot = self.get_account_snapshot(account_number)
+        return {'balance': snapshot['balance'], 'holdings_pages': iter([snapshot['holdings']])}
+    
+    def get_account_snapshots(self, account_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 계좌 잔고 + 보유종목 조회
+
+        Returns:
+            계좌번호별 {'balance', 'holdings'} 또는 실패 시 {'error'}
+        """
+        snapshots = {}
+        for account_number in account_numbers:
+            try:
+                snapshots[account_number] = self.get_account_snapshot(account_number)
+            except Exception as e:
+                snapshots[account_number] = {'error': str(e)}
+        return snapshots
+    
     @abstractmethod
     def get_transactions(self, account_number: str, start_date: date, end_date: date) -> List[Dict[str, Any]]:
         """거래내역 조회"""
@@ -0,0 +1,199 @@
+"""
+한국투자증권 API asyncio 클라이언트
+"""
+import asyncio
+from typing import List, Dict, Any, Optional, Tuple
+from app.brokers.base_broker import BaseBroker
+from app.brokers.kis_broker import KISBroker
+from app.utils.exceptions import BrokerError
+from app.utils.logger import get_logger
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp 미설치 시 동기 KISBroker 사용
+    aiohttp = None
+
+logger = get_logger(__name__)
+
+# 재시도 대상 예외 (연결 오류/타임아웃, aiohttp 설치 시 HTTP 오류 포함)
+RETRY_EXCEPTIONS: Tuple[type, ...] = (asyncio.TimeoutError, OSError)
+if aiohttp is not None:
+    RETRY_EXCEPTIONS += (aiohttp.ClientError,)
+
+
+class AsyncKISBroker(KISBroker):
+    """asyncio 기반 한국투자증권 클라이언트
+
+    KISBroker의 응답 파싱/토큰 관리를 그대로 사용하고 HTTP 호출만 비동기로 수행합니다.
+    - keep-alive 연결 풀(aiohttp.TCPConnector) 하나를 이벤트 루프 안에서 공유
+    - 요청 속도 제한과 재시도 대기는 asyncio.sleep으로 처리해 스레드를 막지 않음
+    - 동시 요청 수는 api_settings.max_concurrency (기본 20)로 제한
+
+    여러 계좌 조회(get_account_snapshots)는 하나의 이벤트 루프에서 동시에 실행되므로
+    수집 처리량은 스레드 수가 아니라 API 요청 한도(rate_limit)에 따라 결정됩니다.
+    """
+
+    supports_batch_snapshot = True
+    DEFAULT_MAX_CONCURRENCY = 20
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.max_concurrency = int(self.api_settings.get('max_concurrency') or self.DEFAULT_MAX_CONCURRENCY)
+        self.pool_size = int(self.api_settings.get('http_pool_size') or self.max_concurrency)
+        self._http_session = None
+        self._http_loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._token_lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def is_available() -> bool:
+        """aiohttp 설치 여부"""
+        return aiohttp is not None
+
+    # HTTP 세션 -----------------------------------------------------------------
+
+    def _create_http_session(self):
+        """keep-alive 연결 풀을 가진 aiohttp 세션 생성 (실행 중인 이벤트 루프에서 호출)"""
+        if aiohttp is None:
+            raise BrokerError("비동기 클라이언트는 aiohttp가 필요합니다. (pip install aiohttp)")
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'Content-Type': 'application/json; charset=utf-8'}
+        )
+
+    def _get_http_session(self):
+        """현재 이벤트 루프의 HTTP 세션 (루프가 바뀌면 새로 생성)"""
+        loop = asyncio.get_running_loop()
+        if self._http_session is None or self._http_loop is not loop or self._http_session.closed:
+            self._http_session = self._create_http_session()
+            self._http_loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._token_lock = asyncio.Lock()
+        return self._http_session
+
+    async def aclose(self):
+        """HTTP 세션 종료"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+        self._http_loop = None
+
+    async def __aenter__(self) -> 'AsyncKISBroker':
+        if not self.connected:
+            await asyncio.to_thread(self.connect)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    # 요청 ----------------------------------------------------------------------
+
+    async def _ensure_token_async(self):
+        """토큰 만료 시 재발급 (동시 요청 중 한 번만 발급, 발급은 워커 스레드에서)"""
+        if self._is_token_expired():
+            async with self._token_lock:
+                if self._is_token_expired():
+                    await asyncio.to_thread(self._get_access_token)
+        if self._auth_generation != self.token_manager.generation:
+            self._install_auth_headers()
+
+    async def _make_request_async(self, method: str, url: str, headers: Dict[str, str],
+                                  params: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """API 요청 실행 (재시도 로직 포함), (응답 JSON, 응답 헤더) 반환"""
+        session = self._get_http_session()
+        for attempt in range(self.retry_count):
+            try:
+                await self._ensure_token_async()
+                # 인증 헤더는 토큰 세대마다 한 번 만든 dict 재사용
+                request_headers = {**self._auth_headers, **headers}
+
+                async with self._semaphore:
+                    # Rate limiting (동기 클라이언트와 같은 토큰 버킷, 이벤트 루프를 막지 않음)
+                    await self.rate_limiter.acquire_async()
+                    async with session.request(method, url, headers=request_headers, params=params) as response:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+                        return data, dict(response.headers)
+
+            except RETRY_EXCEPTIONS as e:
+                if attempt == self.retry_count - 1:
+                    raise BrokerError(f"API 요청 실패: {str(e)}")
+
+                # 재시도 전 대기 (다른 요청은 계속 진행)
+                await asyncio.sleep(2 ** attempt)
+
+        raise BrokerError("최대 재시도 횟수 초과")
+
+    async def _iter_balance_pages_async(self, account_number: str) -> List[Dict[str, Any]]:
+        """잔고조회 연속조회 전체 페이지 응답"""
+        ctx_fk100 = ''
+        ctx_nk100 = ''
+        continuation = False
+        pages = []
+
+        for _ in range(self.max_pages):
+            url, headers, params = self._balance_request(account_number, ctx_fk100, ctx_nk100, continuation)
+            data, response_headers = await self._make_request_async('GET', url, headers, params)
+            pages.append(data)
+
+            next_keys = self._next_page_keys(data, response_headers)
+            if next_keys is None:
+                return pages
+            ctx_fk100, ctx_nk100 = next_keys
+            continuation = True
+
+        logger.warning(f"계좌 {account_number} 연속조회 최대 페이지 수({self.max_pages}) 초과")
+        return pages
+
+    async def get_account_snapshot_async(self, account_number: str) -> Dict[str, Any]:
+        """잔고 + 보유종목 비동기 조회"""
+        try:
+            pages = await self._iter_balance_pages_async(account_number)
+            balance_info = self._parse_balance(account_number, pages[0]) if pages else None
+            holdings = [holding for data in pages for holding in self._parse_holdings(data)]
+
+            logger.info(f"계좌 {account_number} 잔고/보유종목 {len(holdings)}개 조회 완료")
+            return {'balance': balance_info, 'holdings': holdings}
+
+        except Exception as e:
+            logger.error(f"계좌 {account_number} 잔고/보유종목 조회 실패: {str(e)}")
+            raise BrokerError(f"잔고/보유종목 조회 실패: {str(e)}")
+
+    async def get_account_snapshots_async(self, account_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 계좌 동시 조회 (계좌별 실패는 {'error'}로 반환)"""
+        if not self.connected:
+            await asyncio.to_thread(self.connect)
+
+        results = await asyncio.gather(
+            *[self.get_account_snapshot_async(account_number) for account_number in account_numbers],
+            return_exceptions=True
+        )
+        return {
+            account_number: {'error': str(result)} if isinstance(result, Exception) else result
+            for account_number, result in zip(account_numbers, results)
+        }
+
+    # 동기 BaseBroker 인터페이스 -----------------------------------------------------
+
+    def _run(self, coro):
+        """동기 호출용: 새 이벤트 루프에서 실행 후 HTTP 세션 정리"""
+        async def run():
+            try:
+                return await coro
+            finally:
+                await self.aclose()
+        return asyncio.run(run())
+
+    def get_account_snapshot(self, account_number: str) -> Dict[str, Any]:
+        """잔고 + 보유종목 조회"""
+        return self._run(self.get_account_snapshot_async(account_number))
+
+    def get_account_snapshots(self, account_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 계좌 잔고 + 보유종목 조회 (하나의 이벤트 루프에서 동시 실행)"""
+        return self._run(self.get_account_snapshots_async(account_numbers))
+
+    def stream_account_snapshot(self, account_number: str) -> Dict[str, Any]:
+        """잔고 + 보유종목 조회 (비동기 클라이언트는 연속조회까지 한 번에 조회 후 단일 페이지로 반환)"""
+        return BaseBroker.stream_account_snapshot(self, account_number)
@@ -1,11 +1,14 @@
 """
 한국투자증권 API 연동 클래스
 """
+import itertools
 import requests
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from datetime import datetime, date
 from app.brokers.base_broker import BaseBroker
+from app.brokers.price_cache import PriceCache
+from app.brokers.rate_limiter import RateLimiter
 from app.utils.exceptions import BrokerError, AuthenticationError
 from app.utils.logger import get_logger
 from app.utils.token_manager import TokenManager
@@ -15,6 +18,10 @@ logger = get_logger(__name__)
 class KISBroker(BaseBroker):
     """한국투자증권 API 연동 클래스"""
     
+    # 요청 경로에서 토큰을 만료로 간주하는 여유 시간 (초)
+    # 만료 token_refresh_threshold 전 갱신은 백그라운드 스레드가 담당
+    TOKEN_EXPIRY_MARGIN = 30
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.api_settings = config.get('api_settings', {})
@@ -23,7 +30,10 @@ class KISBroker(BaseBroker):
         self.timeout = self.api_settings.get('timeout', 30)
         self.retry_count = self.api_settings.get('retry_count', 3)
         self.rate_limit = self.api_settings.get('rate_limit', {})
+        self.rate_limiter = RateLimiter.from_config(self.rate_limit, name=self.name)
         self.token_refresh_threshold = self.api_settings.get('token_refresh_threshold', 300)
+        self.background_token_refresh = self.api_settings.get('background_token_refresh', True)
+        self.max_pages = self.api_settings.get('max_pages', 100)  # 연속조회 최대 페이지 수
         
         # API 설정 (환경변수에서 로드)
         self.tr_id_balance = self.api_settings.get('tr_id_balance', 'TTTC8434R')
@@ -33,6 +43,8 @@ class KISBroker(BaseBroker):
         # API 엔드포인트 (환경변수에서 로드)
         self.api_balance = self.api_settings.get('api_balance', '/uapi/domestic-stock/v1/trading/inquire-balance')
         self.api_accounts = self.api_settings.get('api_accounts', '/uapi/domestic-stock/v1/trading/inquire-balance')
+        self.api_multi_price = self.api_settings.get('api_multi_price', '/uapi/domestic-stock/v1/quotations/intstock-multprice')
+        self.tr_id_multi_price = self.api_settings.get('tr_id_multi_price', 'FHKST11300006')
         
         # 계좌 정보 (환경변수에서 로드)
         self.account_8_prod = self.api_settings.get('account_8_prod')
@@ -50,6 +62,13 @@ class KISBroker(BaseBroker):
         self.token_manager = TokenManager(broker_name="kis")
         self.access_token = None
         self.refresh_token = None
+        self._token_refresh_started = False
+        self._auth_headers: Dict[str, str] = {}
+        self._auth_generation: Optional[int] = None  # 인증 헤더를 만든 토큰 세대
+        self._approval_key: Optional[str] = None  # 실시간(WebSocket) 접속키
+        
+        # 종목 시세 캐시 (잔고조회/시세조회 응답으로 채움)
+        self.price_cache = PriceCache.from_config(self.api_settings.get('price_cache'))
         
         # 세션 설정
         self.session = requests.Session()
@@ -70,6 +89,11 @@ class KISBroker(BaseBroker):
             if not self._load_or_refresh_token():
                 self._get_access_token()
             
+            # 만료 전 백그라운드 갱신 (프로세스당 스레드 하나, 요청 경로는 발급을 기다리지 않음)
+            if self.background_token_refresh and not self._token_refresh_started:
+                self.token_manager.start_background_refresh(self._request_access_token, self.token_refresh_threshold)
+                self._token_refresh_started = True
+            
             self.connected = True
             logger.info(f"{self.name} API 연결이 완료되었습니다.")
             return True
@@ -82,6 +106,9 @@ class KISBroker(BaseBroker):
     def disconnect(self) -> bool:
         """한국투자증권 API 연결 해제"""
         try:
+            if self._token_refresh_started:
+                self.token_manager.stop_background_refresh()
+                self._token_refresh_started = False
             self.session.close()
             self.connected = False
             logger.info(f"{self.name} API 연결이 해제되었습니다.")
@@ -90,11 +117,17 @@ class KISBroker(BaseBroker):
             logger.error(f"{self.name} API 연결 해제 실패: {str(e)}")
             return False
     
+    def get_broker_info(self) -> Dict[str, Any]:
+        """브로커 정보 반환 (요청 속도 제한 메트릭 포함)"""
+        info = super().get_broker_info()
+        info['rate_limit'] = self.rate_limiter.get_metrics()
+        return info
+    
     def _load_or_refresh_token(self) -> bool:
         """저장된 토큰 로드 또는 갱신"""
         try:
-            # 저장된 토큰 확인
-            if self.token_manager.is_token_valid():
+            # 저장된 토큰 확인 (다른 프로세스가 발급한 토큰 포함)
+            if self.token_manager.is_token_valid(self.TOKEN_EXPIRY_MARGIN):
                 self.access_token = self.token_manager.get_access_token()
                 self.refresh_token = self.token_manager.get_refresh_token()
                 logger.info(f"저장된 토큰을 사용합니다: {self.name}")
@@ -108,8 +141,8 @@ class KISBroker(BaseBroker):
             logger.error(f"토큰 로드 실패: {str(e)}")
             return False
     
-    def _get_access_token(self) -> str:
-        """액세스 토큰 발급"""
+    def _request_access_token(self) -> Dict[str, Any]:
+        """토큰 발급 API 호출 (저장은 TokenManager.issue_token에서 잠금 안에 수행)"""
         try:
             url = f"{self.base_url}/oauth2/tokenP"
             data = {
@@ -121,53 +154,80 @@ class KISBroker(BaseBroker):
             response = self.session.post(url, json=data, timeout=self.timeout)
             response.raise_for_status()
             
-            token_data = response.json()
-            self.access_token = token_data.get('access_token')
-            self.refresh_token = token_data.get('refresh_token')
-            expires_in = token_data.get('expires_in', 86400)
+            logger.info("액세스 토큰이 발급되었습니다.")
+            return response.json()
+            
+        except requests.exceptions.RequestException as e:
+            raise AuthenticationError(f"토큰 발급 실패: {str(e)}")
+    
+    def _get_access_token(self) -> str:
+        """액세스 토큰 발급 (다른 프로세스가 먼저 발급했으면 그 토큰 사용)"""
+        token_info = self.token_manager.issue_token(self._request_access_token, self.TOKEN_EXPIRY_MARGIN)
+        self.access_token = token_info.get('access_token')
+        self.refresh_token = token_info.get('refresh_token')
+        return self.access_token
+    
+    def get_approval_key(self) -> str:
+        """실시간(WebSocket) 접속키 발급 (인스턴스당 한 번)"""
+        if self._approval_key:
+            return self._approval_key
+        
+        try:
+            url = f"{self.base_url}/oauth2/Approval"
+            data = {
+                "grant_type": "client_credentials",
+                "appkey": self.app_key,
+                "secretkey": self.app_secret
+            }
             
-            # 토큰을 파일에 저장
-            self.token_manager.save_token(
-                access_token=self.access_token,
-                refresh_token=self.refresh_token,
-                expires_in=expires_in
-            )
+            response = self.session.post(url, json=data, timeout=self.timeout)
+            response.raise_for_status()
             
-            logger.info("액세스 토큰이 발급되고 저장되었습니다.")
-            return self.access_token
+            self._approval_key = response.json().get('approval_key')
+            if not self._approval_key:
+                raise AuthenticationError("응답에 approval_key가 없습니다.")
+            logger.info("실시간 접속키가 발급되었습니다.")
+            return self._approval_key
             
         except requests.exceptions.RequestException as e:
-            raise AuthenticationError(f"토큰 발급 실패: {str(e)}")
+            raise AuthenticationError(f"실시간 접속키 발급 실패: {str(e)}")
     
     def _is_token_expired(self) -> bool:
-        """토큰 만료 여부 확인"""
-        return not self.token_manager.is_token_valid()
+        """토큰 만료 여부 확인 (만료 직전까지 사용, 미리 갱신은 백그라운드에서)"""
+        return self.token_manager.is_token_expired(self.TOKEN_EXPIRY_MARGIN)
+    
+    def _install_auth_headers(self):
+        """토큰 파일의 최신 토큰으로 인증 헤더를 만들어 세션에 설치"""
+        self.access_token = self.token_manager.get_access_token() or self.access_token
+        self._auth_headers = {
+            'authorization': f'Bearer {self.access_token}',
+            'appkey': self.app_key,
+            'appsecret': self.app_secret
+        }
+        self.session.headers.update(self._auth_headers)
+        self._auth_generation = self.token_manager.generation
+    
+    def _ensure_token(self):
+        """요청 전 토큰 확인 (만료 시각 비교만 하고, 인증 헤더는 토큰이 바뀔 때만 다시 설치)"""
+        if self._is_token_expired():
+            self._get_access_token()
+        if self._auth_generation != self.token_manager.generation:
+            self._install_auth_headers()
     
     def _make_request(self, method: str, url: str, **kwargs) -> requests.Response:
         """API 요청 실행 (재시도 로직 포함)"""
         for attempt in range(self.retry_count):
             try:
-                # 토큰 갱신 확인
-                if self._is_token_expired():
-                    self._get_access_token()
+                # 토큰 갱신 확인 (인증 헤더는 세션 기본 헤더)
+                self._ensure_token()
                 
-                # 헤더 설정
-                headers = kwargs.get('headers', {})
-                headers.update({
-                    'authorization': f'Bearer {self.access_token}',
-                    'appkey': self.app_key,
-                    'appsecret': self.app_secret
-                })
-                kwargs['headers'] = headers
+                # Rate limiting (브로커 인스턴스 공용 토큰 버킷)
+                self.rate_limiter.acquire()
                 
                 # 요청 실행
                 response = self.session.request(method, url, timeout=self.timeout, **kwargs)
                 response.raise_for_status()
                 
-                # Rate limiting
-                if self.rate_limit.get('requests_per_second'):
-                    time.sleep(1.0 / self.rate_limit['requests_per_second'])
-                
                 return response
                 
             except requests.exceptions.RequestException as e:
@@ -206,105 +266,138 @@ class KISBroker(BaseBroker):
             logger.error(f"계좌 목록 조회 실패: {str(e)}")
             raise BrokerError(f"계좌 목록 조회 실패: {str(e)}")
     
+    def _balance_request(self, account_number: str, ctx_fk100: str = '', ctx_nk100: str = '',
+                         continuation: bool = False) -> Tuple[str, Dict[str, str], Dict[str, str]]:
+        """잔고조회 API 요청 URL/헤더/파라미터 구성"""
+        url = f"{self.base_url}{self.api_balance}"
+        headers = {
+            'tr_id': self.tr_id_balance,
+            'custtype': 'P'
+        }
+        if continuation:
+            headers['tr_cont'] = 'N'  # 연속조회
+        
+        # 계좌번호 처리 (환경변수에서 가져온 계좌 정보 사용)
+        if self.account_8_prod and self.account_pd_prod:
+            cano = self.account_8_prod  # 앞 8자리
+            acnt_prdt_cd = self.account_pd_prod  # 계좌상품코드
+        else:
+            cano = account_number[:8]  # 계좌번호 앞 8자리
+            acnt_prdt_cd = self.account_product_code
+        
+        params = {
+            'CANO': cano,
+            'ACNT_PRDT_CD': acnt_prdt_cd,
+            'AFHR_FLPR_YN': 'N',
+            'OFL_YN': 'N',  # 실전거래
+            'INQR_DVSN': '01',  # 체결기준
+            'UNPR_DVSN': '01',  # 현재가 기준
+            'FUND_STTL_ICLD_YN': 'N',
+            'FNCG_AMT_AUTO_RDPT_YN': 'N',
+            'PRCS_DVSN': '01',
+            'CTX_AREA_FK100': ctx_fk100,
+            'CTX_AREA_NK100': ctx_nk100
+        }
+        return url, headers, params
+    
+    def _request_balance_inquiry(self, account_number: str, ctx_fk100: str = '',
+                                 ctx_nk100: str = '', continuation: bool = False) -> requests.Response:
+        """잔고조회 API 호출 (output1: 보유종목, output2: 계좌 요약)"""
+        if not self.connected:
+            self.connect()
+        
+        url, headers, params = self._balance_request(account_number, ctx_fk100, ctx_nk100, continuation)
+        return self._make_request('GET', url, headers=headers, params=params)
+    
+    @staticmethod
+    def _next_page_keys(data: Dict[str, Any], headers) -> Optional[Tuple[str, str]]:
+        """다음 페이지 연속조회 키 (마지막 페이지면 None)"""
+        # tr_cont: F/M - 다음 데이터 있음, D/E - 마지막 데이터
+        tr_cont = headers.get('tr_cont', '')
+        ctx_fk100 = (data.get('ctx_area_fk100') or '').strip()
+        ctx_nk100 = (data.get('ctx_area_nk100') or '').strip()
+        if tr_cont not in ('F', 'M') or not ctx_nk100:
+            return None
+        return ctx_fk100, ctx_nk100
+    
+    def _iter_balance_pages(self, account_number: str) -> Iterator[Dict[str, Any]]:
+        """잔고조회 연속조회 (CTX_AREA_FK100/NK100 + tr_cont 헤더) 페이지별 응답 반환"""
+        ctx_fk100 = ''
+        ctx_nk100 = ''
+        continuation = False
+        
+        for _ in range(self.max_pages):
+            response = self._request_balance_inquiry(account_number, ctx_fk100, ctx_nk100, continuation)
+            data = response.json()
+            yield data
+            
+            next_keys = self._next_page_keys(data, response.headers)
+            if next_keys is None:
+                return
+            ctx_fk100, ctx_nk100 = next_keys
+            continuation = True
+        
+        logger.warning(f"계좌 {account_number} 연속조회 최대 페이지 수({self.max_pages}) 초과")
+    
+    def _parse_balance(self, account_number: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """잔고조회 응답의 output2에서 계좌 요약 정보 파싱"""
+        balance_info = {
+            'account_number': account_number,
+            'cash_balance': 0,
+            'stock_balance': 0,
+            'total_balance': 0,
+            'evaluation_amount': 0,
+            'profit_loss': 0,
+            'profit_loss_rate': 0.0
+        }
+        
+        output2 = data.get('output2')
+        if isinstance(output2, list):
+            # 리스트 형태인 경우 첫 번째 항목 사용
+            output2 = output2[0] if output2 else None
+        
+        if isinstance(output2, dict):
+            balance_info['cash_balance'] = float(output2.get('dnca_tot_amt', 0))  # 총예수금
+            balance_info['total_balance'] = float(output2.get('tot_evlu_amt', 0))  # 총평가금액
+            balance_info['evaluation_amount'] = float(output2.get('scts_evlu_amt', 0))  # 주식평가금액
+            balance_info['profit_loss'] = float(output2.get('evlu_pfls_smtl_amt', 0))  # 평가손익
+            
+            # 주식 잔고 = 총평가금액 - 현금잔고
+            balance_info['stock_balance'] = balance_info['total_balance'] - balance_info['cash_balance']
+            
+            # 손익률 계산 (평가손익 / (총평가금액 - 평가손익) * 100)
+            if balance_info['total_balance'] - balance_info['profit_loss'] > 0:
+                balance_info['profit_loss_rate'] = (balance_info['profit_loss'] / (balance_info['total_balance'] - balance_info['profit_loss'])) * 100
+            else:
+                balance_info['profit_loss_rate'] = 0.0
+        
+        return balance_info
+    
+    def _parse_holdings(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """잔고조회 응답의 output1에서 보유종목 파싱"""
+        holdings = []
+        for item in data.get('output1') or []:
+            if item.get('pdno'):  # 주식 종목
+                holdings.append({
+                    'symbol': item.get('pdno', ''),  # 종목코드
+                    'name': item.get('prdt_name', ''),  # 종목명
+                    'quantity': int(item.get('hldg_qty', 0)),  # 보유수량
+                    'average_price': float(item.get('pchs_avg_pric', 0)),  # 평균단가
+                    'current_price': float(item.get('prpr', 0)),  # 현재가
+                    'evaluation_amount': float(item.get('evlu_amt', 0)),  # 평가금액
+                    'profit_loss': float(item.get('evlu_pfls_amt', 0)),  # 평가손익
+                    'profit_loss_rate': float(item.get('evlu_pfls_rt', 0))  # 평가손익률
+                })
+        
+        # 응답에 들어 있는 현재가로 시세 캐시 채움
+        self.price_cache.put_holdings(holdings)
+        return holdings
+    
     def get_balance(self, account_number: str) -> Dict[str, Any]:
         """계좌 잔고 조회"""
         try:
-            if not self.connected:
-                self.connect()
-            
-            url = f"{self.base_url}{self.api_balance}"
-            headers = {
-                'authorization': f'Bearer {self.access_token}',
-                'appkey': self.app_key,
-                'appsecret': self.app_secret,
-                'tr_id': self.tr_id_balance,
-                'custtype': 'P'
-            }
-            params = {
-                'CANO': account_number[:8],  # 계좌번호 앞 8자리
-                'ACNT_PRDT_CD': self.account_product_code,
-                'AFHR_FLPR_YN': 'N',
-                'OFL_YN': 'N',  # 실전거래
-                'INQR_DVSN': '01',  # 체결기준
-                'UNPR_DVSN': '01',  # 현재가 기준
-                'FUND_STTL_ICLD_YN': 'N',
-                'FNCG_AMT_AUTO_RDPT_YN': 'N',
-                'PRCS_DVSN': '01',
-                'CTX_AREA_FK100': '',
-                'CTX_AREA_NK100': ''
-            }
-            
-            # 계좌번호 처리 (환경변수에서 가져온 계좌 정보 사용)
-            if self.account_8_prod and self.account_pd_prod:
-                cano = self.account_8_prod  # 앞 8자리
-                acnt_prdt_cd = self.account_pd_prod  # 계좌상품코드
-            else:
-                cano = account_number[:8]  # 계좌번호 앞 8자리
-                acnt_prdt_cd = self.account_product_code
-            
-            params = {
-                'CANO': cano,
-                'ACNT_PRDT_CD': acnt_prdt_cd,
-                'AFHR_FLPR_YN': 'N',
-                'OFL_YN': 'N',  # 실전거래
-                'INQR_DVSN': '01',  # 체결기준
-                'UNPR_DVSN': '01',  # 현재가 기준
-                'FUND_STTL_ICLD_YN': 'N',
-                'FNCG_AMT_AUTO_RDPT_YN': 'N',
-                'PRCS_DVSN': '01',
-                'CTX_AREA_FK100': '',
-                'CTX_AREA_NK100': ''
-            }
-            
-            response = self._make_request('GET', url, headers=headers, params=params)
-            data = response.json()
-            
-            
-            # 잔고 정보 파싱 (사용자 제공 API 명세에 맞게)
-            balance_info = {
-                'account_number': account_number,
-                'cash_balance': 0,
-                'stock_balance': 0,
-                'total_balance': 0,
-                'evaluation_amount': 0,
-                'profit_loss': 0,
-                'profit_loss_rate': 0.0
-            }
-            
-            # output2에서 계좌 요약 정보 추출
-            if 'output2' in data:
-                output2 = data['output2']
-                if isinstance(output2, dict):
-                    balance_info['cash_balance'] = float(output2.get('dnca_tot_amt', 0))  # 총예수금
-                    balance_info['total_balance'] = float(output2.get('tot_evlu_amt', 0))  # 총평가금액
-                    balance_info['evaluation_amount'] = float(output2.get('scts_evlu_amt', 0))  # 주식평가금액
-                    balance_info['profit_loss'] = float(output2.get('evlu_pfls_smtl_amt', 0))  # 평가손익
-                    
-                    # 주식 잔고 = 총평가금액 - 현금잔고
-                    balance_info['stock_balance'] = balance_info['total_balance'] - balance_info['cash_balance']
-                    
-                    # 손익률 계산 (평가손익 / (총평가금액 - 평가손익) * 100)
-                    if balance_info['total_balance'] - balance_info['profit_loss'] > 0:
-                        balance_info['profit_loss_rate'] = (balance_info['profit_loss'] / (balance_info['total_balance'] - balance_info['profit_loss'])) * 100
-                    else:
-                        balance_info['profit_loss_rate'] = 0.0
-                        
-                elif isinstance(output2, list) and len(output2) > 0:
-                    # 리스트 형태인 경우 첫 번째 항목 사용
-                    output2_item = output2[0]
-                    balance_info['cash_balance'] = float(output2_item.get('dnca_tot_amt', 0))  # 총예수금
-                    balance_info['total_balance'] = float(output2_item.get('tot_evlu_amt', 0))  # 총평가금액
-                    balance_info['evaluation_amount'] = float(output2_item.get('scts_evlu_amt', 0))  # 주식평가금액
-                    balance_info['profit_loss'] = float(output2_item.get('evlu_pfls_smtl_amt', 0))  # 평가손익
-                    
-                    # 주식 잔고 = 총평가금액 - 현금잔고
-                    balance_info['stock_balance'] = balance_info['total_balance'] - balance_info['cash_balance']
-                    
-                    # 손익률 계산 (평가손익 / (총평가금액 - 평가손익) * 100)
-                    if balance_info['total_balance'] - balance_info['profit_loss'] > 0:
-                        balance_info['profit_loss_rate'] = (balance_info['profit_loss'] / (balance_info['total_balance'] - balance_info['profit_loss'])) * 100
-                    else:
-                        balance_info['profit_loss_rate'] = 0.0
+            data = self._request_balance_inquiry(account_number).json()
+            balance_info = self._parse_balance(account_number, data)
             
             logger.info(f"계좌 {account_number} 잔고 조회 완료")
             return balance_info
@@ -313,68 +406,74 @@ class KISBroker(BaseBroker):
             logger.error(f"계좌 {account_number} 잔고 조회 실패: {str(e)}")
             raise BrokerError(f"잔고 조회 실패: {str(e)}")
     
-    def get_holdings(self, account_number: str) -> List[Dict[str, Any]]:
-        """보유종목 조회"""
+    def iter_holdings_pages(self, account_number: str) -> Iterator[List[Dict[str, Any]]]:
+        """보유종목 페이지 단위 조회 (연속조회 키를 따라가며 페이지마다 반환)"""
         try:
-            if not self.connected:
-                self.connect()
-            
-            url = f"{self.base_url}{self.api_balance}"
-            headers = {
-                'authorization': f'Bearer {self.access_token}',
-                'appkey': self.app_key,
-                'appsecret': self.app_secret,
-                'tr_id': self.tr_id_balance,
-                'custtype': 'P'
-            }
-            
-            # 계좌번호 처리 (환경변수에서 가져온 계좌 정보 사용)
-            if self.account_8_prod and self.account_pd_prod:
-                cano = self.account_8_prod  # 앞 8자리
-                acnt_prdt_cd = self.account_pd_prod  # 계좌상품코드
-            else:
-                cano = account_number[:8]  # 계좌번호 앞 8자리
-                acnt_prdt_cd = self.account_product_code
-            
-            params = {
-                'CANO': cano,
-                'ACNT_PRDT_CD': acnt_prdt_cd,
-                'AFHR_FLPR_YN': 'N',
-                'OFL_YN': 'N',  # 실전거래
-                'INQR_DVSN': '01',  # 체결기준
-                'UNPR_DVSN': '01',  # 현재가 기준
-                'FUND_STTL_ICLD_YN': 'N',
-                'FNCG_AMT_AUTO_RDPT_YN': 'N',
-                'PRCS_DVSN': '01',
-                'CTX_AREA_FK100': '',
-                'CTX_AREA_NK100': ''
-            }
-            
-            response = self._make_request('GET', url, headers=headers, params=params)
-            data = response.json()
+            count = 0
+            for data in self._iter_balance_pages(account_number):
+                holdings = self._parse_holdings(data)
+                count += len(holdings)
+                yield holdings
             
-            holdings = []
-            if 'output1' in data:
-                for item in data['output1']:
-                    if item.get('pdno'):  # 주식 종목
-                        holdings.append({
-                            'symbol': item.get('pdno', ''),  # 종목코드
-                            'name': item.get('prdt_name', ''),  # 종목명
-                            'quantity': int(item.get('hldg_qty', 0)),  # 보유수량
-                            'average_price': float(item.get('pchs_avg_pric', 0)),  # 평균단가
-                            'current_price': float(item.get('prpr', 0)),  # 현재가
-                            'evaluation_amount': float(item.get('evlu_amt', 0)),  # 평가금액
-                            'profit_loss': float(item.get('evlu_pfls_amt', 0)),  # 평가손익
-                            'profit_loss_rate': float(item.get('evlu_pfls_rt', 0))  # 평가손익률
-                        })
-            
-            logger.info(f"계좌 {account_number} 보유종목 {len(holdings)}개 조회 완료")
-            return holdings
+            logger.info(f"계좌 {account_number} 보유종목 {count}개 조회 완료")
             
         except Exception as e:
             logger.error(f"계좌 {account_number} 보유종목 조회 실패: {str(e)}")
             raise BrokerError(f"보유종목 조회 실패: {str(e)}")
     
+    def get_holdings(self, account_number: str) -> List[Dict[str, Any]]:
+        """보유종목 조회"""
+        holdings = []
+        for page in self.iter_holdings_pages(account_number):
+            holdings.extend(page)
+        return holdings
+    
+    def get_account_snapshot(self, account_number: str) -> Dict[str, Any]:
+        """잔고 + 보유종목 동시 조회 (잔고조회 API 연속조회 1회)"""
+        try:
+            balance_info = None
+            holdings = []
+            for data in self._iter_balance_pages(account_number):
+                if balance_info is None:
+                    balance_info = self._parse_balance(account_number, data)
+                holdings.extend(self._parse_holdings(data))
+            
+            logger.info(f"계좌 {account_number} 잔고/보유종목 {len(holdings)}개 조회 완료")
+            return {'balance': balance_info, 'holdings': holdings}
+            
+        except Exception as e:
+            logger.error(f"계좌 {account_number} 잔고/보유종목 조회 실패: {str(e)}")
+            raise BrokerError(f"잔고/보유종목 조회 실패: {str(e)}")
+    
+    def stream_account_snapshot(self, account_number: str) -> Dict[str, Any]:
+        """잔고 + 보유종목 페이지 이터레이터 조회
+
+        첫 페이지(잔고 요약 포함)는 바로 조회하고, 연속조회 페이지는 holdings_pages를 소비할 때
+        한 페이지씩 조회하므로 보유종목 전체를 메모리에 모으지 않고 페이지마다 저장할 수 있습니다.
+        HTTP 세션을 사용하므로 holdings_pages는 조회를 시작한 스레드에서 소비해야 합니다.
+        """
+        try:
+            pages = self._iter_balance_pages(account_number)
+            first = next(pages)
+            balance_info = self._parse_balance(account_number, first)
+        except Exception as e:
+            logger.error(f"계좌 {account_number} 잔고/보유종목 조회 실패: {str(e)}")
+            raise BrokerError(f"잔고/보유종목 조회 실패: {str(e)}")
+        
+        def holdings_pages() -> Iterator[List[Dict[str, Any]]]:
+            count = 0
+            try:
+                for data in itertools.chain([first], pages):
+                    holdings = self._parse_holdings(data)
+                    count += len(holdings)
+                    yield holdings
+            except Exception as e:
+                logger.error(f"계좌 {account_number} 보유종목 연속조회 실패: {str(e)}")
+                raise BrokerError(f"보유종목 조회 실패: {str(e)}")
+            logger.info(f"계좌 {account_number} 잔고/보유종목 {count}개 조회 완료")
+        
+        return {'balance': balance_info, 'holdings_pages': holdings_pages()}
+    
     def get_transactions(self, account_number: str, start_date: date, end_date: date) -> List[Dict[str, Any]]:
         """거래내역 조회"""
         try:
@@ -420,36 +519,62 @@ class KISBroker(BaseBroker):
             logger.error(f"계좌 {account_number} 거래내역 조회 실패: {str(e)}")
             raise BrokerError(f"거래내역 조회 실패: {str(e)}")
     
-    def get_stock_price(self, stock_code: str) -> Dict[str, Any]:
-        """종목 가격 조회 (보유종목 조회 API 사용) - 보유종목만 조회 가능"""
-        try:
-            if not self.connected:
-                self.connect()
+    # 관심종목(멀티종목) 시세조회 1회당 최대 종목 수
+    MULTI_PRICE_BATCH = 30
+    
+    def _parse_multi_price(self, data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """관심종목 시세조회 응답 파싱"""
+        prices = {}
+        for item in data.get('output') or []:
+            symbol = (item.get('inter_shrn_iscd') or '').strip()
+            if not symbol:
+                continue
+            prices[symbol] = {
+                'stock_code': symbol,
+                'stock_name': (item.get('inter_kor_isnm') or '').strip(),
+                'current_price': float(item.get('inter2_prpr') or 0),  # 현재가
+                'change_price': float(item.get('inter2_prdy_vrss') or 0),  # 전일대비
+                'change_rate': float(item.get('prdy_ctrt') or 0),  # 전일대비율
+                'volume': int(item.get('acml_vol') or 0),  # 누적거래량
+                'source': 'quote'
+            }
+        return prices
+    
+    def _fetch_stock_prices(self, stock_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """관심종목 시세조회 API로 MULTI_PRICE_BATCH개씩 일괄 조회"""
+        if not self.connected:
+            self.connect()
+        
+        url = f"{self.base_url}{self.api_multi_price}"
+        headers = {
+            'tr_id': self.tr_id_multi_price,
+            'custtype': 'P'
+        }
+        prices = {}
+        for start in range(0, len(stock_codes), self.MULTI_PRICE_BATCH):
+            batch = stock_codes[start:start + self.MULTI_PRICE_BATCH]
+            params = {}
+            for i, stock_code in enumerate(batch, start=1):
+                params[f'FID_COND_MRKT_DIV_CODE_{i}'] = self.market_div_code
+                params[f'FID_INPUT_ISCD_{i}'] = stock_code
             
-            # 보유종목 조회를 통해 해당 종목 정보 찾기
-            if not self.account_8_prod or not self.account_pd_prod:
-                raise BrokerError("계좌 정보가 설정되지 않았습니다.")
-            
-            # 보유종목 조회
-            holdings = self.get_holdings(f"{self.account_8_prod}{self.account_pd_prod}")
-            
-            # 해당 종목 찾기
-            for holding in holdings:
-                if holding.get('symbol') == stock_code:
-                    return {
-                        'stock_code': stock_code,
-                        'stock_name': holding.get('name', ''),
-                        'current_price': holding.get('current_price', 0),
-                        'change_rate': holding.get('profit_loss_rate', 0),
-                        'change_price': holding.get('current_price', 0) - holding.get('average_price', 0),
-                        'quantity': holding.get('quantity', 0),
-                        'evaluation_amount': holding.get('evaluation_amount', 0),
-                        'profit_loss': holding.get('profit_loss', 0)
-                    }
-            
-            # 보유하지 않은 종목인 경우
-            raise BrokerError(f"보유하지 않은 종목입니다: {stock_code}")
-                
+            response = self._make_request('GET', url, headers=headers, params=params)
+            prices.update(self._parse_multi_price(response.json()))
+        
+        logger.debug(f"종목 {len(stock_codes)}개 시세 조회 완료 (API {-(-len(stock_codes) // self.MULTI_PRICE_BATCH)}회)")
+        return prices
+    
+    def get_stock_prices(self, stock_codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 종목 가격 조회 (캐시에 없는 종목만 일괄 조회, 조회되지 않은 종목은 제외)"""
+        try:
+            return self.price_cache.get_many(stock_codes, self._fetch_stock_prices)
         except Exception as e:
-            logger.error(f"종목 가격 조회 실패: {str(e)}")
+            logger.error(f"종목 가격 일괄 조회 실패: {str(e)}")
             raise BrokerError(f"종목 가격 조회 실패: {str(e)}")
+    
+    def get_stock_price(self, stock_code: str) -> Dict[str, Any]:
+        """종목 가격 조회 (시세 캐시 사용, 보유하지 않은 종목도 조회 가능)"""
+        price = self.get_stock_prices([stock_code]).get(stock_code)
+        if price is None:
+            raise BrokerError(f"종목 가격 조회 실패: 시세를 찾을 수 없습니다: {stock_code}")
+        return price
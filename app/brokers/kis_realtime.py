@@ -0,0 +1,265 @@
+"""
+한국투자증권 실시간 체결가 WebSocket 클라이언트
+"""
+import json
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Iterable
+from app.utils.exceptions import BrokerError
+from app.utils.logger import get_logger
+
+try:
+    import websocket
+except ImportError:  # websocket-client 미설치 시 실시간 시세 사용 불가
+    websocket = None
+
+logger = get_logger(__name__)
+
+TR_ID_PRICE = 'H0STCNT0'  # 국내주식 실시간 체결가
+TR_ID_PINGPONG = 'PINGPONG'
+
+# H0STCNT0 응답 필드 위치 ('^' 구분, 종목당 46개 필드)
+FIELD_SYMBOL = 0        # MKSC_SHRN_ISCD 종목코드
+FIELD_TIME = 1          # STCK_CNTG_HOUR 체결시간 (HHMMSS)
+FIELD_PRICE = 2         # STCK_PRPR 현재가
+FIELD_CHANGE = 4        # PRDY_VRSS 전일대비
+FIELD_CHANGE_RATE = 5   # PRDY_CTRT 전일대비율
+FIELD_VOLUME = 13       # ACML_VOL 누적거래량
+
+
+def parse_price_message(message: str) -> List[Dict[str, Any]]:
+    """실시간 체결가 메시지 파싱
+
+    메시지 형식: '0|H0STCNT0|003|필드^필드^...' (암호화 여부|TR ID|건수|데이터)
+    건수가 2 이상이면 여러 체결이 이어서 들어오므로 필드 수를 건수로 나눠 분리합니다.
+    """
+    parts = message.split('|', 3)
+    if len(parts) != 4 or parts[1] != TR_ID_PRICE:
+        return []
+
+    fields = parts[3].split('^')
+    count = int(parts[2] or 1)
+    width = len(fields) // count if count > 0 else 0
+    if width <= FIELD_VOLUME:
+        logger.warning(f"실시간 체결가 메시지 형식 오류: {message[:80]}")
+        return []
+
+    ticks = []
+    for i in range(count):
+        record = fields[i * width:(i + 1) * width]
+        try:
+            ticks.append({
+                'symbol': record[FIELD_SYMBOL],
+                'price': float(record[FIELD_PRICE]),
+                'change': float(record[FIELD_CHANGE] or 0),
+                'change_rate': float(record[FIELD_CHANGE_RATE] or 0),
+                'volume': int(record[FIELD_VOLUME] or 0),
+                'trade_time': record[FIELD_TIME],
+                'received_at': datetime.now()
+            })
+        except (ValueError, IndexError):
+            logger.warning(f"실시간 체결가 파싱 실패: {record[:3]}")
+    return ticks
+
+
+class KISRealtimeClient:
+    """한국투자증권 실시간 체결가 구독 클라이언트
+
+    백그라운드 스레드에서 WebSocket에 접속해 종목별 체결가(H0STCNT0)를 구독하고,
+    체결마다 on_price(tick)를 호출합니다.
+    - 접속이 끊기면 지수 백오프로 재접속한 뒤 구독 종목을 다시 등록
+    - PINGPONG 메시지는 그대로 돌려보내 연결 유지
+    - 한 접속키로 등록 가능한 종목 수(max_subscriptions, 기본 40)를 넘는 종목은 구독하지 않음
+    """
+
+    DEFAULT_WEBSOCKET_URL = 'ws://ops.koreainvestment.com:21000'
+    DEFAULT_MAX_SUBSCRIPTIONS = 40
+    RECV_TIMEOUT = 1.0       # 종료 요청 확인 간격 (초)
+    MAX_RECONNECT_DELAY = 30
+
+    def __init__(self, broker, on_price: Callable[[Dict[str, Any]], None],
+                 websocket_url: Optional[str] = None):
+        self.broker = broker
+        self.on_price = on_price
+        api_settings = broker.api_settings
+        self.websocket_url = websocket_url or api_settings.get('websocket_url', self.DEFAULT_WEBSOCKET_URL)
+        self.max_subscriptions = int(api_settings.get('realtime_max_subscriptions') or self.DEFAULT_MAX_SUBSCRIPTIONS)
+        self.timeout = api_settings.get('timeout', 30)
+
+        self.symbols: List[str] = []
+        self._ws = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._connected = threading.Event()
+        self.metrics = {'messages': 0, 'ticks': 0, 'reconnects': 0}
+
+    @staticmethod
+    def is_available() -> bool:
+        """websocket-client 설치 여부"""
+        return websocket is not None
+
+    # 구독 관리 -------------------------------------------------------------------
+
+    def _subscription_message(self, symbol: str, subscribe: bool = True) -> str:
+        """구독 등록(tr_type=1)/해제(tr_type=2) 요청"""
+        return json.dumps({
+            'header': {
+                'approval_key': self.broker.get_approval_key(),
+                'custtype': 'P',
+                'tr_type': '1' if subscribe else '2',
+                'content-type': 'utf-8'
+            },
+            'body': {'input': {'tr_id': TR_ID_PRICE, 'tr_key': symbol}}
+        })
+
+    def _send(self, message: str):
+        ws = self._ws
+        if ws is not None and self._connected.is_set():
+            ws.send(message)
+
+    def subscribe(self, symbols: Iterable[str]):
+        """종목 구독 추가 (접속 중이면 바로 등록)"""
+        with self._lock:
+            added = []
+            for symbol in symbols:
+                if symbol in self.symbols:
+                    continue
+                if len(self.symbols) >= self.max_subscriptions:
+                    logger.warning(f"실시간 구독 한도({self.max_subscriptions}) 초과, 구독하지 않음: {symbol}")
+                    continue
+                self.symbols.append(symbol)
+                added.append(symbol)
+            for symbol in added:
+                self._send(self._subscription_message(symbol))
+
+    def unsubscribe(self, symbols: Iterable[str]):
+        """종목 구독 해제"""
+        with self._lock:
+            for symbol in symbols:
+                if symbol in self.symbols:
+                    self.symbols.remove(symbol)
+                    self._send(self._subscription_message(symbol, subscribe=False))
+
+    # 실행 -----------------------------------------------------------------------
+
+    def start(self, symbols: Iterable[str] = ()):
+        """백그라운드 스레드에서 접속 및 구독 시작"""
+        if websocket is None:
+            raise BrokerError("실시간 시세는 websocket-client가 필요합니다. (pip install websocket-client)")
+        self.subscribe(symbols)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='kis-realtime', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """접속 종료 및 스레드 정지"""
+        self._stop_event.set()
+        self._connected.clear()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        """접속 및 구독 등록 완료 대기"""
+        return self._connected.wait(timeout)
+
+    def is_connected(self) -> bool:
+        return self._connected.is_set()
+
+    def _connect(self):
+        """접속 후 구독 종목 전체 등록"""
+        self._ws = websocket.create_connection(self.websocket_url, timeout=self.timeout)
+        self._ws.settimeout(self.RECV_TIMEOUT)
+        with self._lock:
+            for symbol in self.symbols:
+                self._ws.send(self._subscription_message(symbol))
+            self._connected.set()
+        logger.info(f"실시간 체결가 접속 완료: 종목 {len(self.symbols)}개 구독")
+
+    def _run(self):
+        attempt = 0
+        while not self._stop_event.is_set():
+            try:
+                self._connect()
+                attempt = 0
+                while not self._stop_event.is_set():
+                    try:
+                        message = self._ws.recv()
+                    except websocket.WebSocketTimeoutException:
+                        continue
+                    if not message:
+                        raise websocket.WebSocketConnectionClosedException("빈 메시지 수신 (접속 종료)")
+                    self._handle_message(message)
+
+            except (websocket.WebSocketException, OSError) as e:
+                if self._stop_event.is_set():
+                    break
+                attempt += 1
+                self.metrics['reconnects'] += 1
+                delay = min(2 ** attempt, self.MAX_RECONNECT_DELAY)
+                logger.warning(f"실시간 체결가 접속 끊김, {delay}초 후 재접속: {str(e)}")
+
+            except Exception as e:
+                # 접속키 발급 실패 등
+                logger.error(f"실시간 체결가 수신 오류: {str(e)}")
+                attempt += 1
+                delay = min(2 ** attempt, self.MAX_RECONNECT_DELAY)
+
+            else:
+                break
+
+            finally:
+                self._connected.clear()
+                if self._ws is not None:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                    self._ws = None
+
+            self._stop_event.wait(delay)
+
+    def _handle_message(self, message):
+        """수신 메시지 처리 (체결 데이터, PINGPONG, 구독 응답)"""
+        if isinstance(message, bytes):
+            message = message.decode('utf-8')
+        self.metrics['messages'] += 1
+
+        if message[0] in ('0', '1'):
+            if message[0] == '1':
+                # 암호화 데이터 (체결통보 등)는 구독하지 않음
+                logger.debug(f"암호화된 실시간 메시지 무시: {message[:20]}")
+                return
+            for tick in parse_price_message(message):
+                self.metrics['ticks'] += 1
+                try:
+                    self.on_price(tick)
+                except Exception as e:
+                    logger.error(f"실시간 체결가 처리 실패 ({tick['symbol']}): {str(e)}")
+            return
+
+        try:
+            data = json.loads(message)
+        except json.JSONDecodeError:
+            logger.warning(f"알 수 없는 실시간 메시지: {message[:80]}")
+            return
+
+        header = data.get('header', {})
+        if header.get('tr_id') == TR_ID_PINGPONG:
+            self._ws.send(message)
+            return
+
+        body = data.get('body', {})
+        if body.get('rt_cd') not in (None, '0'):
+            logger.warning(f"실시간 구독 실패 ({header.get('tr_key')}): {body.get('msg1')}")
+        else:
+            logger.debug(f"실시간 구독 응답 ({header.get('tr_key')}): {body.get('msg1')}")
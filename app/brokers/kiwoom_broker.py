@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, date
 from pathlib import Path
 from app.brokers.base_broker import BaseBroker
+from app.brokers.kiwoom_worker_client import KiwoomWorkerClient
 from app.utils.exceptions import BrokerError, AuthenticationError
 from app.utils.logger import get_logger
 
@@ -18,6 +19,9 @@ logger = get_logger(__name__)
 class KiwoomBroker(BaseBroker):
     """키움증권 브로커 클래스 (32비트 서브프로세스 방식)"""
 
+    # 로그인 비용이 크므로 계좌 조회를 묶어서 처리
+    supports_batch_snapshot = True
+
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.credentials = config.get('credentials', {})
@@ -34,6 +38,17 @@ class KiwoomBroker(BaseBroker):
         project_root = Path(__file__).parent.parent.parent
         self.worker_script = project_root / 'workers' / 'kiwoom_worker_32.py'
 
+        # Worker 실행 방식 (기본: 상주 프로세스 - 로그인 세션 재사용)
+        self.persistent_worker = self.api_settings.get('persistent_worker', True)
+        self.worker_timeout = self.api_settings.get('worker_timeout', 60)
+        self.batch_command_timeout = self.api_settings.get('batch_command_timeout', 15)
+        self.worker_client = KiwoomWorkerClient(
+            self.python32_path,
+            str(self.worker_script),
+            startup_timeout=self.api_settings.get('worker_startup_timeout', 120),
+            request_timeout=self.worker_timeout
+        )
+
         # 연결 상태 캐싱
         self._accounts_cache = None
 
@@ -52,6 +67,7 @@ class KiwoomBroker(BaseBroker):
     def disconnect(self) -> bool:
         """브로커 연결 해제"""
         try:
+            self.worker_client.close()
             self.connected = False
             self._accounts_cache = None
             logger.info(f"{self.name} API 연결 해제")
@@ -62,7 +78,24 @@ class KiwoomBroker(BaseBroker):
             return False
 
     def _run_worker(self, command: str, *args) -> Dict[str, Any]:
-        """32비트 Worker 프로세스 실행"""
+        """32비트 Worker 명령 실행 (상주 프로세스 또는 1회성 프로세스)"""
+        if not self.persistent_worker:
+            return self._run_worker_once(command, *args)
+
+        try:
+            response = self.worker_client.request(command, *args)
+        except Exception as e:
+            logger.error(f"Worker 실행 중 오류: {str(e)}")
+            raise BrokerError(f"Worker 실행 오류: {str(e)}")
+
+        if not response.get('success', False):
+            error = response.get('error', '알 수 없는 오류')
+            raise BrokerError(f"Worker 오류: {error}")
+
+        return response
+
+    def _run_worker_once(self, command: str, *args) -> Dict[str, Any]:
+        """32비트 Worker 프로세스 1회 실행 (명령마다 로그인)"""
         try:
             # 명령어 구성
             cmd = [self.python32_path, str(self.worker_script), command] + list(args)
@@ -74,7 +107,7 @@ class KiwoomBroker(BaseBroker):
                 cmd,
                 capture_output=True,
                 text=True,
-                timeout=60,
+                timeout=self.worker_timeout,
                 encoding='utf-8'
             )
 
@@ -100,11 +133,106 @@ class KiwoomBroker(BaseBroker):
 
         except subprocess.TimeoutExpired:
             logger.error("Worker 타임아웃")
-            raise BrokerError("Worker 실행 타임아웃 (60초)")
+            raise BrokerError(f"Worker 실행 타임아웃 ({self.worker_timeout}초)")
         except Exception as e:
             logger.error(f"Worker 실행 중 오류: {str(e)}")
             raise BrokerError(f"Worker 실행 오류: {str(e)}")
 
+    def _run_worker_batch(self, commands: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """명령 목록 일괄 실행 (로그인 1회), 명령 id별 응답 반환"""
+        if self.persistent_worker:
+            # 상주 Worker는 이미 로그인 상태이므로 명령을 순차 전송
+            results = {}
+            for request in commands:
+                try:
+                    results[request['id']] = self.worker_client.request(request['command'], *request.get('args', []))
+                except Exception as e:
+                    results[request['id']] = {'success': False, 'error': str(e)}
+            return results
+
+        timeout = self.worker_timeout + self.batch_command_timeout * len(commands)
+        try:
+            cmd = [self.python32_path, str(self.worker_script), 'batch', '-']
+            logger.debug(f"Worker 일괄 실행: 명령 {len(commands)}개")
+
+            result = subprocess.run(
+                cmd,
+                input=json.dumps(commands, ensure_ascii=False),
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+                encoding='utf-8'
+            )
+        except subprocess.TimeoutExpired:
+            logger.error("Worker 일괄 실행 타임아웃")
+            raise BrokerError(f"Worker 일괄 실행 타임아웃 ({timeout}초)")
+
+        results = {}
+        for line in result.stdout.splitlines():
+            if not line.strip():
+                continue
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Worker 출력 파싱 실패: {line}")
+                continue
+            if 'id' in response:
+                results[response['id']] = response
+            elif not response.get('success', False):
+                # 로그인 실패 등 일괄 실행 전체 오류
+                raise BrokerError(f"Worker 오류: {response.get('error', '알 수 없는 오류')}")
+
+        if result.returncode != 0 and not results:
+            error_msg = result.stderr if result.stderr else "알 수 없는 오류"
+            raise BrokerError(f"Worker 실행 실패: {error_msg}")
+
+        return results
+
+    def get_account_snapshots(self, account_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 계좌 잔고 + 보유종목 일괄 조회 (Worker 로그인 1회)"""
+        logger.info(f"계좌 {len(account_numbers)}개 잔고/보유종목 일괄 조회 중...")
+
+        commands = []
+        for account_number in account_numbers:
+            commands.append({'id': f"balance:{account_number}", 'command': 'get_balance', 'args': [account_number]})
+            commands.append({'id': f"holdings:{account_number}", 'command': 'get_holdings', 'args': [account_number]})
+
+        try:
+            results = self._run_worker_batch(commands)
+        except Exception as e:
+            logger.error(f"계좌 일괄 조회 실패: {str(e)}")
+            return {account_number: {'error': str(e)} for account_number in account_numbers}
+
+        snapshots = {}
+        for account_number in account_numbers:
+            balance = results.get(f"balance:{account_number}")
+            holdings = results.get(f"holdings:{account_number}")
+
+            errors = [
+                response.get('error', '알 수 없는 오류') if response else '응답 없음'
+                for response in (balance, holdings)
+                if not response or not response.get('success', False)
+            ]
+            if errors:
+                snapshots[account_number] = {'error': f"Worker 오류: {errors[0]}"}
+            else:
+                snapshots[account_number] = {
+                    'balance': balance.get('data', {}),
+                    'holdings': holdings.get('data', [])
+                }
+
+        success_count = sum(1 for snapshot in snapshots.values() if 'error' not in snapshot)
+        logger.info(f"계좌 일괄 조회 완료 (성공 {success_count}/{len(account_numbers)})")
+        return snapshots
+
+    def get_account_snapshot(self, account_number: str) -> Dict[str, Any]:
+        """잔고 + 보유종목 조회 (Worker 로그인 1회)"""
+        snapshot = self.get_account_snapshots([account_number])[account_number]
+        if 'error' in snapshot:
+            logger.error(f"계좌 {account_number} 잔고/보유종목 조회 실패: {snapshot['error']}")
+            raise BrokerError(f"잔고/보유종목 조회 실패: {snapshot['error']}")
+        return snapshot
+
     def get_accounts(self) -> List[Dict[str, Any]]:
         """계좌 목록 조회"""
         try:
@@ -0,0 +1,175 @@
+"""
+키움증권 32비트 상주 Worker 클라이언트
+"""
+import atexit
+import itertools
+import json
+import subprocess
+import threading
+import weakref
+from queue import Queue, Empty
+from typing import List, Dict, Any, Optional
+from app.utils.exceptions import BrokerError
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_EOF = object()
+
+
+class KiwoomWorkerClient:
+    """상주 Worker 프로세스(serve 모드) 관리 및 JSON-lines 요청 처리
+
+    프로세스는 첫 요청 시 시작되어 로그인 세션을 유지하며,
+    응답 타임아웃이나 프로세스 종료 시 재시작 후 한 번 재시도합니다.
+    """
+
+    def __init__(self, python_path: str, worker_script: str,
+                 startup_timeout: float = 120, request_timeout: float = 60,
+                 env: Optional[Dict[str, str]] = None):
+        self.python_path = python_path
+        self.worker_script = worker_script
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        self.env = env
+
+        self.process: Optional[subprocess.Popen] = None
+        self.accounts: List[str] = []
+        self.start_count = 0
+        self._responses: Queue = Queue()
+        self._request_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        # 인터프리터 종료 시 Worker 프로세스 정리
+        atexit.register(KiwoomWorkerClient._close_ref, weakref.ref(self))
+
+    @staticmethod
+    def _close_ref(client_ref):
+        client = client_ref()
+        if client is not None:
+            client.close()
+
+    def is_alive(self) -> bool:
+        """Worker 프로세스 동작 여부"""
+        return self.process is not None and self.process.poll() is None
+
+    def _start(self):
+        """Worker 프로세스 시작 및 로그인 완료 대기"""
+        cmd = [self.python_path, str(self.worker_script), 'serve']
+        logger.info(f"키움 Worker 상주 프로세스 시작: {' '.join(cmd)}")
+
+        self._responses = Queue()
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            env=self.env
+        )
+        self.start_count += 1
+
+        threading.Thread(target=self._read_stdout, args=(self.process, self._responses), daemon=True).start()
+        threading.Thread(target=self._drain_stderr, args=(self.process,), daemon=True).start()
+
+        ready = self._wait_response(self.startup_timeout)
+        if not ready.get('success') or ready.get('event') != 'ready':
+            error = ready.get('error', '알 수 없는 오류')
+            self._terminate()
+            raise BrokerError(f"Worker 시작 실패: {error}")
+
+        self.accounts = ready.get('accounts', [])
+        logger.info(f"키움 Worker 로그인 완료 (계좌 {len(self.accounts)}개)")
+
+    @staticmethod
+    def _read_stdout(process: subprocess.Popen, responses: Queue):
+        """stdout의 JSON 라인을 응답 큐로 전달"""
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Worker 출력 파싱 실패: {line}")
+        responses.put(_EOF)
+
+    @staticmethod
+    def _drain_stderr(process: subprocess.Popen):
+        """stderr 출력 로깅 (파이프 버퍼가 차서 Worker가 멈추지 않도록 계속 읽음)"""
+        for line in process.stderr:
+            line = line.rstrip()
+            if line:
+                logger.debug(f"Worker stderr: {line}")
+
+    def _wait_response(self, timeout: float, request_id: Optional[int] = None) -> Dict[str, Any]:
+        """응답 대기 (request_id가 주어지면 해당 응답까지 대기)"""
+        while True:
+            try:
+                response = self._responses.get(timeout=timeout)
+            except Empty:
+                raise BrokerError(f"Worker 응답 타임아웃 ({timeout}초)")
+
+            if response is _EOF:
+                raise BrokerError("Worker 프로세스가 종료되었습니다.")
+            if request_id is None or response.get('id') == request_id:
+                return response
+            logger.warning(f"예상하지 않은 Worker 응답 무시: {response}")
+
+    def _send(self, command: str, args: List[str], timeout: float) -> Dict[str, Any]:
+        """요청 전송 후 응답 반환"""
+        if not self.is_alive():
+            self._start()
+
+        request_id = next(self._request_ids)
+        payload = {'id': request_id, 'command': command, 'args': list(args)}
+        try:
+            self.process.stdin.write(json.dumps(payload, ensure_ascii=False) + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise BrokerError(f"Worker 요청 전송 실패: {str(e)}")
+
+        return self._wait_response(timeout, request_id)
+
+    def request(self, command: str, *args, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """명령 실행 (실패 시 Worker 재시작 후 1회 재시도)"""
+        timeout = timeout or self.request_timeout
+        with self._lock:
+            try:
+                return self._send(command, args, timeout)
+            except BrokerError as e:
+                logger.warning(f"Worker 요청 실패, 재시작 후 재시도합니다: {str(e)}")
+                self._terminate()
+                return self._send(command, args, timeout)
+
+    def _terminate(self):
+        """Worker 프로세스 강제 종료"""
+        if self.process is None:
+            return
+        try:
+            if self.process.poll() is None:
+                self.process.kill()
+                self.process.wait(timeout=5)
+        except Exception as e:
+            logger.warning(f"Worker 프로세스 종료 실패: {str(e)}")
+        finally:
+            self.process = None
+
+    def close(self):
+        """Worker 정상 종료 (shutdown 명령 후 대기)"""
+        with self._lock:
+            if not self.is_alive():
+                self.process = None
+                return
+            try:
+                request_id = next(self._request_ids)
+                self.process.stdin.write(json.dumps({'id': request_id, 'command': 'shutdown'}) + '\n')
+                self.process.stdin.flush()
+                self.process.wait(timeout=10)
+                logger.info("키움 Worker 상주 프로세스 종료")
+            except Exception:
+                pass
+            finally:
+                self._terminate()
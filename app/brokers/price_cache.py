@@ -0,0 +1,200 @@
+"""
+종목 시세 캐시 (장 운영시간 기준 TTL, 일괄 조회, 동시 요청 병합)
+"""
+import threading
+from datetime import datetime, time as dt_time, timedelta
+from typing import List, Dict, Any, Optional, Callable, Iterable
+from app.utils.exceptions import BrokerError
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 여러 종목 시세를 한 번에 조회하는 함수: 종목코드 목록 -> {종목코드: 시세}
+PriceFetcher = Callable[[List[str]], Dict[str, Dict[str, Any]]]
+
+
+def _parse_time(value: str) -> dt_time:
+    return datetime.strptime(value, '%H:%M').time()
+
+
+class _Flight:
+    """진행 중인 시세 조회 (같은 종목을 요청한 다른 호출자는 결과를 기다림)"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.error: Optional[Exception] = None
+
+
+class PriceCache:
+    """종목별 시세 캐시
+
+    - TTL은 장 운영시간을 따름: 장중에는 open_ttl(기본 5초), 장 마감 후/주말에는 다음 개장 시각까지 고정
+    - get_many()는 캐시에 없는 종목만 모아 fetcher를 한 번 호출 (fetcher가 API 한도에 맞게 나눠 조회)
+    - 같은 종목을 동시에 요청하면 먼저 요청한 호출자의 조회 결과를 함께 사용 (single-flight)
+    - put_holdings()/put_many()로 잔고조회, 시세조회 응답에 들어 있는 현재가를 그대로 채움
+
+    장 운영시간은 서버 로컬 시간(KST) 기준 평일 market_open ~ market_close이며, 휴장일은 고려하지 않습니다.
+    """
+
+    DEFAULT_OPEN_TTL = 5.0
+    DEFAULT_MARKET_OPEN = '09:00'
+    DEFAULT_MARKET_CLOSE = '15:30'
+    FLIGHT_TIMEOUT = 60.0  # 다른 호출자의 조회를 기다리는 최대 시간 (초)
+
+    def __init__(self, open_ttl: float = DEFAULT_OPEN_TTL, market_open: str = DEFAULT_MARKET_OPEN,
+                 market_close: str = DEFAULT_MARKET_CLOSE, clock: Callable[[], datetime] = datetime.now):
+        self.open_ttl = open_ttl
+        self.market_open = _parse_time(market_open)
+        self.market_close = _parse_time(market_close)
+        self.clock = clock
+        self._entries: Dict[str, tuple] = {}  # 종목코드 -> (만료 시각, 시세)
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'fetches': 0, 'shared': 0}
+
+    @classmethod
+    def from_config(cls, cache_config: Optional[Dict[str, Any]] = None) -> 'PriceCache':
+        """api_settings.price_cache 설정으로 생성
+
+        예시: {"open_ttl": 5, "market_open": "09:00", "market_close": "15:30"}
+        """
+        cache_config = cache_config or {}
+        return cls(
+            open_ttl=float(cache_config.get('open_ttl', cls.DEFAULT_OPEN_TTL)),
+            market_open=cache_config.get('market_open', cls.DEFAULT_MARKET_OPEN),
+            market_close=cache_config.get('market_close', cls.DEFAULT_MARKET_CLOSE)
+        )
+
+    # 장 운영시간 -------------------------------------------------------------------
+
+    def is_market_open(self, now: Optional[datetime] = None) -> bool:
+        now = now or self.clock()
+        return now.weekday() < 5 and self.market_open <= now.time() < self.market_close
+
+    def expires_at(self, now: Optional[datetime] = None) -> datetime:
+        """지금 저장한 시세의 만료 시각 (장중: open_ttl 후, 장외: 다음 개장 시각)"""
+        now = now or self.clock()
+        if self.is_market_open(now):
+            return now + timedelta(seconds=self.open_ttl)
+
+        next_open = datetime.combine(now.date(), self.market_open)
+        if now >= next_open:
+            next_open += timedelta(days=1)
+        while next_open.weekday() >= 5:
+            next_open += timedelta(days=1)
+        return next_open
+
+    # 저장 -----------------------------------------------------------------------
+
+    def put_many(self, prices: Dict[str, Dict[str, Any]]):
+        """시세 저장 (조회 응답에 들어 있는 종목 모두)"""
+        if not prices:
+            return
+        expires_at = self.expires_at()
+        with self._lock:
+            for symbol, price in prices.items():
+                self._entries[symbol] = (expires_at, price)
+
+    def put(self, symbol: str, price: Dict[str, Any]):
+        self.put_many({symbol: price})
+
+    def put_holdings(self, holdings: Iterable[Dict[str, Any]]):
+        """잔고조회 보유종목의 현재가 저장 (시세조회와 같은 키, 잔고조회 응답에 없는 전일대비/거래량은 None)"""
+        self.put_many({
+            holding['symbol']: {
+                'stock_code': holding['symbol'],
+                'stock_name': holding.get('name', ''),
+                'current_price': holding.get('current_price', 0),
+                'change_price': None,
+                'change_rate': None,
+                'volume': None,
+                'source': 'holdings'
+            }
+            for holding in holdings if holding.get('symbol') and holding.get('current_price')
+        })
+
+    def invalidate(self, symbols: Optional[Iterable[str]] = None):
+        """캐시 비우기 (symbols 지정 시 해당 종목만)"""
+        with self._lock:
+            if symbols is None:
+                self._entries.clear()
+            else:
+                for symbol in symbols:
+                    self._entries.pop(symbol, None)
+
+    # 조회 -----------------------------------------------------------------------
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """캐시된 시세 (없거나 만료되면 None)"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None or entry[0] <= now:
+                return None
+            return entry[1]
+
+    def get_many(self, symbols: Iterable[str], fetcher: PriceFetcher) -> Dict[str, Dict[str, Any]]:
+        """여러 종목 시세 (캐시에 없는 종목만 fetcher로 한 번에 조회)
+
+        fetcher가 반환하지 않은 종목(상장폐지, 잘못된 코드 등)은 결과에서 빠집니다.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        result: Dict[str, Dict[str, Any]] = {}
+        owned: List[str] = []
+        waiting: Dict[str, _Flight] = {}
+        now = self.clock()
+
+        with self._lock:
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                if entry is not None and entry[0] > now:
+                    self._stats['hits'] += 1
+                    result[symbol] = entry[1]
+                    continue
+
+                self._stats['misses'] += 1
+                flight = self._flights.get(symbol)
+                if flight is not None:
+                    self._stats['shared'] += 1
+                    waiting[symbol] = flight
+                else:
+                    owned.append(symbol)
+            flight = _Flight()
+            for symbol in owned:
+                self._flights[symbol] = flight
+
+        if owned:
+            try:
+                fetched = fetcher(owned) or {}
+                self.put_many(fetched)
+                flight.results = fetched
+                with self._lock:
+                    self._stats['fetches'] += 1
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    for symbol in owned:
+                        if self._flights.get(symbol) is flight:
+                            del self._flights[symbol]
+                flight.event.set()
+            result.update({symbol: fetched[symbol] for symbol in owned if symbol in fetched})
+
+        for symbol, other in waiting.items():
+            if not other.event.wait(self.FLIGHT_TIMEOUT):
+                raise BrokerError(f"시세 조회 대기 시간 초과: {symbol}")
+            if other.error is not None:
+                raise other.error
+            if symbol in other.results:
+                result[symbol] = other.results[symbol]
+
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """캐시 통계 (hits, misses, fetches, shared, entries)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
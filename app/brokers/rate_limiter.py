@@ -0,0 +1,139 @@
+"""
+브로커 API 요청 속도 제한 (토큰 버킷)
+"""
+import asyncio
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class TokenBucket:
+    """토큰 버킷
+
+    토큰은 rate(개/초) 속도로 capacity까지 채워지며,
+    요청은 토큰을 미리 예약(음수 허용)하고 부족분만큼만 대기합니다.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate는 0보다 커야 합니다: {rate}")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else float(rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        """경과 시간만큼 토큰 충전"""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def reserve(self, now: float, tokens: float = 1.0) -> float:
+        """토큰 예약 후 필요한 대기 시간(초) 반환"""
+        self._refill(now)
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def available(self, now: float) -> float:
+        """현재 사용 가능한 토큰 수"""
+        self._refill(now)
+        return max(0.0, self.tokens)
+
+
+class RateLimiter:
+    """다중 토큰 버킷 기반 요청 속도 제한기 (스레드/asyncio 공용)
+
+    초당/분당 한도를 동시에 적용하며, 예약은 락 안에서 처리하고
+    대기는 락 밖에서 수행하므로 여러 스레드와 코루틴이 하나의 인스턴스를 공유할 수 있습니다.
+    """
+
+    def __init__(self, buckets: Optional[List[TokenBucket]] = None, name: str = 'default'):
+        self.name = name
+        self.buckets = buckets or []
+        self._lock = threading.Lock()
+
+        # 메트릭
+        self.total_requests = 0
+        self.throttled_requests = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, rate_limit: Optional[Dict[str, Any]], name: str = 'default') -> 'RateLimiter':
+        """브로커 설정의 rate_limit 항목으로 생성
+
+        rate_limit 예시: {"requests_per_second": 10, "requests_per_minute": 100, "burst": 10}
+        """
+        rate_limit = rate_limit or {}
+        buckets = []
+
+        per_second = rate_limit.get('requests_per_second')
+        if per_second:
+            buckets.append(TokenBucket(per_second, rate_limit.get('burst') or per_second))
+
+        per_minute = rate_limit.get('requests_per_minute')
+        if per_minute:
+            buckets.append(TokenBucket(per_minute / 60.0, per_minute))
+
+        return cls(buckets, name=name)
+
+    @property
+    def enabled(self) -> bool:
+        """속도 제한 적용 여부"""
+        return bool(self.buckets)
+
+    def _reserve(self) -> float:
+        """모든 버킷에서 토큰 예약 후 대기 시간 계산"""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = 0.0
+            for bucket in self.buckets:
+                wait_time = max(wait_time, bucket.reserve(now))
+
+            self.total_requests += 1
+            if wait_time > 0:
+                self.throttled_requests += 1
+                self.total_wait_seconds += wait_time
+                self.max_wait_seconds = max(self.max_wait_seconds, wait_time)
+            return wait_time
+
+    def acquire(self) -> float:
+        """요청 슬롯 확보 (필요 시 블로킹 대기), 대기한 시간(초) 반환"""
+        if not self.buckets:
+            return 0.0
+
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.debug(f"[{self.name}] 요청 속도 제한 대기: {wait_time:.3f}초")
+            time.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self) -> float:
+        """요청 슬롯 확보 (이벤트 루프를 막지 않고 대기), 대기한 시간(초) 반환"""
+        if not self.buckets:
+            return 0.0
+
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.debug(f"[{self.name}] 요청 속도 제한 대기: {wait_time:.3f}초")
+            await asyncio.sleep(wait_time)
+        return wait_time
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """속도 제한 메트릭 조회"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                'name': self.name,
+                'total_requests': self.total_requests,
+                'throttled_requests': self.throttled_requests,
+                'total_wait_seconds': round(self.total_wait_seconds, 6),
+                'max_wait_seconds': round(self.max_wait_seconds, 6),
+                'avg_wait_seconds': round(self.total_wait_seconds / self.total_requests, 6) if self.total_requests else 0.0,
+                'tokens_available': [round(bucket.available(now), 3) for bucket in self.buckets]
+            }
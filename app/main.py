@@ -19,7 +19,7 @@ from app.services.data_collector import DataCollector
 from app.models.broker import Broker
 from app.models.account import Account
 from app.models.balance import DailyBalance
-from app.models.holding import Holding
+from app.models.holding import Holding, HoldingSnapshot
 from app.models.transaction import Transaction
 from app.models.aggregation import (
     MonthlySummary, StockPerformance, PortfolioAnalysis,
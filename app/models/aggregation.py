@@ -1,7 +1,7 @@
 """
 분석용 집계 데이터 모델
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
 from datetime import datetime
@@ -39,6 +39,11 @@ class MonthlySummary(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # 계좌별 월 고유 인덱스 (일괄 분석 upsert)
+    __table_args__ = (
+        Index('uq_monthly_summary_account_month', 'account_id', 'year', 'month', unique=True),
+    )
+    
     # 관계
     account = relationship("Account", back_populates="monthly_summaries")
 
@@ -56,6 +61,8 @@ class StockPerformance(Base):
     current_value = Column(Float, default=0.0)
     total_profit_loss = Column(Float, default=0.0)
     profit_loss_rate = Column(Float, default=0.0)
+    realized_profit_loss = Column(Float, default=0.0)  # 매도로 확정된 손익
+    unrealized_profit_loss = Column(Float, default=0.0)  # 보유 로트 평가 손익
     
     # 거래 통계
     total_buy_quantity = Column(Integer, default=0)
@@ -79,6 +86,11 @@ class StockPerformance(Base):
     
     last_updated = Column(DateTime, default=datetime.utcnow)
     
+    # 계좌별 종목 고유 인덱스 (일괄 분석 upsert)
+    __table_args__ = (
+        Index('uq_stock_performance_account_symbol', 'account_id', 'symbol', unique=True),
+    )
+    
     # 관계
     account = relationship("Account", back_populates="stock_performances")
 
@@ -118,6 +130,11 @@ class PortfolioAnalysis(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # 계좌별 분석일 고유 인덱스 (일괄 분석 upsert)
+    __table_args__ = (
+        Index('uq_portfolio_analysis_account_date', 'account_id', 'analysis_date', unique=True),
+    )
+    
     # 관계
     account = relationship("Account", back_populates="portfolio_analyses")
 
@@ -194,5 +211,50 @@ class RiskMetrics(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # 계좌별 계산일 고유 인덱스 (재계산 시 upsert)
+    __table_args__ = (
+        Index('uq_risk_metrics_account_date', 'account_id', 'calculation_date', unique=True),
+    )
+    
     # 관계
     account = relationship("Account", back_populates="risk_metrics")
+
+class MetricsState(Base):
+    """계좌별 누적 지표 상태 모델 (일별 잔고 저장 시 하루씩 갱신)"""
+    __tablename__ = 'metrics_states'
+    
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
+    
+    # 마지막 반영 잔고
+    first_balance_date = Column(Date)
+    last_balance_date = Column(Date)
+    first_balance = Column(Float, default=0.0)
+    last_balance = Column(Float, default=0.0)
+    
+    # 일간 수익률 누적 통계 (Welford)
+    return_count = Column(Integer, default=0)
+    return_mean = Column(Float, default=0.0)
+    return_m2 = Column(Float, default=0.0)
+    downside_sum_sq = Column(Float, default=0.0)
+    ewma_variance = Column(Float, default=0.0)
+    
+    # 고점 및 낙폭
+    peak_balance = Column(Float, default=0.0)
+    current_drawdown = Column(Float, default=0.0)
+    max_drawdown = Column(Float, default=0.0)
+    drawdown_duration = Column(Integer, default=0)
+    max_drawdown_duration = Column(Integer, default=0)
+    
+    # 같은 날 재수집 시 되돌리기 위한 직전 상태 (JSON 문자열)
+    previous_state = Column(Text)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # 계좌당 하나의 상태
+    __table_args__ = (
+        UniqueConstraint('account_id', name='uq_metrics_state_account'),
+    )
+    
+    # 관계
+    account = relationship("Account", back_populates="metrics_state")
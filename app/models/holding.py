@@ -1,13 +1,13 @@
 """
 보유종목 모델
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
 from datetime import datetime
 
 class Holding(Base):
-    """보유종목 모델"""
+    """보유종목 모델 (계좌별 현재 보유종목 - 수집 시 스냅샷 기준으로 갱신)"""
     __tablename__ = 'holdings'
 
     id = Column(Integer, primary_key=True, index=True)
@@ -31,3 +31,31 @@ class Holding(Base):
 
     # 관계
     account = relationship("Account", back_populates="holdings")
+
+class HoldingSnapshot(Base):
+    """보유종목 일별 스냅샷 모델 (이력 보관용, 삭제하지 않음)"""
+    __tablename__ = 'holding_snapshots'
+
+    id = Column(Integer, primary_key=True, index=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
+    snapshot_date = Column(Date, nullable=False)
+    symbol = Column(String(20), nullable=False)
+    name = Column(String(100), nullable=False)
+    quantity = Column(Integer, default=0)
+    average_price = Column(Float, default=0.0)
+    current_price = Column(Float, default=0.0)
+    evaluation_amount = Column(Float, default=0.0)
+    profit_loss = Column(Float, default=0.0)
+    profit_loss_rate = Column(Float, default=0.0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # 계좌별 날짜별 종목 고유 제약조건 (같은 날 재수집 시 갱신)
+    # 종목별 이력 조회용 인덱스 (account_id, symbol, snapshot_date)
+    __table_args__ = (
+        UniqueConstraint('account_id', 'snapshot_date', 'symbol', name='uq_holding_snapshot'),
+        Index('ix_holding_snapshots_account_symbol_date', 'account_id', 'symbol', 'snapshot_date'),
+    )
+
+    # 관계
+    account = relationship("Account", back_populates="holding_snapshots")
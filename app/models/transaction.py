@@ -1,7 +1,7 @@
 """
 거래내역 모델
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from app.utils.database import Base
 from datetime import datetime
@@ -22,5 +22,11 @@ class Transaction(Base):
     fee = Column(Float, default=0.0)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # 계좌별 기간 조회 / 계좌별 종목 거래 조회용 복합 인덱스
+    __table_args__ = (
+        Index('ix_transactions_account_date', 'account_id', 'transaction_date'),
+        Index('ix_transactions_account_symbol_date', 'account_id', 'symbol', 'transaction_date'),
+    )
+    
     # 관계
     account = relationship("Account", back_populates="transactions")
@@ -15,6 +15,10 @@ from app.models.aggregation import (
     MonthlySummary, StockPerformance, PortfolioAnalysis, 
     TradingPattern, RiskMetrics
 )
+from app.services.bulk_writer import BulkWriter
+from app.services.lot_engine import LotEngine
+from app.services.metrics_state import MetricsStateUpdater
+from app.services.risk_engine import RiskMetricsEngine
 from app.utils.database import db_manager
 from app.utils.logger import get_logger
 
@@ -23,8 +27,20 @@ logger = get_logger(__name__)
 class AnalysisService:
     """분석 데이터 생성 서비스"""
     
-    def __init__(self):
+    RISK_LOOKBACK_DAYS = 365
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.session = None
+        analysis_config = (config or {}).get('analysis', {})
+        self.risk_engine = RiskMetricsEngine(
+            risk_free_rate=analysis_config.get('risk_free_rate', 0.0)
+        )
+        self.lot_engine = LotEngine(analysis_config.get('cost_basis_method', 'average'))
+        self.bulk_writer = BulkWriter()
+        self.metrics_updater = MetricsStateUpdater(
+            risk_free_rate=analysis_config.get('risk_free_rate', 0.0),
+            bulk_writer=self.bulk_writer
+        )
     
     def _get_session(self) -> Session:
         """데이터베이스 세션 가져오기"""
@@ -111,8 +127,8 @@ class AnalysisService:
             logger.error(f"월별 요약 데이터 생성 실패: {str(e)}")
             raise
     
-    def generate_stock_performance(self, account_id: int, symbol: str) -> StockPerformance:
-        """종목별 성과 분석 데이터 생성"""
+    def generate_stock_performance(self, account_id: int, symbol: str, as_of: date = None) -> StockPerformance:
+        """종목별 성과 분석 데이터 생성 (as_of: 보유 로트 보유기간 기준일, 기본 오늘)"""
         try:
             session = self._get_session()
             
@@ -122,7 +138,7 @@ class AnalysisService:
                     Transaction.account_id == account_id,
                     Transaction.symbol == symbol
                 )
-            ).order_by(Transaction.transaction_date).all()
+            ).order_by(Transaction.transaction_date, Transaction.id).all()
             
             if not transactions:
                 logger.warning(f"종목 거래 내역 없음: account_id={account_id}, symbol={symbol}")
@@ -137,7 +153,7 @@ class AnalysisService:
             ).first()
             
             # 성과 계산
-            performance_data = self._calculate_stock_performance(transactions, holding)
+            performance_data = self._calculate_stock_performance(transactions, holding, as_of)
             
             # 기존 데이터 업데이트 또는 새로 생성
             existing = session.query(StockPerformance).filter(
@@ -171,7 +187,11 @@ class AnalysisService:
             raise
     
     def generate_portfolio_analysis(self, account_id: int, analysis_date: date = None) -> PortfolioAnalysis:
-        """포트폴리오 분석 데이터 생성"""
+        """포트폴리오 분석 데이터 생성
+
+        위험/성과 지표는 일괄 분석(BatchAnalysisRunner)과 같이 과거 1년 잔고 기준(역사적 VaR)으로
+        계산합니다. 누적 지표 상태 기반 값은 get_incremental_metrics로 따로 조회합니다.
+        """
         try:
             session = self._get_session()
             
@@ -207,11 +227,10 @@ class AnalysisService:
                     DailyBalance.balance_date <= analysis_date
                 )
             ).order_by(DailyBalance.balance_date).all()
+            performance = self._performance_from_history(balance, historical_balances)
             
             # 분석 데이터 계산
-            analysis_data = self._calculate_portfolio_metrics(
-                balance, holdings, historical_balances, analysis_date
-            )
+            analysis_data = self._calculate_portfolio_metrics(balance, holdings, performance)
             
             # 기존 데이터 업데이트 또는 새로 생성
             existing = session.query(PortfolioAnalysis).filter(
@@ -242,6 +261,77 @@ class AnalysisService:
             logger.error(f"포트폴리오 분석 데이터 생성 실패: {str(e)}")
             raise
     
+    def generate_risk_metrics(self, calculation_date: date = None,
+                              account_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """위험 지표 일괄 생성 (전체 계좌 잔고를 한 번에 로드하여 행렬 연산)
+        
+        Returns:
+            계좌 ID별 위험 지표
+        """
+        try:
+            session = self._get_session()
+            
+            if not calculation_date:
+                calculation_date = date.today()
+            
+            start_date = calculation_date - timedelta(days=self.RISK_LOOKBACK_DAYS)
+            ids, _, balances = self.risk_engine.load_balance_matrix(
+                session, account_ids, start_date, calculation_date
+            )
+            if not ids:
+                logger.warning(f"위험 지표 계산 데이터 없음: date={calculation_date}")
+                return {}
+            
+            metrics = self.risk_engine.calculate(balances)
+            
+            now = datetime.utcnow()
+            columns = [
+                'daily_volatility', 'monthly_volatility', 'annual_volatility',
+                'downside_deviation', 'max_drawdown', 'max_drawdown_duration',
+                'var_1d_95', 'var_1d_99', 'var_1m_95', 'var_1m_99',
+                'sharpe_ratio', 'sortino_ratio', 'calmar_ratio'
+            ]
+            results = {}
+            rows = []
+            for i, account_id in enumerate(ids):
+                values = {column: metrics[column][i].item() for column in columns}
+                results[account_id] = values
+                rows.append({'account_id': account_id, 'calculation_date': calculation_date,
+                             'created_at': now, **values})
+            
+            self.bulk_writer.upsert_rows(session, RiskMetrics.__table__, 'uq_risk_metrics_account_date', rows)
+            session.commit()
+            logger.info(f"위험 지표 생성: 계좌 {len(ids)}개, date={calculation_date}")
+            return results
+            
+        except Exception as e:
+            if self.session:
+                self.session.rollback()
+            logger.error(f"위험 지표 생성 실패: {str(e)}")
+            raise
+    
+    def get_incremental_metrics(self, account_id: int) -> Optional[Dict[str, Any]]:
+        """누적 지표 상태 기반 위험 지표 조회 (잔고 이력 재조회 없음)
+
+        전체 잔고 이력 기준 값(VaR는 모수적 VaR)이므로 과거 1년 기준인 portfolio_analyses/risk_metrics
+        테이블에는 저장하지 않고 별도로 반환합니다.
+        """
+        try:
+            session = self._get_session()
+            
+            state = self.metrics_updater.load_state(session, account_id)
+            if state is None:
+                state = self.metrics_updater.rebuild(session, account_id)
+                session.commit()
+            
+            metrics = self.metrics_updater.to_metrics(state)
+            metrics['last_balance_date'] = state['last_balance_date']
+            return metrics
+            
+        except Exception as e:
+            logger.error(f"누적 지표 조회 실패: {str(e)}")
+            raise
+    
     def _calculate_monthly_metrics(self, daily_balances: List[DailyBalance], 
                                  transactions: List[Transaction], 
                                  holdings: List[Holding],
@@ -277,10 +367,11 @@ class AnalysisService:
             else:
                 avg_holding_period = 0
             
-            # 성과 지표 (간단한 버전)
-            sharpe_ratio = 0.0  # 추후 구현
-            max_drawdown = 0.0  # 추후 구현
-            volatility = 0.0    # 추후 구현
+            # 성과 지표 (월중 일별 총자산 기준)
+            risk = self.risk_engine.calculate(np.array([b.total_balance or 0 for b in daily_balances], dtype=float))
+            sharpe_ratio = risk['sharpe_ratio']
+            max_drawdown = risk['max_drawdown']
+            volatility = risk['annual_volatility']
             
             return {
                 'total_balance': total_balance,
@@ -303,73 +394,53 @@ class AnalysisService:
             raise
     
     def _calculate_stock_performance(self, transactions: List[Transaction], 
-                                   holding: Optional[Holding]) -> Dict[str, Any]:
-        """종목별 성과 지표 계산"""
+                                   holding: Optional[Holding],
+                                   as_of: Optional[date] = None) -> Dict[str, Any]:
+        """종목별 성과 지표 계산 (로트 회계 기반 실현/평가 손익)"""
         try:
-            # 기본 통계
-            buy_transactions = [t for t in transactions if t.transaction_type == 'BUY']
-            sell_transactions = [t for t in transactions if t.transaction_type == 'SELL']
-            
-            total_buy_quantity = sum(t.quantity for t in buy_transactions)
-            total_sell_quantity = sum(t.quantity for t in sell_transactions)
-            total_investment = sum(t.amount for t in buy_transactions)
-            
-            # 평균 단가
-            avg_buy_price = total_investment / total_buy_quantity if total_buy_quantity > 0 else 0
-            avg_sell_price = sum(t.amount for t in sell_transactions) / total_sell_quantity if total_sell_quantity > 0 else 0
-            
-            # 현재 보유량
-            current_quantity = total_buy_quantity - total_sell_quantity
-            
-            # 현재 가치 및 수익
-            if holding:
-                current_value = holding.evaluation_amount
-                current_price = holding.current_price
-            else:
-                current_value = current_quantity * avg_buy_price  # 추정치
-                current_price = avg_buy_price
-            
-            total_profit_loss = current_value - (current_quantity * avg_buy_price)
-            profit_loss_rate = (total_profit_loss / (current_quantity * avg_buy_price)) * 100 if current_quantity * avg_buy_price > 0 else 0
-            
-            # 거래 날짜
-            first_buy_date = min(t.transaction_date for t in buy_transactions) if buy_transactions else None
-            last_sell_date = max(t.transaction_date for t in sell_transactions) if sell_transactions else None
-            
-            # 보유 기간
-            holding_days = 0
-            if first_buy_date:
-                end_date = last_sell_date if last_sell_date else date.today()
-                holding_days = (end_date - first_buy_date).days
-            
-            return {
-                'total_investment': total_investment,
-                'current_value': current_value,
-                'total_profit_loss': total_profit_loss,
-                'profit_loss_rate': profit_loss_rate,
-                'total_buy_quantity': total_buy_quantity,
-                'total_sell_quantity': total_sell_quantity,
-                'avg_buy_price': avg_buy_price,
-                'avg_sell_price': avg_sell_price,
-                'first_buy_date': first_buy_date,
-                'last_sell_date': last_sell_date,
-                'holding_days': holding_days,
-                'max_profit_rate': profit_loss_rate,  # 간단한 버전
-                'max_loss_rate': min(0, profit_loss_rate),  # 간단한 버전
-                'avg_daily_return': profit_loss_rate / max(1, holding_days) if holding_days > 0 else 0,
-                'volatility': 0.0,  # 추후 구현
-                'beta': 0.0  # 추후 구현
-            }
+            positions = self.lot_engine.process(
+                (t.account_id, t.symbol, t.transaction_date, t.transaction_type,
+                 t.quantity, t.amount, t.fee, t.name)
+                for t in transactions
+            )
+            position = next(iter(positions.values()))
+            market_value = holding.evaluation_amount if holding else None
+            return self.lot_engine.to_performance(position, market_value, as_of or date.today())
             
         except Exception as e:
             logger.error(f"종목 성과 지표 계산 실패: {str(e)}")
             raise
     
+    def _performance_from_history(self, balance: DailyBalance,
+                                  historical_balances: List[DailyBalance]) -> Dict[str, Any]:
+        """잔고 이력으로 성과/위험 지표 계산"""
+        # 연간 수익률 (간단한 버전)
+        if len(historical_balances) >= 2:
+            start_balance = historical_balances[0].total_balance
+            end_balance = historical_balances[-1].total_balance
+            days = (historical_balances[-1].balance_date - historical_balances[0].balance_date).days
+            annualized_return = ((end_balance / start_balance) ** (365 / days) - 1) * 100 if days > 0 and start_balance > 0 else 0
+        else:
+            annualized_return = balance.profit_loss_rate
+        
+        # 위험 지표 (과거 1년 일별 총자산 기준)
+        risk = self.risk_engine.calculate(
+            np.array([b.total_balance or 0 for b in historical_balances], dtype=float)
+        )
+        return {
+            'annualized_return': annualized_return,
+            'sharpe_ratio': risk['sharpe_ratio'],
+            'sortino_ratio': risk['sortino_ratio'],
+            'volatility': risk['annual_volatility'],
+            'max_drawdown': risk['max_drawdown'],
+            'var_95': risk['var_1d_95'],
+            'var_99': risk['var_1d_99']
+        }
+    
     def _calculate_portfolio_metrics(self, balance: DailyBalance, 
                                    holdings: List[Holding], 
-                                   historical_balances: List[DailyBalance],
-                                   analysis_date: date) -> Dict[str, Any]:
-        """포트폴리오 지표 계산"""
+                                   performance: Dict[str, Any]) -> Dict[str, Any]:
+        """포트폴리오 지표 계산 (performance: 성과/위험 지표)"""
         try:
             # 포트폴리오 구성
             total_assets = balance.total_balance
@@ -382,15 +453,6 @@ class AnalysisService:
             # 성과 지표
             total_return = balance.profit_loss_rate
             
-            # 연간 수익률 (간단한 버전)
-            if len(historical_balances) >= 2:
-                start_balance = historical_balances[0].total_balance
-                end_balance = historical_balances[-1].total_balance
-                days = (historical_balances[-1].balance_date - historical_balances[0].balance_date).days
-                annualized_return = ((end_balance / start_balance) ** (365 / days) - 1) * 100 if days > 0 and start_balance > 0 else 0
-            else:
-                annualized_return = total_return
-            
             # 거래 패턴 (간단한 버전)
             turnover_rate = 0.0  # 추후 구현
             avg_holding_period = 0.0  # 추후 구현
@@ -402,13 +464,7 @@ class AnalysisService:
                 'stock_ratio': stock_ratio,
                 'diversification_score': diversification_score,
                 'total_return': total_return,
-                'annualized_return': annualized_return,
-                'sharpe_ratio': 0.0,  # 추후 구현
-                'sortino_ratio': 0.0,  # 추후 구현
-                'volatility': 0.0,  # 추후 구현
-                'max_drawdown': 0.0,  # 추후 구현
-                'var_95': 0.0,  # 추후 구현
-                'var_99': 0.0,  # 추후 구현
+                **performance,
                 'turnover_rate': turnover_rate,
                 'avg_holding_period': avg_holding_period,
                 'trading_frequency': trading_frequency,
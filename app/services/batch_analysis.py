@@ -0,0 +1,397 @@
+"""
+전체 계좌 일괄 분석 (월별 요약/종목 성과/포트폴리오 분석)
+"""
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Any, Optional, Iterable
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.balance import DailyBalance
+from app.models.holding import Holding
+from app.models.transaction import Transaction
+from app.models.aggregation import MonthlySummary, StockPerformance, PortfolioAnalysis
+from app.services.bulk_writer import BulkWriter
+from app.services.columnar_store import ColumnarStore
+from app.services.lot_engine import LotEngine
+from app.services.risk_engine import RiskMetricsEngine
+from app.utils.database import db_manager
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MONTH_KEYS = ['account_id', 'year', 'month']
+
+# 컬럼형 캐시에서 읽을 테이블별 컬럼 (DB 조회 컬럼과 동일)
+SOURCE_COLUMNS = {
+    'daily_balances': ['account_id', 'balance_date', 'cash_balance', 'stock_balance',
+                       'total_balance', 'profit_loss', 'profit_loss_rate'],
+    'transactions': ['account_id', 'transaction_date', 'symbol', 'name',
+                     'transaction_type', 'quantity', 'amount', 'fee'],
+    'holdings': ['account_id', 'symbol', 'current_price', 'evaluation_amount', 'last_updated'],
+}
+STOCK_KEYS = ['account_id', 'symbol']
+
+
+class BatchAnalysisRunner:
+    """AnalysisService의 generate_* 계산을 전체 계좌에 대해 한 번에 수행
+
+    잔고/거래내역/보유종목 테이블을 각각 한 번씩 DataFrame으로 읽고
+    월별 요약은 groupby로, 종목 성과는 전체 거래를 한 번 순회하는 LotEngine으로 계산한 뒤
+    배치 upsert 합니다.
+    계산 방식은 AnalysisService의 건별 계산과 동일합니다.
+    """
+
+    PORTFOLIO_LOOKBACK_DAYS = 365
+    HOLDING_RECENT_DAYS = 7
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 risk_engine: Optional[RiskMetricsEngine] = None,
+                 bulk_writer: Optional[BulkWriter] = None):
+        self.session = None
+        analysis_config = (config or {}).get('analysis', {})
+        self.risk_engine = risk_engine or RiskMetricsEngine(
+            risk_free_rate=analysis_config.get('risk_free_rate', 0.0)
+        )
+        self.lot_engine = LotEngine(analysis_config.get('cost_basis_method', 'average'))
+        self.bulk_writer = bulk_writer or BulkWriter()
+        self.columnar_store = ColumnarStore.from_config(config)
+
+    def _get_session(self) -> Session:
+        """데이터베이스 세션 가져오기"""
+        if not self.session:
+            self.session = db_manager.get_session()
+        return self.session
+
+    @staticmethod
+    def _read(session: Session, query) -> pd.DataFrame:
+        """쿼리 결과를 DataFrame으로 (ORM 객체 생성 없이 행 튜플 그대로)"""
+        result = session.execute(query)
+        return pd.DataFrame(result.all(), columns=list(result.keys()))
+
+    def load_frames(self, session: Session, account_ids: Optional[List[int]] = None,
+                    start_date: Optional[date] = None,
+                    end_date: Optional[date] = None) -> Dict[str, pd.DataFrame]:
+        """테이블별 한 번의 쿼리로 분석 원천 데이터 로드
+
+        잔고는 기간으로 제한하고, 거래내역/보유종목은 종목 누적 성과 계산을 위해 전체를 읽습니다.
+        컬럼형 캐시가 설정되어 있으면 DB 대신 캐시 파일에서 읽습니다.
+        """
+        if self.columnar_store and all(self.columnar_store.has_table(name) for name in SOURCE_COLUMNS):
+            return self._load_frames_from_store(account_ids, start_date, end_date)
+
+        balance_query = select(
+            DailyBalance.account_id, DailyBalance.balance_date, DailyBalance.cash_balance,
+            DailyBalance.stock_balance, DailyBalance.total_balance,
+            DailyBalance.profit_loss, DailyBalance.profit_loss_rate
+        ).order_by(DailyBalance.account_id, DailyBalance.balance_date)
+        transaction_query = select(
+            Transaction.account_id, Transaction.transaction_date, Transaction.symbol, Transaction.name,
+            Transaction.transaction_type, Transaction.quantity, Transaction.amount, Transaction.fee
+        ).order_by(Transaction.account_id, Transaction.transaction_date, Transaction.id)
+        holding_query = select(
+            Holding.account_id, Holding.symbol, Holding.current_price,
+            Holding.evaluation_amount, Holding.last_updated
+        )
+
+        if account_ids is not None:
+            balance_query = balance_query.where(DailyBalance.account_id.in_(account_ids))
+            transaction_query = transaction_query.where(Transaction.account_id.in_(account_ids))
+            holding_query = holding_query.where(Holding.account_id.in_(account_ids))
+        if start_date:
+            balance_query = balance_query.where(DailyBalance.balance_date >= start_date)
+        if end_date:
+            balance_query = balance_query.where(DailyBalance.balance_date <= end_date)
+            transaction_query = transaction_query.where(Transaction.transaction_date <= end_date)
+
+        balances = self._read(session, balance_query)
+        balances['balance_date'] = pd.to_datetime(balances['balance_date'])
+        transactions = self._read(session, transaction_query)
+        transactions['transaction_date'] = pd.to_datetime(transactions['transaction_date'])
+        holdings = self._read(session, holding_query)
+        holdings['last_updated'] = pd.to_datetime(holdings['last_updated'])
+
+        return {'balances': balances, 'transactions': transactions, 'holdings': holdings}
+
+    def _load_frames_from_store(self, account_ids: Optional[List[int]],
+                                start_date: Optional[date], end_date: Optional[date]) -> Dict[str, pd.DataFrame]:
+        """컬럼형 캐시에서 분석 원천 데이터 로드 (필요한 컬럼만)"""
+        store = self.columnar_store
+        balances = store.read('daily_balances', SOURCE_COLUMNS['daily_balances'], account_ids, start_date, end_date)
+        transactions = store.read('transactions', SOURCE_COLUMNS['transactions'] + ['id'], account_ids,
+                                  end_date=end_date)
+        holdings = store.read('holdings', SOURCE_COLUMNS['holdings'], account_ids)
+
+        return {
+            'balances': balances.sort_values(['account_id', 'balance_date'], ignore_index=True),
+            'transactions': transactions.sort_values(['account_id', 'transaction_date', 'id'], ignore_index=True)
+                                        .drop(columns=['id']),
+            'holdings': holdings
+        }
+
+    def _group_risk(self, frame: pd.DataFrame, keys: List[str]) -> Dict[str, np.ndarray]:
+        """그룹별 총자산 시계열을 (그룹 수, 최대 일수) 행렬로 만들어 한 번에 위험 지표 계산
+
+        그룹마다 관측일 순서대로 채우고 남는 칸은 NaN으로 두므로
+        그룹별 배열을 따로 계산한 결과와 같습니다 (결과는 keys 정렬 순서).
+        """
+        grouped = frame.groupby(keys, sort=True)
+        group_index = grouped.ngroup().to_numpy()
+        position = grouped.cumcount().to_numpy()
+
+        matrix = np.full((grouped.ngroups, position.max() + 1 if len(position) else 0), np.nan)
+        matrix[group_index, position] = frame['total_balance'].fillna(0).to_numpy(dtype=float)
+        return self.risk_engine.calculate(matrix)
+
+    def compute_monthly_summaries(self, frames: Dict[str, pd.DataFrame],
+                                  start_date: Optional[date] = None,
+                                  end_date: Optional[date] = None) -> pd.DataFrame:
+        """잔고가 있는 모든 (계좌, 월)의 월별 요약 계산"""
+        balances = frames['balances']
+        if start_date:
+            balances = balances[balances['balance_date'] >= pd.Timestamp(start_date)]
+        if end_date:
+            balances = balances[balances['balance_date'] <= pd.Timestamp(end_date)]
+        if balances.empty:
+            return pd.DataFrame()
+
+        balances = balances.assign(year=balances['balance_date'].dt.year,
+                                   month=balances['balance_date'].dt.month)
+
+        # 월초/월말 잔고 (NaN 건너뛰지 않도록 첫/마지막 행 그대로 사용)
+        first = balances.drop_duplicates(MONTH_KEYS, keep='first').set_index(MONTH_KEYS)
+        last = balances.drop_duplicates(MONTH_KEYS, keep='last').set_index(MONTH_KEYS)
+        summary = pd.DataFrame({
+            'total_balance': last['total_balance'],
+            'total_investment': first['total_balance'],
+            'total_profit_loss': last['profit_loss'],
+            'profit_loss_rate': last['profit_loss_rate']
+        }).sort_index()
+
+        # 거래 통계
+        transactions = frames['transactions']
+        transactions = transactions.assign(year=transactions['transaction_date'].dt.year,
+                                           month=transactions['transaction_date'].dt.month)
+        is_buy = transactions['transaction_type'] == 'BUY'
+        is_sell = transactions['transaction_type'] == 'SELL'
+        trade_stats = transactions.assign(
+            buy_amount=transactions['amount'].where(is_buy, 0.0),
+            sell_amount=transactions['amount'].where(is_sell, 0.0)
+        ).groupby(MONTH_KEYS).agg(
+            total_transactions=('symbol', 'size'),
+            total_buy_amount=('buy_amount', 'sum'),
+            total_sell_amount=('sell_amount', 'sum'),
+            total_fees=('fee', 'sum')
+        )
+        summary = summary.join(trade_stats, how='left')
+
+        # 보유종목 통계 (해당 월 이후 갱신된 현재 보유종목 기준)
+        months = summary.index.to_frame(index=False)
+        months['start_date'] = pd.to_datetime(dict(year=months['year'], month=months['month'], day=1))
+        months['end_date'] = months['start_date'] + pd.offsets.MonthEnd(0)
+        matched = months.merge(frames['holdings'][['account_id', 'last_updated']], on='account_id')
+        matched = matched[matched['last_updated'] >= matched['start_date']]
+        matched = matched.assign(
+            holding_days=(matched['end_date'] - matched['last_updated'].dt.normalize()).dt.days
+        )
+        holding_stats = matched.groupby(MONTH_KEYS).agg(
+            total_holdings=('holding_days', 'size'),
+            avg_holding_period=('holding_days', 'mean')
+        )
+        summary = summary.join(holding_stats, how='left')
+
+        count_columns = ['total_transactions', 'total_holdings']
+        sum_columns = ['total_buy_amount', 'total_sell_amount', 'total_fees', 'avg_holding_period']
+        summary[count_columns] = summary[count_columns].fillna(0).astype(int)
+        summary[sum_columns] = summary[sum_columns].fillna(0.0)
+
+        # 성과 지표 (월중 일별 총자산 기준)
+        risk = self._group_risk(balances, MONTH_KEYS)
+        summary['sharpe_ratio'] = risk['sharpe_ratio']
+        summary['max_drawdown'] = risk['max_drawdown']
+        summary['volatility'] = risk['annual_volatility']
+
+        return summary.reset_index()
+
+    def compute_stock_performances(self, frames: Dict[str, pd.DataFrame],
+                                   as_of: Optional[date] = None) -> pd.DataFrame:
+        """거래 내역이 있는 모든 (계좌, 종목)의 성과 계산 (전체 거래를 한 번 순회하는 로트 회계)"""
+        transactions = frames['transactions']
+        if transactions.empty:
+            return pd.DataFrame()
+
+        as_of = as_of or date.today()
+        positions = self.lot_engine.process(zip(
+            transactions['account_id'].tolist(), transactions['symbol'].tolist(),
+            [value.date() for value in transactions['transaction_date']],
+            transactions['transaction_type'].tolist(), transactions['quantity'].tolist(),
+            transactions['amount'].tolist(), transactions['fee'].tolist(), transactions['name'].tolist()
+        ))
+
+        holdings = frames['holdings'].drop_duplicates(STOCK_KEYS, keep='last')
+        market_values = dict(zip(zip(holdings['account_id'], holdings['symbol']),
+                                 holdings['evaluation_amount']))
+
+        rows = []
+        for (account_id, symbol), position in sorted(positions.items()):
+            row = self.lot_engine.to_performance(position, market_values.get((account_id, symbol)), as_of)
+            row.update(account_id=account_id, symbol=symbol, name=position.name)
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def compute_portfolio_analyses(self, frames: Dict[str, pd.DataFrame],
+                                   analysis_date: date) -> pd.DataFrame:
+        """분석일에 잔고가 있는 모든 계좌의 포트폴리오 분석 계산"""
+        balances = frames['balances']
+        analysis_day = pd.Timestamp(analysis_date)
+        current = balances[balances['balance_date'] == analysis_day] \
+            .drop_duplicates('account_id').set_index('account_id').sort_index()
+        if current.empty:
+            return pd.DataFrame()
+
+        total_assets = current['total_balance'].to_numpy(dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cash_ratio = np.where(total_assets > 0, current['cash_balance'] / total_assets * 100, 0.0)
+            stock_ratio = np.where(total_assets > 0, current['stock_balance'] / total_assets * 100, 0.0)
+
+        # 다각화 점수 (최근 갱신된 보유종목 수 기반)
+        holdings = frames['holdings']
+        recent = holdings[holdings['last_updated'] >= analysis_day - pd.Timedelta(days=self.HOLDING_RECENT_DAYS)]
+        holding_count = recent.groupby('account_id').size().reindex(current.index, fill_value=0)
+        diversification_score = np.minimum(100, holding_count.to_numpy() * 10)
+
+        # 과거 1년 잔고 (연환산 수익률/위험 지표)
+        window_start = analysis_day - pd.Timedelta(days=self.PORTFOLIO_LOOKBACK_DAYS)
+        history = balances[(balances['balance_date'] >= window_start)
+                           & (balances['balance_date'] <= analysis_day)
+                           & balances['account_id'].isin(current.index)]
+        grouped = history.groupby('account_id', sort=True)
+        first = grouped.head(1).set_index('account_id')
+        last = grouped.tail(1).set_index('account_id')
+        observations = grouped.size().to_numpy()
+
+        start_balance = first['total_balance'].to_numpy(dtype=float)
+        end_balance = last['total_balance'].to_numpy(dtype=float)
+        days = (last['balance_date'] - first['balance_date']).dt.days.to_numpy()
+        total_return = current['profit_loss_rate'].to_numpy(dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            annualized = np.where((days > 0) & (start_balance > 0),
+                                  ((end_balance / start_balance) ** (365 / np.maximum(days, 1)) - 1) * 100,
+                                  0.0)
+        annualized_return = np.where(observations >= 2, annualized, total_return)
+
+        risk = self._group_risk(history, ['account_id'])
+
+        return pd.DataFrame({
+            'account_id': current.index.to_numpy(),
+            'analysis_date': analysis_date,
+            'total_assets': total_assets,
+            'cash_ratio': cash_ratio,
+            'stock_ratio': stock_ratio,
+            'diversification_score': diversification_score.astype(float),
+            'total_return': total_return,
+            'annualized_return': annualized_return,
+            'sharpe_ratio': risk['sharpe_ratio'],
+            'sortino_ratio': risk['sortino_ratio'],
+            'volatility': risk['annual_volatility'],
+            'max_drawdown': risk['max_drawdown'],
+            'var_95': risk['var_1d_95'],
+            'var_99': risk['var_1d_99'],
+            'turnover_rate': 0.0,
+            'avg_holding_period': 0.0,
+            'trading_frequency': 0.0,
+            'sector_allocation': '{}'
+        })
+
+    @staticmethod
+    def _to_rows(frame: pd.DataFrame, date_columns: Iterable[str] = (),
+                 **extra: Any) -> List[Dict[str, Any]]:
+        """DataFrame을 upsert용 행 목록으로 변환 (NaN/NaT는 None, 날짜는 date)"""
+        frame = frame.copy()
+        for column in date_columns:
+            values = pd.to_datetime(frame[column])
+            frame[column] = [value.date() if not pd.isna(value) else None for value in values]
+        frame = frame.astype(object).where(frame.notna(), None)
+        rows = frame.to_dict('records')
+        for row in rows:
+            row.update(extra)
+        return rows
+
+    def run(self, account_ids: Optional[List[int]] = None,
+            start_date: Optional[date] = None, end_date: Optional[date] = None,
+            analysis_date: Optional[date] = None,
+            include: Iterable[str] = ('monthly', 'stock', 'portfolio')) -> Dict[str, int]:
+        """일괄 분석 실행 후 결과 upsert
+
+        Args:
+            account_ids: 대상 계좌 (None이면 전체)
+            start_date/end_date: 월별 요약 기간 (월 단위로 확장)
+            analysis_date: 포트폴리오 분석일 및 종목 보유기간 기준일 (기본: end_date 또는 오늘)
+            include: 계산할 항목 ('monthly', 'stock', 'portfolio')
+
+        Returns:
+            항목별 저장한 행 수
+        """
+        try:
+            session = self._get_session()
+            include = set(include)
+
+            if start_date:
+                start_date = start_date.replace(day=1)
+            if end_date:
+                end_date = (pd.Timestamp(end_date) + pd.offsets.MonthEnd(0)).date()
+            analysis_date = analysis_date or (min(end_date, date.today()) if end_date else date.today())
+
+            # 포트폴리오 분석은 분석일 기준 과거 1년 잔고가 필요
+            starts = []
+            if 'monthly' in include:
+                starts.append(start_date)
+            if 'portfolio' in include:
+                starts.append(analysis_date - timedelta(days=self.PORTFOLIO_LOOKBACK_DAYS))
+            load_start = min(starts) if starts and None not in starts else None
+            load_end = max(end_date, analysis_date) if end_date else None
+
+            frames = self.load_frames(session, account_ids, load_start, load_end)
+            now = datetime.utcnow()
+            counts = {}
+
+            if 'monthly' in include:
+                monthly = self.compute_monthly_summaries(frames, start_date, end_date)
+                rows = self._to_rows(monthly, created_at=now, updated_at=now)
+                counts['monthly_summaries'] = self.bulk_writer.upsert_rows(
+                    session, MonthlySummary.__table__, 'uq_monthly_summary_account_month', rows,
+                    update_columns=[column for column in monthly.columns if column not in MONTH_KEYS]
+                    + ['updated_at']
+                )
+
+            if 'stock' in include:
+                performance = self.compute_stock_performances(frames, analysis_date)
+                rows = self._to_rows(performance, ['first_buy_date', 'last_sell_date'], last_updated=now)
+                counts['stock_performances'] = self.bulk_writer.upsert_rows(
+                    session, StockPerformance.__table__, 'uq_stock_performance_account_symbol', rows
+                )
+
+            if 'portfolio' in include:
+                portfolio = self.compute_portfolio_analyses(frames, analysis_date)
+                rows = self._to_rows(portfolio, created_at=now)
+                counts['portfolio_analyses'] = self.bulk_writer.upsert_rows(
+                    session, PortfolioAnalysis.__table__, 'uq_portfolio_analysis_account_date', rows,
+                    update_columns=[column for column in portfolio.columns
+                                    if column not in ('account_id', 'analysis_date')]
+                )
+
+            session.commit()
+            logger.info(f"일괄 분석 완료: {counts}")
+            return counts
+
+        except Exception as e:
+            if self.session:
+                self.session.rollback()
+            logger.error(f"일괄 분석 실패: {str(e)}")
+            raise
+
+    def close_session(self):
+        """세션 종료"""
+        if self.session:
+            self.session.close()
+            self.session = None
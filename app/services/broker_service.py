@@ -1,8 +1,10 @@
 """
 브로커 서비스 클래스
 """
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import List, Dict, Any, Optional, Iterator
 from app.brokers.kis_broker import KISBroker
+from app.brokers.kis_async_broker import AsyncKISBroker
 from app.brokers.kiwoom_broker import KiwoomBroker
 from app.brokers.base_broker import BaseBroker
 from app.utils.exceptions import BrokerError
@@ -34,7 +36,7 @@ class BrokerService:
             
             try:
                 if api_type == 'kis':
-                    broker = KISBroker(broker_config)
+                    broker = self._create_kis_broker(broker_config)
                     self.brokers[broker_name] = broker
                     logger.info(f"브로커 {broker_name} 초기화 완료")
                 elif api_type == 'kiwoom':
@@ -47,6 +49,14 @@ class BrokerService:
             except Exception as e:
                 logger.error(f"브로커 {broker_name} 초기화 실패: {str(e)}")
     
+    def _create_kis_broker(self, broker_config: Dict[str, Any]) -> KISBroker:
+        """한국투자증권 브로커 생성 (api_settings.async_client 설정 시 asyncio 클라이언트)"""
+        if broker_config.get('api_settings', {}).get('async_client', False):
+            if AsyncKISBroker.is_available():
+                return AsyncKISBroker(broker_config)
+            logger.warning("aiohttp가 설치되지 않아 동기 클라이언트를 사용합니다. (pip install aiohttp)")
+        return KISBroker(broker_config)
+    
     def get_broker(self, broker_name: str) -> Optional[BaseBroker]:
         """특정 브로커 반환"""
         return self.brokers.get(broker_name)
@@ -131,6 +141,88 @@ class BrokerService:
             logger.error(f"계좌 {account_number} 보유종목 조회 실패: {str(e)}")
             raise BrokerError(f"보유종목 조회 실패: {str(e)}")
     
+    def iter_account_holdings_pages(self, broker_name: str, account_number: str) -> Iterator[List[Dict[str, Any]]]:
+        """계좌 보유종목 페이지 단위 조회"""
+        broker = self.get_broker(broker_name)
+        if not broker:
+            raise BrokerError(f"브로커 {broker_name}을 찾을 수 없습니다.")
+        
+        if not broker.is_connected():
+            broker.connect()
+        
+        return broker.iter_holdings_pages(account_number)
+    
+    def get_account_snapshot(self, broker_name: str, account_number: str) -> Dict[str, Any]:
+        """계좌 잔고 + 보유종목 조회"""
+        broker = self.get_broker(broker_name)
+        if not broker:
+            raise BrokerError(f"브로커 {broker_name}을 찾을 수 없습니다.")
+        
+        try:
+            if not broker.is_connected():
+                broker.connect()
+            
+            return broker.get_account_snapshot(account_number)
+            
+        except Exception as e:
+            logger.error(f"계좌 {account_number} 잔고/보유종목 조회 실패: {str(e)}")
+            raise BrokerError(f"잔고/보유종목 조회 실패: {str(e)}")
+    
+    def stream_account_snapshot(self, broker_name: str, account_number: str) -> Dict[str, Any]:
+        """계좌 잔고 + 보유종목 페이지 이터레이터 조회 ({'balance', 'holdings_pages'})"""
+        broker = self.get_broker(broker_name)
+        if not broker:
+            raise BrokerError(f"브로커 {broker_name}을 찾을 수 없습니다.")
+        
+        try:
+            if not broker.is_connected():
+                broker.connect()
+            
+            return broker.stream_account_snapshot(account_number)
+            
+        except Exception as e:
+            logger.error(f"계좌 {account_number} 잔고/보유종목 조회 실패: {str(e)}")
+            raise BrokerError(f"잔고/보유종목 조회 실패: {str(e)}")
+    
+    def get_account_snapshots(self, broker_name: str, account_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 계좌 잔고 + 보유종목 일괄 조회 (계좌별 실패는 {'error'}로 반환)"""
+        broker = self.get_broker(broker_name)
+        if not broker:
+            raise BrokerError(f"브로커 {broker_name}을 찾을 수 없습니다.")
+        
+        try:
+            if not broker.is_connected():
+                broker.connect()
+            
+            return broker.get_account_snapshots(account_numbers)
+            
+        except Exception as e:
+            logger.error(f"계좌 {len(account_numbers)}개 일괄 조회 실패: {str(e)}")
+            raise BrokerError(f"잔고/보유종목 일괄 조회 실패: {str(e)}")
+    
+    async def get_account_snapshots_async(self, broker_name: str,
+                                          account_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 계좌 일괄 조회 (이벤트 루프 안에서 호출)
+
+        asyncio 클라이언트는 현재 루프에서 계좌를 동시에 조회하고,
+        동기 브로커는 워커 스레드에서 실행해 루프를 막지 않습니다.
+        """
+        broker = self.get_broker(broker_name)
+        if not broker:
+            raise BrokerError(f"브로커 {broker_name}을 찾을 수 없습니다.")
+        
+        try:
+            if isinstance(broker, AsyncKISBroker):
+                return await broker.get_account_snapshots_async(account_numbers)
+            
+            if not broker.is_connected():
+                await asyncio.to_thread(broker.connect)
+            return await asyncio.to_thread(broker.get_account_snapshots, account_numbers)
+            
+        except Exception as e:
+            logger.error(f"계좌 {len(account_numbers)}개 일괄 조회 실패: {str(e)}")
+            raise BrokerError(f"잔고/보유종목 일괄 조회 실패: {str(e)}")
+    
     def get_account_transactions(self, broker_name: str, account_number: str, 
                                start_date, end_date) -> List[Dict[str, Any]]:
         """계좌 거래내역 조회"""
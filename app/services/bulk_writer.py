@@ -0,0 +1,182 @@
+"""
+대량 저장(upsert) 서비스 클래스
+"""
+from datetime import datetime, date
+from typing import List, Dict, Any, Iterable, Optional
+from sqlalchemy import Table, UniqueConstraint, delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.account import Account
+from app.models.balance import DailyBalance
+from app.models.holding import Holding, HoldingSnapshot
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HOLDING_FIELDS = [
+    'name', 'quantity', 'average_price', 'current_price',
+    'evaluation_amount', 'profit_loss', 'profit_loss_rate'
+]
+BALANCE_FIELDS = [
+    'cash_balance', 'stock_balance', 'total_balance',
+    'evaluation_amount', 'profit_loss', 'profit_loss_rate'
+]
+
+
+class BulkWriter:
+    """INSERT ... ON CONFLICT DO UPDATE 기반 대량 저장
+
+    현재 보유종목은 uq_account_symbol, 보유종목 스냅샷은 uq_holding_snapshot,
+    일일 잔고는 uq_account_balance_date 제약조건으로 upsert합니다.
+    행은 executemany 배치로 전송하므로 계좌당 실행 문장 수가 행 수와 무관합니다.
+    SQLite와 PostgreSQL을 지원합니다.
+    """
+
+    DEFAULT_BATCH_SIZE = 500
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        self._account_ids: Dict[str, int] = {}
+
+    def clear_cache(self):
+        """계좌 ID 캐시 초기화"""
+        self._account_ids.clear()
+
+    def get_account_id(self, session: Session, account_number: str) -> Optional[int]:
+        """계좌번호로 계좌 ID 조회 (조회된 ID는 캐시)"""
+        account_id = self._account_ids.get(account_number)
+        if account_id is None:
+            account_id = session.execute(
+                select(Account.id).where(Account.account_number == account_number)
+            ).scalar()
+            if account_id is not None:
+                self._account_ids[account_number] = account_id
+        return account_id
+
+    @staticmethod
+    def _insert(session: Session, table: Table):
+        """DB 방언별 INSERT 구문 생성"""
+        dialect = session.get_bind().dialect.name
+        if dialect == 'sqlite':
+            return sqlite.insert(table)
+        if dialect == 'postgresql':
+            return postgresql.insert(table)
+        raise ValueError(f"upsert를 지원하지 않는 데이터베이스: {dialect}")
+
+    @staticmethod
+    def _conflict_columns(table: Table, constraint_name: str) -> List[str]:
+        """고유 제약조건(또는 고유 인덱스) 이름으로 컬럼 목록 조회"""
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name == constraint_name:
+                return [column.name for column in constraint.columns]
+        for index in table.indexes:
+            if index.unique and index.name == constraint_name:
+                return [column.name for column in index.columns]
+        raise ValueError(f"{table.name} 테이블에 {constraint_name} 제약조건이 없습니다.")
+
+    def _upsert_statement(self, session: Session, table: Table, constraint_name: str,
+                          update_columns: List[str]):
+        """ON CONFLICT DO UPDATE 구문 생성"""
+        stmt = self._insert(session, table)
+        return stmt.on_conflict_do_update(
+            index_elements=self._conflict_columns(table, constraint_name),
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+
+    def upsert_rows(self, session: Session, table: Table, constraint_name: str,
+                    rows: List[Dict[str, Any]], update_columns: Optional[List[str]] = None) -> int:
+        """임의 테이블 배치 upsert (update_columns 생략 시 제약조건 외 전달된 컬럼 갱신)
+
+        Returns:
+            처리한 행 수
+        """
+        if not rows:
+            return 0
+        if update_columns is None:
+            conflict_columns = set(self._conflict_columns(table, constraint_name))
+            update_columns = [column for column in rows[0] if column not in conflict_columns]
+
+        stmt = self._upsert_statement(session, table, constraint_name, update_columns)
+        for start in range(0, len(rows), self.batch_size):
+            session.execute(stmt, rows[start:start + self.batch_size])
+        return len(rows)
+
+    def upsert_balance(self, session: Session, account_id: int, balance_info: Dict[str, Any],
+                       balance_date: Optional[date] = None):
+        """일일 잔고 upsert (단일 문장)"""
+        now = datetime.utcnow()
+        row = {field: balance_info.get(field, 0) for field in BALANCE_FIELDS}
+        row.update(account_id=account_id, balance_date=balance_date or date.today(),
+                   created_at=now, updated_at=now)
+
+        stmt = self._upsert_statement(
+            session, DailyBalance.__table__, 'uq_account_balance_date', BALANCE_FIELDS + ['updated_at']
+        )
+        session.execute(stmt, [row])
+
+    def replace_holdings(self, session: Session, account_id: int,
+                         pages: Iterable[List[Dict[str, Any]]],
+                         snapshot_date: Optional[date] = None) -> int:
+        """보유종목 교체 및 일별 스냅샷 기록
+
+        현재 보유종목(holdings)과 당일 스냅샷(holding_snapshots)을 페이지별 배치로 upsert한 뒤
+        (페이지 이터레이터는 한 페이지씩 소비하며 페이지마다 저장),
+        이번 스냅샷에 없는 종목을 두 테이블에서 삭제합니다 (이전 날짜 스냅샷은 유지).
+
+        Returns:
+            저장한 보유종목 수
+        """
+        snapshot_date = snapshot_date or date.today()
+        current = Holding.__table__
+        history = HoldingSnapshot.__table__
+        current_stmt = self._upsert_statement(
+            session, current, 'uq_account_symbol', HOLDING_FIELDS + ['updated_at', 'last_updated']
+        )
+        history_stmt = self._upsert_statement(
+            session, history, 'uq_holding_snapshot', HOLDING_FIELDS + ['updated_at']
+        )
+
+        def flush(rows: List[Dict[str, Any]]):
+            session.execute(current_stmt, rows)
+            history_rows = []
+            for row in rows:
+                history_row = {key: value for key, value in row.items() if key != 'last_updated'}
+                history_row['snapshot_date'] = snapshot_date
+                history_rows.append(history_row)
+            session.execute(history_stmt, history_rows)
+
+        now = datetime.utcnow()
+        symbols = set()
+        # 같은 배치에 중복 종목이 있으면 PostgreSQL에서 오류가 나므로 종목별 마지막 행만 유지
+        batch: Dict[str, Dict[str, Any]] = {}
+        for holdings in pages:
+            for holding_data in holdings:
+                symbol = holding_data.get('symbol', '')
+                if symbol in symbols:
+                    logger.warning(f"중복 종목 {symbol}은(는) 마지막 데이터로 저장합니다.")
+                symbols.add(symbol)
+
+                row = {field: holding_data.get(field, 0) for field in HOLDING_FIELDS}
+                row.update(account_id=account_id, symbol=symbol, name=holding_data.get('name', ''),
+                           created_at=now, updated_at=now, last_updated=now)
+                batch[symbol] = row
+
+                if len(batch) >= self.batch_size:
+                    flush(list(batch.values()))
+                    batch = {}
+
+            # 페이지가 끝나면 바로 저장 (다음 페이지 조회 전에 메모리 비움)
+            if batch:
+                flush(list(batch.values()))
+                batch = {}
+
+        # 이번 스냅샷에 없는 종목 삭제 (전량 매도 등)
+        for table, condition in ((current, None), (history, history.c.snapshot_date == snapshot_date)):
+            stale = delete(table).where(table.c.account_id == account_id)
+            if condition is not None:
+                stale = stale.where(condition)
+            if symbols:
+                stale = stale.where(table.c.symbol.notin_(symbols))
+            session.execute(stale)
+
+        return len(symbols)
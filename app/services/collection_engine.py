@@ -0,0 +1,396 @@
+"""
+다중 계좌 동시 수집 엔진
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class _PageStream:
+    """워커 스레드가 조회한 보유종목 페이지를 호출 스레드로 넘기는 제한 크기 큐
+
+    워커는 브로커 슬롯을 잡은 채로 연속조회 페이지를 넣고, 호출 스레드는 꺼내는 대로 저장합니다.
+    브로커 HTTP 세션은 워커 스레드에서만 사용되고, 메모리에는 최대 MAX_PAGES 페이지만 쌓입니다.
+    조회 기한은 워커가 저장 측을 기다린 시간(큐가 가득 찬 시간)만큼 늦춰집니다.
+    """
+
+    MAX_PAGES = 2
+    POLL_INTERVAL = 0.1  # 초
+    _END = object()
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self._queue: queue.Queue = queue.Queue(maxsize=self.MAX_PAGES)
+        self._closed = threading.Event()
+
+    def feed(self, pages) -> None:
+        """페이지를 모두 넣을 때까지 조회 (워커 스레드, 저장 측이 닫으면 중단)"""
+        try:
+            for page in pages:
+                if not self._put(page):
+                    return
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(self._END)
+
+    def _put(self, item) -> bool:
+        while not self._closed.is_set():
+            waited_from = time.monotonic()
+            try:
+                self._queue.put(item, timeout=self.POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+            finally:
+                self.deadline += time.monotonic() - waited_from
+        return False
+
+    def close(self) -> None:
+        """저장 종료 (대기 중인 워커를 풀어줌)"""
+        self._closed.set()
+
+    def __iter__(self):
+        """도착한 페이지를 차례로 반환 (호출 스레드, 기한까지 다음 페이지가 없으면 TimeoutError)"""
+        while True:
+            try:
+                item = self._queue.get(timeout=max(self.POLL_INTERVAL, self.deadline - time.monotonic()))
+            except queue.Empty:
+                if time.monotonic() > self.deadline:
+                    raise TimeoutError("보유종목 연속조회 시간 초과")
+                continue
+            if item is self._END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class CollectionEngine:
+    """계좌 데이터 동시 수집 엔진
+
+    브로커 API 호출은 제한된 스레드 풀에서 병렬로 실행하고,
+    DB 저장은 호출 스레드에서 순차적으로 처리합니다.
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_ACCOUNT_TIMEOUT = 120  # 초
+    DEFAULT_BROKER_CONCURRENCY = {
+        'kis': 4,
+        'kiwoom': 1  # OCX 로그인 세션은 동시에 하나만 사용 가능
+    }
+    POLL_INTERVAL = 0.2  # 초
+
+    def __init__(self, data_collector, max_workers: Optional[int] = None,
+                 account_timeout: Optional[float] = None):
+        self.data_collector = data_collector
+        self.broker_service = data_collector.broker_service
+
+        settings = self.broker_service.config.get('collection', {})
+        self.max_workers = max_workers or settings.get('max_workers', self.DEFAULT_MAX_WORKERS)
+        self.account_timeout = account_timeout or settings.get('account_timeout', self.DEFAULT_ACCOUNT_TIMEOUT)
+        self.broker_concurrency = dict(self.DEFAULT_BROKER_CONCURRENCY)
+        self.broker_concurrency.update(settings.get('broker_concurrency', {}))
+
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _get_concurrency_limit(self, broker_name: str) -> int:
+        """브로커별 동시 요청 수 (api_settings.max_concurrency > collection.broker_concurrency)"""
+        broker = self.broker_service.get_broker(broker_name)
+        if not broker:
+            return 1
+
+        limit = broker.config.get('api_settings', {}).get('max_concurrency')
+        if not limit:
+            limit = self.broker_concurrency.get(broker_name) or self.broker_concurrency.get(broker.api_type, 1)
+        return max(1, int(limit))
+
+    def _get_semaphore(self, broker_name: str) -> threading.BoundedSemaphore:
+        """브로커별 세마포어 반환"""
+        with self._lock:
+            if broker_name not in self._semaphores:
+                self._semaphores[broker_name] = threading.BoundedSemaphore(
+                    self._get_concurrency_limit(broker_name)
+                )
+            return self._semaphores[broker_name]
+
+    def _connect_brokers(self, broker_names: List[str]) -> Dict[str, str]:
+        """수집 전 브로커 연결 (토큰 발급 경쟁 방지를 위해 순차 실행)"""
+        errors = {}
+        for broker_name in broker_names:
+            broker = self.broker_service.get_broker(broker_name)
+            if not broker:
+                errors[broker_name] = f"브로커 {broker_name}을 찾을 수 없습니다."
+                continue
+            if broker.is_connected():
+                continue
+            try:
+                self.broker_service.connect_broker(broker_name)
+            except Exception as e:
+                errors[broker_name] = str(e)
+        return errors
+
+    def _supports_batch(self, broker_name: str) -> bool:
+        """여러 계좌 일괄 조회 지원 여부"""
+        broker = self.broker_service.get_broker(broker_name)
+        return bool(getattr(broker, 'supports_batch_snapshot', False))
+
+    def _acquire_slot(self, broker_name: str, state: Dict[str, Any]) -> threading.BoundedSemaphore:
+        """작업 기한 안에 브로커 슬롯 확보 (기한이 지나면 TimeoutError)"""
+        semaphore = self._get_semaphore(broker_name)
+        if not semaphore.acquire(timeout=max(0.0, state['deadline'] - time.monotonic())):
+            raise TimeoutError("브로커 슬롯 대기 시간 초과")
+        state['started_at'] = time.monotonic()
+        if state.get('abandoned'):
+            # 대기 중에 호출 스레드가 타임아웃 처리한 작업
+            semaphore.release()
+            raise TimeoutError("브로커 슬롯 대기 시간 초과")
+        return semaphore
+
+    def _fetch(self, broker_name: str, account_number: str, state: Dict[str, Any]) -> Dict[str, Any]:
+        """브로커 슬롯 확보 후 계좌 데이터 조회 (워커 스레드)
+
+        보유종목 페이지 이터레이터는 슬롯을 잡은 채로 끝까지 조회하고, 각 페이지는 _PageStream으로
+        호출 스레드에 넘깁니다. 첫 페이지가 준비되면 state['snapshot']에 넣어 호출 스레드가
+        조회 완료를 기다리지 않고 저장을 시작할 수 있게 합니다.
+        """
+        semaphore = self._acquire_slot(broker_name, state)
+        try:
+            snapshot = self.data_collector.fetch_account_data(broker_name, account_number)
+            pages = snapshot.get('holdings_pages') if isinstance(snapshot, dict) else None
+            if pages is None:
+                return snapshot
+
+            stream = _PageStream(state['started_at'] + self.account_timeout)
+            snapshot = dict(snapshot, holdings_pages=stream)
+            state['snapshot'] = snapshot
+            stream.feed(pages)
+            return snapshot
+        finally:
+            semaphore.release()
+
+    def _fetch_batch(self, broker_name: str, account_numbers: List[str],
+                     state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """브로커 슬롯 확보 후 여러 계좌 일괄 조회 (워커 스레드)"""
+        semaphore = self._acquire_slot(broker_name, state)
+        try:
+            return self.data_collector.fetch_accounts_data(broker_name, account_numbers)
+        finally:
+            semaphore.release()
+
+    def _job_deadlines(self, jobs: List[tuple], start: float) -> List[float]:
+        """작업별 기한 (제출 시각 기준)
+
+        브로커별 슬롯 수만큼 작업을 차례로 배정했을 때, 앞선 작업이 모두 타임아웃까지 걸리더라도
+        이 작업이 끝나야 하는 시각입니다. 멈춘 호출이 슬롯을 계속 잡고 있으면 뒤에서 기다리던 작업은
+        이 기한이 지나면 타임아웃으로 처리됩니다.
+        """
+        slots: Dict[str, List[float]] = {}
+        deadlines = []
+        for broker_name, account_numbers, _ in jobs:
+            broker_slots = slots.setdefault(broker_name, [0.0] * self._get_concurrency_limit(broker_name))
+            index = broker_slots.index(min(broker_slots))
+            broker_slots[index] += self.account_timeout * len(account_numbers)
+            deadlines.append(start + broker_slots[index])
+        return deadlines
+
+    def run(self, accounts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """계좌 목록 동시 수집
+
+        Args:
+            accounts: broker_name, account_number 키를 가진 계좌 정보 목록
+
+        Returns:
+            계좌별 결과(results)와 브로커별 집계(brokers)를 포함한 수집 리포트
+        """
+        started_at = datetime.now()
+        start = time.monotonic()
+        results: List[Dict[str, Any]] = []
+
+        broker_names = list(dict.fromkeys(acc['broker_name'] for acc in accounts))
+        connect_errors = self._connect_brokers(broker_names)
+
+        # 일괄 조회 지원 브로커는 계좌를 묶어 하나의 작업으로 처리
+        jobs: List[tuple] = []
+        batch_jobs: Dict[str, List[str]] = {}
+        for account_info in accounts:
+            broker_name = account_info['broker_name']
+            account_number = account_info['account_number']
+
+            if broker_name in connect_errors:
+                results.append(self._make_result(
+                    broker_name, account_number, 'failed', 0.0,
+                    f"브로커 연결 실패: {connect_errors[broker_name]}"
+                ))
+            elif self._supports_batch(broker_name):
+                if broker_name not in batch_jobs:
+                    batch_jobs[broker_name] = []
+                    jobs.append((broker_name, batch_jobs[broker_name], True))
+                batch_jobs[broker_name].append(account_number)
+            else:
+                jobs.append((broker_name, [account_number], False))
+
+        # 작업 기한은 제출 시각부터 계산하고, 전체 수집에도 기한을 둠
+        # (멈춘 호출이 브로커 슬롯을 놓지 않아도 대기 중인 작업과 수집 전체가 끝나도록)
+        deadlines = self._job_deadlines(jobs, time.monotonic())
+        run_timeout = self.broker_service.config.get('collection', {}).get('run_timeout')
+        if run_timeout:
+            run_deadline = start + float(run_timeout)
+        else:
+            run_deadline = max(deadlines, default=start) + self.account_timeout * max(
+                (len(account_numbers) for _, account_numbers, _ in jobs), default=0)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='collector')
+        futures = {}
+        try:
+            for (broker_name, account_numbers, batch), deadline in zip(jobs, deadlines):
+                state: Dict[str, Any] = {'submitted_at': time.monotonic(), 'deadline': deadline}
+                if batch:
+                    future = executor.submit(self._fetch_batch, broker_name, account_numbers, state)
+                else:
+                    future = executor.submit(self._fetch, broker_name, account_numbers[0], state)
+                futures[future] = (broker_name, account_numbers, batch, state)
+
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=self.POLL_INTERVAL, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    broker_name, account_numbers, batch, state = futures[future]
+                    if state.get('saving'):
+                        continue
+                    elapsed = time.monotonic() - state.get('started_at', state['submitted_at'])
+                    try:
+                        result = future.result()
+                    except TimeoutError as e:
+                        for account_number in account_numbers:
+                            results.append(self._make_result(
+                                broker_name, account_number, 'timeout',
+                                time.monotonic() - state['submitted_at'], str(e)
+                            ))
+                            logger.error(f"계좌 {account_number} 데이터 수집 타임아웃: {str(e)}")
+                        continue
+                    except Exception as e:
+                        for account_number in account_numbers:
+                            results.append(self._make_result(broker_name, account_number, 'failed', elapsed, str(e)))
+                            logger.error(f"계좌 {account_number} 데이터 수집 실패: {str(e)}")
+                        continue
+
+                    snapshots = result if batch else {account_numbers[0]: result}
+                    for account_number in account_numbers:
+                        results.append(self._save_snapshot(
+                            broker_name, account_number, snapshots.get(account_number), elapsed
+                        ))
+
+                # 연속조회 중인 계좌는 워커가 페이지를 조회하는 동안 도착한 페이지부터 저장
+                for future in list(pending):
+                    broker_name, account_numbers, batch, state = futures[future]
+                    snapshot = state.get('snapshot')
+                    if snapshot is None or state.get('saving'):
+                        continue
+                    state['saving'] = True
+                    pending.discard(future)
+                    results.append(self._save_snapshot(
+                        broker_name, account_numbers[0], snapshot, time.monotonic() - state['started_at']
+                    ))
+
+                # 작업별 타임아웃 확인
+                # - 실행 중: 브로커 슬롯을 확보한 시점부터 계산 (일괄 작업은 계좌 수만큼 허용)
+                # - 슬롯 대기 중: 제출 시각 기준 작업 기한이 지나면 타임아웃
+                # - 전체 수집 기한이 지나면 남은 작업 모두 타임아웃
+                now = time.monotonic()
+                for future in list(pending):
+                    broker_name, account_numbers, batch, state = futures[future]
+                    timeout = self.account_timeout * len(account_numbers)
+                    started = state.get('started_at')
+                    if now > run_deadline:
+                        error = "전체 수집 시간 초과"
+                    elif started is not None:
+                        if now - started <= timeout:
+                            continue
+                        error = f"계좌 수집 타임아웃 ({timeout}초)"
+                    elif now > state['deadline']:
+                        error = f"브로커 슬롯 대기 시간 초과 ({state['deadline'] - state['submitted_at']:.1f}초)"
+                    else:
+                        continue
+
+                    state['abandoned'] = True
+                    pending.discard(future)
+                    future.cancel()
+                    for account_number in account_numbers:
+                        results.append(self._make_result(
+                            broker_name, account_number, 'timeout', now - state.get('started_at', state['submitted_at']),
+                            error
+                        ))
+                        logger.error(f"계좌 {account_number} 데이터 수집 타임아웃: {error}")
+        finally:
+            # 저장하지 못한 연속조회 스트림은 닫아서 워커가 슬롯을 놓도록 함
+            for _, _, _, state in futures.values():
+                snapshot = state.get('snapshot')
+                if snapshot is not None:
+                    snapshot['holdings_pages'].close()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return self._build_report(results, started_at, time.monotonic() - start)
+
+    def _save_snapshot(self, broker_name: str, account_number: str,
+                       snapshot: Optional[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        """조회 결과 저장 후 계좌별 결과 반환 (호출 스레드)"""
+        try:
+            if snapshot is None:
+                raise Exception("조회 결과가 없습니다.")
+            if 'error' in snapshot:
+                raise Exception(snapshot['error'])
+            self.data_collector.save_account_data(account_number, snapshot)
+        except TimeoutError as e:
+            logger.error(f"계좌 {account_number} 데이터 수집 타임아웃: {str(e)}")
+            return self._make_result(broker_name, account_number, 'timeout', elapsed, str(e))
+        except Exception as e:
+            logger.error(f"계좌 {account_number} 데이터 수집 실패: {str(e)}")
+            return self._make_result(broker_name, account_number, 'failed', elapsed, str(e))
+        finally:
+            if snapshot is not None and isinstance(snapshot.get('holdings_pages'), _PageStream):
+                snapshot['holdings_pages'].close()
+
+        logger.info(f"계좌 {account_number} 데이터 수집 완료 ({elapsed:.2f}초)")
+        return self._make_result(broker_name, account_number, 'success', elapsed)
+
+    def _make_result(self, broker_name: str, account_number: str, status: str,
+                     elapsed: float, error: Optional[str] = None) -> Dict[str, Any]:
+        """계좌별 결과 생성"""
+        return {
+            'broker_name': broker_name,
+            'account_number': account_number,
+            'status': status,
+            'elapsed_seconds': round(elapsed, 3),
+            'error': error
+        }
+
+    def _build_report(self, results: List[Dict[str, Any]], started_at: datetime,
+                      elapsed: float) -> Dict[str, Any]:
+        """수집 리포트 생성"""
+        brokers: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            stats = brokers.setdefault(result['broker_name'], {
+                'total': 0, 'success': 0, 'failed': 0, 'timeout': 0, 'max_elapsed_seconds': 0.0
+            })
+            stats['total'] += 1
+            stats[result['status']] += 1
+            stats['max_elapsed_seconds'] = max(stats['max_elapsed_seconds'], result['elapsed_seconds'])
+
+        return {
+            'started_at': started_at.isoformat(),
+            'elapsed_seconds': round(elapsed, 3),
+            'total_count': len(results),
+            'collected_count': sum(1 for r in results if r['status'] == 'success'),
+            'failed_count': sum(1 for r in results if r['status'] == 'failed'),
+            'timeout_count': sum(1 for r in results if r['status'] == 'timeout'),
+            'results': results,
+            'brokers': brokers
+        }
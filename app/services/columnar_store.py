@@ -0,0 +1,320 @@
+"""
+잔고/보유종목/거래내역 컬럼형(Parquet/NumPy) 분석 캐시
+"""
+import json
+import os
+import shutil
+from datetime import datetime, date
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, distinct, func
+from sqlalchemy.orm import Session
+from app.models.balance import DailyBalance
+from app.models.holding import Holding, HoldingSnapshot
+from app.models.transaction import Transaction
+from app.utils.logger import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치 시 NumPy 컬럼 파일 사용
+    pa = None
+    pq = None
+
+logger = get_logger(__name__)
+
+# 테이블명: (모델, 월 파티션 날짜 컬럼, 변경 감지 컬럼)
+# 날짜 컬럼이 None이면 파티션 하나(current)에 전체 저장
+TABLES = {
+    'daily_balances': (DailyBalance, 'balance_date', 'updated_at'),
+    'holding_snapshots': (HoldingSnapshot, 'snapshot_date', 'updated_at'),
+    'transactions': (Transaction, 'transaction_date', 'created_at'),
+    'holdings': (Holding, None, 'updated_at'),
+}
+CURRENT_PARTITION = 'current'
+MANIFEST_FILE = 'manifest.json'
+
+
+class ColumnarStore:
+    """테이블별/월별 컬럼형 파일 캐시
+
+    base_dir/<테이블>/<YYYY-MM>.parquet (pyarrow 설치 시) 또는
+    base_dir/<테이블>/<YYYY-MM>/<컬럼>.npy 로 저장합니다.
+    읽을 때는 필요한 월 파일과 컬럼만 열고, NumPy 형식은 메모리 맵으로 읽어 복사 없이 사용합니다.
+
+    refresh()는 직전 갱신 이후 변경된 행(updated_at/created_at 기준)이 속한 월과, 행 수가 캐시와
+    달라진 월(보유종목 교체 등으로 행이 삭제된 월)만 다시 씁니다. DB에서 사라진 월은 캐시에서도 지웁니다.
+    다른 인스턴스(프로세스)가 갱신한 파티션은 매니페스트 파일이 바뀌면 다시 읽어 반영합니다.
+    """
+
+    FORMATS = ('parquet', 'npy')
+
+    def __init__(self, base_dir: str = './data/columnar', format: str = 'auto'):
+        if format == 'auto':
+            format = 'parquet' if pq is not None else 'npy'
+        if format not in self.FORMATS:
+            raise ValueError(f"지원하지 않는 형식: {format} (지원: {', '.join(self.FORMATS)})")
+        if format == 'parquet' and pq is None:
+            raise ImportError("parquet 형식은 pyarrow가 필요합니다. (pip install pyarrow)")
+
+        self.base_dir = Path(base_dir)
+        self.format = format
+        self._manifest_mtime = None
+        self.manifest = self._load_manifest()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> Optional['ColumnarStore']:
+        """columnar_cache 설정으로 생성 (비활성화 시 None)"""
+        cache_config = (config or {}).get('columnar_cache', {})
+        if not cache_config.get('enabled', False):
+            return None
+        return cls(cache_config.get('path', './data/columnar'), cache_config.get('format', 'auto'))
+
+    # 매니페스트 -------------------------------------------------------------
+
+    def _manifest_stat(self) -> Optional[Tuple[int, int, int]]:
+        """매니페스트 파일 변경 감지 키 (원자적 교체 시 inode도 바뀜)"""
+        try:
+            stat = (self.base_dir / MANIFEST_FILE).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        path = self.base_dir / MANIFEST_FILE
+        self._manifest_mtime = self._manifest_stat()
+        if self._manifest_mtime is not None:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('format') == self.format:
+                return manifest
+        return {'format': self.format, 'tables': {}}
+
+    def _reload_manifest_if_changed(self):
+        """다른 인스턴스가 매니페스트를 바꿨으면 다시 읽음 (새 월 파티션 반영)"""
+        if self._manifest_stat() != self._manifest_mtime:
+            self.manifest = self._load_manifest()
+
+    def _save_manifest(self):
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        path = self.base_dir / MANIFEST_FILE
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        self._manifest_mtime = self._manifest_stat()
+
+    def has_table(self, table_name: str) -> bool:
+        """캐시에 테이블이 만들어져 있는지"""
+        self._reload_manifest_if_changed()
+        return bool(self.manifest['tables'].get(table_name, {}).get('partitions'))
+
+    # 갱신 ---------------------------------------------------------------------
+
+    def refresh(self, session: Session, tables: Optional[Iterable[str]] = None,
+                full: bool = False) -> Dict[str, List[str]]:
+        """변경된 월 파티션만 다시 내보내기
+
+        Returns:
+            테이블별 다시 쓰거나 지운 파티션 목록
+        """
+        self._reload_manifest_if_changed()
+        refreshed = {}
+        for table_name in tables or TABLES:
+            model, date_column, change_column = TABLES[table_name]
+            state = self.manifest['tables'].setdefault(table_name, {'watermark': None, 'partitions': {}})
+            watermark = None if full else state.get('watermark')
+            change = getattr(model, change_column)
+
+            counts = self._partition_counts(session, model, date_column)
+            latest = session.execute(select(func.max(change))).scalar()
+
+            if full:
+                self._remove_table(table_name)
+                state['partitions'] = {}
+                partitions = set(counts)
+            else:
+                # 행 수가 달라진 월 (삭제는 변경 시각이 남지 않으므로 행 수로 감지)
+                partitions = {partition for partition, count in counts.items()
+                              if state['partitions'].get(partition) != count}
+                if latest is not None and (watermark is None or latest > datetime.fromisoformat(watermark)):
+                    if date_column is None:
+                        partitions.add(CURRENT_PARTITION)
+                    else:
+                        partition_date = getattr(model, date_column)
+                        query = select(distinct(partition_date))
+                        if watermark is not None:
+                            query = query.where(change > datetime.fromisoformat(watermark))
+                        partitions.update(value.strftime('%Y-%m') for value in session.execute(query).scalars())
+            removed = sorted(set(state['partitions']) - set(counts))
+            if not partitions and not removed:
+                continue
+
+            for partition in removed:
+                self._remove_partition(table_name, partition)
+                del state['partitions'][partition]
+            for partition in sorted(partitions):
+                frame = self._query_partition(session, model, date_column, partition)
+                state['partitions'][partition] = len(frame)
+                self._write_partition(table_name, partition, frame)
+
+            if latest is not None:
+                state['watermark'] = latest.isoformat()
+            refreshed[table_name] = sorted(partitions | set(removed))
+
+        self._save_manifest()
+        if refreshed:
+            logger.info(f"컬럼형 캐시 갱신: { {name: len(parts) for name, parts in refreshed.items()} }")
+        return refreshed
+
+    @staticmethod
+    def _partition_counts(session: Session, model, date_column: Optional[str]) -> Dict[str, int]:
+        """DB의 파티션별 행 수 (행이 없는 파티션은 제외)"""
+        if date_column is None:
+            count = session.execute(select(func.count()).select_from(model.__table__)).scalar()
+            return {CURRENT_PARTITION: count} if count else {}
+
+        partition_date = getattr(model, date_column)
+        counts: Dict[str, int] = {}
+        for value, count in session.execute(select(partition_date, func.count()).group_by(partition_date)):
+            partition = value.strftime('%Y-%m')
+            counts[partition] = counts.get(partition, 0) + count
+        return counts
+
+    @staticmethod
+    def _month_range(partition: str) -> Tuple[date, date]:
+        start = datetime.strptime(partition, '%Y-%m').date()
+        end = (pd.Timestamp(start) + pd.offsets.MonthEnd(0)).date()
+        return start, end
+
+    def _query_partition(self, session: Session, model, date_column: Optional[str],
+                         partition: str) -> pd.DataFrame:
+        """파티션 하나를 컬럼 단위로 조회 (ORM 객체 생성 없음)"""
+        columns = [column for column in model.__table__.columns]
+        query = select(*columns)
+        if date_column is not None:
+            start, end = self._month_range(partition)
+            partition_date = getattr(model, date_column)
+            query = query.where(partition_date >= start, partition_date <= end)
+        query = query.order_by(*[column for column in model.__table__.primary_key.columns])
+
+        result = session.execute(query)
+        frame = pd.DataFrame(result.all(), columns=list(result.keys()))
+        return self._normalize(model, frame)
+
+    @staticmethod
+    def _normalize(model, frame: pd.DataFrame) -> pd.DataFrame:
+        """컬럼 타입별 고정 dtype으로 변환 (문자열은 고정폭, 날짜는 datetime64)"""
+        for column in model.__table__.columns:
+            values = frame[column.name]
+            python_type = column.type.python_type
+            if python_type is date:
+                frame[column.name] = pd.to_datetime(values).astype('datetime64[s]')
+            elif python_type is datetime:
+                frame[column.name] = pd.to_datetime(values).astype('datetime64[us]')
+            elif python_type is str:
+                frame[column.name] = values.fillna('').astype(str)
+            elif python_type is int and not values.isna().any():
+                frame[column.name] = values.astype('int64')
+            else:
+                frame[column.name] = values.astype('float64')
+        return frame
+
+    # 파일 입출력 -------------------------------------------------------------
+
+    def _partition_path(self, table_name: str, partition: str) -> Path:
+        suffix = '.parquet' if self.format == 'parquet' else ''
+        return self.base_dir / table_name / f"{partition}{suffix}"
+
+    def _remove_table(self, table_name: str):
+        shutil.rmtree(self.base_dir / table_name, ignore_errors=True)
+
+    def _remove_partition(self, table_name: str, partition: str):
+        path = self._partition_path(table_name, partition)
+        if self.format == 'parquet':
+            path.unlink(missing_ok=True)
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _write_partition(self, table_name: str, partition: str, frame: pd.DataFrame):
+        """파티션 파일 원자적 교체 (임시 경로에 쓴 뒤 rename)"""
+        path = self._partition_path(table_name, partition)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+
+        if self.format == 'parquet':
+            pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp_path)
+            os.replace(tmp_path, path)
+            return
+
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir()
+        for column in frame.columns:
+            values = frame[column]
+            if pd.api.types.is_string_dtype(values):
+                # 고정폭 유니코드 배열 (object 배열은 메모리 맵 불가)
+                array = np.asarray(values.tolist(), dtype=str)
+            else:
+                array = values.to_numpy()
+            np.save(tmp_path / f"{column}.npy", array)
+
+        # 디렉터리는 덮어쓸 수 없으므로 기존 파티션을 옮긴 뒤 교체
+        old_path = path.with_name(path.name + '.old')
+        shutil.rmtree(old_path, ignore_errors=True)
+        if path.exists():
+            os.replace(path, old_path)
+        os.replace(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+    def _read_partition(self, table_name: str, partition: str, columns: List[str]) -> pd.DataFrame:
+        path = self._partition_path(table_name, partition)
+        if self.format == 'parquet':
+            return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+        return pd.DataFrame({column: np.load(path / f"{column}.npy", mmap_mode='r') for column in columns},
+                            copy=False)
+
+    # 조회 ---------------------------------------------------------------------
+
+    def read(self, table_name: str, columns: Optional[List[str]] = None,
+             account_ids: Optional[List[int]] = None,
+             start_date: Optional[date] = None, end_date: Optional[date] = None) -> pd.DataFrame:
+        """캐시에서 테이블 조회 (필요한 월 파일/컬럼만 읽음)
+
+        Args:
+            columns: 읽을 컬럼 (None이면 전체)
+            account_ids: 계좌 필터
+            start_date/end_date: 파티션 날짜 컬럼 기준 기간 필터
+        """
+        model, date_column, _ = TABLES[table_name]
+        columns = columns or [column.name for column in model.__table__.columns]
+        read_columns = list(columns)
+        if account_ids is not None and 'account_id' not in read_columns:
+            read_columns.append('account_id')
+        if date_column and (start_date or end_date) and date_column not in read_columns:
+            read_columns.append(date_column)
+
+        self._reload_manifest_if_changed()
+        partitions = sorted(self.manifest['tables'].get(table_name, {}).get('partitions', {}))
+        if date_column is not None:
+            first = start_date.strftime('%Y-%m') if start_date else None
+            last = end_date.strftime('%Y-%m') if end_date else None
+            partitions = [p for p in partitions if (not first or p >= first) and (not last or p <= last)]
+
+        frames = [self._read_partition(table_name, partition, read_columns) for partition in partitions]
+        frames = [frame for frame in frames if len(frame)]
+        if not frames:
+            return pd.DataFrame({column: [] for column in columns})
+        frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+        mask = np.ones(len(frame), dtype=bool)
+        if account_ids is not None:
+            mask &= frame['account_id'].isin(account_ids).to_numpy()
+        if start_date:
+            mask &= (frame[date_column] >= pd.Timestamp(start_date)).to_numpy()
+        if end_date:
+            mask &= (frame[date_column] <= pd.Timestamp(end_date)).to_numpy()
+        if not mask.all():
+            frame = frame[mask]
+        return frame[columns].reset_index(drop=True)
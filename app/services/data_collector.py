@@ -1,14 +1,17 @@
 """
 데이터 수집 서비스 클래스
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 from datetime import datetime, date
 from sqlalchemy.orm import Session
 from app.services.broker_service import BrokerService
+from app.services.bulk_writer import BulkWriter
+from app.services.collection_engine import CollectionEngine
+from app.services.columnar_store import ColumnarStore
+from app.services.metrics_state import MetricsStateUpdater
 from app.models.account import Account
-from app.models.balance import DailyBalance
-from app.models.holding import Holding
 from app.models.transaction import Transaction
+from app.utils.data_generation import data_generation
 from app.utils.database import db_manager
 from app.utils.logger import get_logger
 
@@ -19,26 +22,32 @@ class DataCollector:
     
     def __init__(self, broker_service: BrokerService):
         self.broker_service = broker_service
+        self.bulk_writer = BulkWriter()
+        
+        config = getattr(broker_service, 'config', None) or {}
+        analysis_config = config.get('analysis', {})
+        self.metrics_updater = MetricsStateUpdater(
+            risk_free_rate=analysis_config.get('risk_free_rate', 0.0),
+            bulk_writer=self.bulk_writer
+        )
+        self.columnar_store = ColumnarStore.from_config(config)
     
-    def collect_all_accounts(self):
-        """모든 계좌 데이터 수집"""
+    def collect_all_accounts(self) -> Dict[str, Any]:
+        """모든 계좌 데이터 수집 (브로커별 동시 수집)"""
         try:
             logger.info("전체 계좌 데이터 수집을 시작합니다.")
             
             # 모든 브로커의 계좌 목록 조회
             all_accounts = self.broker_service.get_all_accounts()
             
-            for account_info in all_accounts:
-                try:
-                    self.collect_account_data(
-                        account_info['broker_name'],
-                        account_info['account_number']
-                    )
-                except Exception as e:
-                    logger.error(f"계좌 {account_info['account_number']} 데이터 수집 실패: {str(e)}")
-                    continue
+            report = CollectionEngine(self).run(all_accounts)
+            self.refresh_columnar_store()
             
-            logger.info("전체 계좌 데이터 수집이 완료되었습니다.")
+            logger.info(
+                f"전체 계좌 데이터 수집이 완료되었습니다. "
+                f"(성공 {report['collected_count']}/{report['total_count']}, {report['elapsed_seconds']:.2f}초)"
+            )
+            return report
             
         except Exception as e:
             logger.error(f"전체 계좌 데이터 수집 실패: {str(e)}")
@@ -49,13 +58,9 @@ class DataCollector:
         try:
             logger.info(f"계좌 {account_number} 데이터 수집을 시작합니다.")
             
-            # 잔고 정보 수집
-            balance_info = self.broker_service.get_account_balance(broker_name, account_number)
-            self._save_balance_data(account_number, balance_info)
-            
-            # 보유종목 정보 수집
-            holdings = self.broker_service.get_account_holdings(broker_name, account_number)
-            self._save_holdings_data(account_number, holdings)
+            snapshot = self.fetch_account_data(broker_name, account_number)
+            self.save_account_data(account_number, snapshot)
+            self.refresh_columnar_store()
             
             logger.info(f"계좌 {account_number} 데이터 수집이 완료되었습니다.")
             
@@ -63,50 +68,63 @@ class DataCollector:
             logger.error(f"계좌 {account_number} 데이터 수집 실패: {str(e)}")
             raise
     
+    def refresh_columnar_store(self):
+        """컬럼형 분석 캐시 증분 갱신 (columnar_cache 설정 시, 실패해도 수집 결과는 유지)"""
+        if not self.columnar_store:
+            return
+        session = db_manager.get_session()
+        try:
+            if self.columnar_store.refresh(session):
+                data_generation.bump()  # 캐시에서 읽은 조회 결과 무효화
+        except Exception as e:
+            logger.warning(f"컬럼형 캐시 갱신 실패: {str(e)}")
+        finally:
+            session.close()
+    
+    def fetch_account_data(self, broker_name: str, account_number: str) -> Dict[str, Any]:
+        """계좌 잔고/보유종목 조회 (DB 접근 없음 - 워커 스레드에서 호출 가능)
+
+        보유종목은 페이지 이터레이터(holdings_pages)로 반환되며, 연속조회 페이지는 이터레이터를
+        소비할 때 조회됩니다. 수집 엔진은 브로커 슬롯을 잡은 워커 스레드에서 이터레이터를 끝까지
+        소비하고, 페이지는 호출 스레드로 넘겨 도착하는 대로 저장합니다.
+        """
+        return self.broker_service.stream_account_snapshot(broker_name, account_number)
+    
+    def fetch_accounts_data(self, broker_name: str, account_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+        """여러 계좌 일괄 조회 (DB 접근 없음 - 워커 스레드에서 호출 가능)"""
+        return self.broker_service.get_account_snapshots(broker_name, account_numbers)
+    
+    def save_account_data(self, account_number: str, snapshot: Dict[str, Any]):
+        """조회한 계좌 데이터 저장 (holdings_pages가 있으면 페이지 단위로 저장)"""
+        self._save_balance_data(account_number, snapshot['balance'])
+        pages = snapshot.get('holdings_pages')
+        if pages is None:
+            pages = [snapshot['holdings']]
+        self._save_holdings_pages(account_number, pages)
+    
     def _save_balance_data(self, account_number: str, balance_info: Dict[str, Any]):
-        """잔고 데이터 저장"""
+        """잔고 데이터 저장 (오늘 날짜 기준 upsert)"""
         try:
             session = db_manager.get_session()
             
-            # 계좌 ID 조회
-            account = session.query(Account).filter(
-                Account.account_number == account_number
-            ).first()
-            
-            if not account:
+            account_id = self.bulk_writer.get_account_id(session, account_number)
+            if account_id is None:
                 logger.warning(f"계좌 {account_number}을 찾을 수 없습니다.")
                 return
             
-            # 오늘 날짜의 잔고 데이터 확인
             today = date.today()
-            existing_balance = session.query(DailyBalance).filter(
-                DailyBalance.account_id == account.id,
-                DailyBalance.balance_date == today
-            ).first()
+            self.bulk_writer.upsert_balance(session, account_id, balance_info, today)
             
-            if existing_balance:
-                # 기존 데이터 업데이트
-                existing_balance.cash_balance = balance_info.get('cash_balance', 0)
-                existing_balance.stock_balance = balance_info.get('stock_balance', 0)
-                existing_balance.total_balance = balance_info.get('total_balance', 0)
-                existing_balance.evaluation_amount = balance_info.get('evaluation_amount', 0)
-                existing_balance.profit_loss = balance_info.get('profit_loss', 0)
-                existing_balance.profit_loss_rate = balance_info.get('profit_loss_rate', 0)
-            else:
-                # 새 데이터 생성
-                new_balance = DailyBalance(
-                    account_id=account.id,
-                    balance_date=today,
-                    cash_balance=balance_info.get('cash_balance', 0),
-                    stock_balance=balance_info.get('stock_balance', 0),
-                    total_balance=balance_info.get('total_balance', 0),
-                    evaluation_amount=balance_info.get('evaluation_amount', 0),
-                    profit_loss=balance_info.get('profit_loss', 0),
-                    profit_loss_rate=balance_info.get('profit_loss_rate', 0)
-                )
-                session.add(new_balance)
+            # 누적 지표 상태를 하루 갱신 (실패해도 잔고 저장은 유지)
+            # 세이브포인트 안에서 실행해 실패 시 지표 상태 변경만 되돌림 (PostgreSQL은 오류 후 트랜잭션 전체가 중단됨)
+            try:
+                with session.begin_nested():
+                    self.metrics_updater.advance(session, account_id, today, balance_info.get('total_balance', 0))
+            except Exception as e:
+                logger.warning(f"계좌 {account_number} 지표 상태 갱신 실패: {str(e)}")
             
             session.commit()
+            data_generation.bump()  # GUI 조회 캐시 무효화
             logger.info(f"계좌 {account_number} 잔고 데이터 저장 완료")
             
         except Exception as e:
@@ -116,42 +134,41 @@ class DataCollector:
         finally:
             session.close()
     
+    def collect_holdings_data(self, broker_name: str, account_number: str) -> int:
+        """보유종목 스트리밍 수집 (연속조회 페이지가 도착하는 대로 저장)"""
+        try:
+            logger.info(f"계좌 {account_number} 보유종목 수집을 시작합니다.")
+            
+            pages = self.broker_service.iter_account_holdings_pages(broker_name, account_number)
+            count = self._save_holdings_pages(account_number, pages)
+            
+            logger.info(f"계좌 {account_number} 보유종목 {count}개 수집이 완료되었습니다.")
+            return count
+            
+        except Exception as e:
+            logger.error(f"계좌 {account_number} 보유종목 수집 실패: {str(e)}")
+            raise
+    
     def _save_holdings_data(self, account_number: str, holdings: List[Dict[str, Any]]):
         """보유종목 데이터 저장"""
+        self._save_holdings_pages(account_number, [holdings])
+    
+    def _save_holdings_pages(self, account_number: str, pages: Iterable[List[Dict[str, Any]]]) -> int:
+        """보유종목 데이터 페이지 단위 저장 (배치 upsert, 스냅샷에 없는 종목은 삭제)"""
         try:
             session = db_manager.get_session()
             
-            # 계좌 ID 조회
-            account = session.query(Account).filter(
-                Account.account_number == account_number
-            ).first()
-            
-            if not account:
+            account_id = self.bulk_writer.get_account_id(session, account_number)
+            if account_id is None:
                 logger.warning(f"계좌 {account_number}을 찾을 수 없습니다.")
-                return
-            
-            # 기존 보유종목 데이터 삭제
-            session.query(Holding).filter(
-                Holding.account_id == account.id
-            ).delete()
+                return 0
             
-            # 새 보유종목 데이터 저장
-            for holding_data in holdings:
-                new_holding = Holding(
-                    account_id=account.id,
-                    symbol=holding_data.get('symbol', ''),
-                    name=holding_data.get('name', ''),
-                    quantity=holding_data.get('quantity', 0),
-                    average_price=holding_data.get('average_price', 0),
-                    current_price=holding_data.get('current_price', 0),
-                    evaluation_amount=holding_data.get('evaluation_amount', 0),
-                    profit_loss=holding_data.get('profit_loss', 0),
-                    profit_loss_rate=holding_data.get('profit_loss_rate', 0)
-                )
-                session.add(new_holding)
+            count = self.bulk_writer.replace_holdings(session, account_id, pages)
             
             session.commit()
+            data_generation.bump()  # GUI 조회 캐시 무효화
             logger.info(f"계좌 {account_number} 보유종목 데이터 저장 완료")
+            return count
             
         except Exception as e:
             session.rollback()
@@ -173,6 +190,7 @@ class DataCollector:
             
             # 거래내역 데이터 저장
             self._save_transactions_data(account_number, transactions)
+            self.refresh_columnar_store()
             
             logger.info(f"계좌 {account_number} 거래내역 수집이 완료되었습니다.")
             
@@ -210,6 +228,7 @@ class DataCollector:
                 session.add(new_transaction)
             
             session.commit()
+            data_generation.bump()  # GUI 조회 캐시 무효화
             logger.info(f"계좌 {account_number} 거래내역 데이터 저장 완료")
             
         except Exception as e:
@@ -0,0 +1,226 @@
+"""
+종목별 매수 로트(lot) 회계 엔진 (선입선출/이동평균)
+"""
+from datetime import date
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+COST_METHODS = ('average', 'fifo')
+
+# (account_id, symbol, 거래일, 거래구분, 수량, 거래금액, 수수료, 종목명)
+TradeRecord = Tuple[int, str, date, str, float, float, float, Optional[str]]
+
+
+class LotPosition:
+    """계좌-종목 하나의 로트 큐와 누적 실현 손익
+
+    로트는 리스트 배열에 쌓고 head 인덱스로 소진하므로 매도마다 앞쪽 삭제 비용이 없습니다.
+    이동평균법은 로트 하나(수량 가중 평균 단가/취득일)만 유지합니다.
+    """
+
+    __slots__ = (
+        'name', 'lot_quantity', 'lot_cost', 'lot_day', 'head',
+        'buy_quantity', 'sell_quantity', 'buy_amount', 'sell_amount', 'fees',
+        'realized', 'closed_quantity', 'closed_quantity_days', 'unmatched_quantity',
+        'first_buy_date', 'last_sell_date', 'max_realized_rate', 'min_realized_rate'
+    )
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self.lot_quantity: List[float] = []
+        self.lot_cost: List[float] = []  # 주당 취득원가 (매수 수수료 포함)
+        self.lot_day: List[float] = []   # 취득일 (ordinal, 이동평균은 수량 가중 평균)
+        self.head = 0
+
+        self.buy_quantity = 0
+        self.sell_quantity = 0
+        self.buy_amount = 0.0
+        self.sell_amount = 0.0
+        self.fees = 0.0
+        self.realized = 0.0
+        self.closed_quantity = 0
+        self.closed_quantity_days = 0.0
+        self.unmatched_quantity = 0
+        self.first_buy_date: Optional[date] = None
+        self.last_sell_date: Optional[date] = None
+        self.max_realized_rate: Optional[float] = None
+        self.min_realized_rate: Optional[float] = None
+
+    @property
+    def open_quantity(self) -> float:
+        return sum(self.lot_quantity[self.head:])
+
+    @property
+    def open_cost(self) -> float:
+        return sum(q * c for q, c in zip(self.lot_quantity[self.head:], self.lot_cost[self.head:]))
+
+    def open_quantity_days(self, as_of: date) -> float:
+        """보유 중인 로트의 수량 x 보유일 합계"""
+        today = as_of.toordinal()
+        return sum(q * (today - d) for q, d in zip(self.lot_quantity[self.head:], self.lot_day[self.head:]))
+
+
+class LotEngine:
+    """거래내역으로 종목별 실현/평가 손익과 실제 보유기간 계산
+
+    거래는 체결 순서(거래일 순)로 한 번만 순회하며, 계좌-종목별 로트 큐를 딕셔너리로 찾아
+    전체 거래 테이블을 거래 수에 비례하는 시간에 처리합니다.
+
+    - average: 이동평균법 (매도 시 평균 단가로 원가 차감, 국내 증권사 잔고 표시 방식)
+    - fifo: 선입선출법 (먼저 매수한 로트부터 소진)
+
+    매수 수수료는 취득원가에, 매도 수수료는 매도대금 차감으로 반영합니다.
+    보유 수량보다 많이 매도한 수량(수집 이전 매수분 등)은 원가를 알 수 없어 실현 손익에서 제외합니다.
+    """
+
+    def __init__(self, method: str = 'average'):
+        if method not in COST_METHODS:
+            raise ValueError(f"지원하지 않는 원가 계산 방식: {method} (지원: {', '.join(COST_METHODS)})")
+        self.method = method
+
+    def process(self, trades: Iterable[TradeRecord]) -> Dict[Tuple[int, str], LotPosition]:
+        """거래일 순으로 정렬된 거래 목록 처리
+
+        Returns:
+            (account_id, symbol)별 LotPosition
+        """
+        positions: Dict[Tuple[int, str], LotPosition] = {}
+        fifo = self.method == 'fifo'
+
+        for account_id, symbol, trade_date, trade_type, quantity, amount, fee, name in trades:
+            key = (account_id, symbol)
+            position = positions.get(key)
+            if position is None:
+                position = positions[key] = LotPosition(name)
+            elif position.name is None:
+                position.name = name
+
+            quantity = quantity or 0
+            amount = amount or 0.0
+            fee = fee or 0.0
+            if quantity <= 0:
+                continue
+
+            if trade_type == 'BUY':
+                self._buy(position, trade_date, quantity, amount, fee, fifo)
+            elif trade_type == 'SELL':
+                self._sell(position, trade_date, quantity, amount, fee)
+
+        return positions
+
+    @staticmethod
+    def _buy(position: LotPosition, trade_date: date, quantity: float, amount: float, fee: float, fifo: bool):
+        position.buy_quantity += quantity
+        position.buy_amount += amount
+        position.fees += fee
+        if position.first_buy_date is None or trade_date < position.first_buy_date:
+            position.first_buy_date = trade_date
+
+        cost = (amount + fee) / quantity
+        day = trade_date.toordinal()
+        if fifo or position.head >= len(position.lot_quantity):
+            position.lot_quantity.append(quantity)
+            position.lot_cost.append(cost)
+            position.lot_day.append(day)
+            return
+
+        # 이동평균: 마지막(유일한) 로트에 합산
+        held = position.lot_quantity[-1]
+        total = held + quantity
+        position.lot_cost[-1] = (held * position.lot_cost[-1] + quantity * cost) / total
+        position.lot_day[-1] = (held * position.lot_day[-1] + quantity * day) / total
+        position.lot_quantity[-1] = total
+
+    @staticmethod
+    def _sell(position: LotPosition, trade_date: date, quantity: float, amount: float, fee: float):
+        position.sell_quantity += quantity
+        position.sell_amount += amount
+        position.fees += fee
+        if position.last_sell_date is None or trade_date > position.last_sell_date:
+            position.last_sell_date = trade_date
+
+        day = trade_date.toordinal()
+        remaining = quantity
+        matched_cost = 0.0
+        while remaining > 0 and position.head < len(position.lot_quantity):
+            lot = position.head
+            take = min(remaining, position.lot_quantity[lot])
+            matched_cost += take * position.lot_cost[lot]
+            position.closed_quantity_days += take * (day - position.lot_day[lot])
+            position.lot_quantity[lot] -= take
+            remaining -= take
+            if position.lot_quantity[lot] <= 0:
+                position.head += 1
+
+        # 소진된 로트가 절반을 넘으면 배열 압축
+        if position.head > 32 and position.head * 2 > len(position.lot_quantity):
+            del position.lot_quantity[:position.head]
+            del position.lot_cost[:position.head]
+            del position.lot_day[:position.head]
+            position.head = 0
+
+        matched = quantity - remaining
+        position.unmatched_quantity += remaining
+        if matched <= 0:
+            return
+
+        proceeds = (amount - fee) * matched / quantity
+        profit = proceeds - matched_cost
+        position.realized += profit
+        position.closed_quantity += matched
+
+        if matched_cost > 0:
+            rate = profit / matched_cost * 100
+            position.max_realized_rate = rate if position.max_realized_rate is None else max(position.max_realized_rate, rate)
+            position.min_realized_rate = rate if position.min_realized_rate is None else min(position.min_realized_rate, rate)
+
+    @staticmethod
+    def to_performance(position: LotPosition, market_value: Optional[float] = None,
+                       as_of: Optional[date] = None) -> Dict[str, Any]:
+        """StockPerformance 컬럼 값으로 변환
+
+        Args:
+            position: 로트 처리 결과
+            market_value: 현재 평가금액 (보유종목이 없으면 None -> 잔여 원가로 평가)
+            as_of: 미청산 로트 보유일 기준일 (기본: 오늘)
+        """
+        as_of = as_of or date.today()
+        open_quantity = position.open_quantity
+        open_cost = position.open_cost
+        current_value = market_value if market_value is not None else open_cost
+
+        unrealized = current_value - open_cost if open_quantity > 0 else 0.0
+        total_profit_loss = position.realized + unrealized
+        profit_loss_rate = total_profit_loss / position.buy_amount * 100 if position.buy_amount > 0 else 0.0
+
+        # 실제 보유기간: 청산/보유 로트의 수량 가중 평균
+        quantity = position.closed_quantity + open_quantity
+        quantity_days = position.closed_quantity_days + position.open_quantity_days(as_of)
+        holding_days = int(round(quantity_days / quantity)) if quantity > 0 else 0
+
+        rates = [rate for rate in (position.max_realized_rate, position.min_realized_rate) if rate is not None]
+        if open_quantity > 0 and open_cost > 0:
+            rates.append(unrealized / open_cost * 100)
+
+        return {
+            'total_investment': position.buy_amount,
+            'current_value': current_value,
+            'total_profit_loss': total_profit_loss,
+            'profit_loss_rate': profit_loss_rate,
+            'realized_profit_loss': position.realized,
+            'unrealized_profit_loss': unrealized,
+            'total_buy_quantity': position.buy_quantity,
+            'total_sell_quantity': position.sell_quantity,
+            'avg_buy_price': position.buy_amount / position.buy_quantity if position.buy_quantity > 0 else 0,
+            'avg_sell_price': position.sell_amount / position.sell_quantity if position.sell_quantity > 0 else 0,
+            'first_buy_date': position.first_buy_date,
+            'last_sell_date': position.last_sell_date,
+            'holding_days': holding_days,
+            'max_profit_rate': max([0.0] + rates),
+            'max_loss_rate': min([0.0] + rates),
+            'avg_daily_return': profit_loss_rate / holding_days if holding_days > 0 else 0,
+            'volatility': 0.0,  # 추후 구현
+            'beta': 0.0  # 추후 구현
+        }
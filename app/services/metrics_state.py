@@ -0,0 +1,219 @@
+"""
+계좌별 누적(스트리밍) 지표 상태 관리
+"""
+import json
+import math
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.aggregation import MetricsState
+from app.models.balance import DailyBalance
+from app.services.bulk_writer import BulkWriter
+from app.services.risk_engine import Z_95, Z_99
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STATE_FIELDS = [
+    'first_balance_date', 'last_balance_date', 'first_balance', 'last_balance',
+    'return_count', 'return_mean', 'return_m2', 'downside_sum_sq', 'ewma_variance',
+    'peak_balance', 'current_drawdown', 'max_drawdown', 'drawdown_duration', 'max_drawdown_duration'
+]
+
+
+class MetricsStateUpdater:
+    """일별 잔고가 저장될 때마다 지표 상태를 하루씩 갱신 (O(1))
+
+    평균/분산은 Welford 방식, 변동성 추정은 EWMA(RiskMetrics λ=0.94)를 사용하며,
+    고점과 낙폭(기간 포함)을 함께 누적합니다.
+    0 이하 잔고는 RiskMetricsEngine과 같이 결측으로 보아 수익률에서 빼고, 낙폭은 직전 유효 잔고로 계산합니다.
+    같은 날 재수집하면 직전 상태로 되돌린 뒤 다시 반영하고,
+    과거 날짜가 들어오거나 상태가 없으면 잔고 이력으로 한 번 재구성합니다.
+    """
+
+    def __init__(self, risk_free_rate: float = 0.0, ewma_lambda: float = 0.94,
+                 trading_days: int = 252, bulk_writer: Optional[BulkWriter] = None):
+        self.risk_free_rate = risk_free_rate
+        self.ewma_lambda = ewma_lambda
+        self.trading_days = trading_days
+        self.bulk_writer = bulk_writer or BulkWriter()
+
+    @staticmethod
+    def empty_state() -> Dict[str, Any]:
+        """초기 상태"""
+        return {
+            'first_balance_date': None, 'last_balance_date': None,
+            'first_balance': 0.0, 'last_balance': 0.0,
+            'return_count': 0, 'return_mean': 0.0, 'return_m2': 0.0,
+            'downside_sum_sq': 0.0, 'ewma_variance': 0.0,
+            'peak_balance': 0.0, 'current_drawdown': 0.0, 'max_drawdown': 0.0,
+            'drawdown_duration': 0, 'max_drawdown_duration': 0
+        }
+
+    def advance_state(self, state: Dict[str, Any], balance_date: date, balance: float) -> Dict[str, Any]:
+        """다음 날 잔고를 반영한 새 상태 반환"""
+        state = dict(state)
+        balance = float(balance or 0)
+
+        if state['last_balance_date'] is None:
+            state['first_balance_date'] = balance_date
+            state['first_balance'] = balance
+        elif state['last_balance'] > 0 and balance > 0:
+            daily_return = balance / state['last_balance'] - 1
+
+            # Welford 평균/분산
+            count = state['return_count'] + 1
+            delta = daily_return - state['return_mean']
+            mean = state['return_mean'] + delta / count
+            state['return_m2'] += delta * (daily_return - mean)
+            state['return_mean'] = mean
+            state['return_count'] = count
+
+            # 하방 편차
+            downside = min(daily_return - self.risk_free_rate / self.trading_days, 0.0)
+            state['downside_sum_sq'] += downside ** 2
+
+            # EWMA 분산
+            if count == 1:
+                state['ewma_variance'] = daily_return ** 2
+            else:
+                state['ewma_variance'] = (self.ewma_lambda * state['ewma_variance']
+                                          + (1 - self.ewma_lambda) * daily_return ** 2)
+
+        # 고점/낙폭 (0 이하 잔고는 직전 유효 잔고가 이어진 것으로 처리)
+        peak = state['peak_balance']
+        if balance > 0:
+            effective = balance
+        elif peak > 0:
+            effective = peak * (1 - state['current_drawdown'])
+        else:
+            effective = None
+
+        if effective is None:
+            pass
+        elif effective >= peak:
+            state['peak_balance'] = effective
+            state['current_drawdown'] = 0.0
+            state['drawdown_duration'] = 0
+        else:
+            state['current_drawdown'] = 1 - effective / peak
+            state['drawdown_duration'] += 1
+            state['max_drawdown'] = max(state['max_drawdown'], state['current_drawdown'])
+            state['max_drawdown_duration'] = max(state['max_drawdown_duration'], state['drawdown_duration'])
+
+        state['last_balance_date'] = balance_date
+        state['last_balance'] = balance
+        return state
+
+    def build_state(self, balances: Iterable[Tuple[date, float]]) -> Dict[str, Any]:
+        """잔고 이력 전체로 상태 구성"""
+        state = self.empty_state()
+        for balance_date, balance in balances:
+            state = self.advance_state(state, balance_date, balance)
+        return state
+
+    def to_metrics(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """상태에서 지표 계산 (단위는 RiskMetricsEngine과 동일: % 값, 손실은 양수)
+
+        수익률이 2개 미만이면 RiskMetricsEngine과 같이 모든 지표를 0으로 반환합니다.
+        VaR는 누적 평균/표준편차로 계산한 모수적 VaR(parametric_var_1d_*)만 제공합니다.
+        """
+        count = state['return_count']
+        annual_factor = math.sqrt(self.trading_days)
+        rf_daily = self.risk_free_rate / self.trading_days
+
+        std = math.sqrt(state['return_m2'] / (count - 1)) if count > 1 else 0.0
+        downside_dev = math.sqrt(state['downside_sum_sq'] / count) if count > 0 else 0.0
+        mean = state['return_mean']
+        excess = mean - rf_daily
+
+        metrics = {
+            'observations': count,
+            'mean_return': mean * 100,
+            'daily_volatility': std * 100,
+            'annual_volatility': std * annual_factor * 100,
+            'ewma_volatility': math.sqrt(state['ewma_variance']) * annual_factor * 100,
+            'downside_deviation': downside_dev * annual_factor * 100,
+            'sharpe_ratio': excess / std * annual_factor if std > 0 else 0.0,
+            'sortino_ratio': excess / downside_dev * annual_factor if downside_dev > 0 else 0.0,
+            'current_drawdown': state['current_drawdown'] * 100,
+            'max_drawdown': state['max_drawdown'] * 100,
+            'max_drawdown_duration': state['max_drawdown_duration'],
+            'parametric_var_1d_95': -(mean - Z_95 * std) * 100,
+            'parametric_var_1d_99': -(mean - Z_99 * std) * 100
+        }
+        if count < 2:
+            metrics = {key: 0 if key != 'observations' else count for key in metrics}
+        return metrics
+
+    def load_state(self, session: Session, account_id: int) -> Optional[Dict[str, Any]]:
+        """저장된 상태 조회 (없으면 None)"""
+        columns = [getattr(MetricsState, field) for field in STATE_FIELDS]
+        row = session.execute(
+            select(*columns, MetricsState.previous_state).where(MetricsState.account_id == account_id)
+        ).first()
+        if row is None:
+            return None
+
+        state = dict(zip(STATE_FIELDS, row[:-1]))
+        state['previous_state'] = row[-1]
+        return state
+
+    def _save_state(self, session: Session, account_id: int, state: Dict[str, Any],
+                    previous: Optional[Dict[str, Any]]):
+        """상태 upsert"""
+        row = {field: state[field] for field in STATE_FIELDS}
+        row['account_id'] = account_id
+        row['previous_state'] = json.dumps(self._serialize(previous)) if previous else None
+        row['updated_at'] = datetime.utcnow()
+        self.bulk_writer.upsert_rows(session, MetricsState.__table__, 'uq_metrics_state_account', [row])
+
+    @staticmethod
+    def _serialize(state: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value.isoformat() if isinstance(value, date) else value
+                for key, value in state.items() if key in STATE_FIELDS}
+
+    @staticmethod
+    def _deserialize(data: str) -> Dict[str, Any]:
+        state = json.loads(data)
+        for key in ('first_balance_date', 'last_balance_date'):
+            if state.get(key):
+                state[key] = date.fromisoformat(state[key])
+        return state
+
+    def rebuild(self, session: Session, account_id: int) -> Dict[str, Any]:
+        """잔고 이력 전체로 상태 재구성 후 저장"""
+        rows = session.execute(
+            select(DailyBalance.balance_date, DailyBalance.total_balance)
+            .where(DailyBalance.account_id == account_id)
+            .order_by(DailyBalance.balance_date)
+        ).all()
+
+        previous = self.build_state(rows[:-1])
+        state = self.advance_state(previous, *rows[-1]) if rows else previous
+        self._save_state(session, account_id, state, previous)
+        logger.info(f"계좌 {account_id} 지표 상태 재구성 ({len(rows)}일)")
+        return state
+
+    def advance(self, session: Session, account_id: int, balance_date: date, balance: float) -> Dict[str, Any]:
+        """일별 잔고 저장 시 상태 갱신 (호출 측에서 commit)"""
+        stored = self.load_state(session, account_id)
+
+        if stored is None:
+            return self.rebuild(session, account_id)
+
+        last_date = stored['last_balance_date']
+        if last_date is not None and balance_date < last_date:
+            # 과거 날짜 보정은 이후 누적값 전체에 영향
+            return self.rebuild(session, account_id)
+
+        if last_date == balance_date:
+            # 같은 날 재수집: 직전 상태에 새 잔고를 다시 반영
+            base = self._deserialize(stored['previous_state']) if stored['previous_state'] else self.empty_state()
+        else:
+            base = {field: stored[field] for field in STATE_FIELDS}
+
+        state = self.advance_state(base, balance_date, balance)
+        self._save_state(session, account_id, state, base)
+        return state
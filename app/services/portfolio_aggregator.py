@@ -0,0 +1,141 @@
+"""
+다중 계좌 통합 포트폴리오 집계
+"""
+from datetime import date
+from typing import List, Dict, Any, Optional, Sequence
+import numpy as np
+import pandas as pd
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from app.models.balance import DailyBalance
+from app.models.holding import Holding
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BALANCE_AMOUNT_COLUMNS = [
+    'total_balance', 'cash_balance', 'stock_balance', 'evaluation_amount', 'profit_loss'
+]
+
+
+def _profit_loss_rate(profit_loss, total_balance):
+    """합산 손익률 (%) = 손익 합계 / (총평가금액 합계 - 손익 합계)
+
+    단일 계좌 수집 시(KISBroker._parse_balance)와 같은 기준이므로 계좌 하나만 선택하면 저장된 손익률과 같습니다.
+    """
+    cost = np.asarray(total_balance, dtype=float) - np.asarray(profit_loss, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(cost > 0, np.asarray(profit_loss, dtype=float) / cost * 100, 0.0)
+    return rate
+
+
+class PortfolioAggregator:
+    """선택한 계좌 묶음의 잔고/보유종목/손익을 하나의 포트폴리오로 합산
+
+    계좌별로 반복 조회하지 않고 조회마다 GROUP BY 쿼리 한 번 또는 pivot 한 번으로 계산하므로
+    선택한 계좌 수와 무관하게 쿼리 수가 일정합니다.
+    손익률은 계좌별 손익률의 평균이 아니라 손익 합계 / 매입금액 합계로 다시 계산합니다.
+    """
+
+    def latest_balance(self, session: Session, account_ids: Sequence[int]) -> Optional[Dict[str, Any]]:
+        """계좌별 최신 잔고 합계"""
+        latest = (
+            select(DailyBalance.account_id, func.max(DailyBalance.balance_date).label('balance_date'))
+            .where(DailyBalance.account_id.in_(account_ids))
+            .group_by(DailyBalance.account_id)
+            .subquery()
+        )
+        row = session.execute(
+            select(
+                func.max(DailyBalance.balance_date),
+                func.count(DailyBalance.account_id),
+                *[func.coalesce(func.sum(getattr(DailyBalance, column)), 0.0) for column in BALANCE_AMOUNT_COLUMNS]
+            ).join(
+                latest,
+                (DailyBalance.account_id == latest.c.account_id) & (DailyBalance.balance_date == latest.c.balance_date)
+            )
+        ).one()
+
+        balance_date, account_count = row[0], row[1]
+        if not account_count:
+            return None
+
+        result = {'balance_date': balance_date.isoformat(), 'account_count': account_count}
+        result.update({column: float(value) for column, value in zip(BALANCE_AMOUNT_COLUMNS, row[2:])})
+        result['profit_loss_rate'] = float(_profit_loss_rate(result['profit_loss'], result['total_balance']))
+        return result
+
+    def balance_history(self, session: Session, account_ids: Sequence[int],
+                        start_date: date, end_date: date) -> pd.DataFrame:
+        """일자별 합산 잔고 이력 (날짜 오름차순)
+
+        계좌마다 수집일이 다를 수 있으므로 (계좌 x 날짜) 행렬로 펼친 뒤 직전 값으로 채워 합산합니다.
+        기간 중 처음 수집되기 전 날짜는 해당 계좌를 0으로 취급합니다.
+        """
+        result = session.execute(
+            select(DailyBalance.account_id, DailyBalance.balance_date,
+                   *[getattr(DailyBalance, column) for column in BALANCE_AMOUNT_COLUMNS])
+            .where(
+                DailyBalance.account_id.in_(account_ids),
+                DailyBalance.balance_date >= start_date,
+                DailyBalance.balance_date <= end_date
+            )
+        )
+        frame = pd.DataFrame(result.all(), columns=list(result.keys()))
+        if frame.empty:
+            return pd.DataFrame(columns=['balance_date'] + BALANCE_AMOUNT_COLUMNS + ['profit_loss_rate'])
+
+        frame['balance_date'] = pd.to_datetime(frame['balance_date'])
+        wide = frame.pivot(index='balance_date', columns='account_id', values=BALANCE_AMOUNT_COLUMNS).sort_index()
+        wide = wide.ffill().fillna(0.0)
+
+        combined = wide.T.groupby(level=0).sum().T[BALANCE_AMOUNT_COLUMNS]
+        combined['profit_loss_rate'] = _profit_loss_rate(combined['profit_loss'], combined['total_balance'])
+        return combined.reset_index().rename_axis(columns=None)
+
+    def holdings(self, session: Session, account_ids: Sequence[int]) -> List[Dict[str, Any]]:
+        """종목별 합산 보유종목 (평가금액 내림차순)
+
+        수량/매입금액/평가금액/손익은 합산하고 평균단가는 수량 가중 평균(매입금액 합계 / 수량 합계)입니다.
+        """
+        quantity = func.sum(Holding.quantity)
+        cost = func.sum(Holding.quantity * Holding.average_price)
+        evaluation = func.sum(Holding.evaluation_amount)
+        rows = session.execute(
+            select(
+                Holding.symbol,
+                func.max(Holding.name),
+                quantity,
+                cost,
+                func.max(Holding.current_price),
+                evaluation,
+                func.sum(Holding.profit_loss),
+                func.count(Holding.account_id),
+                func.max(Holding.last_updated),
+                func.max(Holding.updated_at)
+            )
+            .where(Holding.account_id.in_(account_ids), Holding.quantity > 0)
+            .group_by(Holding.symbol)
+            .order_by(evaluation.desc())
+        ).all()
+
+        result = []
+        for symbol, name, qty, buy_amount, current_price, evaluation_amount, profit_loss, account_count, \
+                last_updated, updated_at in rows:
+            qty = qty or 0
+            buy_amount = float(buy_amount or 0)
+            profit_loss = float(profit_loss or 0)
+            result.append({
+                'symbol': symbol or '',
+                'name': name or '',
+                'quantity': qty,
+                'average_price': buy_amount / qty if qty > 0 else 0.0,
+                'current_price': float(current_price or 0),
+                'evaluation_amount': float(evaluation_amount or 0),
+                'profit_loss': profit_loss,
+                'profit_loss_rate': profit_loss / buy_amount * 100 if buy_amount > 0 else 0.0,
+                'account_count': account_count,
+                'last_updated': last_updated.isoformat() if last_updated else None,
+                'updated_at': updated_at.isoformat() if updated_at else None
+            })
+        return result
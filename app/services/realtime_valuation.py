@@ -0,0 +1,263 @@
+"""
+실시간 체결가 기반 보유종목/잔고 증분 재평가
+"""
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
+from sqlalchemy import select, update, func, bindparam
+from sqlalchemy.orm import Session
+from app.models.balance import DailyBalance
+from app.models.holding import Holding
+from app.utils.data_generation import data_generation
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PriceTable:
+    """종목별 최신 체결가 (메모리, 스레드 안전)"""
+
+    def __init__(self):
+        self._prices: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, tick: Dict[str, Any]) -> bool:
+        """체결가 반영 (가격이 바뀌었으면 True)"""
+        symbol = tick['symbol']
+        with self._lock:
+            previous = self._prices.get(symbol)
+            self._prices[symbol] = dict(tick)
+            return previous is None or previous['price'] != tick['price']
+
+    def get(self, symbol: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            tick = self._prices.get(symbol)
+            return dict(tick) if tick else None
+
+    def get_price(self, symbol: str) -> Optional[float]:
+        with self._lock:
+            tick = self._prices.get(symbol)
+            return tick['price'] if tick else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """전체 종목 최신 체결가"""
+        with self._lock:
+            return {symbol: dict(tick) for symbol, tick in self._prices.items()}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+
+class RealtimeValuation:
+    """보유종목과 계좌 잔고를 체결가가 들어올 때마다 증분 재평가
+
+    load()로 DB의 현재 보유종목과 계좌별 최신 잔고를 한 번 읽어 두고, 체결가가 바뀐 종목은
+    그 종목을 보유한 계좌만 (수량 x 가격 변화)만큼 평가금액/손익/총평가금액을 조정합니다.
+    계좌 전체를 다시 합산하지 않으므로 체결 한 건의 처리 비용은 해당 종목 보유 계좌 수에 비례합니다.
+
+    재평가 결과는 메모리에 유지되며, flush()를 호출하면 바뀐 보유종목만 holdings 테이블에 반영합니다.
+    (일별 잔고는 수집 시 저장하는 스냅샷이므로 갱신하지 않습니다.)
+    flush()는 (계좌, 종목)과 로드 시점의 수량/평균단가가 그대로인 행만 갱신하므로, 그 사이 수집기가
+    삭제하거나 수량을 바꾼 행은 덮어쓰지 않고 건너뛴 뒤 보유종목을 다시 로드합니다.
+    별도 프로세스(scripts/stream_prices.py)에서 실행하면 GUI는 조회 캐시 TTL이 지난 뒤에 반영된 값을 읽습니다.
+    """
+
+    def __init__(self, price_table: Optional[PriceTable] = None):
+        self.price_table = price_table or PriceTable()
+        self.positions: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self.balances: Dict[int, Dict[str, Any]] = {}
+        self._accounts_by_symbol: Dict[str, List[int]] = {}
+        self._dirty: Set[Tuple[int, str]] = set()
+        self._account_ids: Optional[List[int]] = None
+        self._lock = threading.Lock()
+
+    # 초기 로드 ------------------------------------------------------------------
+
+    def load(self, session: Session, account_ids: Optional[Sequence[int]] = None):
+        """보유종목과 계좌별 최신 잔고 로드 (쿼리 2회)"""
+        holding_query = select(
+            Holding.id, Holding.account_id, Holding.symbol, Holding.name, Holding.quantity,
+            Holding.average_price, Holding.current_price, Holding.evaluation_amount, Holding.profit_loss
+        ).where(Holding.quantity > 0)
+        if account_ids is not None:
+            holding_query = holding_query.where(Holding.account_id.in_(account_ids))
+
+        latest = select(DailyBalance.account_id, func.max(DailyBalance.balance_date).label('balance_date')) \
+            .group_by(DailyBalance.account_id)
+        if account_ids is not None:
+            latest = latest.where(DailyBalance.account_id.in_(account_ids))
+        latest = latest.subquery()
+        balance_query = select(DailyBalance).join(
+            latest,
+            (DailyBalance.account_id == latest.c.account_id) & (DailyBalance.balance_date == latest.c.balance_date)
+        )
+
+        positions: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        accounts_by_symbol: Dict[str, List[int]] = {}
+        for row in session.execute(holding_query):
+            quantity = row.quantity or 0
+            average_price = float(row.average_price or 0)
+            positions.setdefault(row.account_id, {})[row.symbol] = {
+                'id': row.id,
+                'symbol': row.symbol,
+                'name': row.name,
+                'quantity': quantity,
+                'average_price': average_price,
+                'buy_amount': quantity * average_price,
+                'current_price': float(row.current_price or 0),
+                'evaluation_amount': float(row.evaluation_amount or 0),
+                'profit_loss': float(row.profit_loss or 0)
+            }
+            accounts_by_symbol.setdefault(row.symbol, []).append(row.account_id)
+
+        balances = {}
+        for balance in session.execute(balance_query).scalars():
+            balances[balance.account_id] = {
+                'account_id': balance.account_id,
+                'balance_date': balance.balance_date.isoformat(),
+                'cash_balance': float(balance.cash_balance or 0),
+                'stock_balance': float(balance.stock_balance or 0),
+                'total_balance': float(balance.total_balance or 0),
+                'evaluation_amount': float(balance.evaluation_amount or 0),
+                'profit_loss': float(balance.profit_loss or 0),
+                'profit_loss_rate': float(balance.profit_loss_rate or 0)
+            }
+
+        with self._lock:
+            self.positions = positions
+            self.balances = balances
+            self._accounts_by_symbol = accounts_by_symbol
+            self._account_ids = list(account_ids) if account_ids is not None else None
+            self._dirty.clear()
+
+        # 로드 전에 받은 체결가 반영
+        for symbol in accounts_by_symbol:
+            price = self.price_table.get_price(symbol)
+            if price is not None:
+                self.apply_price(symbol, price)
+
+        logger.info(f"실시간 재평가 대상: 계좌 {len(positions)}개, 종목 {len(accounts_by_symbol)}개")
+
+    def symbols(self) -> List[str]:
+        """보유 종목 목록 (보유 계좌 수가 많은 순)"""
+        return sorted(self._accounts_by_symbol, key=lambda symbol: -len(self._accounts_by_symbol[symbol]))
+
+    # 증분 재평가 ----------------------------------------------------------------
+
+    def on_price(self, tick: Dict[str, Any]) -> List[int]:
+        """체결가 수신 콜백 (KISRealtimeClient on_price), 재평가된 계좌 ID 반환"""
+        if not self.price_table.update(tick):
+            return []
+        return self.apply_price(tick['symbol'], tick['price'])
+
+    def apply_price(self, symbol: str, price: float) -> List[int]:
+        """종목 가격 변화를 보유 계좌에 반영"""
+        price = float(price)
+        with self._lock:
+            account_ids = self._accounts_by_symbol.get(symbol, [])
+            for account_id in account_ids:
+                position = self.positions[account_id][symbol]
+                evaluation_amount = position['quantity'] * price
+                delta = evaluation_amount - position['evaluation_amount']
+
+                position['current_price'] = price
+                position['evaluation_amount'] = evaluation_amount
+                position['profit_loss'] = evaluation_amount - position['buy_amount']
+                self._dirty.add((account_id, symbol))
+
+                balance = self.balances.get(account_id)
+                if balance is not None and delta:
+                    balance['evaluation_amount'] += delta
+                    balance['stock_balance'] += delta
+                    balance['total_balance'] += delta
+                    balance['profit_loss'] += delta
+                    # 수집 시와 같은 기준 (평가손익 / (총평가금액 - 평가손익))
+                    cost = balance['total_balance'] - balance['profit_loss']
+                    balance['profit_loss_rate'] = balance['profit_loss'] / cost * 100 if cost > 0 else 0.0
+            return list(account_ids)
+
+    # 조회 -----------------------------------------------------------------------
+
+    @staticmethod
+    def _holding_view(position: Dict[str, Any]) -> Dict[str, Any]:
+        buy_amount = position['buy_amount']
+        return {
+            'symbol': position['symbol'],
+            'name': position['name'],
+            'quantity': position['quantity'],
+            'average_price': position['average_price'],
+            'current_price': position['current_price'],
+            'evaluation_amount': position['evaluation_amount'],
+            'profit_loss': position['profit_loss'],
+            'profit_loss_rate': position['profit_loss'] / buy_amount * 100 if buy_amount > 0 else 0.0
+        }
+
+    def get_holdings(self, account_id: int) -> List[Dict[str, Any]]:
+        """계좌 보유종목 (실시간 평가, 평가금액 내림차순)"""
+        with self._lock:
+            holdings = [self._holding_view(p) for p in self.positions.get(account_id, {}).values()]
+        return sorted(holdings, key=lambda h: h['evaluation_amount'], reverse=True)
+
+    def get_balance(self, account_id: int) -> Optional[Dict[str, Any]]:
+        """계좌 잔고 (실시간 평가)"""
+        with self._lock:
+            balance = self.balances.get(account_id)
+            return dict(balance) if balance else None
+
+    # 저장 -----------------------------------------------------------------------
+
+    def flush(self, session: Session) -> int:
+        """재평가된 보유종목만 holdings 테이블에 반영 (갱신 건수 반환)
+
+        로드 이후 수집기가 삭제했거나 수량/평균단가를 바꾼 행은 건너뛰고, 이 경우 보유종목과
+        잔고를 다시 로드합니다 (다시 로드한 값에 최신 체결가를 반영해 다음 flush에서 저장).
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            now = datetime.utcnow()
+            rows = []
+            for account_id, symbol in dirty:
+                position = self.positions[account_id][symbol]
+                view = self._holding_view(position)
+                rows.append({
+                    'b_account_id': account_id,
+                    'b_symbol': symbol,
+                    'b_quantity': position['quantity'],
+                    'b_average_price': position['average_price'],
+                    'current_price': view['current_price'],
+                    'evaluation_amount': view['evaluation_amount'],
+                    'profit_loss': view['profit_loss'],
+                    'profit_loss_rate': view['profit_loss_rate'],
+                    'last_updated': now
+                })
+
+        if not rows:
+            return 0
+        table = Holding.__table__
+        statement = update(table).where(
+            table.c.account_id == bindparam('b_account_id'),
+            table.c.symbol == bindparam('b_symbol'),
+            table.c.quantity == bindparam('b_quantity'),
+            table.c.average_price == bindparam('b_average_price')
+        )
+        try:
+            updated = session.execute(statement, rows).rowcount
+            session.commit()
+            if updated < 0:  # 드라이버가 executemany 건수를 알려주지 않는 경우
+                updated = len(rows)
+        except Exception as e:
+            session.rollback()
+            with self._lock:
+                self._dirty.update(dirty)
+            logger.error(f"실시간 재평가 저장 실패: {str(e)}")
+            raise
+
+        if 0 <= updated < len(rows):
+            logger.info(f"실시간 재평가 대상 중 {len(rows) - updated}건이 수집 후 변경되어 보유종목을 다시 로드합니다.")
+            self.load(session, self._account_ids)
+
+        # 같은 프로세스의 조회 캐시 무효화 (세대 번호는 프로세스 전역이므로
+        # 다른 프로세스의 GUI에는 조회 캐시 TTL이 지난 뒤 반영됨)
+        data_generation.bump()
+        logger.debug(f"실시간 재평가 보유종목 {updated}건 저장")
+        return updated
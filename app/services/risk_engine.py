@@ -0,0 +1,199 @@
+"""
+위험 지표 계산 엔진 (NumPy 벡터화)
+"""
+from datetime import date
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.balance import DailyBalance
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 정규분포 단측 분위수 (모수적 VaR)
+Z_95 = 1.6448536269514722
+Z_99 = 2.3263478740408408
+
+
+class RiskMetricsEngine:
+    """잔고 시계열 기반 위험 지표 계산
+
+    잔고는 (계좌 수, 일수) 행렬로 한 번에 계산하며, 계좌별 데이터가 없는 날짜는 NaN으로 둡니다.
+    1차원 배열을 넣으면 계좌 하나로 계산하여 스칼라 값을 반환합니다.
+
+    단위: 수익률/변동성/VaR/낙폭은 % 값이며, VaR와 최대낙폭은 손실 크기(양수)로 표시합니다.
+    """
+
+    def __init__(self, risk_free_rate: float = 0.0, trading_days: int = 252,
+                 rolling_window: int = 20, month_days: int = 21):
+        self.risk_free_rate = risk_free_rate  # 연 무위험 수익률 (예: 0.035)
+        self.trading_days = trading_days
+        self.rolling_window = rolling_window
+        self.month_days = month_days
+
+    @staticmethod
+    def load_balance_matrix(session: Session, account_ids: Optional[List[int]] = None,
+                            start_date: Optional[date] = None,
+                            end_date: Optional[date] = None) -> Tuple[List[int], List[date], np.ndarray]:
+        """일별 총자산을 (계좌 수, 일수) 행렬로 로드 (ORM 객체 생성 없이 한 번의 쿼리)
+
+        Returns:
+            (계좌 ID 목록, 날짜 목록, 총자산 행렬)
+        """
+        query = select(DailyBalance.account_id, DailyBalance.balance_date, DailyBalance.total_balance)
+        if account_ids is not None:
+            query = query.where(DailyBalance.account_id.in_(account_ids))
+        if start_date:
+            query = query.where(DailyBalance.balance_date >= start_date)
+        if end_date:
+            query = query.where(DailyBalance.balance_date <= end_date)
+
+        rows = session.execute(query).all()
+        if not rows:
+            return [], [], np.empty((0, 0))
+
+        row_accounts = np.array([row[0] for row in rows])
+        row_dates = np.array([row[1].toordinal() for row in rows])
+        values = np.array([row[2] if row[2] is not None else np.nan for row in rows], dtype=float)
+
+        accounts, account_index = np.unique(row_accounts, return_inverse=True)
+        dates, date_index = np.unique(row_dates, return_inverse=True)
+
+        matrix = np.full((len(accounts), len(dates)), np.nan)
+        matrix[account_index, date_index] = values
+        return accounts.tolist(), [date.fromordinal(int(d)) for d in dates], matrix
+
+    @staticmethod
+    def _forward_fill(values: np.ndarray) -> np.ndarray:
+        """행별 NaN을 직전 값으로 채움"""
+        mask = np.isnan(values)
+        index = np.where(~mask, np.arange(values.shape[1]), 0)
+        np.maximum.accumulate(index, axis=1, out=index)
+        filled = values[np.arange(values.shape[0])[:, None], index]
+        return filled
+
+    @staticmethod
+    def daily_returns(balances: np.ndarray) -> np.ndarray:
+        """일간 수익률 (0 이하 잔고나 누락일은 NaN)"""
+        balances = np.where(balances > 0, balances, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return balances[:, 1:] / balances[:, :-1] - 1
+
+    def rolling_volatility(self, returns: np.ndarray, window: Optional[int] = None) -> np.ndarray:
+        """이동 변동성 (누적합 기반, 창 크기만큼 채워지기 전은 NaN)"""
+        window = window or self.rolling_window
+        returns = np.atleast_2d(returns)
+        result = np.full(returns.shape, np.nan)
+        if returns.shape[1] < window:
+            return result
+
+        valid = ~np.isnan(returns)
+        values = np.where(valid, returns, 0.0)
+        zeros = np.zeros((returns.shape[0], 1))
+        count = np.concatenate([zeros, np.cumsum(valid, axis=1)], axis=1)
+        total = np.concatenate([zeros, np.cumsum(values, axis=1)], axis=1)
+        total_sq = np.concatenate([zeros, np.cumsum(values ** 2, axis=1)], axis=1)
+
+        n = count[:, window:] - count[:, :-window]
+        s = total[:, window:] - total[:, :-window]
+        sq = total_sq[:, window:] - total_sq[:, :-window]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (sq - s ** 2 / n) / (n - 1)
+        variance = np.where(n > 1, np.maximum(variance, 0.0), np.nan)
+        result[:, window - 1:] = np.sqrt(variance)
+        return result
+
+    @staticmethod
+    def drawdowns(balances: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """최대낙폭(비율)과 최장 낙폭 기간(관측일 수)"""
+        peaks = np.fmax.accumulate(balances, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            drawdown = balances / peaks - 1
+        drawdown = np.where(np.isnan(drawdown), 0.0, drawdown)
+
+        # 고점 회복 전까지 연속 구간 길이
+        underwater = drawdown < 0
+        index = np.arange(balances.shape[1])
+        last_peak = np.where(~underwater, index, -1)
+        np.maximum.accumulate(last_peak, axis=1, out=last_peak)
+        duration = np.where(underwater, index - last_peak, 0)
+
+        return -drawdown.min(axis=1), duration.max(axis=1)
+
+    def calculate(self, balances: np.ndarray) -> Dict[str, Any]:
+        """총자산 시계열로 위험 지표 계산
+
+        Args:
+            balances: (일수,) 또는 (계좌 수, 일수) 배열
+
+        Returns:
+            지표명별 값 (1차원 입력은 스칼라, 2차원 입력은 계좌별 배열)
+        """
+        single = np.ndim(balances) == 1
+        balances = np.atleast_2d(np.asarray(balances, dtype=float))
+        balances = np.where(balances > 0, balances, np.nan)
+        filled = self._forward_fill(balances)
+
+        returns = self.daily_returns(balances)
+        n = np.sum(~np.isnan(returns), axis=1)
+        has_data = n > 1
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(n > 0, np.nansum(returns, axis=1) / np.maximum(n, 1), np.nan)
+            variance = np.nansum((returns - mean[:, None]) ** 2, axis=1) / (n - 1)
+            std = np.where(has_data, np.sqrt(variance), np.nan)
+
+            rf_daily = self.risk_free_rate / self.trading_days
+            downside = np.minimum(returns - rf_daily, 0.0)
+            downside_dev = np.sqrt(np.nansum(downside ** 2, axis=1) / n)
+
+            annual_factor = np.sqrt(self.trading_days)
+            sharpe = (mean - rf_daily) / std * annual_factor
+            sortino = (mean - rf_daily) / downside_dev * annual_factor
+
+            # 연환산 수익률 (첫/마지막 유효 잔고 기준)
+            first = balances[np.arange(len(balances)), np.argmax(~np.isnan(balances), axis=1)]
+            last = filled[:, -1]
+            annual_return = (last / first) ** (self.trading_days / np.maximum(n, 1)) - 1
+
+        if returns.shape[1] > 0 and has_data.any():
+            historical_95 = -np.nanpercentile(np.where(has_data[:, None], returns, 0.0), 5, axis=1)
+            historical_99 = -np.nanpercentile(np.where(has_data[:, None], returns, 0.0), 1, axis=1)
+            rolling = self.rolling_volatility(returns)[:, -1]
+        else:
+            historical_95 = historical_99 = rolling = np.full(len(balances), np.nan)
+
+        max_drawdown, drawdown_duration = self.drawdowns(filled)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            calmar = np.where(max_drawdown > 0, annual_return / max_drawdown, 0.0)
+
+        month_factor = np.sqrt(self.month_days)
+        metrics = {
+            'observations': n,
+            'mean_return': mean * 100,
+            'daily_volatility': std * 100,
+            'monthly_volatility': std * month_factor * 100,
+            'annual_volatility': std * annual_factor * 100,
+            'rolling_volatility': rolling * annual_factor * 100,
+            'downside_deviation': downside_dev * annual_factor * 100,
+            'max_drawdown': max_drawdown * 100,
+            'max_drawdown_duration': drawdown_duration,
+            'var_1d_95': historical_95 * 100,
+            'var_1d_99': historical_99 * 100,
+            'var_1m_95': historical_95 * month_factor * 100,
+            'var_1m_99': historical_99 * month_factor * 100,
+            'parametric_var_1d_95': -(mean - Z_95 * std) * 100,
+            'parametric_var_1d_99': -(mean - Z_99 * std) * 100,
+            'annual_return': annual_return * 100,
+            'sharpe_ratio': sharpe,
+            'sortino_ratio': sortino,
+            'calmar_ratio': calmar
+        }
+
+        # 데이터 부족/0 나눗셈 결과는 0으로 저장 (기존 컬럼 기본값과 동일)
+        for key, values in metrics.items():
+            values = np.where(np.isfinite(values) & has_data, values, 0)
+            metrics[key] = values[0].item() if single else values
+
+        return metrics
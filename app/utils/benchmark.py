@@ -0,0 +1,96 @@
+"""
+벤치마크 측정 및 결과 기록
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Optional
+
+
+def get_git_commit(cwd: Optional[str] = None) -> Optional[str]:
+    """현재 git 커밋 해시 (git 저장소가 아니면 None)"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, timeout=5, cwd=cwd
+        )
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+class BenchmarkRecorder:
+    """함수 실행 시간 측정 및 JSON 기록
+
+    pytest-benchmark와 같이 워밍업 후 여러 라운드를 실행하여
+    min/max/mean/median/stddev를 기록합니다.
+    """
+
+    def __init__(self, metadata: Optional[Dict[str, Any]] = None):
+        self.metadata = metadata or {}
+        self.results: List[Dict[str, Any]] = []
+
+    def measure(self, name: str, func: Callable, *args, rounds: int = 5, warmup: int = 1,
+                group: Optional[str] = None, **kwargs) -> Any:
+        """함수 실행 시간 측정 후 마지막 반환값 반환"""
+        result = None
+        for _ in range(warmup):
+            result = func(*args, **kwargs)
+
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+
+        self.results.append({
+            'name': name,
+            'group': group,
+            'rounds': rounds,
+            'min': min(timings),
+            'max': max(timings),
+            'mean': statistics.mean(timings),
+            'median': statistics.median(timings),
+            'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0
+        })
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """기록 결과 (메타데이터 포함)"""
+        return {
+            'created_at': datetime.now().isoformat(),
+            'commit': get_git_commit(),
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'metadata': self.metadata,
+            'benchmarks': self.results
+        }
+
+    def save(self, path: str) -> Path:
+        """결과를 JSON 파일로 저장"""
+        output_path = Path(path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return output_path
+
+
+def compare_results(previous: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """두 벤치마크 결과의 중앙값 비교 (ratio > 1이면 느려짐)"""
+    previous_by_name = {bench['name']: bench for bench in previous.get('benchmarks', [])}
+    comparison = []
+    for bench in current.get('benchmarks', []):
+        before = previous_by_name.get(bench['name'])
+        if not before or not before['median']:
+            continue
+        comparison.append({
+            'name': bench['name'],
+            'previous_median': before['median'],
+            'current_median': bench['median'],
+            'ratio': bench['median'] / before['median']
+        })
+    return comparison
@@ -1,11 +1,12 @@
 """
 차트 생성 유틸리티 클래스
 """
+import os
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, date
 from app.utils.logger import get_logger
 
@@ -25,10 +26,10 @@ class ChartGenerator:
             }
         }
     
-    def create_portfolio_performance_chart(self, daily_balances: List[Dict[str, Any]]) -> go.Figure:
-        """포트폴리오 성과 차트 생성"""
+    def create_portfolio_performance_chart(self, daily_balances: Union[List[Dict[str, Any]], pd.DataFrame]) -> go.Figure:
+        """포트폴리오 성과 차트 생성 (dict 목록 또는 컬럼형 캐시 DataFrame)"""
         try:
-            if not daily_balances:
+            if daily_balances is None or len(daily_balances) == 0:
                 return self._create_empty_chart("포트폴리오 성과 데이터가 없습니다.")
             
             # DataFrame 생성
@@ -364,11 +365,25 @@ class ChartGenerator:
         fig.update_layout(**self.chart_theme['layout'])
         return fig
     
-    def export_chart_to_html(self, fig: go.Figure, filename: str) -> str:
-        """차트를 HTML 파일로 내보내기"""
+    def chart_to_html(self, fig: go.Figure, include_plotlyjs: Union[bool, str] = 'cdn') -> str:
+        """차트를 HTML 조각 문자열로 변환 (파일 입출력 없음)
+
+        기본값은 plotly.js를 CDN script 태그로만 참조하므로 차트마다 수 MB의 라이브러리를 포함하지 않고,
+        브라우저가 한 번 받은 plotly.js를 캐시에서 재사용합니다.
+        """
+        return fig.to_html(full_html=False, include_plotlyjs=include_plotlyjs)
+
+    def chart_to_json(self, fig: go.Figure) -> str:
+        """차트를 Plotly JSON 문자열로 변환 (프런트엔드에서 Plotly.newPlot으로 렌더링)"""
+        return fig.to_json()
+
+    def export_chart_to_html(self, fig: go.Figure, filename: str,
+                             include_plotlyjs: Union[bool, str] = True) -> str:
+        """차트를 HTML 파일로 내보내기 (기본: plotly.js 포함, 오프라인에서 열람 가능)"""
         try:
             filepath = f"./data/charts/{filename}"
-            fig.write_html(filepath)
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            fig.write_html(filepath, include_plotlyjs=include_plotlyjs)
             logger.info(f"차트 HTML 내보내기 완료: {filepath}")
             return filepath
         except Exception as e:
@@ -0,0 +1,31 @@
+"""
+데이터 변경 세대(generation) 카운터
+"""
+import threading
+
+
+class DataGeneration:
+    """수집 데이터가 저장될 때마다 증가하는 프로세스 전역 카운터
+
+    조회 결과 캐시는 저장 당시의 세대 번호를 함께 보관하고,
+    번호가 달라지면 해당 항목을 무효로 취급합니다.
+    다른 프로세스(스케줄러 등)의 저장은 감지하지 못하므로 캐시 TTL과 함께 사용합니다.
+    """
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        """현재 세대 번호"""
+        return self._value
+
+    def bump(self) -> int:
+        """세대 번호 증가 후 반환"""
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+# 전역 세대 카운터
+data_generation = DataGeneration()
@@ -1,12 +1,15 @@
 """
 데이터베이스 관리 클래스
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import StaticPool
 import os
-from typing import Optional
+from typing import List, Optional
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 Base = declarative_base()
 
@@ -16,6 +19,7 @@ class DatabaseManager:
     def __init__(self):
         self.engine = None
         self.SessionLocal = None
+        self.ScopedSession = None
         self.database_url = None
     
     def init_database(self, database_url: str):
@@ -39,21 +43,65 @@ class DatabaseManager:
                 autoflush=False, 
                 bind=self.engine
             )
+            # 스레드(요청)별 세션 레지스트리
+            self.ScopedSession = scoped_session(self.SessionLocal)
             
             # 테이블 생성
             Base.metadata.create_all(bind=self.engine)
             
+            # 기존 테이블에 추가된 인덱스 생성 (create_all은 기존 테이블의 인덱스를 만들지 않음)
+            self.ensure_indexes()
+            
             return True
             
         except Exception as e:
             raise Exception(f"데이터베이스 초기화 실패: {str(e)}")
     
+    def ensure_indexes(self) -> List[str]:
+        """모델에 선언된 인덱스 중 DB에 없는 인덱스 생성
+        
+        기존 데이터에 중복이 있어 고유 인덱스를 만들 수 없으면 경고만 남깁니다
+        (scripts/migrate_db_schema.py로 중복 정리 후 다시 생성).
+        
+        Returns:
+            새로 생성한 인덱스 이름 목록
+        """
+        inspector = inspect(self.engine)
+        existing_tables = set(inspector.get_table_names())
+        created = []
+        
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+                try:
+                    index.create(bind=self.engine, checkfirst=True)
+                    created.append(index.name)
+                except Exception as e:
+                    logger.warning(f"인덱스 생성 실패 ({index.name}): {str(e)}")
+        
+        return created
+    
     def get_session(self):
         """데이터베이스 세션 반환"""
         if not self.SessionLocal:
             raise Exception("데이터베이스가 초기화되지 않았습니다.")
         return self.SessionLocal()
     
+    def get_scoped_session(self):
+        """현재 스레드의 세션 반환 (같은 스레드에서는 같은 세션)"""
+        if not self.ScopedSession:
+            raise Exception("데이터베이스가 초기화되지 않았습니다.")
+        return self.ScopedSession()
+    
+    def remove_scoped_session(self):
+        """현재 스레드의 세션 종료"""
+        if self.ScopedSession:
+            self.ScopedSession.remove()
+    
     def close(self):
         """데이터베이스 연결 종료"""
         if self.engine:
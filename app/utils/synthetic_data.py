@@ -0,0 +1,223 @@
+"""
+대규모 포트폴리오 합성 데이터 생성기 (벤치마크/테스트용)
+"""
+import math
+import random
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from app.models.account import Account
+from app.models.balance import DailyBalance
+from app.models.broker import Broker
+from app.models.holding import Holding
+from app.models.transaction import Transaction
+
+
+class SyntheticDataGenerator:
+    """계좌 N개 x 종목 M개 x Y년치 잔고/보유종목/거래내역 생성
+
+    같은 seed와 end_date로 생성하면 항상 같은 데이터가 만들어집니다.
+    가격과 총자산은 일별 로그 정규 랜덤워크로 생성합니다 (영업일만, 주말 제외).
+    """
+
+    BROKERS = [
+        {'id': 1, 'name': '한국투자증권', 'api_type': 'kis', 'platform': 'rest'},
+        {'id': 2, 'name': '키움증권', 'api_type': 'kiwoom', 'platform': 'windows'},
+    ]
+    INSERT_BATCH_SIZE = 5000
+
+    def __init__(self, account_count: int = 5, symbol_count: int = 50, years: int = 3,
+                 seed: int = 42, end_date: Optional[date] = None,
+                 holdings_per_account: int = 20, trades_per_day: float = 2.0):
+        self.account_count = account_count
+        self.symbol_count = symbol_count
+        self.years = years
+        self.seed = seed
+        self.end_date = end_date or date.today()
+        self.holdings_per_account = min(holdings_per_account, symbol_count)
+        self.trades_per_day = trades_per_day
+
+        self.symbols = [f"{100000 + i * 10:06d}" for i in range(symbol_count)]
+        self.business_days = self._business_days()
+
+    def _business_days(self) -> List[date]:
+        """기간 내 영업일 목록 (오래된 날짜부터)"""
+        start_date = self.end_date - timedelta(days=365 * self.years)
+        days = []
+        current = start_date
+        while current <= self.end_date:
+            if current.weekday() < 5:
+                days.append(current)
+            current += timedelta(days=1)
+        return days
+
+    def get_params(self) -> Dict[str, Any]:
+        """생성 파라미터"""
+        return {
+            'account_count': self.account_count,
+            'symbol_count': self.symbol_count,
+            'years': self.years,
+            'seed': self.seed,
+            'end_date': self.end_date.isoformat(),
+            'holdings_per_account': self.holdings_per_account,
+            'trades_per_day': self.trades_per_day
+        }
+
+    def account_number(self, account_id: int) -> str:
+        """계좌 ID에 대응하는 계좌번호"""
+        return f"{50000000 + account_id:08d}01"
+
+    def _price_paths(self, rng: random.Random) -> Dict[str, List[float]]:
+        """종목별 일별 가격 경로"""
+        paths = {}
+        for symbol in self.symbols:
+            price = rng.uniform(5000, 300000)
+            path = []
+            for _ in self.business_days:
+                price *= math.exp(rng.gauss(0.0002, 0.02))
+                path.append(round(price, 0))
+            paths[symbol] = path
+        return paths
+
+    def generate_accounts(self) -> List[Dict[str, Any]]:
+        """계좌 행 생성"""
+        return [{
+            'id': account_id,
+            'broker_id': self.BROKERS[(account_id - 1) % len(self.BROKERS)]['id'],
+            'account_number': self.account_number(account_id),
+            'account_name': f"합성계좌{account_id}",
+            'account_type': 'stock',
+            'is_active': True
+        } for account_id in range(1, self.account_count + 1)]
+
+    def generate_account_rows(self, account_id: int,
+                              prices: Dict[str, List[float]]) -> Dict[str, List[Dict[str, Any]]]:
+        """계좌 하나의 잔고/보유종목/거래내역 행 생성"""
+        rng = random.Random(self.seed * 1000 + account_id)
+        now = datetime(self.end_date.year, self.end_date.month, self.end_date.day, 16, 0)
+
+        # 일별 잔고 (랜덤워크)
+        balances = []
+        total = rng.uniform(5_000_000, 500_000_000)
+        principal = total
+        for day in self.business_days:
+            total *= math.exp(rng.gauss(0.0003, 0.012))
+            cash_ratio = rng.uniform(0.05, 0.4)
+            balances.append({
+                'account_id': account_id,
+                'balance_date': day,
+                'cash_balance': round(total * cash_ratio, 0),
+                'stock_balance': round(total * (1 - cash_ratio), 0),
+                'total_balance': round(total, 0),
+                'evaluation_amount': round(total * (1 - cash_ratio), 0),
+                'profit_loss': round(total - principal, 0),
+                'profit_loss_rate': round((total / principal - 1) * 100, 2),
+                'created_at': now,
+                'updated_at': now
+            })
+
+        # 거래내역
+        transactions = []
+        for day_index, day in enumerate(self.business_days):
+            trade_count = int(self.trades_per_day + rng.random())
+            for _ in range(trade_count):
+                symbol = rng.choice(self.symbols)
+                price = prices[symbol][day_index]
+                quantity = rng.randint(1, 100)
+                amount = price * quantity
+                transactions.append({
+                    'account_id': account_id,
+                    'transaction_date': day,
+                    'symbol': symbol,
+                    'name': f"종목{symbol}",
+                    'transaction_type': 'BUY' if rng.random() < 0.55 else 'SELL',
+                    'quantity': quantity,
+                    'price': price,
+                    'amount': amount,
+                    'fee': round(amount * 0.00015, 0),
+                    'created_at': now
+                })
+
+        # 현재 보유종목
+        holdings = []
+        for symbol in rng.sample(self.symbols, self.holdings_per_account):
+            quantity = rng.randint(1, 500)
+            current_price = prices[symbol][-1]
+            average_price = round(current_price * rng.uniform(0.7, 1.3), 0)
+            evaluation_amount = current_price * quantity
+            profit_loss = evaluation_amount - average_price * quantity
+            holdings.append({
+                'account_id': account_id,
+                'symbol': symbol,
+                'name': f"종목{symbol}",
+                'quantity': quantity,
+                'average_price': average_price,
+                'current_price': current_price,
+                'evaluation_amount': evaluation_amount,
+                'profit_loss': profit_loss,
+                'profit_loss_rate': round(profit_loss / (average_price * quantity) * 100, 2),
+                'created_at': now,
+                'updated_at': now,
+                'last_updated': now
+            })
+
+        return {'daily_balances': balances, 'transactions': transactions, 'holdings': holdings}
+
+    def populate(self, engine: Engine) -> Dict[str, int]:
+        """빈 스키마에 합성 데이터 저장
+
+        Returns:
+            테이블별 생성 행 수
+        """
+        prices = self._price_paths(random.Random(self.seed))
+        counts = {'brokers': len(self.BROKERS), 'accounts': self.account_count,
+                  'daily_balances': 0, 'holdings': 0, 'transactions': 0}
+        models = {'daily_balances': DailyBalance, 'holdings': Holding, 'transactions': Transaction}
+
+        with engine.begin() as conn:
+            conn.execute(insert(Broker), self.BROKERS)
+            conn.execute(insert(Account), self.generate_accounts())
+
+            for account_id in range(1, self.account_count + 1):
+                rows = self.generate_account_rows(account_id, prices)
+                for table_name, model in models.items():
+                    table_rows = rows[table_name]
+                    for start in range(0, len(table_rows), self.INSERT_BATCH_SIZE):
+                        conn.execute(insert(model), table_rows[start:start + self.INSERT_BATCH_SIZE])
+                    counts[table_name] += len(table_rows)
+
+        return counts
+
+    def generate_snapshot(self, account_id: int, day_offset: int = 0) -> Dict[str, Any]:
+        """브로커 조회 결과 형식의 계좌 스냅샷 생성 (수집/저장 벤치마크용)"""
+        rng = random.Random(self.seed * 1000 + account_id * 7 + day_offset)
+        holdings = []
+        for symbol in rng.sample(self.symbols, self.holdings_per_account):
+            quantity = rng.randint(1, 500)
+            current_price = round(rng.uniform(5000, 300000), 0)
+            average_price = round(current_price * rng.uniform(0.7, 1.3), 0)
+            holdings.append({
+                'symbol': symbol,
+                'name': f"종목{symbol}",
+                'quantity': quantity,
+                'average_price': average_price,
+                'current_price': current_price,
+                'evaluation_amount': current_price * quantity,
+                'profit_loss': (current_price - average_price) * quantity,
+                'profit_loss_rate': round((current_price / average_price - 1) * 100, 2)
+            })
+
+        stock_balance = sum(h['evaluation_amount'] for h in holdings)
+        cash_balance = round(rng.uniform(100_000, 50_000_000), 0)
+        return {
+            'balance': {
+                'cash_balance': cash_balance,
+                'stock_balance': stock_balance,
+                'total_balance': cash_balance + stock_balance,
+                'evaluation_amount': stock_balance,
+                'profit_loss': sum(h['profit_loss'] for h in holdings),
+                'profit_loss_rate': 0.0
+            },
+            'holdings': holdings
+        }
@@ -3,19 +3,54 @@
 """
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Tuple
 from app.utils.logger import get_logger
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
 logger = get_logger(__name__)
 
+# 토큰 발급 함수: {'access_token', 'refresh_token', 'expires_in'} 반환
+TokenIssuer = Callable[[], Dict[str, Any]]
+
 class TokenManager:
-    """토큰 파일 관리 클래스"""
+    """토큰 파일 관리 클래스
+
+    토큰 파일은 여러 프로세스(Streamlit, 수집 스크립트, 스케줄러)가 공유합니다.
+    - 쓰기는 잠금 파일(tokens.json.lock)의 advisory lock 안에서 임시 파일에 쓴 뒤 rename으로 교체
+    - 읽기는 파일 mtime이 바뀌었을 때만 다시 로드 (다른 프로세스가 갱신한 토큰 반영)
+    - 발급(issue_token)은 잠금 안에서 파일을 다시 확인하므로 동시에 만료를 감지해도 한 프로세스만 발급
+    
+    요청마다 호출되는 is_token_expired는 로드 시 계산한 monotonic 만료 시각과 비교만 하고,
+    파일 변경 확인(stat)도 RELOAD_CHECK_INTERVAL마다 한 번만 합니다.
+    토큰이 바뀔 때마다 generation이 증가하므로 호출 측은 인증 헤더를 토큰당 한 번만 만들면 됩니다.
+    """
+    
+    RELOAD_CHECK_INTERVAL = 1.0  # 요청 경로의 토큰 파일 변경 확인 간격 (초)
     
     def __init__(self, broker_name: str = None):
         self.broker_name = broker_name
         self.token_file_path = self._get_token_file_path()
+        self.lock_file_path = f"{self.token_file_path}.lock"
         self.tokens = {}
+        self._lock = threading.RLock()
+        self._file_signature: Optional[Tuple[int, int, int]] = None
+        self._next_reload_check = 0.0
+        self._deadline: Optional[float] = None  # time.monotonic() 기준 만료 시각
+        self._access_token: Optional[str] = None
+        self.generation = 0
         self._ensure_token_file()
         self._load_tokens()
     
@@ -34,66 +69,166 @@ class TokenManager:
         
         # 토큰 파일이 없으면 빈 파일 생성
         if not os.path.exists(self.token_file_path):
-            with open(self.token_file_path, 'w', encoding='utf-8') as f:
-                json.dump({}, f, indent=2, ensure_ascii=False)
-            logger.info(f"토큰 파일이 생성되었습니다: {self.token_file_path}")
+            with self._file_lock():
+                if not os.path.exists(self.token_file_path):
+                    self._save_tokens()
+                    logger.info(f"토큰 파일이 생성되었습니다: {self.token_file_path}")
+    
+    @contextmanager
+    def _file_lock(self):
+        """토큰 파일 쓰기 잠금 (같은 프로세스의 스레드와 다른 프로세스 모두 배제)"""
+        with self._lock:
+            with open(self.lock_file_path, 'a+b') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                elif msvcrt is not None:
+                    lock_file.seek(0)
+                    while True:
+                        try:
+                            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            # LK_LOCK은 약 10초 대기 후 실패하므로 잠금을 얻을 때까지 반복
+                            continue
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                    elif msvcrt is not None:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        """토큰 파일 변경 감지용 (mtime, 크기, inode)"""
+        try:
+            stat = os.stat(self.token_file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
     
     def _load_tokens(self):
         """토큰 파일에서 토큰 정보 로드"""
-        try:
-            with open(self.token_file_path, 'r', encoding='utf-8') as f:
-                self.tokens = json.load(f)
-            logger.debug("토큰 정보를 로드했습니다.")
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.warning(f"토큰 파일 로드 실패: {str(e)}")
-            self.tokens = {}
+        with self._lock:
+            signature = self._stat_signature()
+            try:
+                with open(self.token_file_path, 'r', encoding='utf-8') as f:
+                    self.tokens = json.load(f)
+                logger.debug("토큰 정보를 로드했습니다.")
+            except (FileNotFoundError, json.JSONDecodeError) as e:
+                logger.warning(f"토큰 파일 로드 실패: {str(e)}")
+                self.tokens = {}
+            self._file_signature = signature
+            self._update_token_state()
+    
+    def _update_token_state(self):
+        """만료 시각(monotonic)과 토큰 세대 갱신 (토큰 정보가 바뀔 때만 호출)"""
+        token_info = self.tokens.get('current') or {}
+        deadline = None
+        if token_info:
+            try:
+                expires_at = datetime.fromisoformat(token_info.get('expires_at', ''))
+                deadline = time.monotonic() + (expires_at - datetime.now()).total_seconds()
+            except (ValueError, TypeError):
+                logger.warning(f"브로커 {self.broker_name}의 토큰 만료 시간을 파싱할 수 없습니다.")
+        
+        access_token = token_info.get('access_token')
+        if access_token != self._access_token:
+            self._access_token = access_token
+            self.generation += 1
+        self._deadline = deadline
+    
+    def _reload_if_changed(self, force: bool = True):
+        """다른 프로세스/인스턴스가 토큰 파일을 교체했으면 다시 로드
+        
+        force=False이면 RELOAD_CHECK_INTERVAL 안에서는 파일을 확인하지 않습니다 (요청 경로용).
+        """
+        now = time.monotonic()
+        if not force and now < self._next_reload_check:
+            return
+        self._next_reload_check = now + self.RELOAD_CHECK_INTERVAL
+        if self._stat_signature() != self._file_signature:
+            self._load_tokens()
     
     def _save_tokens(self):
-        """토큰 정보를 파일에 저장"""
+        """토큰 정보를 파일에 저장 (임시 파일에 쓴 뒤 rename, _file_lock 안에서 호출)"""
+        tmp_path = f"{self.token_file_path}.{os.getpid()}.tmp"
         try:
-            with open(self.token_file_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(self.tokens, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.token_file_path)
+            self._file_signature = self._stat_signature()
+            self._update_token_state()
             logger.debug("토큰 정보를 저장했습니다.")
         except Exception as e:
             logger.error(f"토큰 파일 저장 실패: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             raise
     
+    def _store_token(self, access_token: str, refresh_token: str = None,
+                     expires_in: int = 86400) -> Dict[str, Any]:
+        """토큰 정보 기록 (_file_lock 안에서 호출)"""
+        # 만료 시간 계산 (현재 시간 + expires_in 초)
+        expires_at = datetime.now() + timedelta(seconds=expires_in)
+        
+        token_info = {
+            'access_token': access_token,
+            'refresh_token': refresh_token,
+            'expires_at': expires_at.isoformat(),
+            'created_at': datetime.now().isoformat(),
+            'expires_in': expires_in
+        }
+        
+        # 증권사별 토큰 저장 (잠금 안에서 최신 파일 기준으로 갱신)
+        self._reload_if_changed()
+        self.tokens['current'] = token_info
+        self._save_tokens()
+        
+        logger.info(f"브로커 {self.broker_name}의 토큰이 저장되었습니다.")
+        logger.info(f"토큰 만료 시간: {expires_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        return token_info
+    
     def save_token(self, access_token: str, refresh_token: str = None, 
                    expires_in: int = 86400):
         """토큰 정보 저장"""
         try:
-            # 만료 시간 계산 (현재 시간 + expires_in 초)
-            expires_at = datetime.now() + timedelta(seconds=expires_in)
-            
-            token_info = {
-                'access_token': access_token,
-                'refresh_token': refresh_token,
-                'expires_at': expires_at.isoformat(),
-                'created_at': datetime.now().isoformat(),
-                'expires_in': expires_in
-            }
-            
-            # 증권사별 토큰 저장
-            self.tokens['current'] = token_info
-            self._save_tokens()
-            
-            logger.info(f"브로커 {self.broker_name}의 토큰이 저장되었습니다.")
-            logger.info(f"토큰 만료 시간: {expires_at.strftime('%Y-%m-%d %H:%M:%S')}")
+            with self._file_lock():
+                self._store_token(access_token, refresh_token, expires_in)
             
         except Exception as e:
             logger.error(f"토큰 저장 실패: {str(e)}")
             raise
     
+    def issue_token(self, issuer: TokenIssuer, threshold_seconds: int = 300) -> Dict[str, Any]:
+        """토큰이 threshold_seconds 안에 만료되면 발급해 저장, 아니면 저장된 토큰 반환
+        
+        파일 잠금을 잡은 뒤 파일을 다시 읽으므로, 다른 프로세스가 먼저 발급했으면 issuer를 호출하지 않고
+        그 토큰을 사용합니다.
+        """
+        with self._file_lock():
+            self._reload_if_changed()
+            if not self.is_token_expired(threshold_seconds):
+                return self.get_token()
+            
+            token_data = issuer()
+            return self._store_token(
+                access_token=token_data.get('access_token'),
+                refresh_token=token_data.get('refresh_token'),
+                expires_in=int(token_data.get('expires_in') or 86400)
+            )
+    
     def get_token(self) -> Optional[Dict[str, Any]]:
         """토큰 정보 조회"""
+        self._reload_if_changed()
         return self.tokens.get('current')
     
     def get_access_token(self) -> Optional[str]:
         """액세스 토큰 조회"""
-        token_info = self.get_token()
-        if token_info:
-            return token_info.get('access_token')
-        return None
+        self._reload_if_changed()
+        return self._access_token
     
     def get_refresh_token(self) -> Optional[str]:
         """리프레시 토큰 조회"""
@@ -103,27 +238,48 @@ class TokenManager:
         return None
     
     def is_token_expired(self, threshold_seconds: int = 300) -> bool:
-        """토큰 만료 여부 확인"""
-        token_info = self.get_token()
-        if not token_info:
-            return True
-        
-        try:
-            expires_at = datetime.fromisoformat(token_info.get('expires_at', ''))
-            # 임계값 시간 전에 만료로 간주
-            threshold_time = datetime.now() + timedelta(seconds=threshold_seconds)
-            return expires_at <= threshold_time
-        except (ValueError, TypeError):
-            logger.warning(f"브로커 {self.broker_name}의 토큰 만료 시간을 파싱할 수 없습니다.")
+        """토큰 만료 여부 확인 (임계값 시간 전에 만료로 간주)"""
+        self._reload_if_changed(force=False)
+        deadline = self._deadline
+        if deadline is None:
             return True
+        return time.monotonic() + threshold_seconds >= deadline
     
-    def is_token_valid(self) -> bool:
+    def is_token_valid(self, threshold_seconds: int = 300) -> bool:
         """토큰 유효성 확인"""
-        token_info = self.get_token()
-        if not token_info:
-            return False
-        
-        return not self.is_token_expired()
+        return not self.is_token_expired(threshold_seconds)
+    
+    def seconds_until_expiry(self) -> Optional[float]:
+        """토큰 만료까지 남은 시간 (초, 토큰이 없거나 파싱 실패 시 None)"""
+        self._reload_if_changed()
+        if self._deadline is None:
+            return None
+        return self._deadline - time.monotonic()
+    
+    def start_background_refresh(self, issuer: TokenIssuer, threshold_seconds: int = 300) -> 'TokenRefresher':
+        """만료 threshold_seconds 전에 백그라운드에서 토큰 갱신 (토큰 파일당 프로세스에 스레드 하나)"""
+        with _refreshers_lock:
+            refresher = _refreshers.get(self.token_file_path)
+            if refresher is None or not refresher.is_alive():
+                refresher = TokenRefresher(self, issuer, threshold_seconds)
+                _refreshers[self.token_file_path] = refresher
+                refresher.start()
+            else:
+                # 가장 최근에 연결한 브로커의 발급 함수 사용
+                refresher.issuer = issuer
+            refresher.subscribers += 1
+            return refresher
+    
+    def stop_background_refresh(self, force: bool = False):
+        """백그라운드 갱신 구독 해제 (마지막 구독자가 해제하면 스레드 종료)"""
+        with _refreshers_lock:
+            refresher = _refreshers.get(self.token_file_path)
+            if refresher is None:
+                return
+            refresher.subscribers -= 1
+            if force or refresher.subscribers <= 0:
+                del _refreshers[self.token_file_path]
+                refresher.stop()
     
     def get_token_expiry_info(self) -> Optional[Dict[str, Any]]:
         """토큰 만료 정보 조회"""
@@ -148,15 +304,18 @@ class TokenManager:
     
     def delete_token(self):
         """토큰 삭제"""
-        if 'current' in self.tokens:
-            del self.tokens['current']
-            self._save_tokens()
-            logger.info(f"브로커 {self.broker_name}의 토큰이 삭제되었습니다.")
+        with self._file_lock():
+            self._reload_if_changed()
+            if 'current' in self.tokens:
+                del self.tokens['current']
+                self._save_tokens()
+                logger.info(f"브로커 {self.broker_name}의 토큰이 삭제되었습니다.")
     
     def clear_all_tokens(self):
         """모든 토큰 삭제"""
-        self.tokens = {}
-        self._save_tokens()
+        with self._file_lock():
+            self.tokens = {}
+            self._save_tokens()
         logger.info(f"브로커 {self.broker_name}의 모든 토큰이 삭제되었습니다.")
     
     def list_tokens(self) -> Dict[str, Dict[str, Any]]:
@@ -165,3 +324,51 @@ class TokenManager:
         if 'current' in self.tokens:
             result['current'] = self.get_token_expiry_info()
         return result
+
+
+class TokenRefresher(threading.Thread):
+    """만료 전에 토큰을 미리 갱신하는 백그라운드 스레드
+    
+    요청 경로는 실제 만료 직전까지 저장된 토큰을 사용하고, 이 스레드가 만료 threshold_seconds 전에
+    issue_token으로 갱신합니다. 여러 프로세스의 스레드가 동시에 깨어나도 파일 잠금 안에서
+    먼저 갱신한 토큰을 확인하므로 발급은 한 번만 일어납니다.
+    """
+    
+    RETRY_INTERVAL = 60      # 발급 실패 시 재시도 간격 (초)
+    MAX_SLEEP = 300          # 다른 프로세스의 갱신/삭제를 확인하는 최대 간격 (초)
+    
+    def __init__(self, token_manager: TokenManager, issuer: TokenIssuer, threshold_seconds: int = 300):
+        super().__init__(name=f"token-refresh-{token_manager.broker_name}", daemon=True)
+        self.token_manager = token_manager
+        self.issuer = issuer
+        self.threshold_seconds = threshold_seconds
+        self.subscribers = 0
+        self.refresh_count = 0
+        self._stop_event = threading.Event()
+    
+    def stop(self):
+        self._stop_event.set()
+    
+    def _next_wait(self) -> float:
+        """다음 확인까지 대기 시간 (필요하면 먼저 갱신)"""
+        remaining = self.token_manager.seconds_until_expiry()
+        if remaining is None or remaining <= self.threshold_seconds:
+            try:
+                self.token_manager.issue_token(self.issuer, self.threshold_seconds)
+                self.refresh_count += 1
+            except Exception as e:
+                logger.error(f"브로커 {self.token_manager.broker_name} 백그라운드 토큰 갱신 실패: {str(e)}")
+                return self.RETRY_INTERVAL
+            remaining = self.token_manager.seconds_until_expiry()
+            if remaining is None:
+                return self.RETRY_INTERVAL
+        return min(max(remaining - self.threshold_seconds, 1.0), self.MAX_SLEEP)
+    
+    def run(self):
+        while not self._stop_event.is_set():
+            self._stop_event.wait(self._next_wait())
+
+
+# 토큰 파일 경로별 백그라운드 갱신 스레드
+_refreshers: Dict[str, TokenRefresher] = {}
+_refreshers_lock = threading.Lock()
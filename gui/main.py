@@ -11,6 +11,8 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from gui.utils.data_service import DataService
+from gui.utils.query_cache import query_cache
+from gui.utils.resources import release_request_session
 
 def main():
     """메인 애플리케이션"""
@@ -177,23 +179,34 @@ def main():
         Real-time Data
         Investment Tracking
         """)
+
+        # 조회 캐시 적중률
+        cache_stats = query_cache.get_stats()
+        st.caption(
+            f"Query cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%}), {cache_stats['size']} entries"
+        )
     
     # 메인 컨텐츠 영역 - 선택된 페이지에 따라 표시
-    if selected_page == "Dashboard":
-        from gui.pages_backup import dashboard
-        dashboard.main()
-    elif selected_page == "Accounts":
-        from gui.pages_backup import accounts
-        accounts.main()
-    elif selected_page == "Holdings":
-        from gui.pages_backup import holdings
-        holdings.main()
-    # elif selected_page == "Transactions":  # 거래내역 기능 비활성화
-    #     from gui.pages_backup import transactions
-    #     transactions.main()
-    elif selected_page == "Analysis":
-        from gui.pages_backup import analysis
-        analysis.main()
+    try:
+        if selected_page == "Dashboard":
+            from gui.pages_backup import dashboard
+            dashboard.main()
+        elif selected_page == "Accounts":
+            from gui.pages_backup import accounts
+            accounts.main()
+        elif selected_page == "Holdings":
+            from gui.pages_backup import holdings
+            holdings.main()
+        # elif selected_page == "Transactions":  # 거래내역 기능 비활성화
+        #     from gui.pages_backup import transactions
+        #     transactions.main()
+        elif selected_page == "Analysis":
+            from gui.pages_backup import analysis
+            analysis.main()
+    finally:
+        # 이번 실행에서 사용한 DB 세션 반환 (엔진/세션 팩토리는 프로세스 전역으로 유지)
+        release_request_session()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -16,15 +16,12 @@ def main():
         st.warning("Warning: Please select an account from the sidebar first.")
         return
 
-    # 현재는 첫 번째 선택된 계좌를 사용
-    account_id = selected_account_ids[0]
-
     if len(selected_account_ids) > 1:
-        st.info(f"Note: Showing data for the first selected account ({account_id}).")
+        st.info(f"Note: Showing combined data for {len(selected_account_ids)} selected accounts.")
     
     # 데이터 서비스 초기화
     data_service = DataService()
-    chart_service = ChartService()
+    chart_service = ChartService(data_service)
     
     try:
         # 차트 타입 선택
@@ -54,10 +51,10 @@ def main():
             
             if st.button("차트 생성", type="primary"):
                 with st.spinner("포트폴리오 성과 차트를 생성하는 중..."):
-                    chart_html = chart_service.create_portfolio_performance_chart(account_id, days=days)
+                    fig = chart_service.get_portfolio_performance_figure(selected_account_ids, days=days)
                     
-                    if chart_html:
-                        st.components.v1.html(chart_html, height=600)
+                    if fig is not None:
+                        st.plotly_chart(fig, use_container_width=True)
                     else:
                         st.warning("포트폴리오 성과 차트를 생성할 수 없습니다.")
         
@@ -72,10 +69,10 @@ def main():
             
             if st.button("차트 생성", type="primary"):
                 with st.spinner("보유종목 비중 차트를 생성하는 중..."):
-                    chart_html = chart_service.create_holdings_pie_chart(account_id)
+                    fig = chart_service.get_holdings_pie_figure(selected_account_ids)
                     
-                    if chart_html:
-                        st.components.v1.html(chart_html, height=500)
+                    if fig is not None:
+                        st.plotly_chart(fig, use_container_width=True)
                     else:
                         st.warning("보유종목 비중 차트를 생성할 수 없습니다.")
         
@@ -90,10 +87,10 @@ def main():
             
             if st.button("차트 생성", type="primary"):
                 with st.spinner("보유종목 수익률 차트를 생성하는 중..."):
-                    chart_html = chart_service.create_holdings_performance_chart(account_id)
+                    fig = chart_service.get_holdings_performance_figure(selected_account_ids)
                     
-                    if chart_html:
-                        st.components.v1.html(chart_html, height=500)
+                    if fig is not None:
+                        st.plotly_chart(fig, use_container_width=True)
                     else:
                         st.warning("보유종목 수익률 차트를 생성할 수 없습니다.")
         
@@ -108,10 +105,10 @@ def main():
             
             if st.button("차트 생성", type="primary"):
                 with st.spinner("월별 수익률 차트를 생성하는 중..."):
-                    chart_html = chart_service.create_monthly_return_chart(account_id, year)
+                    fig = chart_service.get_monthly_return_figure(selected_account_ids, year)
                     
-                    if chart_html:
-                        st.components.v1.html(chart_html, height=500)
+                    if fig is not None:
+                        st.plotly_chart(fig, use_container_width=True)
                     else:
                         st.warning("월별 수익률 차트를 생성할 수 없습니다.")
         
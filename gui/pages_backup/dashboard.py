@@ -149,15 +149,12 @@ def main():
         show_welcome_dashboard()
         return
 
-    # 현재는 첫 번째 선택된 계좌를 사용 (추후 다중 계좌 통합 기능 추가 예정)
-    account_id = selected_account_ids[0]
-
     if len(selected_account_ids) > 1:
-        st.info(f"Note: Showing data for the first selected account ({account_id}). Integrated analysis feature will be updated later.")
+        st.info(f"Note: Showing combined data for {len(selected_account_ids)} selected accounts.")
 
     # 데이터 서비스 초기화
     data_service = DataService()
-    chart_service = ChartService()
+    chart_service = ChartService(data_service)
 
     # 전체 활성 계좌의 당일 데이터 확인 및 자동 조회
     if data_service.has_any_missing_today_data():
@@ -204,10 +201,10 @@ def main():
         # 로딩 표시
         with st.spinner("데이터를 불러오는 중..."):
             # 최신 잔고 정보 조회
-            latest_balance = data_service.get_latest_balance(account_id)
+            latest_balance = data_service.get_portfolio_latest_balance(selected_account_ids)
             
-            # 보유종목 정보 조회
-            holdings_data = data_service.get_holdings(account_id)
+            # 보유종목 정보 조회 (여러 계좌면 종목별 합산)
+            holdings_data = data_service.get_portfolio_holdings(selected_account_ids)
             
             # 최근 거래내역 조회 (최근 10건) - 비활성화
             # recent_transactions = data_service.get_recent_transactions(account_id, limit=10)
@@ -17,20 +17,17 @@ def main():
         st.warning("Warning: Please select an account from the sidebar first.")
         return
 
-    # 현재는 첫 번째 선택된 계좌를 사용
-    account_id = selected_account_ids[0]
-
     if len(selected_account_ids) > 1:
-        st.info(f"Note: Showing data for the first selected account ({account_id}).")
+        st.info(f"Note: Showing combined holdings for {len(selected_account_ids)} selected accounts.")
     
     # 데이터 서비스 초기화
     data_service = DataService()
-    chart_service = ChartService()
+    chart_service = ChartService(data_service)
     
     try:
         # 보유종목 데이터 조회
         with st.spinner("보유종목 정보를 불러오는 중..."):
-            holdings_data = data_service.get_holdings(account_id)
+            holdings_data = data_service.get_portfolio_holdings(selected_account_ids)
         
         if holdings_data:
             # 필터 및 정렬 옵션
@@ -159,17 +156,17 @@ def main():
             
             if chart_type == "보유종목 비중":
                 # 보유종목 비중 파이 차트
-                chart_html = chart_service.create_holdings_pie_chart(account_id)
-                if chart_html:
-                    st.components.v1.html(chart_html, height=500)
+                fig = chart_service.get_holdings_pie_figure(selected_account_ids)
+                if fig is not None:
+                    st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.warning("보유종목 비중 차트를 생성할 수 없습니다.")
             
             elif chart_type == "보유종목 수익률":
                 # 보유종목 수익률 차트
-                chart_html = chart_service.create_holdings_performance_chart(account_id)
-                if chart_html:
-                    st.components.v1.html(chart_html, height=500)
+                fig = chart_service.get_holdings_performance_figure(selected_account_ids)
+                if fig is not None:
+                    st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.warning("보유종목 수익률 차트를 생성할 수 없습니다.")
         
@@ -3,8 +3,10 @@ GUI용 차트 서비스
 """
 import sys
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from datetime import datetime, date, timedelta
+import pandas as pd
+import plotly.graph_objects as go
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 project_root = Path(__file__).parent.parent.parent
@@ -17,157 +19,153 @@ from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 class ChartService:
-    """GUI용 차트 서비스"""
-    
-    def __init__(self):
+    """GUI용 차트 서비스
+
+    get_*_figure는 Plotly Figure를 반환하므로 페이지에서 st.plotly_chart로 바로 그립니다.
+    create_*_chart는 메모리에서 HTML 조각을 만들어 반환하며 (plotly.js는 CDN에서 한 번 로드),
+    export=True일 때만 ./data/charts에 파일로도 저장합니다.
+    """
+
+    def __init__(self, data_service: Optional[DataService] = None):
         self.chart_generator = ChartGenerator()
-        self.data_service = DataService()
-    
-    def create_portfolio_performance_chart(self, account_id: int, days: int = 30) -> Optional[str]:
-        """포트폴리오 성과 차트 생성"""
+        # 페이지에서 만든 DataService를 받아 같은 세션/캐시 사용
+        self.data_service = data_service or DataService()
+
+    @staticmethod
+    def _account_ids(account_id: Union[int, List[int]]) -> List[int]:
+        """계좌 ID 하나 또는 목록을 목록으로 변환"""
+        return list(account_id) if isinstance(account_id, (list, tuple)) else [account_id]
+
+    @classmethod
+    def _account_label(cls, account_id: Union[int, List[int]]) -> str:
+        return '_'.join(str(i) for i in cls._account_ids(account_id))
+
+    def _render(self, fig: Optional[go.Figure], filename: str, export: bool) -> Optional[str]:
+        """Figure를 HTML 문자열로 변환 (export=True면 파일로도 저장)"""
+        if fig is None:
+            return None
+        if export:
+            self.chart_generator.export_chart_to_html(fig, filename)
+        return self.chart_generator.chart_to_html(fig)
+
+    # Figure ---------------------------------------------------------------------
+
+    def get_portfolio_performance_figure(self, account_id: Union[int, List[int]], days: int = 30) -> Optional[go.Figure]:
+        """포트폴리오 성과 차트 (계좌 목록이면 합산 잔고)"""
         try:
-            # 잔고 이력 데이터 조회
-            balance_data = self.data_service.get_balance_history(account_id, days)
-            
-            if not balance_data:
+            # 잔고 이력 데이터 조회 (컬럼형 캐시 또는 컬럼 단위 조회)
+            balance_data = self.data_service.get_portfolio_balance_frame(self._account_ids(account_id), days)
+
+            if balance_data.empty:
                 logger.warning(f"포트폴리오 성과 데이터 없음: account_id={account_id}")
                 return None
-            
-            # 차트 생성
-            fig = self.chart_generator.create_portfolio_performance_chart(balance_data)
-            
-            # HTML 파일로 저장
-            filename = f"portfolio_performance_{account_id}_{date.today().strftime('%Y%m%d')}.html"
-            filepath = self.chart_generator.export_chart_to_html(fig, filename)
-            
-            # HTML 내용 읽기
-            with open(filepath, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            return html_content
-            
+
+            return self.chart_generator.create_portfolio_performance_chart(balance_data)
+
         except Exception as e:
             logger.error(f"포트폴리오 성과 차트 생성 실패: {str(e)}")
             return None
-    
-    def create_holdings_pie_chart(self, account_id: int) -> Optional[str]:
-        """보유종목 비중 파이 차트 생성"""
+
+    def get_holdings_pie_figure(self, account_id: Union[int, List[int]]) -> Optional[go.Figure]:
+        """보유종목 비중 파이 차트 (계좌 목록이면 종목별 합산)"""
         try:
             # 보유종목 데이터 조회
-            holdings_data = self.data_service.get_holdings(account_id)
-            
+            holdings_data = self.data_service.get_portfolio_holdings(self._account_ids(account_id))
+
             if not holdings_data:
                 logger.warning(f"보유종목 데이터 없음: account_id={account_id}")
                 return None
-            
-            # 차트 생성
-            fig = self.chart_generator.create_holdings_pie_chart(holdings_data)
-            
-            # HTML 파일로 저장
-            filename = f"holdings_pie_{account_id}_{date.today().strftime('%Y%m%d')}.html"
-            filepath = self.chart_generator.export_chart_to_html(fig, filename)
-            
-            # HTML 내용 읽기
-            with open(filepath, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            return html_content
-            
+
+            return self.chart_generator.create_holdings_pie_chart(holdings_data)
+
         except Exception as e:
             logger.error(f"보유종목 비중 차트 생성 실패: {str(e)}")
             return None
-    
-    def create_holdings_performance_chart(self, account_id: int) -> Optional[str]:
-        """보유종목 성과 차트 생성"""
+
+    def get_holdings_performance_figure(self, account_id: Union[int, List[int]]) -> Optional[go.Figure]:
+        """보유종목 성과 차트 (계좌 목록이면 종목별 합산)"""
         try:
             # 보유종목 데이터 조회
-            holdings_data = self.data_service.get_holdings(account_id)
-            
+            holdings_data = self.data_service.get_portfolio_holdings(self._account_ids(account_id))
+
             if not holdings_data:
                 logger.warning(f"보유종목 데이터 없음: account_id={account_id}")
                 return None
-            
-            # 차트 생성
-            fig = self.chart_generator.create_holdings_performance_chart(holdings_data)
-            
-            # HTML 파일로 저장
-            filename = f"holdings_performance_{account_id}_{date.today().strftime('%Y%m%d')}.html"
-            filepath = self.chart_generator.export_chart_to_html(fig, filename)
-            
-            # HTML 내용 읽기
-            with open(filepath, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            return html_content
-            
+
+            return self.chart_generator.create_holdings_performance_chart(holdings_data)
+
         except Exception as e:
             logger.error(f"보유종목 성과 차트 생성 실패: {str(e)}")
             return None
-    
-    def create_monthly_return_chart(self, account_id: int, year: int) -> Optional[str]:
-        """월별 수익률 차트 생성"""
+
+    def get_monthly_return_figure(self, account_id: Union[int, List[int]], year: int) -> Optional[go.Figure]:
+        """월별 수익률 차트 (월말 잔고 기준, 계좌 목록이면 합산 잔고)"""
         try:
-            # 월별 데이터 조회
-            monthly_data = []
-            for month in range(1, 13):
-                # 해당 월의 마지막 날짜
-                if month == 12:
-                    next_month = date(year + 1, 1, 1)
-                else:
-                    next_month = date(year, month + 1, 1)
-                month_end = next_month - timedelta(days=1)
-                
-                # 해당 월의 잔고 데이터 조회
-                balance_data = self.data_service.get_balance_history(
-                    account_id, 
-                    days=(month_end - date(year, month, 1)).days + 1
-                )
-                
-                if balance_data:
-                    # 해당 월의 마지막 데이터
-                    latest_balance = balance_data[0]  # 가장 최근 데이터
-                    monthly_data.append({
-                        'month': f"{year}-{month:02d}",
-                        'total_balance': latest_balance['total_balance'],
-                        'profit_loss_rate': latest_balance['profit_loss_rate']
-                    })
-            
+            # 해당 연도 잔고 이력을 한 번에 조회해 월별 마지막 데이터 선택
+            days = (date.today() - date(year, 1, 1)).days
+            balance_data = self.data_service.get_portfolio_balance_frame(
+                self._account_ids(account_id), days, ['total_balance', 'profit_loss_rate']
+            )
+            if balance_data.empty:
+                logger.warning(f"월별 데이터 없음: account_id={account_id}, year={year}")
+                return None
+            balance_data = balance_data[pd.to_datetime(balance_data['balance_date']).dt.year == year]
+            month_end = balance_data.groupby(pd.to_datetime(balance_data['balance_date']).dt.month).last()
+            monthly_data = [{
+                'month': f"{year}-{month:02d}",
+                'total_balance': float(row['total_balance']),
+                'profit_loss_rate': float(row['profit_loss_rate'])
+            } for month, row in month_end.iterrows()]
+
             if not monthly_data:
                 logger.warning(f"월별 데이터 없음: account_id={account_id}, year={year}")
                 return None
-            
-            # 차트 생성
-            fig = self.chart_generator.create_monthly_summary_chart(monthly_data)
-            
-            # HTML 파일로 저장
-            filename = f"monthly_return_{account_id}_{year}.html"
-            filepath = self.chart_generator.export_chart_to_html(fig, filename)
-            
-            # HTML 내용 읽기
-            with open(filepath, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            return html_content
-            
+
+            return self.chart_generator.create_monthly_summary_chart(monthly_data)
+
         except Exception as e:
             logger.error(f"월별 수익률 차트 생성 실패: {str(e)}")
             return None
-    
+
+    # HTML -----------------------------------------------------------------------
+
+    def create_portfolio_performance_chart(self, account_id: Union[int, List[int]], days: int = 30,
+                                           export: bool = False) -> Optional[str]:
+        """포트폴리오 성과 차트 HTML 생성"""
+        filename = f"portfolio_performance_{self._account_label(account_id)}_{date.today().strftime('%Y%m%d')}.html"
+        return self._render(self.get_portfolio_performance_figure(account_id, days), filename, export)
+
+    def create_holdings_pie_chart(self, account_id: Union[int, List[int]], export: bool = False) -> Optional[str]:
+        """보유종목 비중 파이 차트 HTML 생성"""
+        filename = f"holdings_pie_{self._account_label(account_id)}_{date.today().strftime('%Y%m%d')}.html"
+        return self._render(self.get_holdings_pie_figure(account_id), filename, export)
+
+    def create_holdings_performance_chart(self, account_id: Union[int, List[int]], export: bool = False) -> Optional[str]:
+        """보유종목 성과 차트 HTML 생성"""
+        filename = f"holdings_performance_{self._account_label(account_id)}_{date.today().strftime('%Y%m%d')}.html"
+        return self._render(self.get_holdings_performance_figure(account_id), filename, export)
+
+    def create_monthly_return_chart(self, account_id: Union[int, List[int]], year: int,
+                                    export: bool = False) -> Optional[str]:
+        """월별 수익률 차트 HTML 생성"""
+        filename = f"monthly_return_{self._account_label(account_id)}_{year}.html"
+        return self._render(self.get_monthly_return_figure(account_id, year), filename, export)
+
     def create_transaction_pattern_chart(self, account_id: int, days: int = 30) -> Optional[str]:
         """거래 패턴 차트 생성"""
         try:
             # 거래내역 데이터 조회
             transactions_data = self.data_service.get_transactions(account_id)
-            
+
             if not transactions_data:
                 logger.warning(f"거래내역 데이터 없음: account_id={account_id}")
                 return None
-            
+
             # 거래 패턴 분석을 위한 데이터 처리
             # (추후 구현)
-            
+
             return None
-            
+
         except Exception as e:
             logger.error(f"거래 패턴 차트 생성 실패: {str(e)}")
             return None
@@ -5,78 +5,90 @@ import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime, date, timedelta
+import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, or_
+from sqlalchemy import and_, desc, func, or_, select
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.utils.database import db_manager, get_database_url
+from app.utils.database import db_manager
 from app.models.account import Account
 from app.models.balance import DailyBalance
-from app.models.holding import Holding
+from app.models.holding import Holding, HoldingSnapshot
 from app.models.transaction import Transaction
 from app.models.broker import Broker
 from app.models.aggregation import MonthlySummary, StockPerformance, PortfolioAnalysis
+from app.services.portfolio_aggregator import PortfolioAggregator
 from app.utils.logger import get_logger
+from gui.utils.query_cache import cached_query
+from gui.utils.resources import get_app_resources
 
 logger = get_logger(__name__)
 
+BALANCE_FRAME_COLUMNS = [
+    'total_balance', 'cash_balance', 'stock_balance', 'evaluation_amount', 'profit_loss', 'profit_loss_rate'
+]
+
 class DataService:
     """GUI용 데이터 서비스"""
     
     def __init__(self):
         self.session = None
+        self.columnar_store = None
+        self.portfolio_aggregator = PortfolioAggregator()
         self._init_database()
     
     def _init_database(self):
-        """데이터베이스 초기화"""
+        """데이터베이스 초기화 (프로세스당 한 번, 이후에는 공용 자원 재사용)"""
         try:
-            from app.utils.config import ConfigManager
-            config_manager = ConfigManager()
-            config = config_manager.config
-            database_config = config.get('database', {})
-            database_url = get_database_url(database_config)
-            db_manager.init_database(database_url)
-            logger.info("데이터베이스 초기화 완료")
+            self.columnar_store = get_app_resources().columnar_store
         except Exception as e:
             logger.error(f"데이터베이스 초기화 실패: {str(e)}")
     
     def _get_session(self) -> Session:
-        """데이터베이스 세션 가져오기"""
+        """데이터베이스 세션 가져오기 (요청 스레드별 공용 세션)"""
         if not self.session:
-            self.session = db_manager.get_session()
+            self.session = db_manager.get_scoped_session()
         return self.session
     
-    def get_accounts(self) -> List[Dict[str, Any]]:
-        """계좌 목록 조회"""
+    @cached_query('get_account_directory')
+    def get_account_directory(self, active_only: bool = False) -> List[Dict[str, Any]]:
+        """계좌 목록 + 증권사명 + 최신 잔고일/당일 데이터 여부를 한 번의 쿼리로 조회"""
         try:
             session = self._get_session()
+            today = date.today()
 
-            # 모든 계좌 조회 (활성/비활성 구분 없이) - JOIN 없이 조회
-            accounts = session.query(Account).all()
+            # 계좌별 최신 잔고일 (uq_account_balance_date 인덱스로 계좌당 한 번 탐색)
+            latest_balance = (
+                select(DailyBalance.account_id, func.max(DailyBalance.balance_date).label('latest_balance_date'))
+                .group_by(DailyBalance.account_id)
+                .subquery()
+            )
+            query = (
+                select(Account, Broker.name, latest_balance.c.latest_balance_date)
+                .outerjoin(Broker, Broker.id == Account.broker_id)
+                .outerjoin(latest_balance, latest_balance.c.account_id == Account.id)
+                .order_by(Account.id)
+            )
+            if active_only:
+                query = query.where(Account.is_active == True)
 
             result = []
-            for acc in accounts:
-                try:
-                    # 브로커 정보를 별도로 조회
-                    broker = session.query(Broker).filter(Broker.id == acc.broker_id).first()
-                    broker_name = broker.name if broker else 'Unknown'
-
-                    result.append({
-                        'id': acc.id,
-                        'broker_id': acc.broker_id,
-                        'broker_name': broker_name,
-                        'account_number': acc.account_number,
-                        'account_name': acc.account_name or '',
-                        'account_type': acc.account_type,
-                        'is_active': acc.is_active,
-                        'created_at': acc.created_at.isoformat() if acc.created_at else None
-                    })
-                except Exception as e:
-                    logger.warning(f"계좌 {acc.id} 처리 중 오류: {str(e)}")
-                    continue
+            for acc, broker_name, latest_balance_date in session.execute(query).all():
+                result.append({
+                    'id': acc.id,
+                    'broker_id': acc.broker_id,
+                    'broker_name': broker_name or 'Unknown',
+                    'account_number': acc.account_number,
+                    'account_name': acc.account_name or '',
+                    'account_type': acc.account_type,
+                    'is_active': acc.is_active,
+                    'created_at': acc.created_at.isoformat() if acc.created_at else None,
+                    'latest_balance_date': latest_balance_date.isoformat() if latest_balance_date else None,
+                    'has_today_data': latest_balance_date is not None and latest_balance_date >= today
+                })
 
             return result
 
@@ -84,41 +96,15 @@ class DataService:
             logger.error(f"계좌 목록 조회 실패: {str(e)}")
             return []
 
+    def get_accounts(self) -> List[Dict[str, Any]]:
+        """계좌 목록 조회 (활성/비활성 전체)"""
+        return self.get_account_directory()
+
     def get_active_accounts(self) -> List[Dict[str, Any]]:
         """활성 계좌 목록 조회 (is_active=True)"""
-        try:
-            session = self._get_session()
-
-            # 활성 상태인 계좌만 조회
-            accounts = session.query(Account).filter(Account.is_active == True).all()
-
-            result = []
-            for acc in accounts:
-                try:
-                    # 브로커 정보를 별도로 조회
-                    broker = session.query(Broker).filter(Broker.id == acc.broker_id).first()
-                    broker_name = broker.name if broker else 'Unknown'
-
-                    result.append({
-                        'id': acc.id,
-                        'broker_id': acc.broker_id,
-                        'broker_name': broker_name,
-                        'account_number': acc.account_number,
-                        'account_name': acc.account_name or '',
-                        'account_type': acc.account_type,
-                        'is_active': acc.is_active,
-                        'created_at': acc.created_at.isoformat() if acc.created_at else None
-                    })
-                except Exception as e:
-                    logger.warning(f"계좌 {acc.id} 처리 중 오류: {str(e)}")
-                    continue
-
-            return result
-
-        except Exception as e:
-            logger.error(f"활성 계좌 목록 조회 실패: {str(e)}")
-            return []
+        return self.get_account_directory(active_only=True)
     
+    @cached_query('get_latest_balance')
     def get_latest_balance(self, account_id: int) -> Optional[Dict[str, Any]]:
         """최신 잔고 정보 조회"""
         try:
@@ -144,38 +130,22 @@ class DataService:
             logger.error(f"최신 잔고 조회 실패: {str(e)}")
             return None
     
+    @cached_query('get_balance_history')
     def get_balance_history(self, account_id: int, days: int = 30) -> List[Dict[str, Any]]:
-        """잔고 이력 조회 (날짜별 최신 데이터만)"""
+        """잔고 이력 조회"""
         try:
             session = self._get_session()
 
             end_date = date.today()
             start_date = end_date - timedelta(days=days)
 
-            # 각 날짜별로 가장 최신 업데이트된 데이터만 조회
-            from sqlalchemy import func
-
-            # 서브쿼리: 각 날짜별 최신 updated_at 조회
-            latest_updates = session.query(
-                DailyBalance.balance_date,
-                func.max(DailyBalance.updated_at).label('max_updated_at')
-            ).filter(
+            # 잔고는 계좌/날짜별 1건(uq_account_balance_date)이므로 인덱스 범위 조회로 충분
+            balances = session.query(DailyBalance).filter(
                 and_(
                     DailyBalance.account_id == account_id,
                     DailyBalance.balance_date >= start_date,
                     DailyBalance.balance_date <= end_date
                 )
-            ).group_by(DailyBalance.balance_date).subquery()
-
-            # 메인 쿼리: 최신 데이터만 조회
-            balances = session.query(DailyBalance).join(
-                latest_updates,
-                and_(
-                    DailyBalance.balance_date == latest_updates.c.balance_date,
-                    DailyBalance.updated_at == latest_updates.c.max_updated_at
-                )
-            ).filter(
-                DailyBalance.account_id == account_id
             ).order_by(desc(DailyBalance.balance_date)).all()
 
             return [{
@@ -193,30 +163,49 @@ class DataService:
             logger.error(f"잔고 이력 조회 실패: {str(e)}")
             return []
     
-    def get_holdings(self, account_id: int) -> List[Dict[str, Any]]:
-        """보유종목 조회 (계좌별 종목의 최신 데이터만)"""
+    @cached_query('get_balance_frame')
+    def get_balance_frame(self, account_id: int, days: int = 30,
+                          columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """잔고 이력 DataFrame 조회 (날짜 오름차순)
+
+        컬럼형 캐시가 있으면 필요한 월/컬럼 파일만 읽고, 없으면 필요한 컬럼만 조회합니다 (ORM 객체 생성 없음).
+        """
+        columns = columns or BALANCE_FRAME_COLUMNS
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days)
         try:
-            session = self._get_session()
+            if self.columnar_store and self.columnar_store.has_table('daily_balances'):
+                frame = self.columnar_store.read(
+                    'daily_balances', ['balance_date'] + columns, [account_id], start_date, end_date
+                )
+                return frame.sort_values('balance_date', ignore_index=True)
 
-            # 계좌별 종목의 최신 업데이트 데이터만 조회 (수량 0인 것 제외)
-            from sqlalchemy import func
+            session = self._get_session()
+            result = session.execute(
+                select(DailyBalance.balance_date, *[getattr(DailyBalance, column) for column in columns])
+                .where(
+                    DailyBalance.account_id == account_id,
+                    DailyBalance.balance_date >= start_date,
+                    DailyBalance.balance_date <= end_date
+                )
+                .order_by(DailyBalance.balance_date)
+            )
+            frame = pd.DataFrame(result.all(), columns=list(result.keys()))
+            frame['balance_date'] = pd.to_datetime(frame['balance_date'])
+            return frame
 
-            # 서브쿼리: 각 종목별 최신 updated_at 조회
-            latest_holdings = session.query(
-                Holding.symbol,
-                func.max(Holding.updated_at).label('max_updated_at')
-            ).filter(
-                Holding.account_id == account_id
-            ).group_by(Holding.symbol).subquery()
+        except Exception as e:
+            logger.error(f"잔고 이력 조회 실패: {str(e)}")
+            return pd.DataFrame(columns=['balance_date'] + columns)
+    
+    @cached_query('get_holdings')
+    def get_holdings(self, account_id: int) -> List[Dict[str, Any]]:
+        """보유종목 조회 (현재 보유종목 테이블 직접 조회)"""
+        try:
+            session = self._get_session()
 
-            # 메인 쿼리: 최신 데이터만 조회하고 수량이 0보다 큰 것만
-            holdings = session.query(Holding).join(
-                latest_holdings,
-                and_(
-                    Holding.symbol == latest_holdings.c.symbol,
-                    Holding.updated_at == latest_holdings.c.max_updated_at
-                )
-            ).filter(
+            # holdings는 수집 시 계좌별 종목당 1건으로 갱신되므로 최신 데이터 재구성 불필요
+            holdings = session.query(Holding).filter(
                 and_(
                     Holding.account_id == account_id,
                     Holding.quantity > 0  # 실제 보유 중인 종목만
@@ -248,6 +237,75 @@ class DataService:
             logger.error(f"보유종목 조회 실패: {str(e)}")
             return []
     
+    @cached_query('get_portfolio_latest_balance')
+    def get_portfolio_latest_balance(self, account_ids: List[int]) -> Optional[Dict[str, Any]]:
+        """선택 계좌 최신 잔고 합산 (계좌 1개면 get_latest_balance와 동일)"""
+        if len(account_ids) == 1:
+            return self.get_latest_balance(account_ids[0])
+        try:
+            return self.portfolio_aggregator.latest_balance(self._get_session(), account_ids)
+        except Exception as e:
+            logger.error(f"통합 잔고 조회 실패: {str(e)}")
+            return None
+
+    @cached_query('get_portfolio_balance_frame')
+    def get_portfolio_balance_frame(self, account_ids: List[int], days: int = 30,
+                                    columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """선택 계좌 일자별 합산 잔고 이력 DataFrame (날짜 오름차순)"""
+        columns = columns or BALANCE_FRAME_COLUMNS
+        if len(account_ids) == 1:
+            return self.get_balance_frame(account_ids[0], days, columns)
+        end_date = date.today()
+        try:
+            frame = self.portfolio_aggregator.balance_history(
+                self._get_session(), account_ids, end_date - timedelta(days=days), end_date
+            )
+            return frame[['balance_date'] + columns]
+        except Exception as e:
+            logger.error(f"통합 잔고 이력 조회 실패: {str(e)}")
+            return pd.DataFrame(columns=['balance_date'] + columns)
+
+    @cached_query('get_portfolio_holdings')
+    def get_portfolio_holdings(self, account_ids: List[int]) -> List[Dict[str, Any]]:
+        """선택 계좌 종목별 합산 보유종목 (계좌 1개면 get_holdings와 동일)"""
+        if len(account_ids) == 1:
+            return self.get_holdings(account_ids[0])
+        try:
+            return self.portfolio_aggregator.holdings(self._get_session(), account_ids)
+        except Exception as e:
+            logger.error(f"통합 보유종목 조회 실패: {str(e)}")
+            return []
+    
+    @cached_query('get_holding_history')
+    def get_holding_history(self, account_id: int, symbol: str, days: int = 90) -> List[Dict[str, Any]]:
+        """종목별 보유 이력 조회 (일별 스냅샷)"""
+        try:
+            session = self._get_session()
+
+            start_date = date.today() - timedelta(days=days)
+            snapshots = session.query(HoldingSnapshot).filter(
+                and_(
+                    HoldingSnapshot.account_id == account_id,
+                    HoldingSnapshot.symbol == symbol,
+                    HoldingSnapshot.snapshot_date >= start_date
+                )
+            ).order_by(HoldingSnapshot.snapshot_date).all()
+
+            return [{
+                'snapshot_date': snapshot.snapshot_date.isoformat(),
+                'quantity': snapshot.quantity or 0,
+                'average_price': float(snapshot.average_price or 0),
+                'current_price': float(snapshot.current_price or 0),
+                'evaluation_amount': float(snapshot.evaluation_amount or 0),
+                'profit_loss': float(snapshot.profit_loss or 0),
+                'profit_loss_rate': float(snapshot.profit_loss_rate or 0)
+            } for snapshot in snapshots]
+
+        except Exception as e:
+            logger.error(f"종목 {symbol} 보유 이력 조회 실패: {str(e)}")
+            return []
+    
+    @cached_query('get_transactions')
     def get_transactions(self, account_id: int, **filters) -> List[Dict[str, Any]]:
         """거래내역 조회"""
         try:
@@ -302,6 +360,7 @@ class DataService:
             logger.error(f"거래내역 조회 실패: {str(e)}")
             return []
     
+    @cached_query('get_recent_transactions')
     def get_recent_transactions(self, account_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """최근 거래내역 조회"""
         try:
@@ -326,6 +385,7 @@ class DataService:
             logger.error(f"최근 거래내역 조회 실패: {str(e)}")
             return []
     
+    @cached_query('has_today_data', cache_empty=True)
     def has_today_data(self, account_id: int) -> bool:
         """당일 데이터 존재 여부 확인"""
         try:
@@ -348,17 +408,9 @@ class DataService:
             return False
 
     def check_all_accounts_today_data(self) -> Dict[str, bool]:
-        """모든 활성 계좌의 당일 데이터 존재 여부 확인"""
+        """모든 활성 계좌의 당일 데이터 존재 여부 확인 (계좌 목록 조회 결과 사용)"""
         try:
-            accounts = self.get_active_accounts()  # 활성 계좌만 확인
-            result = {}
-
-            for account in accounts:
-                account_id = account['id']
-                has_data = self.has_today_data(account_id)
-                result[account_id] = has_data
-
-            return result
+            return {account['id']: account['has_today_data'] for account in self.get_active_accounts()}
 
         except Exception as e:
             logger.error(f"전체 활성 계좌 당일 데이터 확인 실패: {str(e)}")
@@ -381,10 +433,9 @@ class DataService:
         try:
             from app.services.broker_service import BrokerService
             from app.services.data_collector import DataCollector
-            from app.utils.config import ConfigManager
+            from app.services.collection_engine import CollectionEngine
 
-            config_manager = ConfigManager()
-            broker_service = BrokerService(config_manager.config)
+            broker_service = BrokerService(get_app_resources().config)
             data_collector = DataCollector(broker_service)
 
             # 활성 계좌 목록 조회
@@ -398,26 +449,21 @@ class DataService:
                     'total_count': 0
                 }
 
-            collected_count = 0
-            failed_accounts = []
+            # 브로커별 동시 수집 실행 (완료 후 키움 상주 Worker 등 브로커 자원 정리)
+            try:
+                report = CollectionEngine(data_collector).run(active_accounts)
+            finally:
+                broker_service.close_all_connections()
 
-            # 각 활성 계좌의 데이터 수집
-            for account in active_accounts:
-                try:
-                    data_collector.collect_account_data(
-                        account['broker_name'],
-                        account['account_number']
-                    )
-                    collected_count += 1
-                    logger.info(f"계좌 {account['account_number']} 데이터 수집 완료")
+            # 컬럼형 캐시 갱신 (차트가 방금 수집한 잔고를 읽도록)
+            data_collector.refresh_columnar_store()
 
-                except Exception as e:
-                    failed_accounts.append({
-                        'account_number': account['account_number'],
-                        'broker_name': account['broker_name'],
-                        'error': str(e)
-                    })
-                    logger.error(f"계좌 {account['account_number']} 데이터 수집 실패: {str(e)}")
+            collected_count = report['collected_count']
+            failed_accounts = [{
+                'account_number': item['account_number'],
+                'broker_name': item['broker_name'],
+                'error': item['error']
+            } for item in report['results'] if item['status'] != 'success']
 
             # 결과 반환
             success = collected_count > 0
@@ -427,7 +473,9 @@ class DataService:
                 'success': success,
                 'collected_count': collected_count,
                 'total_count': total_count,
-                'failed_accounts': failed_accounts
+                'failed_accounts': failed_accounts,
+                'elapsed_seconds': report['elapsed_seconds'],
+                'report': report
             }
 
             if success:
@@ -453,5 +501,5 @@ class DataService:
     def close_session(self):
         """세션 종료"""
         if self.session:
-            self.session.close()
+            db_manager.remove_scoped_session()
             self.session = None
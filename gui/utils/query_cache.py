@@ -0,0 +1,135 @@
+"""
+GUI 조회 결과 캐시 (TTL + LRU, 수집 시 무효화)
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import pandas as pd
+from app.utils.data_generation import DataGeneration, data_generation
+
+
+class QueryCache:
+    """프로세스 전역 읽기 캐시
+
+    Streamlit은 상호작용마다 스크립트를 다시 실행하므로 조회 결과를 프로세스 메모리에 보관합니다.
+    - TTL: 다른 프로세스에서 저장한 데이터도 일정 시간 후 반영
+    - LRU: 항목 수가 max_entries를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+    - 세대(generation): DataCollector가 저장할 때마다 번호를 올려 이전 결과를 무효화
+
+    캐시된 값은 여러 화면에서 공유하므로 호출 측에서 수정하지 않아야 합니다.
+    """
+
+    DEFAULT_TTL = 60.0
+    DEFAULT_MAX_ENTRIES = 512
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL,
+                 generation: Optional[DataGeneration] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = generation or data_generation
+        self._entries: 'OrderedDict[Hashable, Tuple[int, float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stale': 0, 'evictions': 0}
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None,
+                    cache_empty: bool = True) -> Any:
+        """캐시에 있으면 반환, 없으면 loader 실행 후 저장
+
+        Args:
+            key: (쿼리명, 인자...) 형태의 키
+            loader: 캐시 미스 시 실행할 조회 함수
+            ttl: 항목별 유효 시간 (기본: ttl_seconds)
+            cache_empty: 빈 결과(None, [], {})도 저장할지 여부
+        """
+        generation = self.generation.current()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_generation, expires_at, value = entry
+                if entry_generation != generation:
+                    self._stats['stale'] += 1
+                    del self._entries[key]
+                elif expires_at <= now:
+                    self._stats['expired'] += 1
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+            self._stats['misses'] += 1
+
+        # 조회는 잠금 밖에서 실행 (느린 쿼리가 다른 키 조회를 막지 않도록)
+        value = loader()
+        if not cache_empty and (value is None or (hasattr(value, '__len__') and len(value) == 0)):
+            return value
+
+        with self._lock:
+            # 조회 중 세대가 바뀌었으면 이미 오래된 결과이므로 저장하지 않음
+            if self.generation.current() == generation:
+                self._entries[key] = (generation, now + (ttl if ttl is not None else self.ttl_seconds), value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats['evictions'] += 1
+        return value
+
+    def invalidate(self, query: Optional[str] = None):
+        """항목 삭제 (query 지정 시 해당 쿼리명 항목만)"""
+        with self._lock:
+            if query is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if isinstance(key, tuple) and key and key[0] == query]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """적중/미스 통계"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['generation'] = self.generation.current()
+        return stats
+
+    def reset_stats(self):
+        """통계 초기화"""
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = 0
+
+
+# 프로세스 전역 캐시
+query_cache = QueryCache()
+
+
+def _freeze(value: Any) -> Hashable:
+    """리스트/딕셔너리 인자를 키로 쓸 수 있도록 튜플로 변환"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def cached_query(name: str, ttl: Optional[float] = None, cache_empty: bool = False):
+    """DataService 조회 메서드용 캐시 데코레이터
+
+    키는 (쿼리명, 위치 인자, 키워드 인자)이며 첫 번째 인자는 보통 account_id입니다.
+    조회 실패 시 빈 결과를 반환하는 메서드가 많으므로 기본적으로 빈 결과는 저장하지 않습니다.
+    DataFrame은 호출 측 수정이 캐시에 반영되지 않도록 복사본을 반환합니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (name, _freeze(args), _freeze(tuple(sorted(kwargs.items()))))
+            value = query_cache.get_or_load(key, lambda: func(self, *args, **kwargs), ttl, cache_empty)
+            return value.copy() if isinstance(value, pd.DataFrame) else value
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
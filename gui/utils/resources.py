@@ -0,0 +1,59 @@
+"""
+GUI 프로세스 공용 자원 (설정, DB 엔진, 세션 팩토리)
+"""
+import threading
+from typing import Any, Dict, Optional
+from app.services.columnar_store import ColumnarStore
+from app.utils.database import db_manager, get_database_url
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AppResources:
+    """프로세스당 한 번만 만드는 자원 묶음
+
+    Streamlit은 상호작용마다 페이지 스크립트를 다시 실행하지만 import한 모듈은 유지되므로,
+    모듈 전역 레지스트리에 보관하면 설정 파싱/엔진 생성/스키마 확인을 프로세스당 한 번만 수행합니다.
+    """
+
+    def __init__(self, config: Dict[str, Any], database_url: str,
+                 columnar_store: Optional[ColumnarStore] = None):
+        self.config = config
+        self.database_url = database_url
+        self.columnar_store = columnar_store
+
+
+_resources: Optional[AppResources] = None
+_lock = threading.Lock()
+
+
+def get_app_resources() -> AppResources:
+    """공용 자원 조회 (최초 호출 시 생성)"""
+    global _resources
+    if _resources is not None:
+        return _resources
+
+    with _lock:
+        if _resources is None:
+            from app.utils.config import ConfigManager
+            config = ConfigManager().config
+            database_url = get_database_url(config.get('database', {}))
+            # 다른 진입점(스크립트, 테스트)에서 같은 DB로 이미 초기화했으면 재사용
+            if db_manager.engine is None or db_manager.database_url != database_url:
+                db_manager.init_database(database_url)
+            _resources = AppResources(config, database_url, ColumnarStore.from_config(config))
+            logger.info("GUI 공용 자원 초기화 완료")
+    return _resources
+
+
+def release_request_session():
+    """현재 요청(스크립트 실행 스레드)의 DB 세션 반환"""
+    db_manager.remove_scoped_session()
+
+
+def reset_app_resources():
+    """공용 자원 초기화 (설정 변경 후 다시 불러올 때)"""
+    global _resources
+    with _lock:
+        _resources = None
@@ -0,0 +1,55 @@
+"""
+컬럼형 분석 캐시(Parquet/NumPy) 내보내기 스크립트
+- 잔고/보유종목 스냅샷/거래내역을 테이블별, 월별 파일로 저장
+- 기본은 마지막 갱신 이후 변경된 월만 다시 쓰고, --full은 전체를 다시 만듦
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.config import ConfigManager
+from app.utils.database import db_manager, get_database_url
+from app.utils.logger import setup_logging
+from app.services.columnar_store import ColumnarStore, TABLES
+
+def main():
+    parser = argparse.ArgumentParser(description="컬럼형 분석 캐시 내보내기")
+    parser.add_argument("--full", action="store_true", help="전체 다시 내보내기")
+    parser.add_argument("--table", choices=list(TABLES), action="append", help="대상 테이블 (기본: 전체)")
+    parser.add_argument("--path", help="저장 디렉토리 (기본: columnar_cache.path 또는 ./data/columnar)")
+    parser.add_argument("--format", choices=["auto", "parquet", "npy"], help="저장 형식 (기본: auto)")
+    args = parser.parse_args()
+
+    config = ConfigManager().config
+    setup_logging(config)
+    db_manager.init_database(get_database_url(config.get('database', {})))
+
+    cache_config = config.get('columnar_cache', {})
+    store = ColumnarStore(
+        args.path or cache_config.get('path', './data/columnar'),
+        args.format or cache_config.get('format', 'auto')
+    )
+
+    print(f"=== 컬럼형 캐시 내보내기 ({store.format}, {store.base_dir}) ===")
+    started = time.perf_counter()
+    session = db_manager.get_session()
+    try:
+        refreshed = store.refresh(session, args.table, full=args.full)
+    finally:
+        session.close()
+
+    for table_name, partitions in refreshed.items():
+        rows = sum(store.manifest['tables'][table_name]['partitions'].get(p, 0) for p in partitions)
+        print(f"  {table_name:<20} 파티션 {len(partitions):>4}개, {rows:>10}행")
+    if not refreshed:
+        print("  변경된 데이터가 없습니다.")
+    print(f"\n완료: {time.perf_counter() - started:.2f}초")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
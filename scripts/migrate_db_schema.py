@@ -2,7 +2,9 @@
 데이터베이스 스키마 마이그레이션 스크립트
 - DailyBalance에 updated_at 컬럼 추가
 - Holding에 created_at, updated_at 컬럼 추가
-- UNIQUE 제약조건 추가
+- StockPerformance에 realized_profit_loss, unrealized_profit_loss 컬럼 추가
+- UNIQUE 제약조건(고유 인덱스) 추가
+- 신규 테이블 및 모델에 선언된 복합 인덱스 생성
 """
 import os
 import sys
@@ -11,9 +13,37 @@ from datetime import datetime
 import sqlite3
 
 # 프로젝트 루트 디렉토리를 Python 경로에 추가
-project_root = Path(__file__).parent
+project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# (인덱스 이름, 테이블, 컬럼) - 모델의 UniqueConstraint와 동일
+UNIQUE_INDEXES = [
+    ("uq_account_balance_date", "daily_balances", ["account_id", "balance_date"]),
+    ("uq_account_symbol", "holdings", ["account_id", "symbol"]),
+    ("uq_monthly_summary_account_month", "monthly_summaries", ["account_id", "year", "month"]),
+    ("uq_stock_performance_account_symbol", "stock_performances", ["account_id", "symbol"]),
+    ("uq_portfolio_analysis_account_date", "portfolio_analyses", ["account_id", "analysis_date"]),
+    ("uq_risk_metrics_account_date", "risk_metrics", ["account_id", "calculation_date"]),
+]
+
+# 분석 결과 테이블 (중복 시 최신 행만 유지, 다시 계산 가능)
+ANALYSIS_TABLES = [entry for entry in UNIQUE_INDEXES if entry[1] not in ("daily_balances", "holdings")]
+
+# 이전 버전에서 수동으로 만든 인덱스 (고유 인덱스로 대체)
+LEGACY_INDEXES = ["idx_daily_balances_account_date", "idx_holdings_account_symbol"]
+
+def _has_unique_index(cursor, table_name, index_columns):
+    """지정한 컬럼 구성의 고유 인덱스 존재 여부"""
+    cursor.execute(f"PRAGMA index_list({table_name})")
+    for index in cursor.fetchall():
+        index_name, is_unique = index[1], index[2]
+        if not is_unique:
+            continue
+        cursor.execute(f"PRAGMA index_info('{index_name}')")
+        if [column[2] for column in cursor.fetchall()] == index_columns:
+            return True
+    return False
+
 def migrate_database():
     """데이터베이스 스키마 마이그레이션"""
     db_path = "./data/stock_analyzer.db"
@@ -30,6 +60,7 @@ def migrate_database():
 
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
+    failed_steps = []  # 실패한 단계 (하나라도 있으면 마이그레이션 실패로 종료)
 
     try:
         print("=== 데이터베이스 스키마 마이그레이션 시작 ===")
@@ -52,6 +83,7 @@ def migrate_database():
 
         except Exception as e:
             print(f"  - DailyBalance 업데이트 실패: {e}")
+            failed_steps.append("DailyBalance")
 
         # 2. Holding 테이블에 created_at, updated_at 컬럼 추가
         print("2. Holding 테이블 업데이트 중...")
@@ -75,28 +107,31 @@ def migrate_database():
 
         except Exception as e:
             print(f"  - Holding 업데이트 실패: {e}")
+            failed_steps.append("Holding")
 
-        # 3. 인덱스 생성
-        print("3. 인덱스 생성 중...")
-        try:
-            # DailyBalance 인덱스
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_daily_balances_account_date
-                ON daily_balances(account_id, balance_date)
-            """)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        existing_tables = {row[0] for row in cursor.fetchall()}
 
-            # Holdings 인덱스
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_holdings_account_symbol
-                ON holdings(account_id, symbol)
-            """)
-            print("  - 인덱스 생성 완료")
+        # 2-1. StockPerformance 테이블에 실현/평가 손익 컬럼 추가
+        if 'stock_performances' in existing_tables:
+            print("2-1. StockPerformance 테이블 업데이트 중...")
+            try:
+                cursor.execute("PRAGMA table_info(stock_performances)")
+                columns = [column[1] for column in cursor.fetchall()]
 
-        except Exception as e:
-            print(f"  - 인덱스 생성 실패: {e}")
+                for column_name in ('realized_profit_loss', 'unrealized_profit_loss'):
+                    if column_name not in columns:
+                        cursor.execute(f"ALTER TABLE stock_performances ADD COLUMN {column_name} FLOAT DEFAULT 0.0")
+                        print(f"  - {column_name} 컬럼 추가 완료")
+                    else:
+                        print(f"  - {column_name} 컬럼이 이미 존재합니다")
 
-        # 4. 중복 데이터 정리 (필요한 경우)
-        print("4. 중복 데이터 정리 중...")
+            except Exception as e:
+                print(f"  - StockPerformance 업데이트 실패: {e}")
+                failed_steps.append("StockPerformance")
+
+        # 3. 중복 데이터 정리 (필요한 경우)
+        print("3. 중복 데이터 정리 중...")
         try:
             # DailyBalance 중복 데이터 제거 (가장 최신 것만 유지)
             cursor.execute("""
@@ -125,10 +160,70 @@ def migrate_database():
             else:
                 print("  - 중복 데이터 없음")
 
+            # 분석 결과 테이블 중복 제거
+            for _, table_name, index_columns in ANALYSIS_TABLES:
+                if table_name not in existing_tables:
+                    continue
+                cursor.execute(f"""
+                    DELETE FROM {table_name}
+                    WHERE id NOT IN (
+                        SELECT MAX(id)
+                        FROM {table_name}
+                        GROUP BY {', '.join(index_columns)}
+                    )
+                """)
+                if cursor.rowcount > 0:
+                    print(f"  - {table_name} 중복 제거: {cursor.rowcount}개")
+
         except Exception as e:
             print(f"  - 중복 데이터 정리 실패: {e}")
+            failed_steps.append("중복 데이터 정리")
+
+        # 4. 고유 인덱스 생성 (upsert의 ON CONFLICT 대상, 중복 정리 후 생성)
+        print("4. 고유 인덱스 생성 중...")
+        try:
+            for index_name, table_name, index_columns in UNIQUE_INDEXES:
+                if table_name not in existing_tables:
+                    continue
+                if _has_unique_index(cursor, table_name, index_columns):
+                    print(f"  - {table_name}({', '.join(index_columns)}) 고유 인덱스가 이미 존재합니다")
+                    continue
+                cursor.execute(
+                    f"CREATE UNIQUE INDEX {index_name} ON {table_name}({', '.join(index_columns)})"
+                )
+                print(f"  - {index_name} 생성 완료")
+
+            # 고유 인덱스와 중복되는 수동 인덱스 제거
+            for index_name in LEGACY_INDEXES:
+                cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+        except Exception as e:
+            print(f"  - 고유 인덱스 생성 실패: {e}")
+            failed_steps.append("고유 인덱스 생성")
 
         conn.commit()
+
+        # 5. 신규 테이블 및 모델에 선언된 복합 인덱스 생성
+        print("5. 모델 인덱스 생성 중...")
+        try:
+            from app.utils.database import db_manager
+            import app.models.account, app.models.aggregation, app.models.balance  # noqa: F401
+            import app.models.broker, app.models.holding, app.models.transaction  # noqa: F401
+
+            db_manager.init_database(f"sqlite:///{db_path}")
+            created = db_manager.ensure_indexes()
+            print(f"  - 인덱스 생성 완료 (추가 {len(created)}개)")
+            db_manager.close()
+
+        except Exception as e:
+            print(f"  - 모델 인덱스 생성 실패: {e}")
+            failed_steps.append("모델 인덱스 생성")
+
+        if failed_steps:
+            print(f"\n마이그레이션 실패 단계: {', '.join(failed_steps)}")
+            print(f"백업에서 복원하려면: cp {backup_path} {db_path}")
+            return False
+
         print("\n데이터베이스 마이그레이션 완료!")
 
         # 테이블 정보 출력
@@ -0,0 +1,92 @@
+"""
+분석 데이터 일괄 생성(백필) 스크립트
+- 전체 계좌의 월별 요약, 종목별 성과, 포트폴리오 분석, 위험 지표를 한 번에 계산하여 저장
+- 예: python scripts/run_batch_analysis.py --start 2022-01 --end 2024-12
+"""
+import argparse
+import calendar
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.config import ConfigManager
+from app.utils.database import db_manager, get_database_url
+from app.utils.logger import setup_logging
+from app.services.analysis_service import AnalysisService
+from app.services.batch_analysis import BatchAnalysisRunner
+
+# 모델들을 import하여 테이블 생성
+from app.models.broker import Broker
+from app.models.account import Account
+from app.models.balance import DailyBalance
+from app.models.holding import Holding, HoldingSnapshot
+from app.models.transaction import Transaction
+from app.models.aggregation import (
+    MonthlySummary, StockPerformance, PortfolioAnalysis,
+    TradingPattern, RiskMetrics
+)
+
+def parse_month(value: str) -> date:
+    """YYYY-MM 또는 YYYY-MM-DD 형식"""
+    for fmt in ('%Y-%m-%d', '%Y-%m'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"날짜 형식 오류: {value} (YYYY-MM 또는 YYYY-MM-DD)")
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 데이터 일괄 생성")
+    parser.add_argument("--start", type=parse_month, help="월별 요약 시작 월 (기본: 전체 기간)")
+    parser.add_argument("--end", type=parse_month, help="월별 요약 종료 월 (기본: 전체 기간)")
+    parser.add_argument("--as-of", type=parse_month, help="포트폴리오/위험 지표 기준일 (기본: 종료일 또는 오늘)")
+    parser.add_argument("--account-id", type=int, action="append", help="대상 계좌 ID (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--only", choices=["monthly", "stock", "portfolio", "risk"], action="append",
+                        help="계산할 항목만 지정 (여러 번 지정 가능, 기본: 전체)")
+    args = parser.parse_args()
+
+    config = ConfigManager().config
+    setup_logging(config)
+    db_manager.init_database(get_database_url(config.get('database', {})))
+
+    include = args.only or ["monthly", "stock", "portfolio", "risk"]
+    print(f"=== 분석 데이터 일괄 생성 ({', '.join(include)}) ===")
+    started = time.perf_counter()
+
+    as_of = args.as_of or date.today()
+    if not args.as_of and args.end:
+        month_end = args.end.replace(day=calendar.monthrange(args.end.year, args.end.month)[1])
+        as_of = min(month_end, date.today())
+
+    counts = {}
+    batch_items = [item for item in include if item != "risk"]
+    if batch_items:
+        runner = BatchAnalysisRunner(config)
+        try:
+            counts = runner.run(
+                account_ids=args.account_id, start_date=args.start, end_date=args.end,
+                analysis_date=as_of, include=batch_items
+            )
+        finally:
+            runner.close_session()
+
+    if "risk" in include:
+        service = AnalysisService(config)
+        try:
+            risk = service.generate_risk_metrics(as_of, args.account_id)
+            counts['risk_metrics'] = len(risk)
+        finally:
+            service.close_session()
+
+    for name, count in counts.items():
+        print(f"  {name:<20} {count:>8}건")
+    print(f"\n완료: {time.perf_counter() - started:.2f}초")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
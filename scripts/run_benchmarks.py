@@ -0,0 +1,84 @@
+"""
+성능 벤치마크 실행 스크립트
+- tests/test_benchmarks.py를 실행하여 결과를 data/benchmarks/에 JSON으로 저장
+- 직전 결과와 중앙값을 비교하여 느려진 항목 표시
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.benchmark import compare_results, get_git_commit
+
+def find_previous_result(output_dir: Path, scale: str, exclude: Path):
+    """같은 규모의 직전 벤치마크 결과 파일"""
+    candidates = sorted(
+        path for path in output_dir.glob(f"benchmark_{scale}_*.json") if path != exclude
+    )
+    return candidates[-1] if candidates else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock Analyzer 성능 벤치마크")
+    parser.add_argument("--scale", choices=["small", "medium", "large"], default="small", help="데이터 규모 (기본: small)")
+    parser.add_argument("--rounds", type=int, default=5, help="측정 반복 횟수 (기본: 5)")
+    parser.add_argument("--output-dir", default=str(project_root / "data" / "benchmarks"), help="결과 저장 디렉토리")
+    parser.add_argument("--threshold", type=float, default=1.2, help="느려짐 판정 배율 (기본: 1.2)")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output_path = output_dir / f"benchmark_{args.scale}_{timestamp}_{get_git_commit(str(project_root)) or 'nogit'}.json"
+
+    env = dict(os.environ)
+    env.update({
+        'BENCHMARK_SCALE': args.scale,
+        'BENCHMARK_ROUNDS': str(args.rounds),
+        'BENCHMARK_OUTPUT': str(output_path)
+    })
+
+    print(f"=== 벤치마크 실행 (규모: {args.scale}, 반복: {args.rounds}) ===")
+    result = subprocess.run(
+        [sys.executable, '-m', 'pytest', '-q', str(project_root / 'tests' / 'test_benchmarks.py')],
+        cwd=str(project_root), env=env
+    )
+    if result.returncode != 0 or not output_path.exists():
+        print("벤치마크 실행 실패")
+        return 1
+
+    with open(output_path, 'r', encoding='utf-8') as f:
+        current = json.load(f)
+
+    print(f"\n결과 저장: {output_path}")
+    for bench in current['benchmarks']:
+        print(f"  {bench['name']:<60} median {bench['median'] * 1000:10.3f} ms")
+
+    previous_path = find_previous_result(output_dir, args.scale, output_path)
+    if not previous_path:
+        print("\n비교할 이전 결과가 없습니다.")
+        return 0
+
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+
+    print(f"\n=== 이전 결과와 비교 ({previous_path.name}) ===")
+    regressions = 0
+    for item in compare_results(previous, current):
+        mark = ""
+        if item['ratio'] > args.threshold:
+            mark = "  <-- 느려짐"
+            regressions += 1
+        print(f"  {item['name']:<60} x{item['ratio']:.2f}{mark}")
+
+    print(f"\n느려진 항목: {regressions}개")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,7 +18,7 @@ from app.utils.config import ConfigManager
 from app.models.broker import Broker
 from app.models.account import Account
 from app.models.balance import DailyBalance
-from app.models.holding import Holding
+from app.models.holding import Holding, HoldingSnapshot
 from app.models.transaction import Transaction
 from app.models.aggregation import (
     MonthlySummary, StockPerformance, PortfolioAnalysis,
@@ -50,6 +50,7 @@ def show_table_columns():
         ("accounts", Account),
         ("daily_balances", DailyBalance),
         ("holdings", Holding),
+        ("holding_snapshots", HoldingSnapshot),
         ("transactions", Transaction),
         ("monthly_summaries", MonthlySummary),
         ("stock_performances", StockPerformance),
@@ -144,7 +145,7 @@ def show_summary():
     inspector = inspect(session.bind)
 
     table_names = [
-        "brokers", "accounts", "daily_balances", "holdings", "transactions",
+        "brokers", "accounts", "daily_balances", "holdings", "holding_snapshots", "transactions",
         "monthly_summaries", "stock_performances", "portfolio_analyses",
         "trading_patterns", "risk_metrics"
     ]
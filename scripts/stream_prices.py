@@ -0,0 +1,86 @@
+"""
+실시간 체결가 수신 및 보유종목 재평가 스크립트
+- 보유종목 전체를 한국투자증권 WebSocket으로 구독하고, 체결가가 바뀔 때마다 보유종목/잔고를 재평가
+- 재평가된 보유종목은 --flush-interval 초마다 holdings 테이블에 반영
+  (GUI는 별도 프로세스이므로 조회 캐시 TTL(기본 60초)이 지난 뒤 반영된 값을 표시)
+- 예: python scripts/stream_prices.py --flush-interval 10
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.config import ConfigManager
+from app.utils.database import db_manager, get_database_url
+from app.utils.logger import setup_logging
+from app.brokers.kis_realtime import KISRealtimeClient
+from app.services.broker_service import BrokerService
+from app.services.realtime_valuation import RealtimeValuation
+
+# 모델들을 import하여 테이블 등록
+from app.models.broker import Broker
+from app.models.account import Account
+from app.models.balance import DailyBalance
+from app.models.holding import Holding, HoldingSnapshot
+from app.models.transaction import Transaction
+
+def main():
+    parser = argparse.ArgumentParser(description="실시간 체결가 기반 보유종목 재평가")
+    parser.add_argument("--broker", default="한국투자증권", help="실시간 시세를 받을 브로커 이름")
+    parser.add_argument("--account-id", type=int, action="append", help="대상 계좌 ID (여러 번 지정 가능, 기본: 전체)")
+    parser.add_argument("--flush-interval", type=float, default=10.0, help="DB 반영 간격 (초)")
+    parser.add_argument("--duration", type=float, help="실행 시간 (초, 기본: Ctrl+C까지)")
+    args = parser.parse_args()
+
+    config = ConfigManager().config
+    setup_logging(config)
+    db_manager.init_database(get_database_url(config.get('database', {})))
+
+    broker_service = BrokerService(config)
+    broker = broker_service.get_broker(args.broker)
+    if not broker or not hasattr(broker, 'get_approval_key'):
+        print(f"ERROR: 실시간 시세를 지원하는 브로커를 찾을 수 없습니다: {args.broker}")
+        return 1
+    if not KISRealtimeClient.is_available():
+        print("ERROR: websocket-client가 설치되지 않았습니다. (pip install websocket-client)")
+        return 1
+    broker.connect()
+
+    valuation = RealtimeValuation()
+    session = db_manager.get_session()
+    client = KISRealtimeClient(broker, valuation.on_price)
+    try:
+        valuation.load(session, args.account_id)
+        symbols = valuation.symbols()
+        if not symbols:
+            print("보유종목이 없습니다.")
+            return 0
+
+        print(f"=== 실시간 체결가 구독: 종목 {len(symbols)}개 ===")
+        client.start(symbols)
+        started = time.monotonic()
+        while args.duration is None or time.monotonic() - started < args.duration:
+            time.sleep(args.flush_interval)
+            updated = valuation.flush(session)
+            # flush 중 보유종목을 다시 로드했으면 구독 종목도 맞춤
+            symbols = valuation.symbols()
+            client.unsubscribe([symbol for symbol in list(client.symbols) if symbol not in symbols])
+            client.subscribe(symbols)
+            print(f"  수신 {client.metrics['ticks']:>8}건, 시세 {len(valuation.price_table):>4}종목, "
+                  f"보유종목 {updated:>4}건 반영")
+
+    except KeyboardInterrupt:
+        print("\n중지합니다.")
+    finally:
+        client.stop()
+        valuation.flush(session)
+        session.close()
+        broker_service.close_all_connections()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
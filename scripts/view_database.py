@@ -23,7 +23,7 @@ from app.utils.config import ConfigManager
 from app.models.broker import Broker
 from app.models.account import Account
 from app.models.balance import DailyBalance
-from app.models.holding import Holding
+from app.models.holding import Holding, HoldingSnapshot
 from app.models.transaction import Transaction
 from app.models.aggregation import (
     MonthlySummary, StockPerformance, PortfolioAnalysis,
@@ -85,6 +85,7 @@ class DatabaseViewer:
             ("accounts", Account, "Account Info"),
             ("daily_balances", DailyBalance, "Daily Balance"),
             ("holdings", Holding, "Holdings"),
+            ("holding_snapshots", HoldingSnapshot, "Holding Snapshots"),
             ("transactions", Transaction, "Transactions"),
             ("monthly_summaries", MonthlySummary, "Monthly Summary"),
             ("stock_performances", StockPerformance, "Stock Performance"),
@@ -376,6 +377,8 @@ class DatabaseViewer:
                 self.format_float(perf.total_investment),
                 self.format_float(perf.current_value),
                 self.format_float(perf.total_profit_loss),
+                self.format_float(perf.realized_profit_loss),
+                self.format_float(perf.unrealized_profit_loss),
                 f"{perf.profit_loss_rate:.2f}%" if perf.profit_loss_rate else "0.00%",
                 f"{perf.holding_days}" if perf.holding_days else ""
             ])
@@ -384,7 +387,7 @@ class DatabaseViewer:
         print("STOCK PERFORMANCES TABLE")
         print("=" * 140)
         print(tabulate(data,
-                      headers=["Broker", "Account No", "Symbol", "Name", "Investment", "Current", "P&L", "Rate", "Days"],
+                      headers=["Broker", "Account No", "Symbol", "Name", "Investment", "Current", "P&L", "Realized", "Unrealized", "Rate", "Days"],
                       tablefmt="grid"))
         print(f"{len(performances)}")
 
@@ -394,6 +397,7 @@ class DatabaseViewer:
             ["brokers", "accounts", "1:N", "broker_id", "Broker-Account"],
             ["accounts", "daily_balances", "1:N", "account_id", "Account-Daily Balance"],
             ["accounts", "holdings", "1:N", "account_id", "Account-Holdings"],
+            ["accounts", "holding_snapshots", "1:N", "account_id", "Account-Holding Snapshots"],
             ["accounts", "transactions", "1:N", "account_id", "Account-Transactions"],
             ["accounts", "monthly_summaries", "1:N", "account_id", "Account-Monthly Summary"],
             ["accounts", "stock_performances", "1:N", "account_id", "Account-Stock Performance"],
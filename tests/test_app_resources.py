@@ -0,0 +1,55 @@
+"""
+GUI 공용 자원(설정/엔진/세션) 수명 관리 테스트
+"""
+import sys
+import threading
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils import config as config_module
+from app.utils.database import db_manager
+from gui.utils import resources
+from gui.utils.data_service import DataService
+
+
+def test_resources_created_once_and_sessions_scoped(tmp_path, monkeypatch):
+    """설정/DB 초기화는 한 번, 세션은 스레드(요청)별로 공유"""
+    loads = []
+
+    class FakeConfigManager:
+        def __init__(self):
+            loads.append(1)
+            self.config = {'database': {'type': 'sqlite', 'path': str(tmp_path / 'gui.db')}}
+
+    init_calls = []
+    original_init = db_manager.init_database
+    monkeypatch.setattr(config_module, 'ConfigManager', FakeConfigManager)
+    monkeypatch.setattr(db_manager, 'init_database', lambda url: init_calls.append(url) or original_init(url))
+    resources.reset_app_resources()
+
+    try:
+        services = [DataService() for _ in range(3)]
+        assert len(loads) == 1
+        assert len(init_calls) == 1
+
+        # 같은 요청 안에서는 같은 세션
+        session = services[0]._get_session()
+        assert all(service._get_session() is session for service in services)
+
+        # 다른 스레드(다른 사용자 요청)는 별도 세션
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db_manager.get_scoped_session()))
+        thread.start()
+        thread.join()
+        assert other[0] is not session
+
+        # 요청 종료 후에는 새 세션
+        resources.release_request_session()
+        assert DataService()._get_session() is not session
+        assert len(loads) == 1
+    finally:
+        resources.release_request_session()
+        resources.reset_app_resources()
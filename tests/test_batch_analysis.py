@@ -0,0 +1,119 @@
+"""
+일괄 분석 실행기 테스트
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sqlalchemy import event
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.models.aggregation import MonthlySummary, StockPerformance, PortfolioAnalysis
+from app.services.analysis_service import AnalysisService
+from app.services.batch_analysis import BatchAnalysisRunner
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+
+END_DATE = date(2024, 12, 31)
+CONFIG = {'analysis': {'risk_free_rate': 0.03}}
+
+MONTHLY_COLUMNS = [
+    'total_balance', 'total_investment', 'total_profit_loss', 'profit_loss_rate',
+    'total_transactions', 'total_buy_amount', 'total_sell_amount', 'total_fees',
+    'total_holdings', 'avg_holding_period', 'sharpe_ratio', 'max_drawdown', 'volatility'
+]
+STOCK_COLUMNS = [
+    'total_investment', 'current_value', 'total_profit_loss', 'profit_loss_rate',
+    'total_buy_quantity', 'total_sell_quantity', 'avg_buy_price', 'avg_sell_price',
+    'first_buy_date', 'last_sell_date', 'holding_days', 'max_profit_rate', 'max_loss_rate', 'avg_daily_return',
+    'realized_profit_loss', 'unrealized_profit_loss'
+]
+PORTFOLIO_COLUMNS = [
+    'total_assets', 'cash_ratio', 'stock_ratio', 'diversification_score', 'total_return',
+    'annualized_return', 'sharpe_ratio', 'sortino_ratio', 'volatility', 'max_drawdown', 'var_95', 'var_99'
+]
+
+
+@pytest.fixture
+def generator(tmp_path):
+    generator = SyntheticDataGenerator(account_count=3, symbol_count=8, years=1, end_date=END_DATE,
+                                       holdings_per_account=5)
+    db_manager.init_database(f"sqlite:///{tmp_path / 'batch.db'}")
+    generator.populate(db_manager.engine)
+    return generator
+
+
+def _assert_same(expected, actual, columns):
+    for column in columns:
+        left, right = getattr(expected, column), getattr(actual, column)
+        if isinstance(left, float) or isinstance(right, float):
+            assert np.isclose(left, right), column
+        else:
+            assert left == right, column
+
+
+def test_batch_matches_per_call_results(generator):
+    """일괄 계산 결과가 AnalysisService 건별 계산과 동일"""
+    analysis_date = generator.business_days[-1]
+    runner = BatchAnalysisRunner(CONFIG)
+    counts = runner.run(analysis_date=analysis_date)
+    runner.close_session()
+
+    session = db_manager.get_session()
+    try:
+        batch_monthly = {(m.account_id, m.year, m.month): m for m in session.query(MonthlySummary).all()}
+        batch_stocks = {(s.account_id, s.symbol): s for s in session.query(StockPerformance).all()}
+        batch_portfolio = {p.account_id: p for p in session.query(PortfolioAnalysis).all()}
+        session.expunge_all()
+    finally:
+        session.close()
+
+    assert counts['monthly_summaries'] == len(batch_monthly) == 3 * 12
+    assert counts['stock_performances'] == len(batch_stocks) == 3 * 8
+    assert counts['portfolio_analyses'] == len(batch_portfolio) == 3
+
+    service = AnalysisService(CONFIG)
+    try:
+        for (account_id, year, month), summary in list(batch_monthly.items())[::7]:
+            _assert_same(service.generate_monthly_summary(account_id, year, month), summary, MONTHLY_COLUMNS)
+        for (account_id, symbol), performance in list(batch_stocks.items())[::5]:
+            expected = service.generate_stock_performance(account_id, symbol, analysis_date)
+            _assert_same(expected, performance, STOCK_COLUMNS)
+            assert performance.name == f"종목{symbol}"
+        for account_id, analysis in batch_portfolio.items():
+            _assert_same(service.generate_portfolio_analysis(account_id, analysis_date), analysis, PORTFOLIO_COLUMNS)
+
+        # 건별 재계산은 같은 고유 행을 갱신
+        assert service._get_session().query(MonthlySummary).count() == 3 * 12
+    finally:
+        service.close_session()
+
+
+def test_batch_reads_each_table_once_and_reruns_in_place(generator):
+    """테이블별 한 번씩만 조회하고 재실행 시 행을 새로 만들지 않음"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    runner = BatchAnalysisRunner(CONFIG)
+    event.listen(db_manager.engine, 'before_cursor_execute', record)
+    try:
+        runner.run(start_date=date(2024, 6, 15), end_date=date(2024, 9, 1), include=['monthly'])
+    finally:
+        event.remove(db_manager.engine, 'before_cursor_execute', record)
+
+    assert statements.count('SELECT') == 3
+    session = runner._get_session()
+    months = sorted({(m.year, m.month) for m in session.query(MonthlySummary).all()})
+    assert months == [(2024, 6), (2024, 7), (2024, 8), (2024, 9)]
+
+    runner.run(start_date=date(2024, 6, 1), end_date=date(2024, 9, 30), include=['monthly'])
+    assert session.query(MonthlySummary).count() == 3 * 4
+    runner.close_session()
@@ -0,0 +1,263 @@
+"""
+합성 데이터 기반 성능 벤치마크 (브로커 API 없이 실행)
+
+BENCHMARK_SCALE=small|medium|large 로 데이터 규모를 정하고,
+BENCHMARK_OUTPUT 환경변수에 경로를 지정하면 결과를 JSON으로 저장합니다.
+커밋 간 비교는 scripts/run_benchmarks.py를 사용합니다.
+"""
+import os
+import random
+import sys
+import types
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.brokers.kis_broker import KISBroker
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.services.analysis_service import AnalysisService
+from app.services.batch_analysis import BatchAnalysisRunner
+from app.services.collection_engine import CollectionEngine
+from app.services.data_collector import DataCollector
+from app.utils.benchmark import BenchmarkRecorder
+from app.utils.chart_generator import ChartGenerator
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+from app.services.portfolio_aggregator import PortfolioAggregator
+from gui.utils.data_service import DataService
+from gui.utils.query_cache import query_cache
+
+SCALES = {
+    'small': {'account_count': 3, 'symbol_count': 30, 'years': 1},
+    'medium': {'account_count': 10, 'symbol_count': 200, 'years': 3},
+    'large': {'account_count': 50, 'symbol_count': 1000, 'years': 5},
+}
+ROUNDS = int(os.getenv('BENCHMARK_ROUNDS', '3'))
+REQUEST_LOOP = 1000  # 요청 경로 마이크로 벤치마크 반복 횟수
+
+
+class MockBroker:
+    """테스트용 브로커"""
+
+    def __init__(self, name, api_type):
+        self.name = name
+        self.api_type = api_type
+        self.config = {'api_settings': {}}
+
+    def is_connected(self):
+        return True
+
+
+class MockBrokerService:
+    """합성 스냅샷을 반환하는 브로커 서비스"""
+
+    def __init__(self, generator):
+        self.generator = generator
+        self.config = {}
+        self.brokers = {b['name']: MockBroker(b['name'], b['api_type']) for b in generator.BROKERS}
+        self.account_ids = {
+            generator.account_number(account_id): account_id
+            for account_id in range(1, generator.account_count + 1)
+        }
+
+    def get_broker(self, broker_name):
+        return self.brokers.get(broker_name)
+
+    def connect_broker(self, broker_name):
+        return True
+
+    def get_account_snapshot(self, broker_name, account_number):
+        return self.generator.generate_snapshot(self.account_ids[account_number])
+
+    def stream_account_snapshot(self, broker_name, account_number):
+        snapshot = self.get_account_snapshot(broker_name, account_number)
+        return {'balance': snapshot['balance'], 'holdings_pages': iter([snapshot['holdings']])}
+
+
+@pytest.fixture(scope='module')
+def generator():
+    return SyntheticDataGenerator(**SCALES[os.getenv('BENCHMARK_SCALE', 'small')])
+
+
+@pytest.fixture(scope='module')
+def recorder(generator):
+    recorder = BenchmarkRecorder({'scale': os.getenv('BENCHMARK_SCALE', 'small'), **generator.get_params()})
+    yield recorder
+    output = os.getenv('BENCHMARK_OUTPUT')
+    if output:
+        recorder.save(output)
+
+
+@pytest.fixture(scope='module')
+def database(tmp_path_factory, generator, recorder):
+    db_path = tmp_path_factory.mktemp('benchmark') / 'benchmark.db'
+    db_manager.init_database(f"sqlite:///{db_path}")
+    counts = recorder.measure('populate', generator.populate, db_manager.engine,
+                              rounds=1, warmup=0, group='setup')
+    recorder.metadata['row_counts'] = counts
+    return counts
+
+
+@pytest.fixture
+def benchmark(recorder, request):
+    """pytest-benchmark 호환 형태의 측정 fixture"""
+    group = request.node.name.replace('test_bench_', '')
+
+    def run(func, *args, **kwargs):
+        name = f"{group}.{getattr(func, '__name__', 'call')}"
+        return recorder.measure(name, func, *args, rounds=ROUNDS, group=group, **kwargs)
+
+    return run
+
+
+@pytest.fixture
+def data_service(database):
+    service = DataService.__new__(DataService)
+    service.session = None
+    service.columnar_store = None
+    service.portfolio_aggregator = PortfolioAggregator()
+    query_cache.invalidate()
+    yield service
+    service.close_session()
+
+
+def _uncached(method):
+    """조회 캐시를 거치지 않는 메서드 (DB 조회 비용 측정용)"""
+    return types.MethodType(method.__func__.uncached, method.__self__)
+
+
+def test_bench_data_service(benchmark, data_service):
+    """DataService 조회 (DB)"""
+    assert benchmark(_uncached(data_service.get_account_directory))
+    assert benchmark(_uncached(data_service.get_latest_balance), 1)
+    assert benchmark(_uncached(data_service.get_balance_history), 1, days=365)
+    assert not benchmark(_uncached(data_service.get_balance_frame), 1, days=365).empty
+    assert benchmark(_uncached(data_service.get_holdings), 1)
+    assert benchmark(_uncached(data_service.get_transactions), 1)
+    assert benchmark(_uncached(data_service.get_recent_transactions), 1)
+    benchmark(data_service.check_all_accounts_today_data)
+
+
+def test_bench_query_cache(benchmark, data_service):
+    """DataService 조회 (캐시 적중)"""
+    data_service.get_balance_history(1, days=365)
+    assert benchmark(data_service.get_balance_history, 1, days=365)
+    assert query_cache.get_stats()['hits'] > 0
+
+
+def test_bench_analysis_service(benchmark, database, generator):
+    """AnalysisService 분석 데이터 생성"""
+    service = AnalysisService()
+    last_day = generator.business_days[-1]
+    try:
+        assert benchmark(service.generate_monthly_summary, 1, last_day.year, last_day.month)
+        assert benchmark(service.generate_stock_performance, 1, generator.symbols[0])
+        assert benchmark(service.generate_portfolio_analysis, 1, last_day)
+        assert benchmark(service.generate_risk_metrics, last_day)
+    finally:
+        service.close_session()
+
+
+def test_bench_batch_analysis(benchmark, database, generator):
+    """BatchAnalysisRunner 전체 계좌 일괄 분석 (월별/종목/포트폴리오)"""
+    runner = BatchAnalysisRunner()
+    try:
+        counts = benchmark(runner.run, analysis_date=generator.business_days[-1])
+        assert counts['portfolio_analyses'] == generator.account_count
+    finally:
+        runner.close_session()
+
+
+def test_bench_chart_generator(benchmark, data_service):
+    """ChartGenerator 차트 생성"""
+    chart_generator = ChartGenerator()
+    balances = data_service.get_balance_history(1, days=365)
+    holdings = data_service.get_holdings(1)
+    monthly = {}
+    for item in sorted(balances, key=lambda b: b['balance_date']):
+        monthly[item['balance_date'][:7]] = {
+            'month': item['balance_date'][:7] + '-01',
+            'total_balance': item['total_balance'],
+            'profit_loss_rate': item['profit_loss_rate']
+        }
+
+    assert benchmark(chart_generator.create_portfolio_performance_chart, balances)
+    assert benchmark(chart_generator.create_holdings_pie_chart, holdings)
+    assert benchmark(chart_generator.create_holdings_performance_chart, holdings)
+    assert benchmark(chart_generator.create_monthly_summary_chart, list(monthly.values()))
+
+
+def test_bench_data_collector(benchmark, database, generator):
+    """DataCollector 저장 (mock 브로커)"""
+    broker_service = MockBrokerService(generator)
+    collector = DataCollector(broker_service)
+    accounts = [{
+        'broker_name': generator.BROKERS[(account_id - 1) % len(generator.BROKERS)]['name'],
+        'account_number': generator.account_number(account_id)
+    } for account_id in range(1, generator.account_count + 1)]
+    snapshot = generator.generate_snapshot(1)
+
+    benchmark(collector.save_account_data, accounts[0]['account_number'], snapshot)
+    report = benchmark(CollectionEngine(collector).run, accounts)
+    assert report['collected_count'] == generator.account_count
+
+
+def test_bench_kis_request_overhead(benchmark, tmp_path, monkeypatch):
+    """KIS 요청당 토큰 확인/인증 헤더 오버헤드 (HTTP 호출 제외, REQUEST_LOOP회 반복)"""
+    monkeypatch.chdir(tmp_path)
+    broker = KISBroker({
+        'name': '한국투자증권',
+        'api_type': 'kis',
+        'enabled': True,
+        'credentials': {'app_key': 'test-key', 'app_secret': 'test-secret'},
+        'api_settings': {}
+    })
+    broker.connected = True
+    broker.token_manager.save_token('token', expires_in=86400)
+    response = types.SimpleNamespace(raise_for_status=lambda: None)
+    monkeypatch.setattr(broker.session, 'request', lambda method, url, **kwargs: response)
+    token_file_path = broker.token_manager.token_file_path
+    token_info = broker.token_manager.get_token()
+
+    def per_request_parse():
+        """비교 기준: 요청마다 토큰 파일 확인 + 만료 시각 파싱 + 인증 헤더 구성"""
+        for _ in range(REQUEST_LOOP):
+            os.stat(token_file_path)
+            expires_at = datetime.fromisoformat(token_info['expires_at'])
+            assert expires_at > datetime.now() + timedelta(seconds=broker.TOKEN_EXPIRY_MARGIN)
+            headers = {'tr_id': 'TEST'}
+            headers.update({
+                'authorization': f"Bearer {token_info['access_token']}",
+                'appkey': broker.app_key,
+                'appsecret': broker.app_secret
+            })
+
+    def ensure_token():
+        for _ in range(REQUEST_LOOP):
+            broker._ensure_token()
+
+    def make_request():
+        for _ in range(REQUEST_LOOP):
+            broker._make_request('GET', 'https://example.invalid', headers={'tr_id': 'TEST'})
+
+    benchmark(per_request_parse)
+    benchmark(ensure_token)
+    benchmark(make_request)
+    assert broker.session.headers['authorization'] == 'Bearer token'
+
+
+def test_generator_is_deterministic():
+    """같은 seed와 종료일이면 같은 데이터 생성"""
+    params = {'account_count': 2, 'symbol_count': 10, 'years': 1, 'end_date': date(2024, 12, 31)}
+    first = SyntheticDataGenerator(**params)
+    second = SyntheticDataGenerator(**params)
+    prices = first._price_paths(random.Random(first.seed))
+
+    assert prices == second._price_paths(random.Random(second.seed))
+    assert first.generate_account_rows(1, prices) == second.generate_account_rows(1, prices)
+    assert first.generate_snapshot(2) == second.generate_snapshot(2)
@@ -0,0 +1,206 @@
+"""
+보유종목/잔고 대량 저장(upsert) 테스트 (SQLite 임시 DB 사용)
+"""
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import event
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.models.account import Account
+from app.models.balance import DailyBalance
+from app.models.broker import Broker
+from app.models.holding import Holding, HoldingSnapshot
+from app.services.data_collector import DataCollector
+from app.utils.database import db_manager
+
+
+def _holding(symbol, price):
+    return {'symbol': symbol, 'name': symbol, 'quantity': 10, 'average_price': 100,
+            'current_price': price, 'evaluation_amount': price * 10, 'profit_loss': 0, 'profit_loss_rate': 0}
+
+
+def create_collector(tmp_path):
+    """임시 DB와 계좌 1개를 준비한 수집기 생성"""
+    db_manager.init_database(f"sqlite:///{tmp_path / 'test.db'}")
+    session = db_manager.get_session()
+    session.add(Broker(id=1, name='테스트', api_type='kis', platform='rest'))
+    session.add(Account(id=1, broker_id=1, account_number='1234567801', account_type='stock'))
+    session.commit()
+    session.close()
+    return DataCollector(broker_service=None)
+
+
+def test_snapshot_upsert_statement_count(tmp_path):
+    """스냅샷 저장 문장 수는 보유종목 수와 무관"""
+    collector = create_collector(tmp_path)
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(db_manager.engine, 'before_cursor_execute', count_statement)
+    try:
+        snapshot = {'balance': {'total_balance': 1000},
+                    'holdings': [_holding(f"{i:06d}", 100 + i) for i in range(50)]}
+        collector.save_account_data('1234567801', snapshot)
+        first_run = list(statements)
+
+        statements.clear()
+        snapshot = {'balance': {'total_balance': 2000},
+                    'holdings': [_holding(f"{i:06d}", 200 + i) for i in range(1, 60)]}
+        collector.save_account_data('1234567801', snapshot)
+    finally:
+        event.remove(db_manager.engine, 'before_cursor_execute', count_statement)
+
+    # 첫 저장: 계좌 ID + 지표 상태 + 잔고 이력(상태 최초 구성)
+    # 두 번째 저장: 계좌 ID는 캐시되어 지표 상태 조회만 실행
+    assert first_run.count('SELECT') == 3
+    assert statements.count('SELECT') == 1
+    # 잔고 1 + 보유종목(현재/스냅샷) 배치 2 + 지표 상태 1, 삭제는 현재/스냅샷 각 1
+    assert statements.count('INSERT') == 4 and statements.count('DELETE') == 2
+
+    session = db_manager.get_session()
+    try:
+        holdings = {h.symbol: h.current_price for h in session.query(Holding).all()}
+        balances = session.query(DailyBalance).all()
+    finally:
+        session.close()
+
+    assert len(holdings) == 59 and '000000' not in holdings
+    assert holdings['000001'] == 201
+    assert len(balances) == 1 and balances[0].total_balance == 2000
+
+
+def test_empty_holdings_clear_account(tmp_path):
+    """보유종목이 없으면 기존 보유종목 삭제"""
+    collector = create_collector(tmp_path)
+    collector._save_holdings_data('1234567801', [_holding('005930', 70000)])
+    collector._save_holdings_data('1234567801', [])
+
+    session = db_manager.get_session()
+    try:
+        assert session.query(Holding).count() == 0
+    finally:
+        session.close()
+
+
+def test_snapshots_keep_history(tmp_path):
+    """이전 날짜 스냅샷은 유지되고 당일 재수집은 당일 스냅샷만 갱신"""
+    from datetime import date, timedelta
+
+    collector = create_collector(tmp_path)
+    writer = collector.bulk_writer
+    yesterday = date.today() - timedelta(days=1)
+
+    session = db_manager.get_session()
+    try:
+        writer.replace_holdings(session, 1, [[_holding('005930', 70000), _holding('035720', 50000)]],
+                                snapshot_date=yesterday)
+        writer.replace_holdings(session, 1, [[_holding('005930', 71000)]])
+        writer.replace_holdings(session, 1, [[_holding('005930', 72000)]])
+        session.commit()
+
+        current = [(h.symbol, h.current_price) for h in session.query(Holding).all()]
+        history = sorted(
+            (s.snapshot_date, s.symbol, s.current_price) for s in session.query(HoldingSnapshot).all()
+        )
+    finally:
+        session.close()
+
+    assert current == [('005930', 72000)]
+    assert history == [
+        (yesterday, '005930', 70000),
+        (yesterday, '035720', 50000),
+        (date.today(), '005930', 72000)
+    ]
+
+
+def test_metrics_state_failure_keeps_balance(tmp_path, monkeypatch):
+    """지표 상태 갱신이 실패하면 세이브포인트만 되돌리고 잔고는 저장"""
+    from app.models.aggregation import MetricsState
+
+    collector = create_collector(tmp_path)
+
+    def failing_advance(session, account_id, balance_date, total_balance):
+        session.add(MetricsState(account_id=account_id, last_balance_date=balance_date))
+        session.flush()
+        raise RuntimeError('지표 상태 갱신 실패')
+
+    monkeypatch.setattr(collector.metrics_updater, 'advance', failing_advance)
+    collector.save_account_data('1234567801', {'balance': {'total_balance': 1000}, 'holdings': [_holding('000001', 100)]})
+
+    session = db_manager.get_session()
+    try:
+        assert [b.total_balance for b in session.query(DailyBalance).all()] == [1000]
+        assert session.query(MetricsState).count() == 0
+        assert session.query(Holding).count() == 1
+    finally:
+        session.close()
+
+
+def test_collector_saves_continuation_pages_as_they_arrive(tmp_path, monkeypatch):
+    """수집 경로에서 연속조회 페이지는 도착하는 대로 저장 (다음 페이지 조회 전에 이전 페이지 upsert)"""
+    from app.brokers.kis_broker import KISBroker
+
+    collector = create_collector(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    broker = KISBroker({
+        'name': '한국투자증권',
+        'api_type': 'kis',
+        'enabled': True,
+        'credentials': {'app_key': 'test-key', 'app_secret': 'test-secret'},
+        'api_settings': {}
+    })
+    broker.connected = True
+
+    class Response:
+        def __init__(self, page, last):
+            self.headers = {'tr_cont': 'D' if last else 'M'}
+            self._data = {
+                'output1': [{'pdno': f"{page:06d}", 'prdt_name': f"종목{page}", 'hldg_qty': '1',
+                             'pchs_avg_pric': '100', 'prpr': '100', 'evlu_amt': '100'}],
+                'output2': [{'dnca_tot_amt': '1000', 'tot_evlu_amt': '1300'}],
+                'ctx_area_fk100': f"FK{page}", 'ctx_area_nk100': '' if last else f"NK{page}"
+            }
+
+        def json(self):
+            return self._data
+
+    inserts = []
+    requested_after_inserts = []
+
+    def fake_request(method, url, **kwargs):
+        page = len(requested_after_inserts)
+        requested_after_inserts.append(len(inserts))
+        return Response(page, last=page == 2)
+
+    def count_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO holding'):
+            inserts.append(statement)
+
+    class Service:
+        def stream_account_snapshot(self, broker_name, account_number):
+            return broker.stream_account_snapshot(account_number)
+
+    monkeypatch.setattr(broker, '_make_request', fake_request)
+    collector.broker_service = Service()
+    event.listen(db_manager.engine, 'before_cursor_execute', count_insert)
+    try:
+        snapshot = collector.fetch_account_data('한국투자증권', '1234567801')
+        # 페이지 이터레이터를 소비하기 전에는 첫 페이지만 요청
+        assert requested_after_inserts == [0]
+        collector.save_account_data('1234567801', snapshot)
+    finally:
+        event.remove(db_manager.engine, 'before_cursor_execute', count_insert)
+
+    # 페이지마다 현재/스냅샷 upsert 2건이 다음 페이지 요청 전에 실행
+    assert requested_after_inserts == [0, 2, 4]
+    session = db_manager.get_session()
+    try:
+        assert sorted(h.symbol for h in session.query(Holding).all()) == ['000000', '000001', '000002']
+    finally:
+        session.close()
@@ -0,0 +1,58 @@
+"""
+GUI 차트 서비스 메모리 렌더링 테스트
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import plotly.graph_objects as go
+import pytest
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.portfolio_aggregator import PortfolioAggregator
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+from gui.utils.chart_service import ChartService
+from gui.utils.data_service import DataService
+from gui.utils.query_cache import query_cache
+
+
+@pytest.fixture
+def chart_service(tmp_path, monkeypatch):
+    generator = SyntheticDataGenerator(account_count=2, symbol_count=6, years=1, holdings_per_account=4)
+    db_manager.init_database(f"sqlite:///{tmp_path / 'charts.db'}")
+    generator.populate(db_manager.engine)
+    monkeypatch.chdir(tmp_path)
+    query_cache.invalidate()
+
+    service = DataService.__new__(DataService)
+    service.session = None
+    service.columnar_store = None
+    service.portfolio_aggregator = PortfolioAggregator()
+    yield ChartService(service)
+    service.close_session()
+
+
+def test_charts_render_in_memory(chart_service, tmp_path):
+    """기본 렌더링은 파일을 쓰지 않고 CDN plotly.js를 참조하는 HTML 조각 반환"""
+    assert isinstance(chart_service.get_holdings_pie_figure([1, 2]), go.Figure)
+
+    html = chart_service.create_holdings_pie_chart([1, 2])
+    assert 'cdn.plot.ly' in html
+    assert '<html>' not in html
+    # plotly.js 번들(수 MB)을 포함하지 않음
+    assert len(html) < 200_000
+
+    assert chart_service.create_portfolio_performance_chart(1, days=90)
+    assert chart_service.create_monthly_return_chart([1, 2], date.today().year)
+    assert not (tmp_path / 'data').exists()
+
+
+def test_export_is_explicit(chart_service, tmp_path):
+    """export=True일 때만 파일로 저장"""
+    html = chart_service.create_holdings_performance_chart(1, export=True)
+    files = list((tmp_path / 'data' / 'charts').glob('holdings_performance_1_*.html'))
+    assert html and len(files) == 1
@@ -0,0 +1,248 @@
+"""
+다중 계좌 동시 수집 엔진 테스트 (브로커 API 없이 실행)
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.collection_engine import CollectionEngine
+
+
+class FakeBroker:
+    """테스트용 브로커"""
+
+    def __init__(self, name, api_type, delay=0.0, api_settings=None):
+        self.name = name
+        self.api_type = api_type
+        self.config = {'api_settings': api_settings or {}}
+        self.delay = delay
+        self.connected = False
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def is_connected(self):
+        return self.connected
+
+
+class FakeBrokerService:
+    """테스트용 브로커 서비스"""
+
+    def __init__(self, brokers, config=None):
+        self.brokers = {broker.name: broker for broker in brokers}
+        self.config = config or {}
+
+    def get_broker(self, broker_name):
+        return self.brokers.get(broker_name)
+
+    def connect_broker(self, broker_name):
+        self.brokers[broker_name].connected = True
+        return True
+
+
+class FakeCollector:
+    """테스트용 데이터 수집기"""
+
+    def __init__(self, broker_service, fail_accounts=()):
+        self.broker_service = broker_service
+        self.fail_accounts = set(fail_accounts)
+        self.saved = []
+        self.save_threads = set()
+
+    def fetch_account_data(self, broker_name, account_number):
+        broker = self.broker_service.get_broker(broker_name)
+        with broker.lock:
+            broker.active += 1
+            broker.max_active = max(broker.max_active, broker.active)
+        try:
+            time.sleep(broker.delay)
+            if account_number in self.fail_accounts:
+                raise Exception("조회 실패")
+            return {'balance': {'total_balance': 1}, 'holdings': []}
+        finally:
+            with broker.lock:
+                broker.active -= 1
+
+    def save_account_data(self, account_number, snapshot):
+        self.save_threads.add(threading.get_ident())
+        self.saved.append(account_number)
+
+
+def _accounts(broker_name, count):
+    return [{'broker_name': broker_name, 'account_number': f"{broker_name}-{i}"} for i in range(count)]
+
+
+def test_concurrent_collection_respects_broker_limits():
+    """브로커별 동시성 제한 및 병렬 실행 확인"""
+    kis = FakeBroker('KIS', 'kis', delay=0.1)
+    kiwoom = FakeBroker('Kiwoom', 'kiwoom', delay=0.05)
+    service = FakeBrokerService([kis, kiwoom], {'collection': {'broker_concurrency': {'kis': 4}}})
+    collector = FakeCollector(service)
+
+    start = time.monotonic()
+    report = CollectionEngine(collector, max_workers=8).run(_accounts('KIS', 8) + _accounts('Kiwoom', 3))
+    elapsed = time.monotonic() - start
+
+    assert report['total_count'] == 11
+    assert report['collected_count'] == 11
+    assert kis.max_active <= 4 and kis.max_active > 1
+    assert kiwoom.max_active == 1
+    # 순차 실행이면 0.95초 이상 소요
+    assert elapsed < 0.8
+    # DB 저장은 호출 스레드에서만 실행
+    assert collector.save_threads == {threading.get_ident()}
+    assert report['brokers']['KIS']['success'] == 8
+
+
+def test_failures_and_timeouts_are_reported():
+    """실패/타임아웃 계좌 리포트 확인"""
+    slow = FakeBroker('Slow', 'kis', delay=1.0)
+    fast = FakeBroker('Fast', 'kis', delay=0.0)
+    service = FakeBrokerService([slow, fast])
+    collector = FakeCollector(service, fail_accounts={'Fast-1'})
+
+    report = CollectionEngine(collector, account_timeout=0.3).run(_accounts('Slow', 1) + _accounts('Fast', 2))
+    statuses = {r['account_number']: r['status'] for r in report['results']}
+
+    assert statuses == {'Slow-0': 'timeout', 'Fast-0': 'success', 'Fast-1': 'failed'}
+    assert report['timeout_count'] == 1
+    assert report['failed_count'] == 1
+    assert collector.saved == ['Fast-0']
+
+
+def test_batch_broker_collects_accounts_in_one_job():
+    """일괄 조회 지원 브로커는 계좌를 묶어서 한 번에 조회"""
+    kiwoom = FakeBroker('Kiwoom', 'kiwoom')
+    kiwoom.supports_batch_snapshot = True
+    service = FakeBrokerService([kiwoom])
+    collector = FakeCollector(service, fail_accounts={'Kiwoom-1'})
+    batches = []
+
+    def fetch_accounts_data(broker_name, account_numbers):
+        batches.append(list(account_numbers))
+        return {
+            account_number: ({'error': '조회 실패'} if account_number in collector.fail_accounts
+                             else {'balance': {'total_balance': 1}, 'holdings': []})
+            for account_number in account_numbers
+        }
+
+    collector.fetch_accounts_data = fetch_accounts_data
+
+    report = CollectionEngine(collector).run(_accounts('Kiwoom', 3))
+    statuses = {r['account_number']: r['status'] for r in report['results']}
+
+    assert batches == [['Kiwoom-0', 'Kiwoom-1', 'Kiwoom-2']]
+    assert statuses == {'Kiwoom-0': 'success', 'Kiwoom-1': 'failed', 'Kiwoom-2': 'success'}
+    assert collector.saved == ['Kiwoom-0', 'Kiwoom-2']
+
+
+def test_hung_call_does_not_block_queued_accounts():
+    """동시성 1 브로커에서 호출이 멈춰도 뒤에서 기다리던 계좌까지 타임아웃 처리 후 종료"""
+    kiwoom = FakeBroker('Kiwoom', 'kiwoom')
+    fast = FakeBroker('Fast', 'kis')
+    service = FakeBrokerService([kiwoom, fast])
+    collector = FakeCollector(service)
+    release = threading.Event()
+    fetch_account_data = collector.fetch_account_data
+    fetched = []
+
+    def hanging_fetch(broker_name, account_number):
+        fetched.append(account_number)
+        if account_number == 'Kiwoom-0':
+            release.wait()  # 응답 없는 호출 (슬롯을 놓지 않음)
+        return fetch_account_data(broker_name, account_number)
+
+    collector.fetch_account_data = hanging_fetch
+    try:
+        start = time.monotonic()
+        report = CollectionEngine(collector, account_timeout=0.3).run(_accounts('Kiwoom', 2) + _accounts('Fast', 1))
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+
+    statuses = {r['account_number']: r['status'] for r in report['results']}
+    assert statuses == {'Kiwoom-0': 'timeout', 'Kiwoom-1': 'timeout', 'Fast-0': 'success'}
+    assert elapsed < 2.0
+    # 대기하던 계좌는 슬롯을 얻지 못한 채 타임아웃
+    time.sleep(0.1)
+    assert 'Kiwoom-1' not in fetched
+    assert collector.saved == ['Fast-0']
+
+
+class PagedCollector(FakeCollector):
+    """연속조회 페이지 이터레이터를 반환하는 테스트용 수집기"""
+
+    def __init__(self, broker_service, page_count=4, hang_accounts=()):
+        super().__init__(broker_service)
+        self.page_count = page_count
+        self.hang_accounts = set(hang_accounts)
+        self.release = threading.Event()
+        self.fetch_threads = set()
+        self.saved_pages = {}
+
+    def fetch_account_data(self, broker_name, account_number):
+        broker = self.broker_service.get_broker(broker_name)
+        with broker.lock:
+            broker.active += 1
+            broker.max_active = max(broker.max_active, broker.active)
+
+        def holdings_pages():
+            try:
+                for page in range(self.page_count):
+                    self.fetch_threads.add(threading.get_ident())
+                    if page == 1 and account_number in self.hang_accounts:
+                        self.release.wait()  # 연속조회 응답 없음
+                    time.sleep(0.02)
+                    yield [f"{account_number}-{page}"]
+            finally:
+                with broker.lock:
+                    broker.active -= 1
+
+        return {'balance': {'total_balance': 1}, 'holdings_pages': holdings_pages()}
+
+    def save_account_data(self, account_number, snapshot):
+        self.save_threads.add(threading.get_ident())
+        pages = self.saved_pages.setdefault(account_number, [])
+        for page in snapshot['holdings_pages']:
+            pages.extend(page)
+        self.saved.append(account_number)
+
+
+def test_continuation_pages_are_fetched_while_holding_broker_slot():
+    """연속조회 페이지는 브로커 슬롯을 잡은 워커 스레드에서 조회하고 호출 스레드에서 저장"""
+    kiwoom = FakeBroker('Kiwoom', 'kiwoom')
+    service = FakeBrokerService([kiwoom])
+    collector = PagedCollector(service)
+
+    report = CollectionEngine(collector).run(_accounts('Kiwoom', 3))
+
+    assert report['collected_count'] == 3
+    assert kiwoom.max_active == 1
+    assert threading.get_ident() not in collector.fetch_threads
+    assert collector.save_threads == {threading.get_ident()}
+    assert collector.saved_pages == {
+        f"Kiwoom-{i}": [f"Kiwoom-{i}-{page}" for page in range(4)] for i in range(3)
+    }
+
+
+def test_hung_continuation_page_times_out():
+    """연속조회 페이지 응답이 멈추면 계좌 타임아웃 후 다음 계좌 수집"""
+    kis = FakeBroker('KIS', 'kis')
+    service = FakeBrokerService([kis])
+    collector = PagedCollector(service, hang_accounts={'KIS-0'})
+    try:
+        start = time.monotonic()
+        report = CollectionEngine(collector, account_timeout=0.3).run(_accounts('KIS', 2))
+        elapsed = time.monotonic() - start
+    finally:
+        collector.release.set()
+
+    statuses = {r['account_number']: r['status'] for r in report['results']}
+    assert statuses == {'KIS-0': 'timeout', 'KIS-1': 'success'}
+    assert elapsed < 2.0
+    assert collector.saved == ['KIS-1']
@@ -0,0 +1,241 @@
+"""
+컬럼형 분석 캐시 테스트
+"""
+import importlib.util
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import select, update
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.models.balance import DailyBalance
+from app.services.batch_analysis import BatchAnalysisRunner
+from app.services.columnar_store import ColumnarStore
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+
+END_DATE = date(2024, 12, 31)
+FORMATS = ['npy', pytest.param('parquet', marks=pytest.mark.skipif(
+    importlib.util.find_spec('pyarrow') is None, reason='pyarrow 미설치'))]
+
+
+@pytest.fixture
+def session(tmp_path):
+    generator = SyntheticDataGenerator(account_count=2, symbol_count=6, years=1, end_date=END_DATE,
+                                       holdings_per_account=4)
+    db_manager.init_database(f"sqlite:///{tmp_path / 'columnar.db'}")
+    generator.populate(db_manager.engine)
+    session = db_manager.get_session()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize('format', FORMATS)
+def test_read_matches_database_with_pruning(session, tmp_path, format):
+    """월/컬럼/계좌 필터로 읽은 결과가 DB 조회와 동일"""
+    store = ColumnarStore(str(tmp_path / 'cache'), format)
+    refreshed = store.refresh(session)
+    assert len(refreshed['daily_balances']) == 12
+    assert refreshed['holdings'] == ['current']
+
+    frame = store.read('daily_balances', ['balance_date', 'total_balance'], [2],
+                       date(2024, 3, 10), date(2024, 5, 20))
+    expected = session.execute(
+        select(DailyBalance.balance_date, DailyBalance.total_balance)
+        .where(DailyBalance.account_id == 2, DailyBalance.balance_date.between(date(2024, 3, 10), date(2024, 5, 20)))
+        .order_by(DailyBalance.balance_date)
+    ).all()
+
+    assert list(frame.columns) == ['balance_date', 'total_balance']
+    assert [d.date() for d in frame['balance_date']] == [row[0] for row in expected]
+    assert np.allclose(frame['total_balance'], [row[1] for row in expected])
+
+    transactions = store.read('transactions', ['symbol', 'transaction_type'])
+    assert set(transactions['transaction_type']) == {'BUY', 'SELL'}
+
+    # 다른 인스턴스도 매니페스트로 같은 캐시를 읽음
+    assert len(ColumnarStore(str(tmp_path / 'cache'), format).read('holdings')) == 8
+
+
+def test_incremental_refresh_rewrites_changed_months_only(session, tmp_path):
+    """변경된 행이 속한 월만 다시 씀"""
+    store = ColumnarStore(str(tmp_path / 'cache'), 'npy')
+    store.refresh(session)
+    assert store.refresh(session) == {}
+
+    session.execute(
+        update(DailyBalance)
+        .where(DailyBalance.account_id == 1, DailyBalance.balance_date == date(2024, 7, 1))
+        .values(total_balance=123.0, updated_at=datetime(2030, 1, 1))
+    )
+    session.commit()
+
+    refreshed = store.refresh(session, ['daily_balances'])
+    assert refreshed == {'daily_balances': ['2024-07']}
+
+    frame = store.read('daily_balances', ['total_balance'], [1], date(2024, 7, 1), date(2024, 7, 1))
+    assert frame['total_balance'].tolist() == [123.0]
+    assert store.refresh(session, ['daily_balances']) == {}
+
+
+def test_refresh_drops_deleted_rows(session, tmp_path):
+    """보유종목 교체처럼 삭제만 된 행도 다음 갱신에서 캐시에서 빠짐"""
+    from sqlalchemy import delete
+    from app.models.holding import Holding, HoldingSnapshot
+
+    store = ColumnarStore(str(tmp_path / 'cache'), 'npy')
+    symbol = session.execute(select(Holding.symbol).where(Holding.account_id == 1)).scalars().first()
+    session.add_all([HoldingSnapshot(account_id=account_id, snapshot_date=END_DATE, symbol=symbol, name=symbol)
+                     for account_id in (1, 2)])
+    session.commit()
+    store.refresh(session)
+
+    session.execute(delete(Holding).where(Holding.account_id == 1, Holding.symbol == symbol))
+    session.execute(delete(HoldingSnapshot).where(HoldingSnapshot.account_id == 1,
+                                                  HoldingSnapshot.snapshot_date == END_DATE))
+    session.execute(delete(DailyBalance).where(DailyBalance.balance_date < date(2024, 2, 1)))
+    session.commit()
+
+    refreshed = store.refresh(session)
+    assert refreshed == {'holding_snapshots': ['2024-12'], 'holdings': ['current'],
+                         'daily_balances': ['2024-01']}
+    holdings = store.read('holdings', ['account_id', 'symbol'])
+    assert len(holdings) == session.query(Holding).count()
+    assert symbol not in holdings[holdings['account_id'] == 1]['symbol'].tolist()
+    assert store.read('holding_snapshots', ['account_id'])['account_id'].tolist() == [2]
+    assert store.read('daily_balances', ['total_balance'], end_date=date(2024, 1, 31)).empty
+    assert store.refresh(session) == {}
+
+
+def test_npy_partitions_are_memory_mapped(session, tmp_path):
+    """NumPy 형식은 요청한 컬럼만 메모리 맵으로 읽음"""
+    store = ColumnarStore(str(tmp_path / 'cache'), 'npy')
+    store.refresh(session, ['daily_balances'])
+
+    partition = store._read_partition('daily_balances', '2024-06', ['total_balance'])
+    assert list(partition.columns) == ['total_balance']
+
+    base = partition['total_balance'].to_numpy()
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    assert isinstance(base, np.memmap)
+
+
+def test_batch_runner_reads_from_store(session, tmp_path):
+    """일괄 분석은 캐시에서 읽어도 DB에서 읽은 결과와 동일"""
+    config = {'columnar_cache': {'enabled': True, 'path': str(tmp_path / 'cache'), 'format': 'npy'}}
+    store = ColumnarStore.from_config(config)
+    store.refresh(session)
+
+    cached = BatchAnalysisRunner(config)
+    direct = BatchAnalysisRunner()
+    try:
+        from_store = cached.load_frames(session)
+        from_db = direct.load_frames(session)
+        analysis_date = date(2024, 12, 31)
+
+        monthly = [runner.compute_monthly_summaries(frames) for runner, frames
+                   in ((cached, from_store), (direct, from_db))]
+        pd.testing.assert_frame_equal(monthly[0], monthly[1], check_dtype=False)
+
+        stocks = [runner.compute_stock_performances(frames, analysis_date) for runner, frames
+                  in ((cached, from_store), (direct, from_db))]
+        pd.testing.assert_frame_equal(stocks[0], stocks[1], check_dtype=False)
+    finally:
+        cached.close_session()
+        direct.close_session()
+
+
+def test_long_lived_store_sees_partitions_written_elsewhere(session, tmp_path):
+    """다른 인스턴스가 새 월 파티션을 쓰면 매니페스트를 다시 읽어 반영"""
+    reader = ColumnarStore(str(tmp_path / 'cache'), 'npy')
+    writer = ColumnarStore(str(tmp_path / 'cache'), 'npy')
+    writer.refresh(session, ['daily_balances'])
+    assert reader.has_table('daily_balances')
+
+    new_day = date(2025, 1, 2)
+    session.add(DailyBalance(account_id=1, balance_date=new_day, total_balance=777.0,
+                             updated_at=datetime(2030, 1, 1)))
+    session.commit()
+    assert writer.refresh(session, ['daily_balances']) == {'daily_balances': ['2025-01']}
+
+    frame = reader.read('daily_balances', ['total_balance'], [1], new_day, new_day)
+    assert frame['total_balance'].tolist() == [777.0]
+
+
+def test_gui_collection_refreshes_columnar_store(tmp_path, monkeypatch):
+    """GUI 수집 후 컬럼형 캐시를 갱신하여 차트 조회에 방금 수집한 잔고가 보임"""
+    from datetime import timedelta
+    from app.services import broker_service as broker_service_module
+    from app.services import collection_engine as collection_engine_module
+    from app.utils import config as config_module
+    from app.utils.data_generation import data_generation
+    from gui.utils import resources
+    from gui.utils.data_service import DataService
+
+    today = date.today()
+    config = {
+        'database': {'type': 'sqlite', 'path': str(tmp_path / 'gui.db')},
+        'columnar_cache': {'enabled': True, 'path': str(tmp_path / 'cache'), 'format': 'npy'}
+    }
+
+    class FakeConfigManager:
+        def __init__(self):
+            self.config = config
+
+    class FakeBrokerService:
+        def __init__(self, config):
+            self.config = config
+
+        def close_all_connections(self):
+            pass
+
+    class FakeEngine:
+        """수집 대신 오늘 잔고를 저장 (DataCollector 저장 경로와 동일하게 조회 캐시 무효화)"""
+
+        def __init__(self, data_collector):
+            pass
+
+        def run(self, accounts):
+            session = db_manager.get_session()
+            session.add(DailyBalance(account_id=1, balance_date=today, total_balance=555.0,
+                                     updated_at=datetime.utcnow()))
+            session.commit()
+            session.close()
+            data_generation.bump()
+            return {'collected_count': 1, 'elapsed_seconds': 0.0,
+                    'results': [{'account_number': '1', 'broker_name': 'b', 'status': 'success', 'error': None}]}
+
+    monkeypatch.setattr(config_module, 'ConfigManager', FakeConfigManager)
+    monkeypatch.setattr(broker_service_module, 'BrokerService', FakeBrokerService)
+    monkeypatch.setattr(collection_engine_module, 'CollectionEngine', FakeEngine)
+    monkeypatch.setattr(DataService, 'get_active_accounts', lambda self: [{'id': 1}])
+    resources.reset_app_resources()
+    try:
+        service = DataService()
+        generator = SyntheticDataGenerator(account_count=1, symbol_count=4, years=1,
+                                           end_date=today - timedelta(days=40), holdings_per_account=2)
+        generator.populate(db_manager.engine)
+        store_session = db_manager.get_session()
+        service.columnar_store.refresh(store_session)
+        store_session.close()
+
+        before = service.get_balance_frame(1, 60)
+        assert today not in [d.date() for d in before['balance_date']]
+
+        assert service.collect_all_active_accounts_data()['success']
+
+        after = service.get_balance_frame(1, 60)
+        assert after['balance_date'].iloc[-1].date() == today
+        assert after['total_balance'].iloc[-1] == 555.0
+    finally:
+        resources.release_request_session()
+        resources.reset_app_resources()
@@ -0,0 +1,193 @@
+"""
+한국투자증권 asyncio 클라이언트 단위 테스트 (API 호출 없이 실행)
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.brokers.kis_async_broker import AsyncKISBroker
+from app.services.broker_service import BrokerService
+
+BALANCE_RESPONSE = {
+    'output1': [
+        {'pdno': '005930', 'prdt_name': '삼성전자', 'hldg_qty': '10', 'pchs_avg_pric': '70000',
+         'prpr': '75000', 'evlu_amt': '750000', 'evlu_pfls_amt': '50000', 'evlu_pfls_rt': '7.14'}
+    ],
+    'output2': [
+        {'dnca_tot_amt': '1000000', 'tot_evlu_amt': '1750000', 'scts_evlu_amt': '750000',
+         'evlu_pfls_smtl_amt': '50000'}
+    ]
+}
+
+
+class FakeResponse:
+    """aiohttp 응답과 같은 형태의 테스트용 응답"""
+
+    def __init__(self, data, headers=None):
+        self._data = data
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self, content_type=None):
+        return self._data
+
+
+class FakeSession:
+    """요청마다 handler를 호출하는 테스트용 HTTP 세션"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.closed = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def request(self, method, url, headers=None, params=None):
+        session = self
+
+        class Call:
+            async def __aenter__(self):
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                try:
+                    return await session.handler(headers, params)
+                finally:
+                    session.in_flight -= 1
+
+            async def __aexit__(self, *args):
+                return False
+
+        return Call()
+
+    async def close(self):
+        self.closed = True
+
+
+def create_broker(tmp_path, monkeypatch, handler, api_settings=None):
+    """토큰 파일을 임시 디렉토리에 두고 테스트용 세션을 쓰는 브로커 생성"""
+    monkeypatch.chdir(tmp_path)
+    broker = AsyncKISBroker({
+        'name': '한국투자증권',
+        'api_type': 'kis',
+        'enabled': True,
+        'credentials': {'app_key': 'test-key', 'app_secret': 'test-secret'},
+        'api_settings': api_settings or {}
+    })
+    broker.connected = True
+    broker.access_token = 'token'
+    sessions = []
+    monkeypatch.setattr(broker, '_is_token_expired', lambda: False)
+    monkeypatch.setattr(broker, '_create_http_session', lambda: sessions.append(FakeSession(handler)) or sessions[-1])
+    return broker, sessions
+
+
+def test_fan_out_on_one_event_loop(tmp_path, monkeypatch):
+    """여러 계좌를 한 이벤트 루프에서 동시 조회 (동시 요청 수는 max_concurrency 이내)"""
+    async def handler(headers, params):
+        await asyncio.sleep(0.05)
+        return FakeResponse(BALANCE_RESPONSE)
+
+    broker, sessions = create_broker(tmp_path, monkeypatch, handler, {'max_concurrency': 25})
+    account_numbers = [f"{i:08d}01" for i in range(100)]
+
+    start = time.monotonic()
+    snapshots = broker.get_account_snapshots(account_numbers)
+    elapsed = time.monotonic() - start
+
+    # 순차 실행이면 5초, 25개씩 동시 실행이면 약 0.2초
+    assert elapsed < 1.5
+    assert len(sessions) == 1 and sessions[0].closed
+    assert sessions[0].max_in_flight == 25
+    assert set(snapshots) == set(account_numbers)
+    assert all(s['balance']['total_balance'] == 1750000 for s in snapshots.values())
+    assert all(s['holdings'][0]['symbol'] == '005930' for s in snapshots.values())
+
+
+def test_retry_backoff_does_not_block_other_accounts(tmp_path, monkeypatch):
+    """재시도 대기 중에도 다른 계좌 요청은 진행, 계좌별 실패는 error로 반환"""
+    attempts = {}
+
+    async def handler(headers, params):
+        cano = params['CANO']
+        attempts[cano] = attempts.get(cano, 0) + 1
+        if cano == '00000001' and attempts[cano] == 1:
+            raise ConnectionResetError('reset')
+        if cano == '00000002':
+            raise ConnectionResetError('down')
+        return FakeResponse(BALANCE_RESPONSE)
+
+    broker, _ = create_broker(tmp_path, monkeypatch, handler, {'retry_count': 2})
+    start = time.monotonic()
+    snapshots = broker.get_account_snapshots(['0000000001', '0000000101', '0000000201'])
+
+    assert attempts == {'00000000': 1, '00000001': 2, '00000002': 2}
+    assert 'error' in snapshots['0000000201']
+    assert snapshots['0000000101']['balance']['cash_balance'] == 1000000
+    # 두 계좌의 재시도 대기(1초)는 동시에 진행
+    assert time.monotonic() - start < 1.9
+
+
+def test_continuation_pages_and_rate_limit(tmp_path, monkeypatch):
+    """연속조회 페이지를 따라가며 토큰 버킷 한도 적용"""
+    async def handler(headers, params):
+        if params['CTX_AREA_NK100'] == '':
+            data = dict(BALANCE_RESPONSE, ctx_area_fk100='FK1', ctx_area_nk100='NK1')
+            return FakeResponse(data, {'tr_cont': 'M'})
+        assert headers['tr_cont'] == 'N'
+        return FakeResponse(BALANCE_RESPONSE, {'tr_cont': 'D'})
+
+    broker, _ = create_broker(tmp_path, monkeypatch, handler,
+                              {'rate_limit': {'requests_per_second': 20, 'burst': 1}})
+    snapshots = broker.get_account_snapshots([f"{i:08d}01" for i in range(5)])
+
+    assert all(len(s['holdings']) == 2 for s in snapshots.values())
+    metrics = broker.rate_limiter.get_metrics()
+    assert metrics['total_requests'] == 10
+    assert metrics['throttled_requests'] == 9
+
+
+def test_broker_service_async_fan_out(tmp_path, monkeypatch):
+    """이미 실행 중인 이벤트 루프에서 BrokerService로 일괄 조회"""
+    async def handler(headers, params):
+        return FakeResponse(BALANCE_RESPONSE)
+
+    broker, _ = create_broker(tmp_path, monkeypatch, handler)
+    service = BrokerService({'brokers': []})
+    service.brokers['한국투자증권'] = broker
+
+    async def run():
+        try:
+            return await service.get_account_snapshots_async('한국투자증권', ['1234567801', '2345678901'])
+        finally:
+            await broker.aclose()
+
+    snapshots = asyncio.run(run())
+    assert set(snapshots) == {'1234567801', '2345678901'}
+
+
+def test_stream_account_snapshot_returns_single_page(tmp_path, monkeypatch):
+    """수집 엔진 경로: 연속조회까지 한 번에 조회한 보유종목을 단일 페이지로 반환"""
+    async def handler(headers, params):
+        if params['CTX_AREA_NK100'] == '':
+            data = dict(BALANCE_RESPONSE, ctx_area_fk100='FK1', ctx_area_nk100='NK1')
+            return FakeResponse(data, {'tr_cont': 'M'})
+        return FakeResponse(BALANCE_RESPONSE, {'tr_cont': 'D'})
+
+    broker, _ = create_broker(tmp_path, monkeypatch, handler)
+    snapshot = broker.stream_account_snapshot('1234567801')
+
+    assert snapshot['balance']['total_balance'] == 1750000
+    pages = list(snapshot['holdings_pages'])
+    assert len(pages) == 1 and len(pages[0]) == 2
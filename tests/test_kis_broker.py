@@ -0,0 +1,125 @@
+"""
+한국투자증권 브로커 단위 테스트 (API 호출 없이 실행)
+"""
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.brokers.kis_broker import KISBroker
+from app.utils.token_manager import TokenManager
+
+
+class FakeResponse:
+    """테스트용 응답 객체"""
+
+    def __init__(self, data, headers=None):
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+BALANCE_RESPONSE = {
+    'output1': [
+        {'pdno': '005930', 'prdt_name': '삼성전자', 'hldg_qty': '10', 'pchs_avg_pric': '70000',
+         'prpr': '75000', 'evlu_amt': '750000', 'evlu_pfls_amt': '50000', 'evlu_pfls_rt': '7.14'},
+        {'pdno': '000660', 'prdt_name': 'SK하이닉스', 'hldg_qty': '5', 'pchs_avg_pric': '120000',
+         'prpr': '110000', 'evlu_amt': '550000', 'evlu_pfls_amt': '-50000', 'evlu_pfls_rt': '-8.33'}
+    ],
+    'output2': [
+        {'dnca_tot_amt': '1000000', 'tot_evlu_amt': '2300000', 'scts_evlu_amt': '1300000',
+         'evlu_pfls_smtl_amt': '0'}
+    ]
+}
+
+
+def create_broker(tmp_path, monkeypatch, api_settings=None):
+    """토큰 파일을 임시 디렉토리에 두는 테스트용 브로커 생성"""
+    monkeypatch.chdir(tmp_path)
+    broker = KISBroker({
+        'name': '한국투자증권',
+        'api_type': 'kis',
+        'enabled': True,
+        'credentials': {'app_key': 'test-key', 'app_secret': 'test-secret'},
+        'api_settings': api_settings or {}
+    })
+    broker.connected = True
+    return broker
+
+
+def test_account_snapshot_uses_single_request(tmp_path, monkeypatch):
+    """잔고 + 보유종목 스냅샷은 잔고조회 API를 한 번만 호출"""
+    broker = create_broker(tmp_path, monkeypatch)
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(kwargs['params'])
+        return FakeResponse(BALANCE_RESPONSE)
+
+    monkeypatch.setattr(broker, '_make_request', fake_request)
+
+    snapshot = broker.get_account_snapshot('1234567801')
+
+    assert len(calls) == 1
+    assert snapshot['balance']['cash_balance'] == 1000000
+    assert snapshot['balance']['stock_balance'] == 1300000
+    assert [h['symbol'] for h in snapshot['holdings']] == ['005930', '000660']
+    assert snapshot['balance'] == broker.get_balance('1234567801')
+    assert snapshot['holdings'] == broker.get_holdings('1234567801')
+
+
+def test_holdings_follow_continuation_keys(tmp_path, monkeypatch):
+    """연속조회 키와 tr_cont 헤더를 따라 모든 페이지 조회"""
+    broker = create_broker(tmp_path, monkeypatch)
+    pages = [
+        FakeResponse({'output1': [BALANCE_RESPONSE['output1'][0]], 'output2': BALANCE_RESPONSE['output2'],
+                      'ctx_area_fk100': 'FK1', 'ctx_area_nk100': 'NK1'}, {'tr_cont': 'M'}),
+        FakeResponse({'output1': [BALANCE_RESPONSE['output1'][1]], 'output2': BALANCE_RESPONSE['output2'],
+                      'ctx_area_fk100': 'FK2', 'ctx_area_nk100': ''}, {'tr_cont': 'D'})
+    ]
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append((kwargs['headers'].get('tr_cont'), kwargs['params']['CTX_AREA_NK100']))
+        return pages[len(calls) - 1]
+
+    monkeypatch.setattr(broker, '_make_request', fake_request)
+
+    streamed = list(broker.iter_holdings_pages('1234567801'))
+
+    assert [[h['symbol'] for h in page] for page in streamed] == [['005930'], ['000660']]
+    assert calls == [(None, ''), ('N', 'NK1')]
+
+    calls.clear()
+    snapshot = broker.get_account_snapshot('1234567801')
+    assert len(snapshot['holdings']) == 2
+    assert snapshot['balance']['total_balance'] == 2300000
+
+
+def test_auth_headers_installed_once_per_token(tmp_path, monkeypatch):
+    """인증 헤더는 토큰이 바뀔 때만 세션에 설치, 요청마다 만료 시간을 파싱하지 않음"""
+    broker = create_broker(tmp_path, monkeypatch)
+    broker.token_manager.RELOAD_CHECK_INTERVAL = 0
+    broker.token_manager.save_token('first', expires_in=3600)
+    installs = []
+    install = broker._install_auth_headers
+    monkeypatch.setattr(broker, '_install_auth_headers', lambda: installs.append(1) or install())
+    monkeypatch.setattr(broker.session, 'request', lambda method, url, **kwargs: FakeResponse({}))
+
+    for _ in range(5):
+        broker._make_request('GET', 'https://example.invalid', headers={'tr_id': 'TEST'})
+    assert len(installs) == 1
+    assert broker.session.headers['authorization'] == 'Bearer first'
+
+    # 다른 프로세스가 토큰을 갱신하면 다음 요청에서 헤더 교체
+    TokenManager(broker_name="kis").save_token('second', expires_in=3600)
+    broker._make_request('GET', 'https://example.invalid')
+    assert len(installs) == 2
+    assert broker.session.headers['authorization'] == 'Bearer second'
@@ -0,0 +1,100 @@
+"""
+키움 상주 Worker 프로토콜 테스트 (fake OCX 사용 - Windows/PyQt5 불필요)
+"""
+import os
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.brokers.kiwoom_broker import KiwoomBroker
+
+
+def create_broker(monkeypatch, **api_settings):
+    """fake OCX로 동작하는 키움 브로커 생성"""
+    monkeypatch.setenv('KIWOOM_FAKE_OCX', '1')
+    monkeypatch.setenv('PYTHON32_PATH', sys.executable)
+    broker = KiwoomBroker({
+        'name': '키움증권',
+        'api_type': 'kiwoom',
+        'enabled': True,
+        'api_settings': api_settings
+    })
+    broker.connect()
+    return broker
+
+
+def test_persistent_worker_reuses_login(monkeypatch):
+    """여러 명령을 하나의 Worker 프로세스(로그인 1회)로 처리"""
+    broker = create_broker(monkeypatch, worker_timeout=10)
+    try:
+        accounts = broker.get_accounts()
+        assert [a['account_number'] for a in accounts] == ['8000000011', '8000000022']
+
+        balance = broker.get_balance('8000000011')
+        holdings = broker.get_holdings('8000000011')
+        assert balance['total_balance'] == 3500000
+        assert [h['symbol'] for h in holdings] == ['005930', '035720']
+        assert broker.get_holdings('8000000022') == []
+
+        assert broker.worker_client.start_count == 1
+    finally:
+        broker.disconnect()
+
+    assert not broker.worker_client.is_alive()
+
+
+def test_worker_restarts_after_crash(monkeypatch):
+    """Worker 프로세스가 종료되면 재시작 후 요청 처리"""
+    broker = create_broker(monkeypatch, worker_timeout=10)
+    try:
+        broker.get_balance('8000000011')
+        broker.worker_client.process.kill()
+        broker.worker_client.process.wait()
+
+        balance = broker.get_balance('8000000011')
+        assert balance['cash_balance'] == 1000000
+        assert broker.worker_client.start_count == 2
+    finally:
+        broker.disconnect()
+
+
+def test_worker_error_is_reported(monkeypatch):
+    """Worker 오류 응답은 BrokerError로 전달되고 프로세스는 유지"""
+    broker = create_broker(monkeypatch, worker_timeout=10)
+    try:
+        try:
+            broker.get_balance('0000000000')
+            assert False, "BrokerError가 발생해야 합니다"
+        except Exception as e:
+            assert 'TR 요청 실패' in str(e)
+
+        assert broker.get_balance('8000000022')['cash_balance'] == 500000
+        assert broker.worker_client.start_count == 1
+    finally:
+        broker.disconnect()
+
+
+def test_batch_snapshots_use_single_launch(monkeypatch):
+    """일괄 조회는 계좌 수와 관계없이 Worker 프로세스를 한 번만 실행"""
+    import subprocess
+
+    broker = create_broker(monkeypatch, persistent_worker=False, worker_timeout=10)
+    launches = []
+    original_run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        launches.append(args[0])
+        return original_run(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, 'run', counting_run)
+
+    snapshots = broker.get_account_snapshots(['8000000011', '8000000022', '0000000000'])
+
+    assert len(launches) == 1
+    assert snapshots['8000000011']['balance']['total_balance'] == 3500000
+    assert [h['symbol'] for h in snapshots['8000000011']['holdings']] == ['005930', '035720']
+    assert snapshots['8000000022']['holdings'] == []
+    assert 'TR 요청 실패' in snapshots['0000000000']['error']
@@ -0,0 +1,96 @@
+"""
+로트 회계 엔진 테스트
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.lot_engine import LotEngine
+
+TRADES = [
+    (1, '005930', date(2024, 1, 1), 'BUY', 10, 1000.0, 0.0, '삼성전자'),
+    (1, '005930', date(2024, 1, 11), 'BUY', 10, 2000.0, 0.0, '삼성전자'),
+    (1, '005930', date(2024, 1, 21), 'SELL', 15, 2250.0, 0.0, '삼성전자'),
+]
+
+
+def test_fifo_realized_profit_and_holding_days():
+    """선입선출: 먼저 산 로트부터 소진"""
+    engine = LotEngine('fifo')
+    position = engine.process(TRADES)[(1, '005930')]
+
+    # 원가 10x100 + 5x200 = 2000, 매도대금 2250
+    assert position.realized == pytest.approx(250.0)
+    assert position.open_quantity == 5
+    assert position.open_cost == pytest.approx(1000.0)
+
+    result = engine.to_performance(position, market_value=1500.0, as_of=date(2024, 1, 31))
+    assert result['unrealized_profit_loss'] == pytest.approx(500.0)
+    assert result['total_profit_loss'] == pytest.approx(750.0)
+    assert result['profit_loss_rate'] == pytest.approx(25.0)
+    # (10x20 + 5x10 + 5x20) / 20
+    assert result['holding_days'] == 18
+    assert result['max_profit_rate'] == pytest.approx(50.0)
+    assert result['max_loss_rate'] == 0.0
+
+
+def test_average_cost_realized_profit():
+    """이동평균: 평균 단가(150)로 원가 차감"""
+    engine = LotEngine('average')
+    position = engine.process(TRADES)[(1, '005930')]
+
+    assert position.realized == pytest.approx(2250.0 - 15 * 150)
+    assert position.open_quantity == 5
+    assert position.open_cost == pytest.approx(750.0)
+
+    result = engine.to_performance(position, as_of=date(2024, 1, 31))
+    assert result['current_value'] == pytest.approx(750.0)
+    assert result['unrealized_profit_loss'] == 0.0
+
+
+def test_fees_oversell_and_loss_rate():
+    """수수료 반영, 보유 수량 초과 매도분은 실현 손익 제외"""
+    trades = [
+        (1, 'A', date(2024, 1, 1), 'BUY', 10, 1000.0, 10.0, 'A'),
+        (1, 'A', date(2024, 1, 2), 'SELL', 20, 1600.0, 20.0, 'A'),
+    ]
+    position = LotEngine('fifo').process(trades)[(1, 'A')]
+
+    # 매칭 10주: 매도대금 (1600-20)/2 = 790, 원가 1010
+    assert position.realized == pytest.approx(790.0 - 1010.0)
+    assert position.unmatched_quantity == 10
+    assert position.open_quantity == 0
+
+    result = LotEngine.to_performance(position, as_of=date(2024, 1, 31))
+    assert result['max_loss_rate'] == pytest.approx(-220.0 / 1010.0 * 100)
+    assert result['holding_days'] == 1
+
+
+def test_interleaved_symbols_single_pass():
+    """여러 계좌/종목 거래가 섞여 있어도 한 번의 순회로 종목별 분리"""
+    trades = []
+    for day in range(1, 29):
+        for account_id in (1, 2):
+            for symbol in ('A', 'B', 'C'):
+                trades.append((account_id, symbol, date(2024, 2, day), 'BUY', 1, 100.0 * day, 0.0, symbol))
+                if day % 2 == 0:
+                    trades.append((account_id, symbol, date(2024, 2, day), 'SELL', 1, 100.0 * day, 0.0, symbol))
+
+    positions = LotEngine('fifo').process(trades)
+    assert len(positions) == 6
+    for position in positions.values():
+        assert position.open_quantity == 14
+        assert position.sell_quantity == 14
+        # 매도 로트 원가는 day/2 시점 매수가 (선입선출)
+        assert position.realized == pytest.approx(sum(100.0 * d - 100.0 * (d // 2) for d in range(2, 29, 2)))
+
+
+def test_unknown_method_rejected():
+    with pytest.raises(ValueError):
+        LotEngine('lifo')
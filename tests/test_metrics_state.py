@@ -0,0 +1,126 @@
+"""
+누적(스트리밍) 지표 상태 테스트
+"""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.models.balance import DailyBalance
+from app.services.metrics_state import MetricsStateUpdater
+from app.services.risk_engine import RiskMetricsEngine
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+
+
+def _series(days=300, seed=3):
+    rng = np.random.default_rng(seed)
+    values = 1e7 * np.exp(np.cumsum(rng.normal(0.0002, 0.012, days)))
+    start = date(2024, 1, 1)
+    return [(start + timedelta(days=i), float(v)) for i, v in enumerate(values)]
+
+
+def test_incremental_matches_full_recomputation():
+    """하루씩 누적한 지표가 전체 재계산 결과와 일치"""
+    series = _series()
+    updater = MetricsStateUpdater(risk_free_rate=0.03)
+    state = updater.empty_state()
+    for balance_date, value in series:
+        state = updater.advance_state(state, balance_date, value)
+
+    incremental = updater.to_metrics(state)
+    full = RiskMetricsEngine(risk_free_rate=0.03).calculate(np.array([v for _, v in series]))
+
+    for key in ('annual_volatility', 'sharpe_ratio', 'sortino_ratio', 'downside_deviation',
+                'max_drawdown', 'max_drawdown_duration'):
+        assert np.isclose(incremental[key], full[key]), key
+    assert incremental['ewma_volatility'] > 0
+
+
+def test_advance_handles_same_day_and_backfill(tmp_path):
+    """같은 날 재수집은 덮어쓰고, 과거 날짜 보정은 이력으로 재구성"""
+    generator = SyntheticDataGenerator(account_count=1, symbol_count=5, years=1, end_date=date(2024, 6, 28))
+    db_manager.init_database(f"sqlite:///{tmp_path / 'state.db'}")
+    generator.populate(db_manager.engine)
+    updater = MetricsStateUpdater()
+
+    session = db_manager.get_session()
+    try:
+        rows = session.query(DailyBalance.balance_date, DailyBalance.total_balance).filter(
+            DailyBalance.account_id == 1
+        ).order_by(DailyBalance.balance_date).all()
+
+        # 상태가 없으면 이력으로 구성
+        state = updater.advance(session, 1, rows[-1][0], rows[-1][1])
+        assert state == updater.build_state(rows)
+
+        # 다음 날 잔고 반영 후 같은 날 재수집
+        next_day = rows[-1][0] + timedelta(days=3)
+        updater.advance(session, 1, next_day, rows[-1][1] * 0.5)
+        state = updater.advance(session, 1, next_day, rows[-1][1] * 1.01)
+        assert state == updater.build_state(rows + [(next_day, rows[-1][1] * 1.01)])
+
+        # 과거 날짜 보정 → 재구성
+        session.query(DailyBalance).filter(DailyBalance.balance_date == rows[10][0]).update(
+            {DailyBalance.total_balance: rows[10][1] * 2}
+        )
+        state = updater.advance(session, 1, rows[10][0], rows[10][1] * 2)
+        session.commit()
+        assert state['last_balance_date'] == rows[-1][0]
+    finally:
+        session.close()
+
+
+def test_non_positive_balance_matches_batch_engine():
+    """0 이하 잔고는 배치 엔진과 같이 결측으로 처리 (100% 낙폭으로 보지 않음)"""
+    series = _series(days=120)
+    for i in (40, 41, 90):
+        series[i] = (series[i][0], 0.0)
+    updater = MetricsStateUpdater()
+    incremental = updater.to_metrics(updater.build_state(series))
+    full = RiskMetricsEngine().calculate(np.array([v for _, v in series]))
+
+    assert incremental['max_drawdown'] < 100
+    for key in ('annual_volatility', 'sharpe_ratio', 'sortino_ratio', 'max_drawdown', 'max_drawdown_duration'):
+        assert np.isclose(incremental[key], full[key]), key
+
+
+def test_portfolio_analysis_keeps_one_definition(tmp_path):
+    """포트폴리오 분석은 누적 지표 상태 유무와 관계없이 1년 잔고 기준, 누적 지표는 별도 조회"""
+    from app.models.aggregation import MetricsState, PortfolioAnalysis
+    from app.services.analysis_service import AnalysisService
+
+    end_date = date(2024, 6, 28)
+    generator = SyntheticDataGenerator(account_count=1, symbol_count=5, years=2, end_date=end_date)
+    db_manager.init_database(f"sqlite:///{tmp_path / 'analysis.db'}")
+    generator.populate(db_manager.engine)
+    service = AnalysisService()
+    keys = ('volatility', 'sharpe_ratio', 'max_drawdown', 'var_95', 'var_99')
+
+    session = service._get_session()
+    try:
+        service.metrics_updater.rebuild(session, 1)
+        session.commit()
+        with_state = service.generate_portfolio_analysis(1, end_date)
+        with_state = {key: getattr(with_state, key) for key in keys}
+
+        session.query(MetricsState).delete()
+        session.commit()
+        without_state = service.generate_portfolio_analysis(1, end_date)
+        for key in keys:
+            assert np.isclose(with_state[key], getattr(without_state, key)), key
+
+        # 누적 지표는 전체 이력 기준 값으로 따로 반환하고 분석 테이블은 바꾸지 않음
+        incremental = service.get_incremental_metrics(1)
+        assert incremental['last_balance_date'] == end_date
+        assert 'parametric_var_1d_95' in incremental
+        stored = session.query(PortfolioAnalysis).filter_by(account_id=1, analysis_date=end_date).one()
+        assert np.isclose(stored.var_95, with_state['var_95'])
+    finally:
+        service.close_session()
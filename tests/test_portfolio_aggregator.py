@@ -0,0 +1,127 @@
+"""
+다중 계좌 통합 포트폴리오 집계 테스트
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from sqlalchemy import delete, event
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.models.balance import DailyBalance
+from app.models.holding import Holding
+from app.services.portfolio_aggregator import PortfolioAggregator
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+
+END_DATE = date(2024, 12, 31)
+ACCOUNT_IDS = [1, 2, 3]
+
+
+@pytest.fixture
+def session(tmp_path):
+    # 종목 수보다 보유종목 수를 크게 잡아 계좌 간 겹치는 종목 생성
+    generator = SyntheticDataGenerator(account_count=3, symbol_count=8, years=1, end_date=END_DATE,
+                                       holdings_per_account=6)
+    db_manager.init_database(f"sqlite:///{tmp_path / 'portfolio.db'}")
+    generator.populate(db_manager.engine)
+    session = db_manager.get_session()
+    yield session
+    session.close()
+
+
+def _count_selects(call):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(db_manager.engine, 'before_cursor_execute', capture)
+    try:
+        result = call()
+    finally:
+        event.remove(db_manager.engine, 'before_cursor_execute', capture)
+    return result, len(statements)
+
+
+def test_merged_holdings_weighted_average(session):
+    """종목별 수량/손익 합산, 평균단가는 수량 가중 평균"""
+    aggregator = PortfolioAggregator()
+    merged, selects = _count_selects(lambda: aggregator.holdings(session, ACCOUNT_IDS))
+    assert selects == 1
+
+    rows = session.query(Holding).filter(Holding.account_id.in_(ACCOUNT_IDS), Holding.quantity > 0).all()
+    expected = pd.DataFrame([{
+        'symbol': h.symbol, 'quantity': h.quantity, 'cost': h.quantity * h.average_price,
+        'evaluation_amount': h.evaluation_amount, 'profit_loss': h.profit_loss
+    } for h in rows]).groupby('symbol').sum()
+
+    assert any(item['account_count'] > 1 for item in merged)
+    assert len(merged) == len(expected)
+    evaluations = [item['evaluation_amount'] for item in merged]
+    assert evaluations == sorted(evaluations, reverse=True)
+    for item in merged:
+        row = expected.loc[item['symbol']]
+        assert item['quantity'] == row['quantity']
+        assert item['average_price'] == pytest.approx(row['cost'] / row['quantity'])
+        assert item['profit_loss'] == pytest.approx(row['profit_loss'])
+        assert item['profit_loss_rate'] == pytest.approx(row['profit_loss'] / row['cost'] * 100)
+
+
+def test_latest_balance_sums_each_accounts_latest_row(session):
+    """계좌마다 최신 잔고일이 달라도 각 계좌의 최신 행을 합산"""
+    session.execute(delete(DailyBalance).where(DailyBalance.account_id == 2, DailyBalance.balance_date >= date(2024, 12, 20)))
+    session.commit()
+
+    aggregator = PortfolioAggregator()
+    combined, selects = _count_selects(lambda: aggregator.latest_balance(session, ACCOUNT_IDS))
+    assert selects == 1
+
+    latest = [
+        session.query(DailyBalance).filter(DailyBalance.account_id == account_id)
+        .order_by(DailyBalance.balance_date.desc()).first()
+        for account_id in ACCOUNT_IDS
+    ]
+    assert combined['account_count'] == 3
+    assert combined['balance_date'] == max(b.balance_date for b in latest).isoformat()
+    assert combined['total_balance'] == pytest.approx(sum(b.total_balance for b in latest))
+    cost = sum(b.total_balance - b.profit_loss for b in latest)
+    assert combined['profit_loss_rate'] == pytest.approx(sum(b.profit_loss for b in latest) / cost * 100)
+
+    # 계좌 하나만 선택하면 수집 시 저장한 손익률과 같은 기준
+    single = aggregator.latest_balance(session, [1])
+    cost = latest[0].total_balance - latest[0].profit_loss
+    assert single['profit_loss_rate'] == pytest.approx(latest[0].profit_loss / cost * 100)
+
+    assert aggregator.latest_balance(session, [999]) is None
+
+
+def test_balance_history_forward_fills_missing_days(session):
+    """수집되지 않은 날은 직전 잔고로 채워 합산"""
+    missing_day = date(2024, 6, 14)
+    session.execute(delete(DailyBalance).where(DailyBalance.account_id == 3, DailyBalance.balance_date == missing_day))
+    session.commit()
+
+    aggregator = PortfolioAggregator()
+    start, end = date(2024, 6, 1), date(2024, 6, 30)
+    frame, selects = _count_selects(lambda: aggregator.balance_history(session, ACCOUNT_IDS, start, end))
+    assert selects == 1
+
+    rows = session.query(DailyBalance).filter(
+        DailyBalance.account_id.in_(ACCOUNT_IDS), DailyBalance.balance_date.between(start, end)
+    ).all()
+    per_account = pd.DataFrame([{
+        'account_id': b.account_id, 'balance_date': pd.Timestamp(b.balance_date), 'total_balance': b.total_balance
+    } for b in rows]).pivot(index='balance_date', columns='account_id', values='total_balance')
+    expected = per_account.sort_index().ffill().fillna(0.0).sum(axis=1)
+
+    assert frame['balance_date'].tolist() == expected.index.tolist()
+    assert frame['total_balance'].to_numpy() == pytest.approx(expected.to_numpy())
+    assert pd.Timestamp(missing_day) in set(frame['balance_date'])
@@ -0,0 +1,186 @@
+"""
+종목 시세 캐시 테스트 (장 운영시간 TTL, 일괄 조회, 동시 요청 병합)
+"""
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.brokers.kis_broker import KISBroker
+from app.brokers.price_cache import PriceCache
+from app.utils.exceptions import BrokerError
+
+FRIDAY_OPEN = datetime(2024, 12, 27, 10, 0)     # 금요일 장중
+FRIDAY_CLOSED = datetime(2024, 12, 27, 16, 0)   # 금요일 장 마감 후
+MONDAY_OPEN = datetime(2024, 12, 30, 9, 0)
+
+
+class Clock:
+    """테스트용 시계"""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def quote(symbol, price=10000.0):
+    return {'stock_code': symbol, 'current_price': price, 'source': 'quote'}
+
+
+class FakeResponse:
+    """테스트용 응답 객체"""
+
+    def __init__(self, data):
+        self._data = data
+        self.headers = {}
+
+    def json(self):
+        return self._data
+
+
+def test_ttl_follows_market_hours():
+    """장중에는 짧은 TTL, 장 마감 후에는 다음 개장까지 고정"""
+    clock = Clock(FRIDAY_OPEN)
+    cache = PriceCache(open_ttl=5, clock=clock)
+    cache.put('005930', quote('005930'))
+    clock.now += timedelta(seconds=4)
+    assert cache.get('005930') is not None
+    clock.now += timedelta(seconds=2)
+    assert cache.get('005930') is None
+
+    clock.now = FRIDAY_CLOSED
+    cache.put('005930', quote('005930', 75000))
+    assert cache.expires_at() == MONDAY_OPEN
+    clock.now = MONDAY_OPEN - timedelta(seconds=1)
+    assert cache.get('005930')['current_price'] == 75000
+    clock.now = MONDAY_OPEN
+    assert cache.get('005930') is None
+
+    # 개장 전에는 당일 개장 시각까지
+    assert cache.expires_at(datetime(2024, 12, 30, 8, 0)) == MONDAY_OPEN
+
+
+def test_concurrent_callers_share_one_fetch():
+    """같은 종목을 동시에 요청하면 조회는 한 번, 결과는 모든 호출자가 공유"""
+    cache = PriceCache(clock=Clock(FRIDAY_OPEN))
+    calls = []
+    started = threading.Event()
+
+    def fetcher(symbols):
+        calls.append(list(symbols))
+        started.set()
+        time.sleep(0.2)
+        return {symbol: quote(symbol) for symbol in symbols}
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(cache.get_many(['005930', '000660'], fetcher)))
+    first.start()
+    assert started.wait(5)
+    others = [threading.Thread(target=lambda: results.append(cache.get_many(['000660', '005930'], fetcher)))
+              for _ in range(7)]
+    for thread in others:
+        thread.start()
+    for thread in [first] + others:
+        thread.join(5)
+
+    assert calls == [['005930', '000660']]
+    assert len(results) == 8 and all(set(r) == {'005930', '000660'} for r in results)
+    assert cache.get_stats()['shared'] == 14
+
+
+def test_fetch_error_reaches_waiters():
+    """조회 실패는 기다리던 호출자에게도 전달되고 다음 호출은 다시 조회"""
+    cache = PriceCache(clock=Clock(FRIDAY_OPEN))
+    started = threading.Event()
+
+    def failing(symbols):
+        started.set()
+        time.sleep(0.1)
+        raise BrokerError("시세 조회 실패")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_many(['005930'], failing)
+        except BrokerError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=call)
+    first.start()
+    assert started.wait(5)
+    second = threading.Thread(target=call)
+    second.start()
+    first.join(5)
+    second.join(5)
+
+    assert len(errors) == 2
+    assert cache.get_many(['005930'], lambda symbols: {s: quote(s) for s in symbols})['005930']
+
+
+def test_broker_batches_quotes_and_fills_from_holdings(tmp_path, monkeypatch):
+    """캐시에 없는 종목만 30개씩 나눠 조회, 잔고조회 응답의 현재가는 그대로 캐시"""
+    monkeypatch.chdir(tmp_path)
+    broker = KISBroker({
+        'name': '한국투자증권',
+        'api_type': 'kis',
+        'enabled': True,
+        'credentials': {'app_key': 'test-key', 'app_secret': 'test-secret'},
+        'api_settings': {}
+    })
+    broker.connected = True
+    broker.price_cache.clock = Clock(FRIDAY_OPEN)
+    requests = []
+
+    def fake_request(method, url, **kwargs):
+        params = kwargs['params']
+        requests.append((url, kwargs['headers']['tr_id'], params))
+        if 'CANO' in params:
+            return FakeResponse({'output1': [
+                {'pdno': '005930', 'prdt_name': '삼성전자', 'hldg_qty': '10', 'pchs_avg_pric': '70000',
+                 'prpr': '75000', 'evlu_amt': '750000', 'evlu_pfls_amt': '50000', 'evlu_pfls_rt': '7.14'}
+            ], 'output2': []})
+        codes = [value for key, value in params.items() if key.startswith('FID_INPUT_ISCD_')]
+        # 존재하지 않는 종목은 응답에서 빠짐
+        return FakeResponse({'output': [
+            {'inter_shrn_iscd': code, 'inter_kor_isnm': f"종목{code}", 'inter2_prpr': '1000',
+             'inter2_prdy_vrss': '-10', 'prdy_ctrt': '-0.99', 'acml_vol': '500'}
+            for code in codes if code != '999999'
+        ]})
+
+    monkeypatch.setattr(broker, '_make_request', fake_request)
+
+    broker.get_holdings('1234567801')
+    # 잔고조회로 채운 시세도 시세조회와 같은 키 (전일대비/거래량은 None)
+    assert broker.get_stock_price('005930') == {
+        'stock_code': '005930', 'stock_name': '삼성전자', 'current_price': 75000.0,
+        'change_price': None, 'change_rate': None, 'volume': None, 'source': 'holdings'
+    }
+    assert len(requests) == 1
+
+    codes = [f"{i:06d}" for i in range(1, 46)]
+    prices = broker.get_stock_prices(codes + ['005930', '999999'])
+    quote_requests = requests[1:]
+    # 005930은 잔고조회 응답으로 캐시되어 조회 대상에서 제외
+    assert [len([k for k in params if k.startswith('FID_INPUT_ISCD_')]) for _, _, params in quote_requests] == [30, 16]
+    assert all(tr_id == 'FHKST11300006' for _, tr_id, _ in quote_requests)
+    assert set(prices) == set(codes) | {'005930'}
+    assert prices['000001'] == {
+        'stock_code': '000001', 'stock_name': '종목000001', 'current_price': 1000.0,
+        'change_price': -10.0, 'change_rate': -0.99, 'volume': 500, 'source': 'quote'
+    }
+
+    # 두 번째 조회는 모두 캐시 적중
+    broker.get_stock_prices(codes)
+    assert len(requests) == 3
+    with pytest.raises(BrokerError):
+        broker.get_stock_price('999999')
@@ -0,0 +1,108 @@
+"""
+GUI 조회 캐시 테스트
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.data_generation import DataGeneration
+from gui.utils import query_cache as query_cache_module
+from gui.utils.query_cache import QueryCache, cached_query
+
+
+class Loader:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_hit_and_ttl_expiry(monkeypatch):
+    """TTL 이내에는 메모리에서, 만료 후에는 다시 조회"""
+    now = [100.0]
+    monkeypatch.setattr(query_cache_module.time, 'monotonic', lambda: now[0])
+    cache = QueryCache(ttl_seconds=10, generation=DataGeneration())
+    loader = Loader([1, 2])
+
+    assert cache.get_or_load(('q', 1), loader) == [1, 2]
+    assert cache.get_or_load(('q', 1), loader) == [1, 2]
+    assert loader.calls == 1
+
+    now[0] += 11
+    cache.get_or_load(('q', 1), loader)
+    assert loader.calls == 2
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['expired']) == (1, 2, 1)
+    assert stats['hit_rate'] == 1 / 3
+
+
+def test_lru_eviction():
+    """최대 항목 수 초과 시 가장 오래 사용하지 않은 항목 제거"""
+    cache = QueryCache(max_entries=2, generation=DataGeneration())
+    loaders = {key: Loader(key) for key in 'abc'}
+
+    cache.get_or_load('a', loaders['a'])
+    cache.get_or_load('b', loaders['b'])
+    cache.get_or_load('a', loaders['a'])  # a를 최근 사용으로
+    cache.get_or_load('c', loaders['c'])  # b 제거
+    cache.get_or_load('a', loaders['a'])
+    cache.get_or_load('b', loaders['b'])
+
+    assert loaders['a'].calls == 1
+    assert loaders['b'].calls == 2
+    assert cache.get_stats()['evictions'] == 2
+
+
+def test_generation_bump_invalidates():
+    """저장 후 세대 번호가 바뀌면 이전 결과는 사용하지 않음"""
+    generation = DataGeneration()
+    cache = QueryCache(generation=generation)
+    loader = Loader({'total_balance': 1.0})
+
+    cache.get_or_load('balance', loader)
+    generation.bump()
+    cache.get_or_load('balance', loader)
+    cache.get_or_load('balance', loader)
+
+    assert loader.calls == 2
+    assert cache.get_stats()['stale'] == 1
+
+
+def test_cached_query_decorator(monkeypatch):
+    """쿼리명/인자별 캐시, 빈 결과 미저장, DataFrame 복사본 반환"""
+    cache = QueryCache(generation=DataGeneration())
+    monkeypatch.setattr(query_cache_module, 'query_cache', cache)
+
+    class Service:
+        def __init__(self):
+            self.calls = 0
+
+        @cached_query('frame')
+        def get_frame(self, account_id, columns=None):
+            self.calls += 1
+            return pd.DataFrame({'value': [account_id]})
+
+        @cached_query('holdings')
+        def get_holdings(self, account_id):
+            self.calls += 1
+            return []
+
+    service = Service()
+    frame = service.get_frame(1, columns=['value'])
+    frame.loc[0, 'value'] = 99
+    assert service.get_frame(1, columns=['value'])['value'].tolist() == [1]
+    service.get_frame(2, columns=['value'])
+    assert service.calls == 2
+
+    service.get_holdings(1)
+    service.get_holdings(1)
+    assert service.calls == 4
@@ -0,0 +1,141 @@
+"""
+GUI 주요 조회 쿼리 실행 계획 테스트 (EXPLAIN QUERY PLAN, 여러 해 분량의 합성 데이터 사용)
+"""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import event, insert, text
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.models.holding import HoldingSnapshot
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+from app.services.portfolio_aggregator import PortfolioAggregator
+from gui.utils.data_service import DataService
+from gui.utils.query_cache import query_cache
+
+# 전체 조회가 의도된 소규모 기준 테이블
+SCAN_ALLOWED_TABLES = {'accounts', 'brokers'}
+
+GENERATOR = SyntheticDataGenerator(account_count=4, symbol_count=30, years=3, holdings_per_account=30)
+SYMBOLS = GENERATOR.symbols
+
+
+def _populate(engine):
+    """계좌 4개 x 3년치 잔고/거래/보유종목 + 보유종목 스냅샷 생성"""
+    GENERATOR.populate(engine)
+    with engine.begin() as conn:
+        for account_id in range(1, GENERATOR.account_count + 1):
+            conn.execute(insert(HoldingSnapshot), [
+                {'account_id': account_id, 'snapshot_date': day, 'symbol': symbol, 'name': '종목', 'quantity': 10}
+                for day in GENERATOR.business_days[-200:] for symbol in SYMBOLS
+            ])
+        conn.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope='module')
+def data_service(tmp_path_factory):
+    db_path = tmp_path_factory.mktemp('plans') / 'plans.db'
+    db_manager.init_database(f"sqlite:///{db_path}")
+    _populate(db_manager.engine)
+
+    service = DataService.__new__(DataService)
+    service.session = None
+    service.columnar_store = None
+    service.portfolio_aggregator = PortfolioAggregator()
+    query_cache.invalidate()
+    yield service
+    service.close_session()
+
+
+def _capture_plans(engine, call):
+    """호출 중 실행된 SELECT 문의 실행 계획 수집"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        call()
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plans.append((statement, [row[-1] for row in rows]))
+    return plans
+
+
+def _table_scans(details):
+    """인덱스를 사용하지 않는 테이블 전체 스캔 목록"""
+    scans = []
+    for detail in details:
+        if detail.startswith('SCAN ') and 'INDEX' not in detail:
+            table = detail.split()[1]
+            # anon_N: 계좌별 1행으로 줄인 서브쿼리 결과
+            if table not in SCAN_ALLOWED_TABLES and not table.startswith('anon_'):
+                scans.append(detail)
+    return scans
+
+
+QUERIES = {
+    'get_accounts': lambda s: s.get_accounts(),
+    'get_active_accounts': lambda s: s.get_active_accounts(),
+    'check_all_accounts_today_data': lambda s: s.check_all_accounts_today_data(),
+    'get_latest_balance': lambda s: s.get_latest_balance(2),
+    'get_balance_history': lambda s: s.get_balance_history(2, days=365),
+    'get_holdings': lambda s: s.get_holdings(2),
+    'get_holding_history': lambda s: s.get_holding_history(2, SYMBOLS[3]),
+    'get_transactions': lambda s: s.get_transactions(
+        2, start_date=date.today() - timedelta(days=90), end_date=date.today()),
+    'get_recent_transactions': lambda s: s.get_recent_transactions(2),
+    'has_today_data': lambda s: s.has_today_data(2),
+    'get_portfolio_latest_balance': lambda s: s.get_portfolio_latest_balance([1, 2, 3]),
+    'get_portfolio_balance_frame': lambda s: s.get_portfolio_balance_frame([1, 2, 3], days=365),
+    'get_portfolio_holdings': lambda s: s.get_portfolio_holdings([1, 2, 3]),
+}
+
+
+@pytest.mark.parametrize('name', sorted(QUERIES))
+def test_data_service_queries_use_indexes(data_service, name):
+    """DataService 조회 쿼리는 테이블 전체 스캔 없이 인덱스 사용"""
+    query_cache.invalidate()
+    plans = _capture_plans(db_manager.engine, lambda: QUERIES[name](data_service))
+
+    assert plans, f"{name}: 실행된 쿼리가 없습니다"
+    for statement, details in plans:
+        assert not _table_scans(details), f"{name}: {details}\n{statement}"
+
+
+def test_account_directory_single_query(data_service):
+    """계좌 목록/증권사명/당일 데이터 여부는 계좌 수와 무관하게 쿼리 1회"""
+    query_cache.invalidate()
+    plans = _capture_plans(db_manager.engine, lambda: (
+        data_service.get_accounts(),
+        data_service.has_any_missing_today_data()
+    ))
+    assert len(plans) == 2
+
+    accounts = data_service.get_accounts()
+    assert len(accounts) == GENERATOR.account_count
+    assert all(account['broker_name'] != 'Unknown' for account in accounts)
+    assert all(account['latest_balance_date'] for account in accounts)
+
+
+def test_ensure_indexes_adds_missing_indexes(data_service):
+    """기존 DB에 없는 모델 인덱스는 ensure_indexes로 생성"""
+    with db_manager.engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_transactions_account_date"))
+
+    assert db_manager.ensure_indexes() == ['ix_transactions_account_date']
+    assert db_manager.ensure_indexes() == []
@@ -0,0 +1,71 @@
+"""
+토큰 버킷 요청 속도 제한 테스트
+"""
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.brokers.rate_limiter import RateLimiter
+
+
+def test_burst_does_not_wait():
+    """버킷 용량 이내의 요청은 대기 없이 통과"""
+    limiter = RateLimiter.from_config({'requests_per_second': 20})
+
+    start = time.monotonic()
+    for _ in range(20):
+        limiter.acquire()
+
+    assert time.monotonic() - start < 0.05
+    assert limiter.get_metrics()['throttled_requests'] == 0
+
+
+def test_threads_share_quota():
+    """여러 스레드가 하나의 한도를 공유"""
+    limiter = RateLimiter.from_config({'requests_per_second': 20, 'burst': 1})
+
+    def worker():
+        for _ in range(5):
+            limiter.acquire()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    # 20개 요청, 초당 20개, 버스트 1 -> 약 0.95초
+    assert 0.85 < elapsed < 1.5
+    metrics = limiter.get_metrics()
+    assert metrics['total_requests'] == 20
+    assert metrics['throttled_requests'] == 19
+
+
+def test_async_acquire_and_minute_quota():
+    """asyncio 대기 및 분당 한도 적용"""
+    limiter = RateLimiter.from_config({'requests_per_second': 1000, 'requests_per_minute': 600})
+
+    async def run():
+        return await asyncio.gather(*[limiter.acquire_async() for _ in range(602)])
+
+    waits = asyncio.run(run())
+
+    # 분당 600개 용량 이후 요청은 0.1초 간격
+    assert sum(1 for w in waits if w > 0) == 2
+    assert max(waits) < 0.25
+    assert len(limiter.get_metrics()['tokens_available']) == 2
+
+
+def test_disabled_without_config():
+    """설정이 없으면 제한 없음"""
+    limiter = RateLimiter.from_config({})
+    assert not limiter.enabled
+    assert limiter.acquire() == 0.0
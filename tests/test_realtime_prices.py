@@ -0,0 +1,286 @@
+"""
+실시간 체결가 스트림 및 보유종목 증분 재평가 테스트 (로컬 WebSocket 서버 사용)
+"""
+import base64
+import hashlib
+import json
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.brokers.kis_broker import KISBroker
+from app.brokers.kis_realtime import KISRealtimeClient, parse_price_message
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.models.holding import Holding
+from app.services.realtime_valuation import RealtimeValuation
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+class LocalKISWebSocket:
+    """한국투자증권 실시간 서버 대역 (표준 라이브러리로 구현한 로컬 WebSocket 서버)
+
+    클라이언트가 보낸 텍스트 메시지는 received 큐에 쌓고, send()로 서버 메시지를 보냅니다.
+    """
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen()
+        self.url = f"ws://127.0.0.1:{self.server.getsockname()[1]}"
+        self.received = queue.Queue()
+        self.connection = None
+        self.connection_count = 0
+        self._connected = threading.Condition()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        request = b''
+        while b'\r\n\r\n' not in request:
+            request += conn.recv(1024)
+        key = [line.split(':', 1)[1].strip() for line in request.decode().split('\r\n')
+               if line.lower().startswith('sec-websocket-key')][0]
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest()).decode()
+        conn.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        with self._connected:
+            self.connection = conn
+            self.connection_count += 1
+            self._connected.notify_all()
+
+        try:
+            while True:
+                opcode, payload = self._read_frame(conn)
+                if opcode == 0x8:
+                    conn.sendall(b'\x88\x00')
+                    break
+                if opcode == 0x1:
+                    self.received.put(payload.decode('utf-8'))
+        except (OSError, ConnectionError):
+            pass
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _recv_exact(conn, size):
+        data = b''
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("연결 종료")
+            data += chunk
+        return data
+
+    def _read_frame(self, conn):
+        first, second = self._recv_exact(conn, 2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', self._recv_exact(conn, 2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', self._recv_exact(conn, 8))[0]
+        mask = self._recv_exact(conn, 4) if second & 0x80 else b'\x00' * 4
+        payload = self._recv_exact(conn, length)
+        return first & 0x0F, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+    def wait_connection(self, count, timeout=5):
+        with self._connected:
+            return self._connected.wait_for(lambda: self.connection_count >= count, timeout)
+
+    def send(self, text):
+        payload = text.encode('utf-8')
+        if len(payload) < 126:
+            header = bytes([0x81, len(payload)])
+        else:
+            header = bytes([0x81, 126]) + struct.pack('>H', len(payload))
+        self.connection.sendall(header + payload)
+
+    def drop(self):
+        """접속 강제 종료 (재접속 확인용)"""
+        self.connection.shutdown(socket.SHUT_RDWR)
+        self.connection.close()
+
+    def close(self):
+        self.server.close()
+
+
+def price_record(symbol, price, volume=1000):
+    """H0STCNT0 한 건 (46개 필드)"""
+    fields = ['0'] * 46
+    fields[0] = symbol
+    fields[1] = '093015'
+    fields[2] = str(price)
+    fields[4] = '500'
+    fields[5] = '0.67'
+    fields[13] = str(volume)
+    return '^'.join(fields)
+
+
+def price_message(*records):
+    return f"0|H0STCNT0|{len(records):03d}|" + '^'.join(records)
+
+
+@pytest.fixture
+def session(tmp_path):
+    generator = SyntheticDataGenerator(account_count=3, symbol_count=8, years=1, end_date=date(2024, 12, 31),
+                                       holdings_per_account=6)
+    db_manager.init_database(f"sqlite:///{tmp_path / 'realtime.db'}")
+    generator.populate(db_manager.engine)
+    session = db_manager.get_session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def kis_server():
+    server = LocalKISWebSocket()
+    yield server
+    server.close()
+
+
+def test_parse_multi_record_message():
+    """건수가 2 이상인 메시지는 종목별 체결로 분리"""
+    ticks = parse_price_message(price_message(price_record('005930', 75100), price_record('000660', 120500, 42)))
+
+    assert [(t['symbol'], t['price'], t['volume']) for t in ticks] == [('005930', 75100.0, 1000), ('000660', 120500.0, 42)]
+    assert ticks[0]['change_rate'] == 0.67 and ticks[0]['trade_time'] == '093015'
+    assert parse_price_message('0|H0STASP0|001|005930^1') == []
+
+
+def test_incremental_revaluation_matches_full_recompute(session):
+    """체결가 반영 후 계좌 잔고 변화 = 보유종목 평가금액 재계산 차이"""
+    valuation = RealtimeValuation()
+    valuation.load(session)
+    before = {account_id: valuation.get_balance(account_id) for account_id in valuation.balances}
+    before_eval = {account_id: sum(h['evaluation_amount'] for h in valuation.get_holdings(account_id))
+                   for account_id in valuation.positions}
+
+    symbol = valuation.symbols()[0]
+    price = valuation.positions[valuation._accounts_by_symbol[symbol][0]][symbol]['current_price'] * 1.1
+    updated = valuation.on_price({'symbol': symbol, 'price': price})
+    assert updated == valuation._accounts_by_symbol[symbol]
+    assert valuation.on_price({'symbol': symbol, 'price': price}) == []  # 가격이 같으면 재평가 생략
+
+    for account_id in valuation.positions:
+        holdings = valuation.get_holdings(account_id)
+        after_eval = sum(h['evaluation_amount'] for h in holdings)
+        after = valuation.get_balance(account_id)
+        assert after['total_balance'] - before[account_id]['total_balance'] == pytest.approx(after_eval - before_eval[account_id])
+        for h in holdings:
+            if h['symbol'] == symbol:
+                assert h['evaluation_amount'] == pytest.approx(h['quantity'] * price)
+                assert h['profit_loss'] == pytest.approx(h['quantity'] * (price - h['average_price']))
+
+    assert valuation.flush(session) == len(updated)
+    rows = session.query(Holding).filter(Holding.symbol == symbol, Holding.quantity > 0).all()
+    assert all(row.current_price == pytest.approx(price) for row in rows)
+    assert valuation.flush(session) == 0
+
+
+def test_flush_skips_rows_changed_by_collector(session):
+    """수집기가 삭제/변경한 보유종목은 덮어쓰지 않고 건너뛴 뒤 다시 로드"""
+    valuation = RealtimeValuation()
+    valuation.load(session)
+    symbol = valuation.symbols()[0]
+    deleted_account, changed_account = valuation._accounts_by_symbol[symbol][:2]
+
+    # 수집기가 한 계좌에서는 종목을 정리하고, 다른 계좌에서는 추가 매수를 반영
+    session.query(Holding).filter_by(account_id=deleted_account, symbol=symbol).delete()
+    changed = session.query(Holding).filter_by(account_id=changed_account, symbol=symbol).one()
+    changed.quantity += 5
+    session.commit()
+    quantity, evaluation_amount = changed.quantity, changed.evaluation_amount
+
+    updated = valuation.on_price({'symbol': symbol, 'price': 12345})
+    assert valuation.flush(session) == len(updated) - 2
+
+    session.expire_all()
+    changed = session.query(Holding).filter_by(account_id=changed_account, symbol=symbol).one()
+    assert changed.quantity == quantity and changed.evaluation_amount == evaluation_amount
+    # 다시 로드한 보유종목에 최신 체결가를 반영해 다음 flush에서 저장
+    assert symbol not in valuation.positions.get(deleted_account, {})
+    assert valuation.positions[changed_account][symbol]['evaluation_amount'] == quantity * 12345
+    valuation.flush(session)
+    session.expire_all()
+    assert session.query(Holding).filter_by(account_id=changed_account, symbol=symbol).one().current_price == 12345
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_stream_against_local_server(session, kis_server, tmp_path, monkeypatch):
+    """구독 등록, PINGPONG 응답, 체결가 재평가, 접속 끊김 후 재구독"""
+    monkeypatch.chdir(tmp_path)
+    kis_broker = KISBroker({
+        'name': '한국투자증권',
+        'api_type': 'kis',
+        'enabled': True,
+        'credentials': {'app_key': 'test-key', 'app_secret': 'test-secret'},
+        'api_settings': {'websocket_url': kis_server.url, 'realtime_max_subscriptions': 3}
+    })
+    monkeypatch.setattr(kis_broker, 'get_approval_key', lambda: 'approval')
+    monkeypatch.setattr(KISRealtimeClient, 'MAX_RECONNECT_DELAY', 0.05)
+
+    valuation = RealtimeValuation()
+    valuation.load(session)
+    symbols = valuation.symbols()
+    client = KISRealtimeClient(kis_broker, valuation.on_price)
+    client.start(symbols)
+    try:
+        assert client.wait_connected(5)
+        # 구독 한도(3)까지만 등록
+        subscriptions = [json.loads(kis_server.received.get(timeout=5)) for _ in range(3)]
+        assert [s['body']['input']['tr_key'] for s in subscriptions] == symbols[:3]
+        assert all(s['header']['approval_key'] == 'approval' and s['header']['tr_type'] == '1' for s in subscriptions)
+        assert kis_server.received.empty()
+
+        pingpong = json.dumps({'header': {'tr_id': 'PINGPONG', 'datetime': '20241231093015'}})
+        kis_server.send(pingpong)
+        assert kis_server.received.get(timeout=5) == pingpong
+
+        kis_server.send(price_message(price_record(symbols[0], 50000), price_record(symbols[1], 60000)))
+        assert wait_until(lambda: len(valuation.price_table) == 2)
+        for account_id in valuation._accounts_by_symbol[symbols[0]]:
+            position = valuation.positions[account_id][symbols[0]]
+            assert position['evaluation_amount'] == position['quantity'] * 50000
+        assert valuation.flush(session) == (len(valuation._accounts_by_symbol[symbols[0]])
+                                            + len(valuation._accounts_by_symbol[symbols[1]]))
+
+        # 접속이 끊기면 재접속 후 같은 종목 다시 등록
+        kis_server.drop()
+        assert kis_server.wait_connection(2)
+        resubscribed = [json.loads(kis_server.received.get(timeout=5))['body']['input']['tr_key'] for _ in range(3)]
+        assert resubscribed == symbols[:3]
+        assert client.metrics['reconnects'] >= 1
+    finally:
+        client.stop()
+    assert not client.is_connected()
@@ -0,0 +1,86 @@
+"""
+위험 지표 계산 엔진 테스트
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models import account, aggregation, balance, broker, holding, transaction  # noqa: F401 (테이블 등록)
+from app.models.aggregation import RiskMetrics
+from app.services.analysis_service import AnalysisService
+from app.services.risk_engine import RiskMetricsEngine
+from app.utils.database import db_manager
+from app.utils.synthetic_data import SyntheticDataGenerator
+
+
+def _balances(seed=0, accounts=3, days=400):
+    rng = np.random.default_rng(seed)
+    return 1e7 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, (accounts, days)), axis=1))
+
+
+def test_metrics_match_pandas_reference():
+    """변동성/최대낙폭/VaR/이동 변동성이 pandas 계산과 일치"""
+    balances = _balances()
+    balances[1, :50] = np.nan  # 늦게 개설된 계좌
+    engine = RiskMetricsEngine(risk_free_rate=0.03)
+    metrics = engine.calculate(balances)
+
+    for i, row in enumerate(balances):
+        series = pd.Series(row)
+        returns = (series / series.shift(1) - 1).dropna()
+        drawdown = series.ffill() / series.ffill().cummax() - 1
+
+        assert np.isclose(metrics['annual_volatility'][i], returns.std() * np.sqrt(252) * 100)
+        assert np.isclose(metrics['max_drawdown'][i], -drawdown.min() * 100)
+        assert np.isclose(metrics['var_1d_95'][i], -np.percentile(returns, 5) * 100)
+        rolling = (series / series.shift(1) - 1).iloc[1:].rolling(20).std().iloc[-1]
+        assert np.isclose(metrics['rolling_volatility'][i], rolling * np.sqrt(252) * 100)
+
+
+def test_stacked_matches_single_account():
+    """여러 계좌 행렬 계산 결과가 계좌별 계산과 동일"""
+    balances = _balances(seed=1)
+    engine = RiskMetricsEngine()
+    stacked = engine.calculate(balances)
+    single = engine.calculate(balances[2])
+
+    for key, value in single.items():
+        assert np.isclose(stacked[key][2], value), key
+
+
+def test_drawdown_duration_and_short_series():
+    """낙폭 기간 계산 및 데이터 부족 시 0 반환"""
+    engine = RiskMetricsEngine()
+    metrics = engine.calculate(np.array([100, 120, 90, 100, 110, 130, 125], dtype=float))
+
+    assert np.isclose(metrics['max_drawdown'], 25.0)
+    assert metrics['max_drawdown_duration'] == 3
+    assert engine.calculate(np.array([100.0]))['sharpe_ratio'] == 0.0
+
+
+def test_generate_risk_metrics_writes_all_accounts(tmp_path):
+    """전체 계좌 위험 지표를 한 번에 계산하여 저장 (재실행 시 갱신)"""
+    generator = SyntheticDataGenerator(account_count=3, symbol_count=10, years=2, end_date=date(2024, 12, 31))
+    db_manager.init_database(f"sqlite:///{tmp_path / 'risk.db'}")
+    generator.populate(db_manager.engine)
+
+    service = AnalysisService({'analysis': {'risk_free_rate': 0.03}})
+    try:
+        results = service.generate_risk_metrics(date(2024, 12, 31))
+        service.generate_risk_metrics(date(2024, 12, 31))
+        analysis = service.generate_portfolio_analysis(1, generator.business_days[-1])
+
+        rows = service._get_session().query(RiskMetrics).all()
+        assert sorted(results) == [1, 2, 3]
+        assert len(rows) == 3
+        assert all(row.annual_volatility > 0 and row.max_drawdown > 0 for row in rows)
+        assert analysis.volatility > 0 and analysis.var_95 > 0
+    finally:
+        service.close_session()
@@ -0,0 +1,126 @@
+"""
+프로세스 간 토큰 공유 테스트 (파일 잠금, mtime 재로드, 백그라운드 갱신)
+"""
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트 디렉토리를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.brokers.kis_broker import KISBroker
+from app.utils import token_manager as token_manager_module
+from app.utils.token_manager import TokenManager
+
+
+def slow_issuer(log_path):
+    """발급 횟수를 파일에 기록하는 느린 발급 함수"""
+    def issue():
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.2)
+        return {'access_token': f"token-{os.getpid()}", 'expires_in': 86400}
+    return issue
+
+
+def issue_in_process(workdir, log_path, queue):
+    """별도 프로세스에서 토큰 요청"""
+    os.chdir(workdir)
+    manager = TokenManager(broker_name="kis")
+    queue.put(manager.issue_token(slow_issuer(log_path))['access_token'])
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="fork 기반 다중 프로세스 테스트")
+def test_concurrent_processes_issue_once(tmp_path, monkeypatch):
+    """여러 프로세스가 동시에 만료를 감지해도 발급은 한 번, 모두 같은 토큰 사용"""
+    monkeypatch.chdir(tmp_path)
+    log_path = str(tmp_path / 'issued.log')
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    processes = [context.Process(target=issue_in_process, args=(str(tmp_path), log_path, queue))
+                 for _ in range(6)]
+    for process in processes:
+        process.start()
+    tokens = [queue.get(timeout=10) for _ in processes]
+    for process in processes:
+        process.join(timeout=10)
+
+    with open(log_path, encoding='utf-8') as f:
+        assert len(f.read().split()) == 1
+    assert len(set(tokens)) == 1
+
+
+def test_reload_on_file_change_and_atomic_write(tmp_path, monkeypatch):
+    """다른 인스턴스가 쓴 토큰은 파일이 바뀌었을 때 다시 로드, 임시 파일은 남지 않음"""
+    monkeypatch.chdir(tmp_path)
+    reader = TokenManager(broker_name="kis")
+    writer = TokenManager(broker_name="kis")
+    assert reader.get_access_token() is None
+
+    writer.save_token('first', expires_in=3600)
+    assert reader.get_access_token() == 'first'
+
+    writer.save_token('second', expires_in=3600)
+    assert reader.get_access_token() == 'second'
+    assert reader.is_token_valid()
+
+    token_dir = tmp_path / 'token' / 'kis'
+    assert sorted(p.name for p in token_dir.iterdir()) == ['tokens.json', 'tokens.json.lock']
+    with open(token_dir / 'tokens.json', encoding='utf-8') as f:
+        assert json.load(f)['current']['access_token'] == 'second'
+
+
+def test_issue_token_reuses_token_from_other_instance(tmp_path, monkeypatch):
+    """잠금을 얻은 뒤 다른 인스턴스가 이미 갱신한 토큰이면 발급하지 않음"""
+    monkeypatch.chdir(tmp_path)
+    stale = TokenManager(broker_name="kis")
+    stale.save_token('old', expires_in=10)
+    TokenManager(broker_name="kis").save_token('fresh', expires_in=3600)
+
+    def issuer():
+        raise AssertionError("발급 API를 호출하면 안 됨")
+
+    assert stale.issue_token(issuer, threshold_seconds=300)['access_token'] == 'fresh'
+
+
+def test_background_refresh_ahead_of_threshold(tmp_path, monkeypatch):
+    """만료 임계값 안에 들어온 토큰은 요청 경로가 아니라 백그라운드 스레드가 갱신"""
+    monkeypatch.chdir(tmp_path)
+    broker = KISBroker({
+        'name': '한국투자증권',
+        'api_type': 'kis',
+        'enabled': True,
+        'credentials': {'app_key': 'test-key', 'app_secret': 'test-secret'},
+        'api_settings': {'token_refresh_threshold': 300}
+    })
+    # 만료까지 120초: 요청에는 쓸 수 있지만 갱신 임계값(300초) 안
+    broker.token_manager.save_token('expiring', expires_in=120)
+    issued = []
+
+    def request_access_token():
+        issued.append(time.monotonic())
+        return {'access_token': 'refreshed', 'expires_in': 86400}
+
+    monkeypatch.setattr(broker, '_request_access_token', request_access_token)
+    try:
+        assert broker.connect()
+        assert broker.access_token == 'expiring'
+
+        deadline = time.monotonic() + 5
+        while broker.token_manager.get_access_token() != 'refreshed' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(issued) == 1
+
+        # 요청 경로는 발급 없이 갱신된 토큰 사용
+        assert not broker._is_token_expired()
+        broker._ensure_token()
+        assert broker.access_token == 'refreshed'
+    finally:
+        broker.disconnect()
+    assert broker.token_manager.token_file_path not in token_manager_module._refreshers
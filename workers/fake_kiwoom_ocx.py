@@ -0,0 +1,166 @@
+"""
+키움 OpenAPI OCX 대체 구현 (테스트용)
+
+KIWOOM_FAKE_OCX=1 환경변수로 kiwoom_worker_32.py를 실행하면 PyQt5/OCX 대신 사용됩니다.
+Windows/32비트 환경 없이 Worker 프로토콜을 검증하기 위한 용도입니다.
+
+KIWOOM_FAKE_DATA 환경변수로 JSON 파일 경로를 지정하면 해당 데이터를 사용합니다.
+    {
+        "accounts": {
+            "<계좌번호>": {
+                "balance": {"예수금": "...", "총평가금액": "...", ...},
+                "holdings": [{"종목코드": "...", "종목명": "...", ...}]
+            }
+        },
+        "login_delay": 0.0
+    }
+"""
+import json
+import os
+import time
+
+DEFAULT_DATA = {
+    'accounts': {
+        '8000000011': {
+            'balance': {
+                '예수금': '000001000000',
+                '총평가금액': '000002500000',
+                '총자산': '000003500000',
+                '총손익금액': '000000250000',
+                '총수익률(%)': '11.11'
+            },
+            'holdings': [
+                {'종목코드': '005930', '종목명': '삼성전자', '보유수량': '000000000020',
+                 '매입가': '000000070000', '현재가': '000000075000', '평가금액': '000001500000',
+                 '평가손익': '000000100000', '손익율': '000000071400'},
+                {'종목코드': '035720', '종목명': '카카오', '보유수량': '000000000020',
+                 '매입가': '000000045000', '현재가': '000000050000', '평가금액': '000001000000',
+                 '평가손익': '000000100000', '손익율': '000000111100'}
+            ]
+        },
+        '8000000022': {
+            'balance': {
+                '예수금': '000000500000',
+                '총평가금액': '000000000000',
+                '총자산': '000000500000',
+                '총손익금액': '000000000000',
+                '총수익률(%)': '0.00'
+            },
+            'holdings': []
+        }
+    },
+    'login_delay': 0.0
+}
+
+
+def _load_data():
+    """테스트 데이터 로드"""
+    data_path = os.getenv('KIWOOM_FAKE_DATA')
+    if data_path:
+        with open(data_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return DEFAULT_DATA
+
+
+class FakeSignal:
+    """Qt 시그널 대체"""
+
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self._slots:
+            slot(*args)
+
+
+class FakeKiwoomControl:
+    """QAxWidget("KHOPENAPI.KHOpenAPICtrl.1") 대체"""
+
+    _instances = []
+
+    def __init__(self, prog_id=None):
+        self.prog_id = prog_id
+        self.data = _load_data()
+        self.OnEventConnect = FakeSignal()
+        self.OnReceiveTrData = FakeSignal()
+        self.login_count = 0
+        self._inputs = {}
+        self._pending = []
+        self._current = {}
+        FakeKiwoomControl._instances.append(self)
+
+    def CommConnect(self):
+        """로그인 요청 (processEvents 시점에 OnEventConnect 발생)"""
+        self.login_count += 1
+        ready_at = time.time() + float(self.data.get('login_delay', 0.0))
+        self._pending.append((ready_at, self.OnEventConnect, (0,)))
+        return 0
+
+    def GetLoginInfo(self, tag):
+        """로그인 정보 조회"""
+        if tag == 'ACCNO':
+            return ''.join(f"{account};" for account in self.data['accounts'])
+        return ''
+
+    def SetInputValue(self, key, value):
+        """TR 입력값 설정"""
+        self._inputs[key] = value
+
+    def CommRqData(self, rqname, trcode, prev_next, screen_no):
+        """TR 요청 (processEvents 시점에 OnReceiveTrData 발생)"""
+        account_number = self._inputs.get('계좌번호')
+        if account_number not in self.data['accounts']:
+            return -300  # 입력값 오류
+        request = {'account_number': account_number, 'trcode': trcode}
+        self._inputs = {}
+        self._pending.append((time.time(), self._deliver_tr, (screen_no, rqname, trcode, request)))
+        return 0
+
+    def _deliver_tr(self, screen_no, rqname, trcode, request):
+        self._current = request
+        self.OnReceiveTrData.emit(screen_no, rqname, trcode, '', '0')
+
+    def GetRepeatCnt(self, trcode, record_name):
+        """멀티데이터 행 수"""
+        account = self.data['accounts'][self._current['account_number']]
+        return len(account['holdings'])
+
+    def GetCommData(self, trcode, item_name, index):
+        """TR 데이터 조회"""
+        account = self.data['accounts'][self._current['account_number']]
+        if self._current['trcode'].upper() == 'OPW00004':
+            holdings = account['holdings']
+            if index < len(holdings):
+                return holdings[index].get(item_name, '')
+            return ''
+        return account['balance'].get(item_name, '')
+
+    def CommTerminate(self):
+        """연결 종료"""
+        pass
+
+    def process_events(self):
+        """대기 중인 이벤트 전달"""
+        now = time.time()
+        ready = [event for event in self._pending if event[0] <= now]
+        self._pending = [event for event in self._pending if event[0] > now]
+        for _, callback, args in ready:
+            if isinstance(callback, FakeSignal):
+                callback.emit(*args)
+            else:
+                callback(*args)
+
+
+class FakeApplication:
+    """QApplication 대체"""
+
+    def __init__(self, argv=None):
+        self.argv = argv
+
+    @staticmethod
+    def processEvents():
+        for control in FakeKiwoomControl._instances:
+            control.process_events()
@@ -4,21 +4,41 @@
 
 Usage:
     python kiwoom_worker_32.py <command> [args...]
+    python kiwoom_worker_32.py serve
+    python kiwoom_worker_32.py batch [<json_commands> | -]
 
 Commands:
     get_accounts - 계좌 목록 조회
     get_balance <account_number> - 계좌 잔고 조회
     get_holdings <account_number> - 보유종목 조회
+    serve - 상주 모드 (한 번 로그인 후 stdin JSON-lines 요청 처리)
+    batch - 일괄 실행 (한 번 로그인 후 명령 목록 실행, 결과를 JSON-lines로 출력)
+            명령 목록: [{"id": 1, "command": "get_balance", "args": ["1234567890"]}, ...]
+            인자를 생략하거나 '-'이면 stdin에서 읽습니다.
+
+Serve protocol (한 줄에 하나의 JSON):
+    로그인 완료: {"event": "ready", "success": true, "accounts": [...]}
+    요청:       {"id": 1, "command": "get_balance", "args": ["1234567890"]}
+    응답:       {"id": 1, "success": true, "data": {...}}
+    종료:       {"id": 2, "command": "shutdown"}
+
+KIWOOM_FAKE_OCX=1 환경변수 설정 시 fake_kiwoom_ocx 모듈로 OCX를 대체합니다 (테스트용).
 """
 
 import sys
 import json
 import os
-from PyQt5.QAxContainer import QAxWidget
-from PyQt5.QtWidgets import QApplication
+import threading
 from queue import Queue, Empty
 import time
 
+if os.getenv('KIWOOM_FAKE_OCX') == '1':
+    from fake_kiwoom_ocx import FakeKiwoomControl as QAxWidget
+    from fake_kiwoom_ocx import FakeApplication as QApplication
+else:
+    from PyQt5.QAxContainer import QAxWidget
+    from PyQt5.QtWidgets import QApplication
+
 
 class KiwoomWorker:
     """키움 API 32비트 워커"""
@@ -277,6 +297,91 @@ class KiwoomWorker:
         print(json.dumps({'success': False, 'error': message}, ensure_ascii=False))
         sys.exit(1)
 
+    def execute(self, command, args):
+        """명령 실행"""
+        if command == 'get_accounts':
+            return self.get_accounts()
+        elif command == 'get_balance':
+            if len(args) < 1:
+                return {'success': False, 'error': '계좌번호가 필요합니다'}
+            return self.get_balance(args[0])
+        elif command == 'get_holdings':
+            if len(args) < 1:
+                return {'success': False, 'error': '계좌번호가 필요합니다'}
+            return self.get_holdings(args[0])
+        elif command == 'ping':
+            return {'success': True, 'data': {'connected': self.connected}}
+        else:
+            return {'success': False, 'error': f'알 수 없는 명령어: {command}'}
+
+    def serve(self, input_stream=None, output_stream=None, idle_interval=0.05):
+        """상주 모드 - JSON-lines 요청을 순차 처리 (로그인 세션 유지)"""
+        input_stream = input_stream or sys.stdin
+        output_stream = output_stream or sys.stdout
+        requests = Queue()
+
+        def read_requests():
+            for line in input_stream:
+                requests.put(line)
+            requests.put(None)  # EOF
+
+        # stdin 읽기는 별도 스레드, OCX 호출과 이벤트 처리는 메인 스레드에서 수행
+        reader = threading.Thread(target=read_requests, daemon=True)
+        reader.start()
+
+        self._write_line(output_stream, {
+            'event': 'ready',
+            'success': True,
+            'accounts': self.account_list
+        })
+
+        while True:
+            QApplication.processEvents()
+            try:
+                line = requests.get(timeout=idle_interval)
+            except Empty:
+                continue
+
+            if line is None:
+                break
+            line = line.strip()
+            if not line:
+                continue
+
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+                command = request.get('command')
+
+                if command == 'shutdown':
+                    self._write_line(output_stream, {'id': request_id, 'success': True})
+                    break
+
+                result = self.execute(command, request.get('args', []))
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+
+            result['id'] = request_id
+            self._write_line(output_stream, result)
+
+    def run_batch(self, commands, output_stream=None):
+        """명령 목록 일괄 실행 (명령마다 결과 한 줄씩 즉시 출력)"""
+        output_stream = output_stream or sys.stdout
+        for index, request in enumerate(commands):
+            request_id = request.get('id', index)
+            try:
+                result = self.execute(request.get('command'), request.get('args', []))
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            result['id'] = request_id
+            self._write_line(output_stream, result)
+
+    def _write_line(self, output_stream, payload):
+        """JSON 한 줄 출력"""
+        output_stream.write(json.dumps(payload, ensure_ascii=False) + '\n')
+        output_stream.flush()
+
     def disconnect(self):
         """연결 해제"""
         try:
@@ -294,6 +399,18 @@ def main():
 
     command = sys.argv[1]
 
+    # 일괄 실행 명령 목록 파싱 (로그인 전에 입력 오류 확인)
+    batch_commands = None
+    if command == 'batch':
+        try:
+            raw = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != '-' else sys.stdin.read()
+            batch_commands = json.loads(raw)
+            if not isinstance(batch_commands, list):
+                raise ValueError('명령 목록은 JSON 배열이어야 합니다')
+        except Exception as e:
+            print(json.dumps({'success': False, 'error': f'명령 목록 파싱 실패: {str(e)}'}, ensure_ascii=False))
+            sys.exit(1)
+
     # Qt 애플리케이션 생성
     app = QApplication(sys.argv)
 
@@ -304,22 +421,14 @@ def main():
 
     # 명령 실행
     try:
-        if command == 'get_accounts':
-            result = worker.get_accounts()
-        elif command == 'get_balance':
-            if len(sys.argv) < 3:
-                result = {'success': False, 'error': '계좌번호가 필요합니다'}
-            else:
-                account_number = sys.argv[2]
-                result = worker.get_balance(account_number)
-        elif command == 'get_holdings':
-            if len(sys.argv) < 3:
-                result = {'success': False, 'error': '계좌번호가 필요합니다'}
-            else:
-                account_number = sys.argv[2]
-                result = worker.get_holdings(account_number)
-        else:
-            result = {'success': False, 'error': f'알 수 없는 명령어: {command}'}
+        if command == 'serve':
+            worker.serve()
+            return
+        if command == 'batch':
+            worker.run_batch(batch_commands)
+            return
+
+        result = worker.execute(command, sys.argv[2:])
 
         # 결과 출력 (JSON)
         print(json.dumps(result, ensure_ascii=False))